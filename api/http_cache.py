@@ -0,0 +1,67 @@
+"""HTTP caching and pagination helpers for the read endpoints."""
+
+import base64
+import json
+from datetime import date
+from typing import Any, Callable, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from config.settings import API_CACHE_MAX_AGE
+
+
+def encode_cursor(after: Optional[tuple]) -> Optional[str]:
+    """Opaque cursor for the next page (None on the last page)."""
+    if after is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(after)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    """Turn a cursor from a previous page back into its keyset position."""
+    if not cursor:
+        return None
+    try:
+        after = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(after, list) or len(after) != 2:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(after)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a ?fields=a,b,c projection into column names."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def etag_for(data_version: int) -> str:
+    """Weak ETag for data at one version (date-relative results change daily too)."""
+    return f'W/"{data_version}-{date.today().isoformat()}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag[2:]  # weak comparison ignores the W/ prefix
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == opaque for tag in tags)
+
+
+def cached_json(request: Request, data_version: int, build: Callable[[], Any]) -> Response:
+    """
+    Respond with build()'s result, or 304 if the client already has this version.
+
+    build() only runs when the client's copy is stale, so polling an
+    unchanged resource costs one data_version() lookup.
+    """
+    etag = etag_for(data_version)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={API_CACHE_MAX_AGE}, must-revalidate"}
+    if _matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(jsonable_encoder(build()), headers=headers)
@@ -9,13 +9,18 @@ Provides programmatic access to:
 - Portfolio insights
 """
 
-from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, BackgroundTasks, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+import hashlib
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 # Add src to path
@@ -24,20 +29,38 @@ sys.path.append(str(Path(__file__).parent.parent))
 from src.search.query_engine import QueryEngine
 from src.database.sql_store import SQLStore
 from src.analytics.lease_analytics import LeaseAnalytics
-from config.settings import Settings
+from src.observability import REGISTRY, get_usage_tracker, span, usage_context
+from src.database.expiration_scheduler import ExpirationScheduler
+from src.ingestion import JobQueue
+from src.export import ReportGenerator
+from src.memory import get_conversation_manager
+from config.settings import SLOW_QUERY_MS, INGEST_UPLOAD_DIR
+from api.http_cache import cached_json, decode_cursor, encode_cursor, parse_fields
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background workers with the server rather than on import"""
+    job_queue.start()  # resume jobs a previous process left queued or running
+    expiration_scheduler.start()
+    yield
+    expiration_scheduler.shutdown()
+    job_queue.shutdown()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Medley Lease Analysis & Management API",
     description="REST API for lease document analysis, financial analytics, and portfolio management",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -50,10 +73,12 @@ app.add_middleware(
 )
 
 # Initialize components
-settings = Settings()
-query_engine = QueryEngine(settings)
+query_engine = QueryEngine()
 sql_store = SQLStore()
 analytics = LeaseAnalytics(sql_store)
+report_generator = ReportGenerator(sql_store, analytics)
+job_queue = JobQueue(store=query_engine.store, ranker=query_engine.ranker, sql_db_path=str(sql_store.db_path))
+expiration_scheduler = ExpirationScheduler(sql_store.db_path)
 
 
 # ==================== Request/Response Models ====================
@@ -63,6 +88,7 @@ class QueryRequest(BaseModel):
     question: str = Field(..., description="Natural language question about leases")
     tenant_filter: Optional[str] = Field(None, description="Filter results to specific tenant")
     max_results: Optional[int] = Field(5, description="Maximum number of results to return", ge=1, le=20)
+    debug: bool = Field(False, description="Include a per-stage timing breakdown in the response")
 
 
 class QueryResponse(BaseModel):
@@ -71,6 +97,25 @@ class QueryResponse(BaseModel):
     sources: List[Dict[str, Any]]
     query_time_ms: float
     result_count: int
+    timings: Optional[Dict[str, float]] = None
+    trace: Optional[Dict[str, Any]] = None
+
+
+class ChatRequest(BaseModel):
+    """Request model for one turn of a multi-turn chat."""
+    message: str = Field(..., description="The user's next message")
+    session_id: Optional[str] = Field(None, description="session_id from the previous turn (omit to start a chat)")
+    tenant_filter: Optional[str] = Field(None, description="Filter results to specific tenant")
+    max_results: Optional[int] = Field(5, description="Maximum number of results to return", ge=1, le=20)
+
+
+class ChatResponse(BaseModel):
+    """Response model for a chat turn."""
+    answer: str
+    sources: List[Dict[str, Any]]
+    session_id: str
+    turn_count: int
+    query_time_ms: float
 
 
 class LeaseCreate(BaseModel):
@@ -96,6 +141,17 @@ class LeaseUpdate(BaseModel):
     status: Optional[str] = None
 
 
+class IngestRequest(BaseModel):
+    """Request model for queueing one lease document."""
+    file_path: str = Field(..., description="Path to a DOCX lease readable by the API server")
+    force: bool = Field(False, description="Queue even if the same file was already ingested")
+
+
+class ReembedRequest(BaseModel):
+    """Request model for re-ingesting a directory of leases."""
+    lease_dir: Optional[str] = Field(None, description="Directory of DOCX leases (default: the lease contracts folder)")
+
+
 class HealthResponse(BaseModel):
     """API health check response."""
     status: str
@@ -114,9 +170,12 @@ async def root():
         "documentation": "/docs",
         "endpoints": {
             "query": "/api/query",
+            "chat": "/api/chat",
             "leases": "/api/leases",
+            "ingest": "/api/ingest",
             "analytics": "/api/analytics",
-            "alerts": "/api/alerts"
+            "alerts": "/api/alerts",
+            "metrics": "/api/metrics"
         }
     }
 
@@ -148,39 +207,99 @@ async def query_leases(request: QueryRequest, background_tasks: BackgroundTasks)
     - "Compare rent rates for cafe tenants"
     """
     try:
-        start_time = datetime.now()
-
-        # Execute RAG query
-        result = query_engine.query(
-            question=request.question,
-            tenant_filter=request.tenant_filter,
-            max_results=request.max_results
-        )
+        # Execute RAG query; pipeline stages attach to this span
+        with span("request", endpoint="/api/query") as trace, usage_context(endpoint="/api/query"):
+            result = query_engine.query(
+                question=request.question,
+                n_results=request.max_results,
+                tenant_filter=request.tenant_filter
+            )
 
-        end_time = datetime.now()
-        query_time_ms = (end_time - start_time).total_seconds() * 1000
+        query_time_ms = trace.duration_ms
+        breakdown = trace.breakdown()
 
         # Log query in background
         background_tasks.add_task(
             sql_store.log_query,
             request.question,
             request.tenant_filter,
-            len(result['sources']),
+            len(result.sources),
             query_time_ms
         )
 
-        return {
-            "answer": result['answer'],
-            "sources": result['sources'],
+        if query_time_ms >= SLOW_QUERY_MS:
+            background_tasks.add_task(
+                sql_store.log_slow_query,
+                request.question,
+                query_time_ms,
+                breakdown,
+                trace.to_dict(),
+                request.tenant_filter
+            )
+
+        response = {
+            "answer": result.answer,
+            "sources": result.sources,
             "query_time_ms": round(query_time_ms, 2),
-            "result_count": len(result['sources'])
+            "result_count": len(result.sources)
         }
+        if request.debug:
+            response["timings"] = breakdown
+            response["trace"] = trace.to_dict()
+        return response
 
     except Exception as e:
         logger.error(f"Query error: {e}")
         raise HTTPException(status_code=500, detail=f"Query failed: {str(e)}")
 
 
+@app.post("/api/chat", response_model=ChatResponse, tags=["Query"])
+async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
+    """
+    Answer one turn of a conversation, with earlier turns as context.
+
+    The history lives server-side: send back the returned session_id to
+    continue the chat. Unknown or expired session IDs start a new chat.
+    """
+    try:
+        memory = get_conversation_manager().get_or_create_session(request.session_id)
+        with span("request", endpoint="/api/chat") as trace, \
+                usage_context(endpoint="/api/chat", session_id=memory.session_id):
+            result = query_engine.chat(
+                message=request.message,
+                conversation_history=memory.get_messages(),
+                n_results=request.max_results,
+                tenant_filter=request.tenant_filter
+            )
+        memory.add_turn(request.message, result.answer, {"tenant_filter": request.tenant_filter})
+
+        background_tasks.add_task(
+            sql_store.log_query,
+            request.message,
+            request.tenant_filter,
+            len(result.sources),
+            trace.duration_ms
+        )
+        return {
+            "answer": result.answer,
+            "sources": result.sources,
+            "session_id": memory.session_id,
+            "turn_count": len(memory),
+            "query_time_ms": round(trace.duration_ms, 2)
+        }
+
+    except Exception as e:
+        logger.error(f"Chat error: {e}")
+        raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
+
+
+@app.delete("/api/chat/{session_id}", tags=["Query"])
+async def end_chat(session_id: str):
+    """Forget a chat session and its history."""
+    get_conversation_manager().delete_session(session_id)
+    return {"session_id": session_id, "deleted": True}
+
+
 @app.get("/api/query/popular", tags=["Query"])
 async def get_popular_queries(limit: int = Query(10, ge=1, le=50)):
     """Get most frequently asked questions."""
@@ -191,26 +310,85 @@ async def get_popular_queries(limit: int = Query(10, ge=1, le=50)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/query/slow", tags=["Query"])
+async def get_slow_queries(limit: int = Query(20, ge=1, le=200)):
+    """Get the slowest sampled queries with per-stage timing breakdowns."""
+    try:
+        slow = sql_store.get_slow_queries(limit=limit)
+        return {"queries": slow, "count": len(slow), "threshold_ms": SLOW_QUERY_MS}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse, tags=["Info"])
+async def get_metrics():
+    """Stage latency histograms and error counters in Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/usage", tags=["Info"])
+async def get_usage(
+    by: str = Query("endpoint", description="endpoint, agent, tenant_filter, model or operation"),
+    hours: Optional[int] = Query(None, ge=1, le=24 * 90, description="Only the last N hours")
+):
+    """Token usage and estimated LLM/embedding spend, grouped by one dimension."""
+    try:
+        tracker = get_usage_tracker()
+        since = datetime.now() - timedelta(hours=hours) if hours else None
+        return {
+            "by": by,
+            "usage": tracker.summary(by=by, since=since),
+            "daily_cost_usd": round(tracker.daily_cost(), 4),
+            "daily_budget_usd": tracker.daily_cost_budget
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ==================== Lease Management Endpoints ====================
 
+def _paged(request: Request, key: str, read_page, cursor: Optional[str], limit: int, fields: Optional[str], **filters):
+    """Serve one keyset page as {key: rows, "count", "next_cursor"} behind an ETag."""
+    after = decode_cursor(cursor)
+    columns = parse_fields(fields)
+
+    def build():
+        rows, next_after = read_page(after=after, limit=limit, fields=columns, **filters)
+        return {key: rows, "count": len(rows), "next_cursor": encode_cursor(next_after)}
+
+    try:
+        return cached_json(request, sql_store.data_version(), build)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/api/leases", tags=["Leases"])
-async def get_all_leases(status: Optional[str] = Query(None, description="Filter by status")):
-    """Get all leases, optionally filtered by status."""
+async def get_all_leases(
+    request: Request,
+    status: Optional[str] = Query(None, description="Filter by status"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return")
+):
+    """Get one page of leases in end-date order, optionally filtered by status."""
     try:
-        leases = sql_store.get_all_leases(status=status)
-        return {"leases": leases, "count": len(leases)}
+        return _paged(request, "leases", sql_store.get_leases_page, cursor, limit, fields, status=status)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/leases/{lease_id}", tags=["Leases"])
-async def get_lease(lease_id: int):
+async def get_lease(request: Request, lease_id: int):
     """Get lease details by ID."""
     try:
         lease = sql_store.get_lease(lease_id)
         if not lease:
             raise HTTPException(status_code=404, detail=f"Lease {lease_id} not found")
-        return lease
+        return cached_json(request, sql_store.data_version(), lambda: lease)
     except HTTPException:
         raise
     except Exception as e:
@@ -262,11 +440,109 @@ async def update_lease(lease_id: int, update: LeaseUpdate):
 
 
 @app.get("/api/leases/tenant/{tenant_name}", tags=["Leases"])
-async def get_leases_by_tenant(tenant_name: str):
+async def get_leases_by_tenant(request: Request, tenant_name: str):
     """Get all leases for a specific tenant."""
-    try:
+    def build():
         leases = sql_store.get_leases_by_tenant(tenant_name)
         return {"tenant": tenant_name, "leases": leases, "count": len(leases)}
+
+    try:
+        return cached_json(request, sql_store.data_version(), build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ==================== Ingestion Endpoints ====================
+
+@app.post("/api/ingest", status_code=202, tags=["Ingestion"])
+async def queue_ingest(request: IngestRequest):
+    """Queue one lease document for ingestion and return its job."""
+    try:
+        return job_queue.submit("ingest", request.file_path, force=request.force).to_dict()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/ingest/upload", status_code=202, tags=["Ingestion"])
+async def upload_and_ingest(file: UploadFile = File(...), force: bool = False):
+    """
+    Stream an uploaded DOCX to disk and queue it for ingestion.
+
+    Uploads are stored under their sha256 (uploads/<sha256>/<file name>), so
+    a later upload with the same name never overwrites bytes a queued job
+    is about to read, and the file name the chunks are attributed to is kept.
+    """
+    name = Path(file.filename or "").name
+    if not name.lower().endswith(".docx"):
+        raise HTTPException(status_code=400, detail="Only .docx files can be ingested")
+    try:
+        INGEST_UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, partial = tempfile.mkstemp(dir=INGEST_UPLOAD_DIR, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while block := await file.read(1024 * 1024):
+                    digest.update(block)
+                    out.write(block)
+            target = INGEST_UPLOAD_DIR / digest.hexdigest() / name
+            target.parent.mkdir(exist_ok=True)
+            if not target.exists():
+                os.replace(partial, target)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return job_queue.submit("ingest", str(target), force=force).to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/ingest/reembed", status_code=202, tags=["Ingestion"])
+async def queue_reembed(request: ReembedRequest):
+    """Queue a re-ingest of every lease in a directory."""
+    try:
+        return job_queue.submit("reembed", request.lease_dir or "").to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/ingest/reindex", status_code=202, tags=["Ingestion"])
+async def queue_reindex():
+    """Queue a rebuild of the keyword (BM25) index."""
+    try:
+        return job_queue.submit("reindex").to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/ingest/jobs", tags=["Ingestion"])
+async def list_ingest_jobs(
+    status: Optional[str] = Query(None, description="queued, running, done or failed"),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """List recent ingestion jobs, newest first."""
+    try:
+        jobs = [job.to_dict() for job in job_queue.list_jobs(status=status, limit=limit)]
+        return {"jobs": jobs, "count": len(jobs)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/ingest/jobs/{job_id}", tags=["Ingestion"])
+async def get_ingest_job(job_id: int):
+    """Get the status and progress of one ingestion job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+
+@app.get("/api/ingest/stats", tags=["Ingestion"])
+async def get_ingest_stats():
+    """Queue depth and ingestion throughput."""
+    try:
+        return job_queue.stats()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -274,23 +550,29 @@ async def get_leases_by_tenant(tenant_name: str):
 # ==================== Tenants Endpoints ====================
 
 @app.get("/api/tenants", tags=["Tenants"])
-async def get_all_tenants():
-    """Get all tenants."""
+async def get_all_tenants(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return")
+):
+    """Get one page of tenants in name order."""
     try:
-        tenants = sql_store.get_all_tenants()
-        return {"tenants": tenants, "count": len(tenants)}
+        return _paged(request, "tenants", sql_store.get_tenants_page, cursor, limit, fields)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/tenants/{tenant_name}", tags=["Tenants"])
-async def get_tenant(tenant_name: str):
+async def get_tenant(request: Request, tenant_name: str):
     """Get tenant information."""
     try:
         tenant = sql_store.get_tenant(tenant_name)
         if not tenant:
             raise HTTPException(status_code=404, detail=f"Tenant '{tenant_name}' not found")
-        return tenant
+        return cached_json(request, sql_store.data_version(), lambda: tenant)
     except HTTPException:
         raise
     except Exception as e:
@@ -300,71 +582,92 @@ async def get_tenant(tenant_name: str):
 # ==================== Analytics Endpoints ====================
 
 @app.get("/api/analytics/summary", tags=["Analytics"])
-async def get_financial_summary():
+async def get_financial_summary(request: Request):
     """Get overall financial summary."""
     try:
-        summary = sql_store.get_financial_summary()
-        return summary
+        return cached_json(request, sql_store.data_version(), sql_store.get_financial_summary)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics/revenue-projection", tags=["Analytics"])
-async def get_revenue_projection(months: int = Query(12, ge=1, le=36)):
+async def get_revenue_projection(request: Request, months: int = Query(12, ge=1, le=36)):
     """Get revenue projections for the next N months."""
     try:
-        projection = analytics.project_revenue(months_ahead=months)
-        return projection
+        return cached_json(request, sql_store.data_version(), lambda: analytics.project_revenue(months_ahead=months))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics/portfolio-health", tags=["Analytics"])
-async def get_portfolio_health():
+async def get_portfolio_health(request: Request):
     """Calculate portfolio health score and recommendations."""
     try:
-        health = analytics.calculate_portfolio_health_score()
-        return health
+        return cached_json(request, sql_store.data_version(), analytics.calculate_portfolio_health_score)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics/risk-assessment", tags=["Analytics"])
-async def get_risk_assessment():
+async def get_risk_assessment(request: Request):
     """Assess portfolio risks."""
     try:
-        risk = analytics.assess_portfolio_risk()
-        return risk
+        return cached_json(request, sql_store.data_version(), analytics.assess_portfolio_risk)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics/benchmarks", tags=["Analytics"])
-async def get_benchmarks():
+async def get_benchmarks(request: Request):
     """Get tenant benchmarks across portfolio."""
     try:
-        benchmarks = analytics.get_tenant_benchmarks()
-        return benchmarks
+        return cached_json(request, sql_store.data_version(), analytics.get_tenant_benchmarks)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics/optimization", tags=["Analytics"])
-async def get_optimization_opportunities():
+async def get_optimization_opportunities(request: Request):
     """Get rent optimization opportunities."""
     try:
-        opportunities = analytics.get_optimization_opportunities()
-        return {"opportunities": opportunities, "count": len(opportunities)}
+        def build():
+            opportunities = analytics.get_optimization_opportunities()
+            return {"opportunities": opportunities, "count": len(opportunities)}
+
+        return cached_json(request, sql_store.data_version(), build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/analytics/expiration-timeline", tags=["Analytics"])
-async def get_expiration_timeline(months: int = Query(24, ge=1, le=60)):
+async def get_expiration_timeline(request: Request, months: int = Query(24, ge=1, le=60)):
     """Get lease expiration timeline."""
     try:
-        timeline = analytics.analyze_expiration_timeline(months_ahead=months)
-        return timeline
+        return cached_json(request, sql_store.data_version(),
+                           lambda: analytics.analyze_expiration_timeline(months_ahead=months))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/analytics/cotenancy-simulation", tags=["Analytics"])
+async def get_cotenancy_simulation(
+    scenarios: int = Query(10000, ge=100, le=200000),
+    anchor_delay_prob: float = Query(0.25, ge=0, le=1),
+    anchor_closure_prob: float = Query(0.05, ge=0, le=1),
+    tenant_failure_prob: float = Query(0.02, ge=0, le=1),
+    horizon_months: int = Query(24, ge=1, le=120),
+    seed: Optional[int] = Query(None, description="Random seed for reproducible results")
+):
+    """Monte Carlo distribution of co-tenancy rent at risk."""
+    try:
+        return analytics.simulate_cotenancy_risk(
+            n_scenarios=scenarios,
+            seed=seed,
+            anchor_delay_prob=anchor_delay_prob,
+            anchor_closure_prob=anchor_closure_prob,
+            tenant_failure_prob=tenant_failure_prob,
+            horizon_months=horizon_months
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -385,13 +688,13 @@ async def compare_tenants(tenant_names: List[str]):
 
 
 @app.get("/api/analytics/lease-value/{lease_id}", tags=["Analytics"])
-async def get_lease_value(lease_id: int):
+async def get_lease_value(request: Request, lease_id: int):
     """Calculate total value metrics for a lease."""
     try:
         value = analytics.calculate_lease_value(lease_id)
         if not value:
             raise HTTPException(status_code=404, detail=f"Lease {lease_id} not found")
-        return value
+        return cached_json(request, sql_store.data_version(), lambda: value)
     except HTTPException:
         raise
     except Exception as e:
@@ -401,21 +704,31 @@ async def get_lease_value(lease_id: int):
 # ==================== Alerts Endpoints ====================
 
 @app.get("/api/alerts", tags=["Alerts"])
-async def get_active_alerts(days_ahead: int = Query(30, ge=0, le=365)):
-    """Get active lease alerts for the next N days."""
+async def get_active_alerts(
+    request: Request,
+    days_ahead: int = Query(30, ge=0, le=365),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return")
+):
+    """Get one page of active lease alerts for the next N days, in alert-date order."""
     try:
-        alerts = sql_store.get_active_alerts(days_ahead=days_ahead)
-        return {"alerts": alerts, "count": len(alerts)}
+        return _paged(request, "alerts", sql_store.get_alerts_page, cursor, limit, fields, days_ahead=days_ahead)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/alerts/expiring", tags=["Alerts"])
-async def get_expiring_leases(days_ahead: int = Query(90, ge=0, le=365)):
+async def get_expiring_leases(request: Request, days_ahead: int = Query(90, ge=0, le=365)):
     """Get leases expiring within the next N days."""
-    try:
+    def build():
         expiring = sql_store.get_expiring_leases(days_ahead=days_ahead)
         return {"leases": expiring, "count": len(expiring)}
+
+    try:
+        return cached_json(request, sql_store.data_version(), build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -430,6 +743,98 @@ async def dismiss_alert(alert_id: int):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ==================== Export Endpoints ====================
+
+def _csv_download(dataset: str, **filters) -> StreamingResponse:
+    """Stream a dataset as a CSV attachment, sending the header before the rest of the table is read."""
+    return StreamingResponse(
+        report_generator.stream_csv(dataset, **filters),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.csv"'}
+    )
+
+
+def _write_portfolio_workbook(output_path: str):
+    """Build the portfolio workbook on a worker thread, with a connection of its own."""
+    with SQLStore(str(sql_store.db_path)) as store:
+        ReportGenerator(store).export_portfolio_excel(output_path)
+
+
+@app.get("/api/export/leases.csv", tags=["Export"])
+async def export_leases_csv(
+    status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to export")
+):
+    """Download leases as CSV, streamed from the database."""
+    try:
+        return _csv_download("leases", status=status, fields=parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/export/revenue.csv", tags=["Export"])
+async def export_revenue_csv():
+    """Download revenue by tenant as CSV."""
+    try:
+        return _csv_download("revenue")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/export/expiring.csv", tags=["Export"])
+async def export_expiring_csv(days_ahead: int = Query(90, ge=0, le=365)):
+    """Download leases expiring within the next N days as CSV."""
+    try:
+        return _csv_download("expiring", days_ahead=days_ahead)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/export/alerts.csv", tags=["Export"])
+async def export_alerts_csv(days_ahead: int = Query(30, ge=0, le=365)):
+    """Download active alerts for the next N days as CSV."""
+    try:
+        return _csv_download("alerts", days_ahead=days_ahead)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/export/financials.csv", tags=["Export"])
+async def export_financials_csv():
+    """Download every financial record as CSV."""
+    try:
+        return _csv_download("financials")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/export/portfolio.xlsx", tags=["Export"])
+async def export_portfolio_excel(background_tasks: BackgroundTasks):
+    """
+    Download the multi-sheet portfolio workbook.
+
+    An xlsx file is a zip archive that can only be finalized once every sheet
+    is written, so the workbook is built in write-only mode into a temporary
+    file off the event loop, then streamed back and deleted.
+    """
+    fd, output_path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await run_in_threadpool(_write_portfolio_workbook, output_path)
+    except Exception as e:
+        os.remove(output_path)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    background_tasks.add_task(os.remove, output_path)
+    return FileResponse(
+        output_path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename="portfolio.xlsx"
+    )
+
+
 # ==================== Error Handlers ====================
 
 @app.exception_handler(Exception)
@@ -3,6 +3,7 @@ Configuration settings for Medley Lease Analysis & Management RAG System
 """
 
 import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,10 +18,12 @@ def get_secret(key: str, default: str = None) -> str:
     if value:
         return value
 
-    # Then try Streamlit secrets (for Streamlit Cloud deployment)
+    # Then try Streamlit secrets (for Streamlit Cloud deployment). Only a
+    # Streamlit app has them, and it has imported streamlit by now; importing
+    # it here would add a second to the startup of every CLI and API worker
+    st = sys.modules.get("streamlit")
     try:
-        import streamlit as st
-        if hasattr(st, 'secrets') and key in st.secrets:
+        if st is not None and hasattr(st, 'secrets') and key in st.secrets:
             return st.secrets[key]
     except Exception:
         pass
@@ -40,6 +43,8 @@ ANTHROPIC_API_KEY = get_secret("ANTHROPIC_API_KEY")
 EMBEDDING_MODEL = get_secret("EMBEDDING_MODEL", "text-embedding-3-small")
 EMBEDDING_DIMENSION = 1536
 EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_CACHE_PATH = BASE_DIR / "data" / "embedding_cache.db"  # SQLite cache of vectors keyed by sha256(model, text)
+EMBEDDING_CACHE_ENABLED = get_secret("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"  # "false" bypasses the cache
 
 # LLM settings
 LLM_MODEL = get_secret("LLM_MODEL", "gpt-4o")
@@ -51,15 +56,103 @@ CHUNK_OVERLAP = 100  # tokens
 MIN_CHUNK_SIZE = 100  # minimum tokens for a chunk
 
 # Search settings
-VECTOR_SEARCH_K = 20  # top-k for vector search
-BM25_SEARCH_K = 20  # top-k for BM25 search
+VECTOR_SEARCH_K = 10  # top-k for vector search (reranking keeps recall at this depth)
+BM25_SEARCH_K = 10  # top-k for BM25 search
 FINAL_RESULTS_K = 10  # final results after fusion
 RRF_K = 60  # RRF constant
 VECTOR_WEIGHT = 0.6  # weight for vector search in hybrid
 BM25_WEIGHT = 0.4  # weight for BM25 in hybrid
+RERANK_ENABLED = True  # rescore fused candidates with the linear feature reranker
+RERANK_WEIGHTS = {  # feature -> weight for the linear reranker (see src/search/reranker.py)
+    "fusion": 1.0,
+    "structured": 0.1,
+    "numeric": 0.2,
+    "tenant_match": 0.6,
+    "tenant_mismatch": -0.6,
+    "section_match": 0.3,
+}
 
-# ChromaDB collection name
+# Vector store backend settings
+VECTOR_BACKEND = get_secret("VECTOR_BACKEND", "chroma")  # "chroma", or "index" for the local memory-mapped VectorIndex
+VECTOR_INDEX_DIR = BASE_DIR / "data" / "vector_index"  # VectorIndex files (manifest + one generation of arrays)
+VECTOR_INDEX_QUANTIZE = get_secret("VECTOR_INDEX_QUANTIZE", "false").lower() == "true"  # int8 vectors, 4x smaller
+VECTOR_INDEX_IVF_MIN_VECTORS = 4096  # train an IVF coarse index at this many vectors (exact scan below)
+VECTOR_INDEX_NPROBE = 8  # IVF lists scanned per unfiltered query
+
+# Prompt context settings
+CONTEXT_TOKEN_BUDGET = 6000  # max tokens of retrieved excerpts sent to the LLM
+
+# Conversation history settings
+HISTORY_TOKEN_BUDGET = 2000  # max tokens of history sent with each LLM call
+HISTORY_KEEP_TURNS = 3  # most recent turns kept verbatim
+HISTORY_SUMMARY_TOKENS = 300  # max tokens for the rolling summary of older turns
+
+# Usage accounting settings
+USAGE_DB_PATH = BASE_DIR / "data" / "usage.db"  # SQLite file for per-call token/cost records
+USAGE_FLUSH_EVERY = 50  # flush buffered usage records after this many calls
+USAGE_FLUSH_INTERVAL_SECONDS = 30  # ...or when the oldest buffered record is this old
+SESSION_TOKEN_BUDGET = int(get_secret("SESSION_TOKEN_BUDGET", "200000"))  # tokens per chat session (0 = unlimited)
+DAILY_COST_BUDGET_USD = float(get_secret("DAILY_COST_BUDGET_USD", "25"))  # spend per day (0 = unlimited)
+
+# USD per 1M tokens as (input, output); model names match by longest prefix
+MODEL_PRICING = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-haiku": (0.25, 1.25),
+}
+
+# Cheaper model used once a session or daily budget is exceeded
+CHEAPER_MODELS = {
+    "gpt-4o": "gpt-4o-mini",
+    "claude-3-5-sonnet": "claude-3-5-haiku-latest",
+}
+
+# Chat session settings
+CHAT_SESSIONS_DB_PATH = BASE_DIR / "data" / "sessions.db"  # SQLite file of chat sessions shared by every process
+CHAT_MAX_SESSIONS = 1000  # sessions cached in memory per process (the SQLite file keeps the rest)
+CHAT_SESSION_TTL_MINUTES = 120  # sessions idle longer than this are expired
+CHAT_SESSION_MAX_TURNS = 20  # turns kept per session and replayed as chat history
+
+# Parse cache settings
+PARSE_CACHE_DIR = BASE_DIR / "data" / "parse_cache"  # pickled parse results keyed by file sha256 + parser version
+PARSE_CACHE_ENABLED = get_secret("PARSE_CACHE_ENABLED", "true").lower() == "true"  # set "false" to always re-parse
+
+# Background ingestion job settings
+INGEST_JOBS_DB_PATH = BASE_DIR / "data" / "ingest_jobs.db"  # SQLite table of queued/running/finished ingestion jobs
+INGEST_UPLOAD_DIR = BASE_DIR / "data" / "uploads"  # where /api/ingest/upload streams uploaded leases
+INGEST_MAX_WORKERS = int(get_secret("INGEST_MAX_WORKERS", "2"))  # jobs that run at the same time
+INGEST_HEARTBEAT_SECONDS = float(get_secret("INGEST_HEARTBEAT_SECONDS", "10"))  # how often a queue marks its jobs alive
+INGEST_STALE_SECONDS = float(get_secret("INGEST_STALE_SECONDS", "60"))  # running jobs silent this long are requeued
+
+# HTTP cache settings
+API_CACHE_MAX_AGE = int(get_secret("API_CACHE_MAX_AGE", "0"))  # seconds a client may reuse a GET before revalidating
+
+# Export settings
+EXPORT_BATCH_SIZE = int(get_secret("EXPORT_BATCH_SIZE", "1000"))  # rows per fetchmany() in streaming exports
+REPORT_CACHE_DIR = BASE_DIR / "data" / "report_cache"  # pickled PDF report sections keyed by their inputs
+REPORT_CACHE_ENABLED = get_secret("REPORT_CACHE_ENABLED", "true").lower() == "true"  # "false" rebuilds every section
+REPORT_WORKERS = int(get_secret("REPORT_WORKERS", str(min(4, os.cpu_count() or 1))))  # processes for PDF tenant pages
+
+# Expiration calendar settings
+EXPIRATION_ALERT_HORIZONS = [  # days' notice of each expiration alert
+    int(days) for days in get_secret("EXPIRATION_ALERT_HORIZONS", "90,60,30").split(",")
+]
+EXPIRATION_REFRESH_AT = get_secret("EXPIRATION_REFRESH_AT", "02:00")  # local time of the nightly calendar rebuild
+EXPIRATION_POLL_SECONDS = 60.0  # how often the scheduler checks for the nightly slot and outside writes
+
+# Cache invalidation settings
+INVALIDATION_POLL_SECONDS = 2.0  # how often caches re-read store data versions to catch other processes' writes
+
+# Tracing settings
+SLOW_QUERY_MS = 5000  # queries slower than this are sampled to the slow_query_log table
+
+# ChromaDB collection name (an alias for the live "<name>__v<n>" version after the first rebuild)
 COLLECTION_NAME = "medley_leases"
+COLLECTION_GC_GRACE_SECONDS = 600  # retired collection versions are kept this long for in-flight readers
 
 # Supported file extensions
 SUPPORTED_EXTENSIONS = [".docx"]
@@ -15,6 +15,9 @@ import pandas as pd
 
 # Import chat components
 from src.search.query_engine import QueryEngine
+from src.database.invalidation import get_invalidation_bus
+from src.memory import get_conversation_manager
+from src.observability.usage import usage_context
 
 # Import agent framework
 from src.agents import (
@@ -30,9 +33,9 @@ from src.data.lease_data import (
     get_all_leases,
     get_categories,
     get_tenants_with_cotenancy,
-    calc_rent_for_year,
     get_summary_stats,
 )
+from src.data.rent_projection import get_portfolio_projection
 
 try:
     from dateutil.relativedelta import relativedelta
@@ -103,7 +106,7 @@ def fmt_percent(val):
 
 @st.cache_resource
 def get_query_engine():
-    """Initialize and cache the query engine"""
+    """Initialize and cache the query engine (it follows data changes through the invalidation bus)"""
     return QueryEngine()
 
 
@@ -130,14 +133,38 @@ def get_agent_router(_query_engine):
 
 def initialize_chat_state():
     """Initialize chat session state variables"""
+    if "session_id" not in st.session_state:
+        # The chat is a ConversationManager session, so it survives reloads (via ?session=)
+        # and restarts; its ID also attributes token usage and the per-session budget
+        memory = get_conversation_manager().get_or_create_session(st.query_params.get("session"))
+        _use_session(memory.session_id)
+        st.session_state.messages = memory.get_messages()
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "sources" not in st.session_state:
         st.session_state.sources = []
 
 
+def _use_session(session_id):
+    """Make session_id this browser tab's chat session"""
+    st.session_state.session_id = session_id
+    st.query_params["session"] = session_id
+
+
+def record_turn(message, answer, tenant_filter):
+    """Store a finished turn in the chat's session (a new one if it expired while idle)"""
+    manager = get_conversation_manager()
+    memory = manager.get_or_create_session(st.session_state.session_id)
+    if memory.session_id != st.session_state.session_id:
+        _use_session(memory.session_id)
+    memory.add_turn(message, answer, {"tenant_filter": tenant_filter})
+
+
 def clear_conversation():
     """Clear the conversation history"""
+    manager = get_conversation_manager()
+    manager.delete_session(st.session_state.session_id)
+    _use_session(manager.create_session())
     st.session_state.messages = []
     st.session_state.sources = []
     if "last_agent" in st.session_state:
@@ -151,10 +178,13 @@ def process_message(router, engine, message, history, num_results, tenant_filter
     Returns:
         tuple: (answer_text, sources_list, agent_name)
     """
+    session_id = st.session_state.get("session_id")
+
     # Build context for agent routing
     context = AgentContext(
         conversation_history=history,
-        tenant_filter=tenant_filter
+        tenant_filter=tenant_filter,
+        session_id=session_id
     )
 
     # Try routing to an agent
@@ -162,7 +192,8 @@ def process_message(router, engine, message, history, num_results, tenant_filter
 
     if routing_result.agent and not routing_result.fallback_to_rag:
         # Agent can handle this query
-        agent_response = routing_result.agent.execute(message, context)
+        with usage_context(endpoint="chat_app", agent=routing_result.agent.name, session_id=session_id):
+            agent_response = routing_result.agent.execute(message, context)
         return (
             agent_response.message,
             agent_response.sources if agent_response.sources else [],
@@ -170,12 +201,13 @@ def process_message(router, engine, message, history, num_results, tenant_filter
         )
 
     # Fall back to standard RAG
-    response = engine.chat(
-        message=message,
-        conversation_history=history,
-        n_results=num_results,
-        tenant_filter=tenant_filter
-    )
+    with usage_context(endpoint="chat_app", agent="rag", session_id=session_id):
+        response = engine.chat(
+            message=message,
+            conversation_history=history,
+            n_results=num_results,
+            tenant_filter=tenant_filter
+        )
     return (response.answer, response.sources, "RAG")
 
 
@@ -186,6 +218,7 @@ def render_chat():
     # Initialize engine and agent router
     try:
         engine = get_query_engine()
+        get_invalidation_bus().check()  # catch up on writes made since the last rerun
         router = get_agent_router(engine)
         stats = engine.get_stats()
     except Exception as e:
@@ -315,6 +348,7 @@ def render_chat():
             st.session_state.messages.append({"role": "assistant", "content": answer})
             st.session_state.sources = sources
             st.session_state.last_agent = agent_name
+            record_turn(pending, answer, tenant_filter)
             st.rerun()
 
         # Chat input
@@ -345,6 +379,7 @@ def render_chat():
             st.session_state.messages.append({"role": "assistant", "content": answer})
             st.session_state.sources = sources
             st.session_state.last_agent = agent_name
+            record_turn(prompt, answer, tenant_filter)
 
             if show_sources and sources:
                 with st.expander("📚 Sources used for this response"):
@@ -484,11 +519,10 @@ def render_cotenancy_risk():
 
 def render_projection():
     """Render the 10-Year Projection view."""
-    projections = []
-    for year in range(1, 11):
-        total_rent = sum(calc_rent_for_year(l, year) for l in LEASE_DATA if year <= l.term_months / 12)
-        active = sum(1 for l in LEASE_DATA if year <= l.term_months / 12)
-        projections.append({"year": year, "calendar": 2026 + year, "rent": total_rent, "active": active})
+    projections = [
+        {"year": p["year"], "calendar": p["calendar_year"], "rent": p["total_rent"], "active": p["active_leases"]}
+        for p in get_portfolio_projection().yearly_summary(10)
+    ]
 
     c1, c2, c3 = st.columns(3)
     c1.metric("Year 1 Total Rent", fmt_currency(projections[0]["rent"]))
@@ -18,9 +18,9 @@ from src.data.lease_data import (
     get_all_leases,
     get_categories,
     get_tenants_with_cotenancy,
-    calc_rent_for_year,
     get_summary_stats,
 )
+from src.data.rent_projection import get_portfolio_projection
 
 
 # Formatting helpers
@@ -279,21 +279,7 @@ def render_projection():
     st.subheader("10-Year Rent Projection")
 
     # Calculate projections
-    projections = []
-    for year in range(1, 11):
-        total_rent = 0
-        active_leases = 0
-        for lease in LEASE_DATA:
-            term_years = lease.term_months / 12
-            if year <= term_years:
-                total_rent += calc_rent_for_year(lease, year)
-                active_leases += 1
-        projections.append({
-            "year": year,
-            "calendar_year": 2026 + year,
-            "total_rent": total_rent,
-            "active_leases": active_leases,
-        })
+    projections = get_portfolio_projection().yearly_summary(10)
 
     # Summary metrics
     col1, col2, col3 = st.columns(3)
@@ -10,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import streamlit as st
 from src.search.query_engine import QueryEngine
+from src.database.invalidation import get_invalidation_bus
 
 
 # Page config
@@ -22,7 +23,7 @@ st.set_page_config(
 
 @st.cache_resource
 def get_query_engine():
-    """Initialize and cache the query engine"""
+    """Initialize and cache the query engine (it follows data changes through the invalidation bus)"""
     return QueryEngine()
 
 
@@ -34,6 +35,7 @@ def main():
     # Initialize engine
     try:
         engine = get_query_engine()
+        get_invalidation_bus().check()  # catch up on writes made since the last rerun
         stats = engine.get_stats()
     except Exception as e:
         st.error(f"Error initializing: {e}")
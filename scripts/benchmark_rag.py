@@ -0,0 +1,156 @@
+"""
+Offline RAG benchmark
+
+Runs the standard test queries against QueryEngine with deterministic fake
+embedding/LLM backends (no API keys needed), then reports per-stage latency
+percentiles, concurrent throughput and retrieval recall@k, and diffs the
+results against reports/benchmark_baseline.json.
+
+No baseline is committed: latencies are only comparable on the machine that
+recorded them, so record one there first. Until then runs say that nothing
+was compared, and --fail-on-regression refuses to pass.
+
+Usage:
+    python scripts/benchmark_rag.py --update-baseline
+    python scripts/benchmark_rag.py --clients 8 --llm-latency-ms 400
+    python scripts/benchmark_rag.py --fail-on-regression
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from rich.console import Console
+from rich.table import Table
+
+from src.benchmark.harness import (
+    STAGES, BenchmarkConfig, compare_reports, load_report, run_benchmark, save_report
+)
+
+console = Console()
+
+REPORTS_DIR = Path(__file__).parent.parent / "reports"
+DEFAULT_BASELINE = REPORTS_DIR / "benchmark_baseline.json"
+
+
+def print_report(report: dict) -> None:
+    """Print latency, throughput and retrieval tables"""
+    table = Table(title="Latency by stage (ms)", header_style="bold magenta")
+    table.add_column("Stage", style="cyan")
+    for name in ("p50", "p95", "p99", "mean"):
+        table.add_column(name, justify="right")
+    for stage in STAGES:
+        summary = report["latency_ms"][stage]
+        if summary["count"]:
+            table.add_row(stage, *(f"{summary[name]:.2f}" for name in ("p50", "p95", "p99", "mean")))
+    console.print(table)
+
+    throughput = report["throughput"]
+    console.print(
+        f"\n[bold]Throughput:[/bold] {throughput['qps']:.1f} queries/s with "
+        f"{throughput['clients']} clients ({throughput['queries']} queries, "
+        f"p95 {throughput['latency_ms']['p95']:.1f} ms)"
+    )
+
+    retrieval = report["retrieval"]
+    console.print(
+        f"[bold]Retrieval@{retrieval['k']}:[/bold] recall {retrieval['recall_at_k']:.3f}, "
+        f"hit rate {retrieval['hit_rate']:.3f}, MRR {retrieval['mrr']:.3f} "
+        f"over {retrieval['queries']} labeled queries"
+    )
+
+
+def print_comparison(comparison: dict) -> None:
+    """Print metrics that changed against the baseline"""
+    table = Table(title="Change vs baseline", header_style="bold magenta")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Baseline", justify="right")
+    table.add_column("Current", justify="right")
+    table.add_column("Change", justify="right")
+
+    for row in comparison["metrics"]:
+        style = "red" if row["regressed"] else None
+        table.add_row(
+            row["metric"],
+            f"{row['baseline']:.3f}",
+            f"{row['current']:.3f}",
+            f"{row['change_pct']:+.1f}%",
+            style=style
+        )
+    console.print(table)
+
+    if comparison["regressions"]:
+        console.print(f"\n[bold red]{len(comparison['regressions'])} regression(s)[/bold red]")
+    else:
+        console.print("\n[green]No regressions against baseline[/green]")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Offline RAG benchmark")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients for throughput (default: 4)")
+    parser.add_argument("--repeats", type=int, default=1, help="Passes over the query set (default: 1)")
+    parser.add_argument("--k", type=int, default=5, help="Results per query and recall cutoff (default: 5)")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated embedding latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated LLM latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Maximum random extra latency per call")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fake vectors and jitter")
+    parser.add_argument("--provider", choices=["openai", "anthropic"], default="openai")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline report to diff against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown (default: 0.2)")
+    parser.add_argument("--update-baseline", action="store_true", help="Save this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit 1 if any metric regressed")
+
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(
+        clients=args.clients,
+        repeats=args.repeats,
+        k=args.k,
+        embed_latency_ms=args.embed_latency_ms,
+        llm_latency_ms=args.llm_latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+        provider=args.provider
+    )
+
+    console.print("[yellow]Running offline benchmark...[/yellow]")
+    report = run_benchmark(config)
+    print_report(report)
+
+    baseline = load_report(args.baseline)
+    comparison = None
+    if baseline:
+        comparison = compare_reports(report, baseline, tolerance=args.tolerance)
+        report["comparison"] = {"baseline": str(args.baseline), **comparison}
+        print_comparison(comparison)
+    else:
+        report["comparison"] = {"baseline": None}
+        console.print(
+            f"\n[bold yellow]No baseline at {args.baseline}: nothing was compared, "
+            f"so regressions cannot be detected.[/bold yellow]\n"
+            "Record one on this machine with --update-baseline."
+        )
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = save_report(report, REPORTS_DIR / f"benchmark_{timestamp}.json")
+    console.print(f"\n[green]✓ Report saved to:[/green] {report_file}")
+
+    if args.update_baseline:
+        report.pop("comparison", None)
+        save_report(report, args.baseline)
+        console.print(f"[green]✓ Baseline updated:[/green] {args.baseline}")
+
+    if args.fail_on_regression:
+        if comparison is None:
+            console.print("[bold red]--fail-on-regression needs a baseline to compare against[/bold red]")
+            sys.exit(2)
+        if comparison["regressions"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,12 +21,12 @@ if sys.platform == "win32":
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.data.structured_chunks import generate_all_structured_chunks
 from src.database.chroma_store import ChromaStore
+from src.database.sql_store import SQLStore
+from src.ingestion import IngestionService
 from src.parsing.docx_parser import DocxParser
-from src.parsing.text_cleaner import TextCleaner
-from src.parsing.chunker import Chunker
-from src.llm.embedder import Embedder
-from src.metadata.extractor import MetadataExtractor
+from src.parsing.parse_cache import get_parse_cache
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
@@ -34,6 +34,10 @@ from collections import defaultdict
 
 console = Console()
 
+# Most leases that may fail to re-ingest before the rebuild is abandoned; a
+# version missing leases must never be swapped in
+MAX_FAILED_LEASES = 0
+
 
 # Tenant name mapping: variations → canonical name
 TENANT_NAME_MAPPING = {
@@ -145,11 +149,7 @@ def re_ingest_with_normalized_names():
     console.print("\n[bold]Re-ingesting documents with normalized tenant names...[/bold]\n")
 
     # Initialize components
-    parser = DocxParser()
-    cleaner = TextCleaner()
-    chunker = Chunker()
-    embedder = Embedder()
-    metadata_extractor = MetadataExtractor()
+    parser = DocxParser(cache=get_parse_cache())
 
     # Get list of lease documents
     lease_dir = Path("Lease Contracts")
@@ -158,112 +158,62 @@ def re_ingest_with_normalized_names():
 
     console.print(f"Found {len(docx_files)} lease documents\n")
 
-    # Clear existing database
-    console.print("[yellow]Clearing existing database...[/yellow]")
-    store = ChromaStore()
-    try:
-        store.client.delete_collection(store.collection_name)
-    except:
-        pass
-    store = ChromaStore()  # Recreate
-    console.print("[green]✓ Database cleared[/green]\n")
-
-    # Process each document
-    all_chunks_data = []
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=console
-    ) as progress:
-
-        task = progress.add_task("[cyan]Processing documents...", total=len(docx_files))
-
-        for docx_file in docx_files:
-            # Extract canonical tenant name from filename
-            canonical_tenant = extract_tenant_from_filename(docx_file.name)
-
-            progress.update(task, description=f"[cyan]Processing {canonical_tenant}...")
-
-            try:
-                # Parse document
-                parsed_doc = parser.parse(str(docx_file))
-
-                # Process each section
-                for section in parsed_doc.sections:
-                    # Clean text
-                    cleaned_text = cleaner.clean(section.content)
-
-                    # Skip very short sections
-                    if len(cleaned_text.strip()) < 50:
-                        continue
-
-                    # Chunk the text
-                    chunks = chunker.chunk(cleaned_text)
-
-                    # Process each chunk
-                    for chunk in chunks:
-                        # Create metadata
-                        metadata = {
-                            "tenant_name": canonical_tenant,  # Use canonical name
-                            "section_name": section.title or "Unknown",
-                            "source_file": docx_file.name
-                        }
-
-                        # Extract additional metadata if available
-                        try:
-                            extracted_meta = metadata_extractor.extract(chunk)
-                            if extracted_meta:
-                                # Only add non-None values
-                                for key, value in extracted_meta.items():
-                                    if value is not None and key != 'tenant_name':
-                                        metadata[key] = value
-                        except:
-                            pass
-
-                        all_chunks_data.append({
-                            "content": chunk,
-                            "metadata": metadata
-                        })
-
+    # Lease rows are written in one SQLite transaction that commits only if
+    # the rebuild is kept, so an abandoned rebuild leaves the database as it was
+    sql_store = SQLStore()
+
+    def populate(version):
+        with sql_store.transaction():
+            populate_version(version)
+
+    def populate_version(version):
+        service = IngestionService(store=version, sql_store=sql_store)
+        failed = []
+
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=console
+        ) as progress:
+
+            task = progress.add_task("[cyan]Processing documents...", total=len(docx_files))
+
+            for docx_file in docx_files:
+                # Extract canonical tenant name from filename
+                canonical_tenant = extract_tenant_from_filename(docx_file.name)
+
+                progress.update(task, description=f"[cyan]Processing {canonical_tenant}...")
+
+                try:
+                    parsed_doc = parser.parse(str(docx_file))
+                    parsed_doc.tenant_name = canonical_tenant  # Use canonical name on every chunk
+                    service.ingest_parsed(parsed_doc)
+                except Exception as e:
+                    console.print(f"[red]Error processing {docx_file.name}: {e}[/red]")
+                    failed.append(docx_file.name)
                 progress.advance(task)
 
-            except Exception as e:
-                console.print(f"[red]Error processing {docx_file.name}: {e}[/red]")
-                progress.advance(task)
-
-    # Generate embeddings and add to database
-    console.print(f"\n[yellow]Generating embeddings for {len(all_chunks_data)} chunks...[/yellow]")
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        TaskProgressColumn(),
-        console=console
-    ) as progress:
-
-        task = progress.add_task("[cyan]Creating embeddings...", total=len(all_chunks_data))
-
-        batch_size = 50
-        for i in range(0, len(all_chunks_data), batch_size):
-            batch = all_chunks_data[i:i + batch_size]
-
-            # Generate embeddings
-            embeddings = embedder.embed_batch([c["content"] for c in batch])
-
-            # Add to database
-            store.add_batch(
-                texts=[c["content"] for c in batch],
-                embeddings=embeddings,
-                metadatas=[c["metadata"] for c in batch]
+        # Raising makes rebuild() drop the new version and keep serving the old one
+        if len(failed) > MAX_FAILED_LEASES:
+            raise RuntimeError(
+                f"{len(failed)} of {len(docx_files)} leases failed to re-ingest: {', '.join(failed)}"
             )
 
-            progress.update(task, advance=len(batch))
+        version.add_chunks(generate_all_structured_chunks(), show_progress=False)
+
+    # Build into a new collection version; the live one keeps answering
+    # queries until the swap
+    console.print("[yellow]Building a new collection version...[/yellow]")
+    store = ChromaStore()
+    try:
+        store.rebuild(populate)
+    except RuntimeError as e:
+        console.print(f"[red]Rebuild abandoned, still serving {store.collection_name}: {e}[/red]")
+        raise
 
-    console.print("[green]✓ Re-ingestion complete![/green]")
+    console.print(f"[green]✓ Re-ingestion complete! Now serving {store.collection_name}[/green]")
 
 
 def validate_cleanup():
@@ -307,7 +257,7 @@ def main():
     current_tenants = analyze_current_tenants()
 
     # Step 2: Confirm re-ingestion
-    console.print("\n[yellow]This will clear the database and re-ingest all documents.[/yellow]")
+    console.print("\n[yellow]This will rebuild the collection and re-ingest all documents.[/yellow]")
     response = input("\nProceed with re-ingestion? (y/n): ").lower().strip()
 
     if response != 'y':
@@ -5,6 +5,7 @@ Ingestion script for processing lease documents into the vector database
 import sys
 import os
 from pathlib import Path
+from typing import List, Tuple
 
 # Fix Windows console encoding
 if sys.platform == "win32":
@@ -19,118 +20,92 @@ from rich.console import Console
 from rich.table import Table
 
 from config.settings import LEASE_CONTRACTS_DIR, CHUNK_SIZE, CHUNK_OVERLAP
-from src.parsing.docx_parser import parse_all_leases
+from src.parsing.docx_parser import iter_leases
+from src.parsing.parse_cache import get_parse_cache
 from src.chunking.chunker import Chunker
-from src.metadata.extractor import extract_all_metadata
 from src.database.chroma_store import ChromaStore
+from src.database.sql_store import SQLStore
+from src.database.vector_index import VectorIndex
 from src.data.structured_chunks import generate_all_structured_chunks
+from src.ingestion import IngestionService
 
 
 console = Console()
 
 
-def run_ingestion(
-    lease_dir: str = None,
-    clear_existing: bool = False,
-    chunk_size: int = CHUNK_SIZE,
-    chunk_overlap: int = CHUNK_OVERLAP
-):
+def ingest_into(store, lease_dir: str, chunker: Chunker, sql_store: SQLStore = None) -> Tuple[int, List[str]]:
     """
-    Run the full ingestion pipeline
+    Ingest every lease in a directory plus the structured data into a store
 
     Args:
+        store: ChromaStore (live, or a new version being rebuilt)
         lease_dir: Directory containing lease documents
-        clear_existing: Whether to clear existing data before ingesting
-        chunk_size: Size of chunks in tokens
-        chunk_overlap: Overlap between chunks in tokens
-    """
-    lease_dir = lease_dir or str(LEASE_CONTRACTS_DIR)
-
-    console.print("\n[bold blue]Medley Lease Document Ingestion[/bold blue]\n")
-    console.print(f"Source directory: {lease_dir}")
-
-    # Initialize store
-    store = ChromaStore()
-
-    if clear_existing:
-        console.print("[yellow]Clearing existing data...[/yellow]")
-        store.delete_all()
-
-    # Step 1: Parse documents
-    console.print("\n[bold]Step 1: Parsing DOCX files[/bold]")
-    console.print("  Parsing documents...")
-    documents = parse_all_leases(lease_dir)
+        chunker: Chunker to split documents with
+        sql_store: SQLStore for the lease rows (opens the default database if None)
 
-    console.print(f"  Parsed [green]{len(documents)}[/green] documents")
-
-    if not documents:
-        console.print("[red]No documents found! Check the lease directory.[/red]")
-        return
+    Returns:
+        (documents ingested, file names of the documents that failed)
+    """
+    # Steps 1-4: Parse, extract, chunk, embed and store one document at a
+    # time; re-running replaces each lease's chunks and updates its lease row
+    console.print("\n[bold]Steps 1-4: Parsing, extracting, chunking and embedding[/bold]")
+    service = IngestionService(store=store, sql_store=sql_store or SQLStore(), chunker=chunker)
 
-    # Show parsed documents
     doc_table = Table(title="Parsed Documents")
     doc_table.add_column("Tenant", style="cyan")
     doc_table.add_column("File", style="dim")
     doc_table.add_column("Paragraphs", justify="right")
     doc_table.add_column("Tables", justify="right")
 
-    for doc in documents:
-        doc_table.add_row(
-            doc.tenant_name,
-            doc.file_name[:40] + "..." if len(doc.file_name) > 40 else doc.file_name,
-            str(len(doc.paragraphs)),
-            str(len(doc.tables))
-        )
-
-    console.print(doc_table)
-
-    # Step 2: Extract metadata
-    console.print("\n[bold]Step 2: Extracting metadata[/bold]")
-    metadata_list = extract_all_metadata(documents)
-
     meta_table = Table(title="Extracted Metadata")
     meta_table.add_column("Tenant", style="cyan")
     meta_table.add_column("Sq Ft", justify="right")
     meta_table.add_column("Term (Yrs)", justify="right")
     meta_table.add_column("Year 1 Rent", justify="right")
 
-    for meta in metadata_list:
-        sqft = f"{meta.premises_sqft:,}" if meta.premises_sqft else "N/A"
-        term = str(meta.lease_term_years) if meta.lease_term_years else "N/A"
-        rent = f"${meta.year1_annual_rent:,.2f}" if meta.year1_annual_rent else "N/A"
+    document_count = 0
+    chunk_count = 0
+    failed = []
+    for doc in iter_leases(lease_dir, cache=get_parse_cache()):
+        try:
+            result = service.ingest_parsed(doc)
+        except Exception as e:
+            console.print(f"  [red]Error processing {doc.file_name}: {e}[/red]")
+            failed.append(doc.file_name)
+            continue
+
+        document_count += 1
+        chunk_count += result.chunks_indexed
+        console.print(f"  {doc.tenant_name}: [green]{result.chunks_indexed}[/green] chunks")
+
+        doc_table.add_row(
+            doc.tenant_name,
+            doc.file_name[:40] + "..." if len(doc.file_name) > 40 else doc.file_name,
+            str(len(doc.paragraphs)),
+            str(len(doc.tables))
+        )
 
+        meta = result.metadata
+        sqft = f"{meta['premises_sqft']:,}" if meta.get("premises_sqft") else "N/A"
+        term = str(meta["lease_term_years"]) if meta.get("lease_term_years") else "N/A"
+        rent = f"${meta['year1_annual_rent']:,.2f}" if meta.get("year1_annual_rent") else "N/A"
         meta_table.add_row(
-            meta.tenant_name[:25],
+            result.tenant_name[:25],
             sqft,
             term,
             rent
         )
 
-    console.print(meta_table)
-
-    # Step 3: Chunk documents
-    console.print("\n[bold]Step 3: Chunking documents[/bold]")
-    chunker = Chunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-
-    all_chunks = []
-    for doc in documents:
-        chunks = chunker.chunk_document(doc)
-        all_chunks.extend(chunks)
-        console.print(f"  {doc.tenant_name}: [green]{len(chunks)}[/green] chunks")
-
-    console.print(f"\n  Total chunks: [green]{len(all_chunks)}[/green]")
+    console.print(f"\n  Ingested [green]{document_count}[/green] documents")
+    if failed:
+        console.print(f"  [red]{len(failed)} failed: {', '.join(failed)}[/red]")
 
-    # Step 4: Add document chunks to vector store
-    console.print("\n[bold]Step 4: Creating embeddings and storing in ChromaDB[/bold]")
+    if not document_count:
+        return 0, failed
 
-    # Process in batches for progress tracking
-    batch_size = 50
-    total_batches = (len(all_chunks) + batch_size - 1) // batch_size
-    for i in range(0, len(all_chunks), batch_size):
-        batch = all_chunks[i:i + batch_size]
-        batch_num = i // batch_size + 1
-        console.print(f"  Processing batch {batch_num}/{total_batches}...")
-        store.add_chunks(batch, show_progress=False)
+    console.print(doc_table)
+    console.print(meta_table)
+    console.print(f"\n  Total chunks: [green]{chunk_count}[/green]")
 
     # Step 5: Add structured data chunks (from dashboard data)
     console.print("\n[bold]Step 5: Adding structured lease data[/bold]")
@@ -138,16 +113,76 @@ def run_ingestion(
 
     structured_chunks = generate_all_structured_chunks()
     console.print(f"  Generated [green]{len(structured_chunks)}[/green] structured chunks")
-
-    # Add structured chunks in batches
-    total_struct_batches = (len(structured_chunks) + batch_size - 1) // batch_size
-    for i in range(0, len(structured_chunks), batch_size):
-        batch = structured_chunks[i:i + batch_size]
-        batch_num = i // batch_size + 1
-        console.print(f"  Processing structured batch {batch_num}/{total_struct_batches}...")
-        store.add_chunks(batch, show_progress=False)
+    store.replace_source_chunks("structured_data", structured_chunks)
 
     console.print(f"  Added structured data for all 29 tenants + portfolio summaries")
+    return document_count, failed
+
+
+def run_ingestion(
+    lease_dir: str = None,
+    clear_existing: bool = False,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    export_index: bool = False
+):
+    """
+    Run the full ingestion pipeline
+
+    Args:
+        lease_dir: Directory containing lease documents
+        clear_existing: Rebuild from scratch (blue/green) instead of updating in place
+        chunk_size: Size of chunks in tokens
+        chunk_overlap: Overlap between chunks in tokens
+        export_index: Also write the local VectorIndex for read replicas
+    """
+    lease_dir = lease_dir or str(LEASE_CONTRACTS_DIR)
+
+    console.print("\n[bold blue]Medley Lease Document Ingestion[/bold blue]\n")
+    console.print(f"Source directory: {lease_dir}")
+
+    # Initialize store
+    store = ChromaStore()
+    chunker = Chunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    if clear_existing:
+        # Build a fresh collection version and swap it in at the end, so
+        # queries keep hitting the old data until the new data is complete.
+        # Lease rows are written in one SQLite transaction that commits only
+        # if every document went in, so an abandoned rebuild leaves the
+        # database untouched too (other writers wait until it finishes)
+        console.print("[yellow]Rebuilding into a new collection version...[/yellow]")
+        sql_store = SQLStore()
+        ingested = {}
+
+        def populate(version):
+            with sql_store.transaction():
+                ingested["documents"], failed = ingest_into(version, lease_dir, chunker, sql_store)
+                if failed:
+                    raise RuntimeError(f"{len(failed)} documents failed to ingest")
+                if not ingested["documents"]:
+                    raise ValueError("no documents ingested")
+
+        try:
+            store.rebuild(populate)
+        except ValueError:
+            console.print("[red]No documents found! Check the lease directory.[/red]")
+            return
+        except RuntimeError as e:
+            console.print(f"[red]Rebuild abandoned, still serving {store.collection_name}: {e}[/red]")
+            return
+        document_count = ingested["documents"]
+        console.print(f"  Swapped [green]{store.alias}[/green] to {store.collection_name}")
+    else:
+        document_count, failed = ingest_into(store, lease_dir, chunker)
+        if not document_count:
+            console.print("[red]No documents found! Check the lease directory.[/red]")
+            return
+
+    if export_index:
+        console.print("\n[bold]Exporting local vector index[/bold]")
+        index = VectorIndex.from_store(store)
+        console.print(f"  Wrote [green]{index.count()}[/green] vectors to {index.index_dir}")
 
     # Final stats
     console.print("\n[bold green]Ingestion Complete![/bold green]")
@@ -156,15 +191,16 @@ def run_ingestion(
     stats_table.add_column("Metric", style="cyan")
     stats_table.add_column("Value", justify="right")
 
-    stats_table.add_row("Total Documents", str(len(documents)))
+    stats_table.add_row("Total Documents", str(document_count))
     stats_table.add_row("Total Chunks", str(store.count()))
-    stats_table.add_row("Unique Tenants", str(len(store.get_unique_tenants())))
+    tenants = store.get_unique_tenants()
+    stats_table.add_row("Unique Tenants", str(len(tenants)))
 
     console.print(stats_table)
 
     # List tenants
     console.print("\n[bold]Tenants in database:[/bold]")
-    for tenant in store.get_unique_tenants():
+    for tenant in tenants:
         console.print(f"  - {tenant}")
 
 
@@ -180,7 +216,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "--clear",
         action="store_true",
-        help="Clear existing data before ingesting"
+        help="Rebuild from scratch into a new collection version, swapped in when complete"
     )
     parser.add_argument(
         "--chunk-size",
@@ -195,11 +231,18 @@ if __name__ == "__main__":
         help=f"Chunk overlap in tokens (default: {CHUNK_OVERLAP})"
     )
 
+    parser.add_argument(
+        "--export-index",
+        action="store_true",
+        help="Also export a memory-mapped VectorIndex (use with VECTOR_BACKEND=index)"
+    )
+
     args = parser.parse_args()
 
     run_ingestion(
         lease_dir=args.dir,
         clear_existing=args.clear,
         chunk_size=args.chunk_size,
-        chunk_overlap=args.chunk_overlap
+        chunk_overlap=args.chunk_overlap,
+        export_index=args.export_index
     )
@@ -25,6 +25,7 @@ if sys.platform == "win32":
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.search.query_engine import QueryEngine
+from src.benchmark.queries import TEST_QUERIES
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -34,119 +35,6 @@ import json
 console = Console()
 
 
-# Test queries organized by category
-TEST_QUERIES = {
-    "Basic Information": [
-        "What is Summit Coffee's monthly rent?",
-        "What is Five Daughters Bakery's square footage?",
-        "What is Sephora's lease term length?",
-        "What is the monthly rent for 26 Thai?",
-        "What suite is Trader Joe's in?",
-        "What is Playa Bowls' monthly rent?",
-        "What is CRU Food & Wine Bar's square footage?",
-        "What is Drybar's lease commencement date?",
-    ],
-
-    "Financial Queries": [
-        "What is Five Daughters Bakery's rent escalation schedule?",
-        "What is the rent per square foot for Summit Coffee?",
-        "What are the CAM charges for Sephora?",
-        "What is the security deposit amount for Trader Joe's?",
-        "What percentage rent does Five Daughters Bakery pay?",
-        "What is the annual rent for 26 Thai?",
-        "What are the tenant improvement allowances for CRU Food & Wine Bar?",
-        "What is the base rent for Playa Bowls?",
-    ],
-
-    "Dates & Deadlines": [
-        "When does Summit Coffee's lease expire?",
-        "When is the lease commencement date for Five Daughters Bakery?",
-        "What is the substantial completion date for Sephora?",
-        "When is the rent commencement date for 26 Thai?",
-        "What are the critical dates for Trader Joe's lease?",
-        "When does Playa Bowls' lease start?",
-        "What is the lease expiration date for Drybar?",
-        "When is the grand opening date mentioned in the leases?",
-    ],
-
-    "Lease Terms & Options": [
-        "What renewal options does Summit Coffee have?",
-        "What are the renewal terms for Five Daughters Bakery?",
-        "Does Sephora have any extension options?",
-        "What are the termination rights for Trader Joe's?",
-        "What expansion options does 26 Thai have?",
-        "Does CRU Food & Wine Bar have a renewal option?",
-        "What are the option periods for Playa Bowls?",
-        "What is the notice period for renewal for Drybar?",
-    ],
-
-    "Operating Requirements": [
-        "What are the operating hours requirements for Summit Coffee?",
-        "What are the permitted uses for Five Daughters Bakery?",
-        "What are the signage requirements for Sephora?",
-        "What are the maintenance obligations for Trader Joe's?",
-        "What are the insurance requirements for 26 Thai?",
-        "What are the parking requirements for CRU Food & Wine Bar?",
-        "What are the use restrictions for Playa Bowls?",
-        "What are the operating covenants for Drybar?",
-    ],
-
-    "Co-Tenancy & Exclusives": [
-        "What co-tenancy provisions does Sephora have?",
-        "Does Trader Joe's have any exclusive use rights?",
-        "What are the co-tenancy requirements for Five Daughters Bakery?",
-        "Does Summit Coffee have any exclusive rights?",
-        "What are the opening co-tenancy requirements for Sephora?",
-        "What are the ongoing co-tenancy provisions for Trader Joe's?",
-        "Does CRU Food & Wine Bar have any exclusivity clauses?",
-        "What are the protected uses for Playa Bowls?",
-    ],
-
-    "Comparison Queries": [
-        "Compare the monthly rent between Summit Coffee and Five Daughters Bakery",
-        "Which tenant has the longest lease term?",
-        "Which tenant pays the highest rent per square foot?",
-        "Compare the renewal options across all cafe tenants",
-        "Which tenants have co-tenancy provisions?",
-        "Compare the square footage of all retail tenants",
-        "Which tenants have percentage rent clauses?",
-        "Compare the security deposits across all tenants",
-    ],
-
-    "Follow-Up Questions": [
-        # These test conversation memory
-        ("What is Five Daughters Bakery's rent schedule?", "What about per month?"),
-        ("Tell me about Summit Coffee's lease", "When does it expire?"),
-        ("What is Sephora's square footage?", "What about their rent?"),
-        ("What is Trader Joe's monthly rent?", "Do they have renewal options?"),
-        ("What are the renewal terms for 26 Thai?", "What is the notice period?"),
-        ("What is the lease term for Playa Bowls?", "What about rent escalations?"),
-    ],
-
-    "Complex Questions": [
-        "What is the total monthly rent across all tenants?",
-        "Which leases expire in 2025?",
-        "What is the average rent per square foot for food tenants?",
-        "List all tenants with leases longer than 10 years",
-        "Which tenants have both renewal options and co-tenancy provisions?",
-        "What is the total square footage leased to retail tenants?",
-        "Which tenants have the most favorable renewal terms?",
-        "What are the prohibited uses across all leases?",
-    ],
-
-    "Edge Cases": [
-        "What is the rent for a tenant that doesn't exist?",
-        "Tell me about XYZ Company's lease",
-        "What is the monthly rent?",  # No tenant specified
-        "When do leases expire?",  # No tenant specified
-        "What are the renewal options?",  # No tenant specified
-        "Show me lease information",  # Vague request
-        "Tell me everything about all tenants",  # Too broad
-        "What is the meaning of life?",  # Completely unrelated
-    ]
-}
-
-
 def test_single_query(engine: QueryEngine, question: str, category: str) -> dict:
     """Test a single query and return results"""
     try:
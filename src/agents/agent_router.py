@@ -10,6 +10,8 @@ from dataclasses import dataclass
 import logging
 
 from src.agents.base_agent import BaseAgent, AgentContext, AgentResponse
+from src.observability.tracing import span, traced
+from src.observability.usage import usage_context
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +71,7 @@ class AgentRouter:
             f"threshold={confidence_threshold}"
         )
 
+    @traced("route")
     def route(
         self,
         message: str,
@@ -179,12 +182,15 @@ class AgentRouter:
 
         # Execute
         if result.agent:
-            response = result.agent.execute(message, context)
+            with span("agent", agent=result.agent.name, confidence=round(result.confidence, 3)), \
+                    usage_context(agent=result.agent.name, session_id=context.session_id):
+                response = result.agent.execute(message, context)
             response.agent_name = result.agent.name
             return response
 
         # Fallback to RAG
-        return self._execute_rag_fallback(message, context)
+        with usage_context(agent="rag", session_id=context.session_id):
+            return self._execute_rag_fallback(message, context)
 
     def _execute_rag_fallback(
         self,
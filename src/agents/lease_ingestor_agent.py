@@ -114,6 +114,10 @@ class LeaseIngestorAgent(BaseAgent):
             # Try to extract file path from message
             file_path = self._extract_file_path(message)
 
+            if file_path and not is_preview and self._is_background_request(message_lower):
+                # Queue the file and return right away
+                return self._queue_file(file_path)
+
             if file_path:
                 # Process specific file
                 return self._process_file(file_path, preview_only=is_preview)
@@ -230,11 +234,24 @@ class LeaseIngestorAgent(BaseAgent):
 
             result = self._write_to_databases(file_path, extracted)
 
+            if result["errors"]:
+                yield AgentResponse(
+                    message="Ingestion failed; no changes were kept.\n\n" + "\n".join(
+                        f"- {error}" for error in result["errors"]
+                    ),
+                    data=result,
+                    is_complete=True,
+                    mode=AgentMode.GUIDED,
+                    agent_name=self.name
+                )
+                return
+
             yield AgentResponse(
                 message=f"**Ingestion Complete**\n\n"
                         f"- Tenant: {extracted.get('tenant_name', 'Unknown')}\n"
                         f"- Chunks indexed: {result.get('chunks_indexed', 0)}\n"
-                        f"- Lease record created: {'Yes' if result.get('lease_created') else 'No'}\n\n"
+                        f"- Chunks replaced: {result.get('chunks_replaced', 0)}\n"
+                        f"- Lease record created: {'Yes' if result.get('lease_created') else 'No (updated)'}\n\n"
                         f"The lease is now searchable in the system.",
                 data=result,
                 is_complete=True,
@@ -278,7 +295,18 @@ class LeaseIngestorAgent(BaseAgent):
         patterns = [
             r"ingestion\s+status",
             r"what'?s\s+been\s+ingested",
-            r"already\s+(processed|ingested)"
+            r"already\s+(processed|ingested)",
+            r"ingestion\s+(jobs?|progress|queue)",
+            r"(job|queue)\s+status"
+        ]
+        return any(re.search(p, message) for p in patterns)
+
+    def _is_background_request(self, message: str) -> bool:
+        """Check if the file should be ingested by a background job."""
+        patterns = [
+            r"in\s+the\s+background",
+            r"\bqueue\b",
+            r"\basync(hronously)?\b"
         ]
         return any(re.search(p, message) for p in patterns)
 
@@ -384,6 +412,68 @@ class LeaseIngestorAgent(BaseAgent):
                 agent_name=self.name
             )
 
+    def _queue_file(self, file_path: str) -> AgentResponse:
+        """Submit a file to the background job queue."""
+        resolved_path = self._resolve_path(file_path)
+        if not resolved_path:
+            return AgentResponse(
+                message=f"File not found: {file_path}\n\n"
+                        "Use 'list available documents' to see available files.",
+                is_complete=True,
+                agent_name=self.name
+            )
+
+        try:
+            job = self._job_queue().submit("ingest", resolved_path)
+        except Exception as e:
+            return AgentResponse(
+                message=f"Could not queue {file_path}: {str(e)}",
+                is_complete=True,
+                agent_name=self.name
+            )
+
+        return AgentResponse(
+            message=f"**Queued for ingestion** (job #{job.id}, {job.status})\n\n"
+                    f"**File:** {file_path}\n\n"
+                    "Ask for 'ingestion status' to check progress.",
+            data=job.to_dict(),
+            is_complete=True,
+            agent_name=self.name
+        )
+
+    def _job_queue(self):
+        """Background job queue sharing this agent's stores (created on first use)."""
+        if getattr(self, "_jobs", None) is None:
+            from src.ingestion.jobs import JobQueue
+
+            self._jobs = JobQueue(
+                store=self.query_engine.store if self.query_engine else None,
+                ranker=self.query_engine.ranker if self.query_engine else None,
+                sql_db_path=str(self.sql_store.db_path) if self.sql_store is not None else None
+            )
+        return self._jobs
+
+    def _format_jobs(self) -> str:
+        """Summarize queue depth, throughput and the most recent jobs."""
+        queue = self._job_queue()
+        stats = queue.stats()
+        counts = stats["counts"]
+        lines = [
+            "**Background Jobs**\n",
+            f"- **Queued:** {counts.get('queued', 0)} | **Running:** {counts.get('running', 0)} | "
+            f"**Done:** {counts.get('done', 0)} | **Failed:** {counts.get('failed', 0)}",
+        ]
+        if stats["chunks_per_second"] is not None:
+            lines.append(
+                f"- **Throughput:** {stats['documents_per_minute']} documents/min, "
+                f"{stats['chunks_per_second']} chunks/s"
+            )
+        for job in queue.list_jobs(limit=5):
+            target = Path(job.target).name if job.target else job.kind
+            detail = f" - {job.error}" if job.error else f" ({job.stage})" if job.stage else ""
+            lines.append(f"- #{job.id} {job.kind} {target}: {job.status} {job.progress:.0%}{detail}")
+        return "\n".join(lines)
+
     def _show_status(self) -> AgentResponse:
         """Show current ingestion status."""
         if self.sql_store is None:
@@ -405,7 +495,8 @@ class LeaseIngestorAgent(BaseAgent):
             message = (
                 f"**Ingestion Status**\n\n"
                 f"- **Tenants in database:** {tenant_count}\n"
-                f"- **Document chunks indexed:** {chunk_count}\n"
+                f"- **Document chunks indexed:** {chunk_count}\n\n"
+                f"{self._format_jobs()}\n"
             )
 
             return AgentResponse(
@@ -477,48 +568,45 @@ class LeaseIngestorAgent(BaseAgent):
         return None
 
     def _parse_document(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Parse a DOCX document and extract key terms."""
+        """
+        Extract key terms for display from the opening pages of a DOCX.
+
+        Key terms live in the data sheet near the front of the lease, so only
+        that part of the XML is read; full ingestion re-reads the file itself.
+        """
         try:
+            from src.metadata.extractor import MetadataExtractor
             from src.parsing.docx_parser import DocxParser
+            from src.parsing.parse_cache import get_parse_cache
 
-            parser = DocxParser()
-            result = parser.parse(file_path)
+            parser = DocxParser(cache=get_parse_cache())
+            result = parser.preview(file_path)
 
-            if not result:
+            if not result.paragraphs and not result.tables:
                 return None
 
-            # Extract structured data
+            # Same extraction rules as full ingestion
+            metadata = MetadataExtractor().extract(result)
+
             extracted = {
                 "file_path": file_path,
-                "full_text": result.get('full_text', ''),
-                "sections": result.get('sections', {}),
-            }
-
-            # Try to extract key lease terms
-            text = result.get('full_text', '')
-
-            # Extract tenant name
-            tenant_match = re.search(r'tenant[:\s]+([A-Z][A-Za-z\s&]+?)(?:\n|,|$)', text)
-            if tenant_match:
-                extracted['tenant_name'] = tenant_match.group(1).strip()
-            else:
+                "data_sheet": result.data_sheet,
+                "sections": list(result.sections),
+                "metadata": metadata.to_dict(),
                 # Fallback to filename
-                extracted['tenant_name'] = Path(file_path).stem.replace('_', ' ').title()
+                "tenant_name": metadata.tenant_name or Path(file_path).stem.replace('_', ' ').title(),
+            }
 
-            # Extract rent
-            rent_match = re.search(r'\$?([\d,]+(?:\.\d{2})?)\s*(?:per\s+)?(?:month|/mo|psf|per\s+square\s+foot)', text, re.IGNORECASE)
-            if rent_match:
-                extracted['rent'] = rent_match.group(1).replace(',', '')
+            if metadata.year1_monthly_rent:
+                extracted['rent'] = f"{metadata.year1_monthly_rent:,.2f} per month"
+            elif metadata.year1_annual_rent:
+                extracted['rent'] = f"{metadata.year1_annual_rent:,.2f} per year"
 
-            # Extract square footage
-            sqft_match = re.search(r'([\d,]+)\s*(?:sq\.?\s*ft\.?|square\s*feet)', text, re.IGNORECASE)
-            if sqft_match:
-                extracted['square_feet'] = sqft_match.group(1).replace(',', '')
+            if metadata.premises_sqft:
+                extracted['square_feet'] = f"{metadata.premises_sqft:,}"
 
-            # Extract term
-            term_match = re.search(r'(\d+)\s*(?:year|yr)s?\s*(?:term|lease)?', text, re.IGNORECASE)
-            if term_match:
-                extracted['term_years'] = term_match.group(1)
+            if metadata.lease_term_years:
+                extracted['term_years'] = str(metadata.lease_term_years)
 
             return extracted
 
@@ -549,24 +637,24 @@ class LeaseIngestorAgent(BaseAgent):
         return "\n".join(lines)
 
     def _write_to_databases(self, file_path: str, extracted: Dict[str, Any]) -> Dict[str, Any]:
-        """Write extracted data to ChromaDB and SQLite."""
+        """Write the document to the vector store and SQLite through the shared ingestion service."""
         result = {
             "chunks_indexed": 0,
             "lease_created": False,
             "errors": []
         }
 
-        # This would integrate with the actual ingestion pipeline
-        # For now, we'll simulate the process
-
         try:
-            # Would call the actual ingestion scripts here
-            # from scripts.ingest import ingest_single_document
-            # chunks = ingest_single_document(file_path)
-            # result["chunks_indexed"] = len(chunks)
+            from src.ingestion.service import IngestionService
 
-            result["chunks_indexed"] = 25  # Simulated
-            result["lease_created"] = True
+            # Reuse the live engine's store and ranker so the lease is searchable immediately
+            service = IngestionService(
+                store=self.query_engine.store if self.query_engine else None,
+                sql_store=self.sql_store,
+                ranker=self.query_engine.ranker if self.query_engine else None
+            )
+            ingested = service.ingest_document(self._resolve_path(file_path) or file_path)
+            result.update(ingested.to_dict())
 
         except Exception as e:
             result["errors"].append(str(e))
@@ -1,5 +1,17 @@
 """Analytics module for lease portfolio management."""
 
-from .lease_analytics import LeaseAnalytics
+from typing import TYPE_CHECKING
 
-__all__ = ['LeaseAnalytics']
+from ..lazy import lazy_exports
+
+__all__ = ['LeaseAnalytics', 'CoTenancySimulator', 'SimulationAssumptions']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "LeaseAnalytics": ".lease_analytics",
+    "CoTenancySimulator": ".cotenancy_simulation",
+    "SimulationAssumptions": ".cotenancy_simulation",
+})
+
+if TYPE_CHECKING:
+    from .lease_analytics import LeaseAnalytics
+    from .cotenancy_simulation import CoTenancySimulator, SimulationAssumptions
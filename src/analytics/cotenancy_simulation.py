@@ -0,0 +1,340 @@
+"""
+Monte Carlo simulation of co-tenancy rent-at-risk.
+
+Models the co-tenancy clauses in the lease roster as a dependency graph:
+- Named co-tenant edges (e.g. Sephora depends on Trader Joe's)
+- GLA occupancy thresholds shared by every shop tenant
+
+Each scenario samples anchor delays/closures and shop tenant failures, then
+propagates triggered clauses (and the terminations they allow) until the
+graph settles. All scenarios in a batch are evaluated together with NumPy.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from src.data.lease_data import LEASE_DATA, Lease
+
+
+_PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+_SQFT_PATTERN = re.compile(r'([\d,]{4,})\s*SF', re.IGNORECASE)
+_MONTHS_PATTERN = re.compile(r'(\d+)\s*(?:mo\b|months?)', re.IGNORECASE)
+
+
+@dataclass
+class SimulationAssumptions:
+    """Probabilities and horizon driving the scenario generator."""
+    horizon_months: int = 24
+    anchor_delay_prob: float = 0.25       # chance each anchor opens late
+    anchor_delay_mean_months: float = 6.0  # mean of the exponential delay
+    anchor_closure_prob: float = 0.05     # chance each anchor never opens / goes dark
+    tenant_failure_prob: float = 0.02     # chance each shop tenant never opens / goes dark
+    anchor_contagion: float = 0.05        # extra shop failure chance when an anchor is out
+    termination_prob: float = 0.35       # chance a tenant exercises an available termination right
+    max_cascade_rounds: int = 10
+
+
+@dataclass
+class CoTenancyGraph:
+    """Vectorized view of the co-tenancy clauses across a lease roster."""
+    tenants: List[str]
+    sqft: np.ndarray            # (N,)
+    annual_rent: np.ndarray     # (N,)
+    is_anchor: np.ndarray       # (N,) bool
+    has_clause: np.ndarray      # (N,) bool
+    gla_threshold: np.ndarray   # (N,) fraction of other GLA that must be open, 0 if none
+    counts_scheduled: np.ndarray  # (N,) bool, delayed tenants still count as "scheduled to open"
+    reduction_rate: np.ndarray  # (N,) share of rent lost while triggered
+    remedy_months: np.ndarray   # (N,) cap on months of reduced rent
+    can_terminate: np.ndarray   # (N,) bool
+    terminate_after: np.ndarray  # (N,) months triggered before termination is allowed
+    edge_dependent: np.ndarray  # (E,) lease index holding the named co-tenant clause
+    edge_named: np.ndarray      # (E,) lease index of the named co-tenant
+
+    @classmethod
+    def from_leases(cls, leases: Sequence[Lease], horizon_months: int = 24) -> "CoTenancyGraph":
+        """Build the graph from Lease records."""
+        leases = list(leases)
+        n = len(leases)
+        index_by_tenant = {lease.tenant.lower(): i for i, lease in enumerate(leases)}
+
+        sqft = np.array([lease.sqft for lease in leases], dtype=np.float64)
+        annual_rent = np.array([lease.rent.year1_annual for lease in leases], dtype=np.float64)
+        is_anchor = np.array([lease.category == "Anchor" for lease in leases], dtype=bool)
+        has_clause = np.zeros(n, dtype=bool)
+        gla_threshold = np.zeros(n)
+        counts_scheduled = np.zeros(n, dtype=bool)
+        reduction_rate = np.zeros(n)
+        remedy_months = np.full(n, float(horizon_months))
+        can_terminate = np.zeros(n, dtype=bool)
+        terminate_after = np.full(n, float(horizon_months))
+        edges = []
+
+        total_sqft = sqft.sum()
+        for i, lease in enumerate(leases):
+            ct = lease.co_tenancy
+            if ct is None:
+                continue
+            has_clause[i] = True
+            gla_threshold[i] = _parse_threshold(ct.threshold, total_sqft - sqft[i])
+            counts_scheduled[i] = "scheduled" in (ct.threshold or "").lower()
+            if annual_rent[i] > 0:
+                reduction_rate[i] = min(1.0, ct.rent_at_risk / annual_rent[i])
+
+            remedy_match = _MONTHS_PATTERN.search(ct.remedy or "")
+            if remedy_match:
+                remedy_months[i] = float(remedy_match.group(1))
+
+            termination = (ct.termination or "").lower()
+            if termination and not termination.startswith("none"):
+                can_terminate[i] = True
+                term_match = _MONTHS_PATTERN.search(termination)
+                terminate_after[i] = float(term_match.group(1)) if term_match else remedy_months[i]
+
+            if ct.named_tenant:
+                named = index_by_tenant.get(ct.named_tenant.lower())
+                if named is not None and named != i:
+                    edges.append((i, named))
+
+        edges.sort()
+        return cls(
+            tenants=[lease.tenant for lease in leases],
+            sqft=sqft,
+            annual_rent=annual_rent,
+            is_anchor=is_anchor,
+            has_clause=has_clause,
+            gla_threshold=gla_threshold,
+            counts_scheduled=counts_scheduled,
+            reduction_rate=reduction_rate,
+            remedy_months=remedy_months,
+            can_terminate=can_terminate,
+            terminate_after=terminate_after,
+            edge_dependent=np.array([e[0] for e in edges], dtype=np.int64),
+            edge_named=np.array([e[1] for e in edges], dtype=np.int64),
+        )
+
+    def named_trigger_months(self, dark_months: np.ndarray) -> np.ndarray:
+        """Months each lease's named co-tenant is dark, (S, N)."""
+        triggered = np.zeros_like(dark_months)
+        if len(self.edge_dependent) == 0:
+            return triggered
+        # Edges are sorted by dependent, so reduceat takes the max per dependent lease
+        dependents, starts = np.unique(self.edge_dependent, return_index=True)
+        triggered[:, dependents] = np.maximum.reduceat(dark_months[:, self.edge_named], starts, axis=1)
+        return triggered
+
+
+@dataclass
+class SimulationResult:
+    """Distribution of annualized co-tenancy rent loss across scenarios."""
+    n_scenarios: int
+    horizon_months: int
+    losses: np.ndarray = field(repr=False)
+    trigger_prob: Dict[str, float]
+    termination_prob: Dict[str, float]
+    expected_loss_by_tenant: Dict[str, float]
+    static_rent_at_risk: float
+
+    def percentiles(self, points: Sequence[float] = (5, 25, 50, 75, 90, 95, 99)) -> Dict[str, float]:
+        values = np.percentile(self.losses, points)
+        return {f"p{int(p)}": round(float(v), 2) for p, v in zip(points, values)}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-friendly dictionary."""
+        return {
+            'n_scenarios': self.n_scenarios,
+            'horizon_months': self.horizon_months,
+            'mean_loss': round(float(self.losses.mean()), 2),
+            'max_loss': round(float(self.losses.max()), 2),
+            'probability_of_loss': round(float((self.losses > 0).mean()), 4),
+            'percentiles': self.percentiles(),
+            'static_rent_at_risk': round(self.static_rent_at_risk, 2),
+            'tenants': sorted(
+                [
+                    {
+                        'tenant': tenant,
+                        'trigger_probability': round(self.trigger_prob[tenant], 4),
+                        'termination_probability': round(self.termination_prob[tenant], 4),
+                        'expected_loss': round(self.expected_loss_by_tenant[tenant], 2),
+                    }
+                    for tenant in self.trigger_prob
+                ],
+                key=lambda x: x['expected_loss'],
+                reverse=True
+            ),
+        }
+
+
+def _parse_threshold(threshold: Optional[str], other_sqft: float) -> float:
+    """Parse an occupancy threshold into a fraction of the other tenants' GLA."""
+    if not threshold:
+        return 0.0
+    # Operating thresholds follow opening thresholds; the last one governs ongoing occupancy
+    percents = _PERCENT_PATTERN.findall(threshold)
+    if percents:
+        return float(percents[-1]) / 100
+    sqft_match = _SQFT_PATTERN.search(threshold)
+    if sqft_match and other_sqft > 0:
+        return min(1.0, float(sqft_match.group(1).replace(",", "")) / other_sqft)
+    return 0.0
+
+
+class CoTenancySimulator:
+    """Batched Monte Carlo engine over a CoTenancyGraph."""
+
+    def __init__(
+        self,
+        leases: Optional[Sequence[Lease]] = None,
+        assumptions: Optional[SimulationAssumptions] = None
+    ):
+        self.assumptions = assumptions or SimulationAssumptions()
+        self.leases = list(leases if leases is not None else LEASE_DATA)
+        self.graph = CoTenancyGraph.from_leases(self.leases, self.assumptions.horizon_months)
+
+    def run(
+        self,
+        n_scenarios: int = 10000,
+        seed: Optional[int] = None,
+        batch_size: int = 20000
+    ) -> SimulationResult:
+        """
+        Simulate co-tenancy outcomes
+
+        Args:
+            n_scenarios: Number of scenarios to draw
+            seed: Random seed for reproducible results
+            batch_size: Scenarios evaluated per NumPy batch
+
+        Returns:
+            SimulationResult with the loss distribution
+        """
+        rng = np.random.default_rng(seed)
+        graph = self.graph
+        n = len(graph.tenants)
+
+        losses = []
+        triggered_count = np.zeros(n)
+        terminated_count = np.zeros(n)
+        loss_by_tenant = np.zeros(n)
+
+        remaining = n_scenarios
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            batch_losses, triggered, terminated, tenant_losses = self._run_batch(rng, size)
+            losses.append(batch_losses)
+            triggered_count += triggered.sum(axis=0)
+            terminated_count += terminated.sum(axis=0)
+            loss_by_tenant += tenant_losses.sum(axis=0)
+            remaining -= size
+
+        clause_idx = np.flatnonzero(graph.has_clause)
+        return SimulationResult(
+            n_scenarios=n_scenarios,
+            horizon_months=self.assumptions.horizon_months,
+            losses=np.concatenate(losses) if losses else np.zeros(0),
+            trigger_prob={graph.tenants[i]: float(triggered_count[i] / n_scenarios) for i in clause_idx},
+            termination_prob={graph.tenants[i]: float(terminated_count[i] / n_scenarios) for i in clause_idx},
+            expected_loss_by_tenant={graph.tenants[i]: float(loss_by_tenant[i] / n_scenarios) for i in clause_idx},
+            static_rent_at_risk=float(sum(
+                lease.co_tenancy.rent_at_risk for lease in self.leases if lease.co_tenancy
+            )),
+        )
+
+    def _run_batch(self, rng: np.random.Generator, size: int):
+        """Evaluate one batch of scenarios; returns per-scenario and per-lease arrays."""
+        a = self.assumptions
+        graph = self.graph
+        horizon = float(a.horizon_months)
+        n = len(graph.tenants)
+
+        # 1. Sample anchor delays and closures
+        anchor = graph.is_anchor[None, :]
+        closed = anchor & (rng.random((size, n)) < a.anchor_closure_prob)
+        delayed = anchor & (rng.random((size, n)) < a.anchor_delay_prob)
+        delay = np.minimum(rng.exponential(a.anchor_delay_mean_months, (size, n)), horizon)
+        dark_months = np.where(closed, horizon, np.where(delayed, delay, 0.0))
+
+        # 2. Shop tenant failures, more likely when an anchor is out
+        anchor_out = closed.any(axis=1, keepdims=True)
+        failure_prob = a.tenant_failure_prob + a.anchor_contagion * anchor_out
+        failed = ~anchor & (rng.random((size, n)) < failure_prob)
+        dark_months = np.where(failed, horizon, dark_months)
+
+        # Fixed draws keep the cascade monotone so it reaches a fixed point
+        exercise = rng.random((size, n)) < a.termination_prob
+
+        # 3. Propagate triggers and terminations through the clause graph; the cap only
+        # guards the loop, triggers are always recomputed from the final dark months
+        terminated = np.zeros((size, n), dtype=bool)
+        trigger_months = self._trigger_months(dark_months)
+        for _ in range(a.max_cascade_rounds):
+            newly_terminated = (
+                ~terminated
+                & graph.can_terminate[None, :]
+                & exercise
+                & (trigger_months > 0)
+                & (trigger_months >= np.minimum(graph.terminate_after, horizon)[None, :])
+            )
+            if not newly_terminated.any():
+                break
+            terminated |= newly_terminated
+            dark_months = np.where(newly_terminated, horizon, dark_months)
+            trigger_months = self._trigger_months(dark_months)
+
+        # 4. Rent reductions while triggered (capped by remedy), full rent lost on termination
+        reduced_months = np.minimum(trigger_months, graph.remedy_months[None, :])
+        tenant_losses = np.where(
+            terminated,
+            graph.annual_rent[None, :] * horizon / 12,
+            graph.reduction_rate[None, :] * graph.annual_rent[None, :] * reduced_months / 12
+        )
+        # Annualize so results line up with the static rent_at_risk figures
+        tenant_losses = tenant_losses * 12 / horizon
+        triggered = (trigger_months > 0) | terminated
+
+        return tenant_losses.sum(axis=1), triggered, terminated, tenant_losses
+
+    def _trigger_months(self, dark_months: np.ndarray) -> np.ndarray:
+        """Months each lease's co-tenancy clause is triggered given everyone's dark months, (S, N)."""
+        graph = self.graph
+        horizon = float(self.assumptions.horizon_months)
+        open_fraction = np.where(
+            graph.counts_scheduled[None, :],
+            self._open_fraction(dark_months >= horizon),
+            self._open_fraction(dark_months / horizon)
+        )
+        gla_triggered = (graph.gla_threshold[None, :] > 0) & (open_fraction < graph.gla_threshold[None, :])
+        trigger_months = np.maximum(graph.named_trigger_months(dark_months), gla_triggered * horizon)
+        return np.where(graph.has_clause[None, :] & (dark_months < horizon), trigger_months, 0.0)
+
+    def _open_fraction(self, dark_share: np.ndarray) -> np.ndarray:
+        """Share of each lease's other-tenant GLA that is open, (S, N)."""
+        sqft = self.graph.sqft
+        other_sqft = sqft.sum() - sqft
+        other_dark = (dark_share @ sqft)[:, None] - dark_share * sqft[None, :]
+        return (other_sqft[None, :] - other_dark) / other_sqft[None, :]
+
+
+def simulate_cotenancy_risk(
+    n_scenarios: int = 10000,
+    seed: Optional[int] = None,
+    leases: Optional[Sequence[Lease]] = None,
+    **assumptions
+) -> Dict[str, Any]:
+    """
+    Run the co-tenancy simulation and return a summary dictionary
+
+    Args:
+        n_scenarios: Number of scenarios to draw
+        seed: Random seed for reproducible results
+        leases: Lease roster (defaults to LEASE_DATA)
+        **assumptions: Overrides for SimulationAssumptions fields
+
+    Returns:
+        Summary with loss percentiles and per-tenant exposure
+    """
+    simulator = CoTenancySimulator(leases, SimulationAssumptions(**assumptions))
+    return simulator.run(n_scenarios=n_scenarios, seed=seed).to_dict()
@@ -10,9 +10,60 @@ Provides:
 """
 
 from typing import List, Dict, Optional, Any
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import date, datetime, timedelta
+from collections import defaultdict, OrderedDict
+import copy
+import functools
 import statistics
+import threading
+
+from src.database.invalidation import get_invalidation_bus
+
+
+# Memoized results kept across all LeaseAnalytics instances
+MEMO_SIZE = 256
+
+_memo: "OrderedDict[tuple, tuple]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _memoized(method):
+    """
+    Reuse a result until the store's data version or the date changes.
+
+    Results are shared by every LeaseAnalytics on the same database, so
+    agents that build a fresh instance per request still hit the cache.
+    Stores without data_version() are never cached.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        data_version = getattr(self.db, "data_version", None)
+        if data_version is None:
+            return method(self, *args, **kwargs)
+
+        source = getattr(self.db, "version_source", id(self.db))
+        key = (source, method.__name__, repr(args), repr(sorted(kwargs.items())))
+        stamp = (data_version(), date.today())
+        with _memo_lock:
+            cached = _memo.get(key)
+        if cached is not None and cached[0] == stamp:
+            return copy.deepcopy(cached[1])
+
+        result = method(self, *args, **kwargs)
+        with _memo_lock:
+            _memo[key] = (stamp, copy.deepcopy(result))
+            _memo.move_to_end(key)
+            while len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+        return result
+    return wrapper
+
+
+def _evict(source: str, version: int) -> None:
+    """Invalidation bus callback: free memoized results of a database that changed."""
+    with _memo_lock:
+        for key in [key for key in _memo if key[0] == source]:
+            del _memo[key]
 
 
 class LeaseAnalytics:
@@ -21,9 +72,12 @@ class LeaseAnalytics:
     def __init__(self, sql_store):
         """Initialize with SQL database store."""
         self.db = sql_store
+        if hasattr(sql_store, "version_source"):
+            get_invalidation_bus().subscribe(sql_store.version_source, _evict)
 
     # ==================== Financial Projections ====================
 
+    @_memoized
     def project_revenue(self, months_ahead: int = 12) -> Dict[str, Any]:
         """Project revenue for the next N months considering expirations."""
         leases = self.db.get_all_leases(status='active')
@@ -65,6 +119,7 @@ class LeaseAnalytics:
             'revenue_at_risk': round(revenues[0] - revenues[-1], 2) if revenues[0] > revenues[-1] else 0
         }
 
+    @_memoized
     def calculate_lease_value(self, lease_id: int) -> Dict[str, float]:
         """Calculate total value metrics for a lease."""
         lease = self.db.get_lease(lease_id)
@@ -97,6 +152,7 @@ class LeaseAnalytics:
 
     # ==================== Tenant Comparison ====================
 
+    @_memoized
     def compare_tenants(self, tenant_names: List[str]) -> Dict[str, Any]:
         """Compare multiple tenants across key metrics."""
         comparisons = []
@@ -150,6 +206,7 @@ class LeaseAnalytics:
             'count': len(comparisons)
         }
 
+    @_memoized
     def get_tenant_benchmarks(self) -> Dict[str, Any]:
         """Calculate benchmarks across all tenants."""
         revenue_by_tenant = self.db.get_revenue_by_tenant()
@@ -174,6 +231,7 @@ class LeaseAnalytics:
 
     # ==================== Risk Assessment ====================
 
+    @_memoized
     def assess_portfolio_risk(self) -> Dict[str, Any]:
         """Assess risk factors across the lease portfolio."""
         all_leases = self.db.get_all_leases(status='active')
@@ -251,8 +309,24 @@ class LeaseAnalytics:
             'expiration_concentration': round(expiration_percentage, 2)
         }
 
+    def simulate_cotenancy_risk(
+        self,
+        n_scenarios: int = 10000,
+        seed: Optional[int] = None,
+        **assumptions
+    ) -> Dict[str, Any]:
+        """
+        Simulate co-tenancy rent-at-risk under anchor delays, closures and cascades.
+
+        Returns loss percentiles across scenarios plus per-tenant trigger and
+        termination probabilities. Keyword overrides map onto SimulationAssumptions.
+        """
+        from .cotenancy_simulation import simulate_cotenancy_risk
+        return simulate_cotenancy_risk(n_scenarios=n_scenarios, seed=seed, **assumptions)
+
     # ==================== Optimization Insights ====================
 
+    @_memoized
     def get_optimization_opportunities(self) -> List[Dict[str, Any]]:
         """Identify opportunities to optimize the lease portfolio."""
         opportunities = []
@@ -290,25 +364,22 @@ class LeaseAnalytics:
 
     # ==================== Trend Analysis ====================
 
+    @_memoized
     def analyze_expiration_timeline(self, months_ahead: int = 24) -> Dict[str, Any]:
-        """Analyze lease expiration timeline."""
-        leases = self.db.get_all_leases(status='active')
+        """Analyze lease expiration timeline from the materialized expiration calendar."""
+        months = self.db.get_expiration_months()
 
         timeline = defaultdict(lambda: {'count': 0, 'revenue': 0, 'tenants': []})
-        current_date = datetime.now()
 
-        for lease in leases:
-            if not lease['end_date']:
-                continue
-
-            end_date = datetime.strptime(lease['end_date'], "%Y-%m-%d")
+        for bucket in months:
+            year, month = bucket['month'].split('-')
 
             # Group by quarter
-            quarter_key = f"{end_date.year}-Q{(end_date.month-1)//3 + 1}"
+            quarter_key = f"{year}-Q{(int(month)-1)//3 + 1}"
 
-            timeline[quarter_key]['count'] += 1
-            timeline[quarter_key]['revenue'] += lease.get('base_rent', 0) or 0
-            timeline[quarter_key]['tenants'].append(lease['tenant_name'])
+            timeline[quarter_key]['count'] += bucket['lease_count']
+            timeline[quarter_key]['revenue'] += bucket['revenue_at_risk']
+            timeline[quarter_key]['tenants'].extend(bucket['tenants'])
 
         # Convert to sorted list
         sorted_timeline = sorted(
@@ -318,11 +389,13 @@ class LeaseAnalytics:
 
         return {
             'timeline': sorted_timeline,
+            'months': months,
             'total_expirations': sum(q['count'] for q in sorted_timeline)
         }
 
     # ==================== Portfolio Health ====================
 
+    @_memoized
     def calculate_portfolio_health_score(self) -> Dict[str, Any]:
         """Calculate overall portfolio health score (0-100)."""
         score = 100
@@ -0,0 +1,6 @@
+"""Offline benchmark harness with deterministic embedding and LLM stand-ins."""
+
+from .fakes import FakeEmbedder, FakeLLMClient
+from .harness import BenchmarkConfig, compare_reports, run_benchmark
+
+__all__ = ["FakeEmbedder", "FakeLLMClient", "BenchmarkConfig", "compare_reports", "run_benchmark"]
@@ -0,0 +1,159 @@
+"""
+Deterministic stand-ins for the OpenAI and Anthropic backends
+
+Lets the full QueryEngine pipeline run offline with repeatable results and
+configurable latency, so benchmarks measure our code rather than the network.
+"""
+
+import hashlib
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+class InjectedLatency:
+    """Sleep for a fixed delay plus seeded jitter to simulate a remote call"""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if self.latency_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        time.sleep((self.latency_ms + jitter) / 1000)
+
+
+class FakeEmbedder:
+    """
+    Embedder with the same interface as Embedder, backed by hash-seeded vectors
+
+    Each word maps to a fixed random unit vector seeded from its hash, and a
+    text embeds to the normalized sum of its word vectors. Texts sharing
+    words are therefore close, which keeps vector retrieval meaningful.
+    """
+
+    def __init__(self, dimension: int = 256, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        """
+        Initialize the fake embedder
+
+        Args:
+            dimension: Embedding size
+            latency_ms: Simulated latency per embedding call
+            jitter_ms: Maximum extra random latency per call
+            seed: Seed for vectors and jitter
+        """
+        self.dimension = dimension
+        self.seed = seed
+        self.latency = InjectedLatency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+        self._word_vectors: Dict[str, np.ndarray] = {}
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            digest = hashlib.blake2b(f"{self.seed}:{word}".encode(), digest_size=8).digest()
+            rng = np.random.default_rng(int.from_bytes(digest, "big"))
+            vector = rng.standard_normal(self.dimension)
+            vector /= np.linalg.norm(vector)
+            self._word_vectors[word] = vector
+        return vector
+
+    def _embed(self, text: str) -> List[float]:
+        words = _WORD_PATTERN.findall(text.lower())
+        if not words:
+            return [0.0] * self.dimension
+        vector = np.sum([self._word_vector(word) for word in words], axis=0)
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_text(self, text: str) -> List[float]:
+        """Embed one text"""
+        self.calls += 1
+        self.latency.wait()
+        return self._embed(text)
+
+    def embed_texts(self, texts: List[str], show_progress: bool = True) -> List[List[float]]:
+        """Embed many texts (one simulated call per text, like Embedder)"""
+        return [self.embed_text(text) for text in texts]
+
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a search query"""
+        return self.embed_text(query)
+
+
+class FakeLLMClient:
+    """
+    Client mimicking the parts of the OpenAI and Anthropic SDKs we call
+
+    `client.chat.completions.create(...)` returns an OpenAI-shaped response and
+    `client.messages.create(...)` an Anthropic-shaped one. Completions are
+    canned and deterministic: the first line of the last user message,
+    trimmed to `max_tokens` words. Usage blocks report ~4 characters per
+    prompt token and one token per completion word.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int = 0,
+        completion: Optional[str] = None
+    ):
+        """
+        Initialize the fake client
+
+        Args:
+            latency_ms: Simulated latency per completion
+            jitter_ms: Maximum extra random latency per completion
+            seed: Seed for jitter
+            completion: Fixed completion text (defaults to an echo of the prompt)
+        """
+        self.latency = InjectedLatency(latency_ms, jitter_ms, seed)
+        self.completion = completion
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_openai))
+        self.messages = SimpleNamespace(create=self._create_anthropic)
+
+    def _complete(self, messages: List[Dict[str, str]], max_tokens: int) -> Tuple[str, int]:
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += prompt_chars
+        self.latency.wait()
+
+        if self.completion is not None:
+            return self.completion, prompt_chars
+        user_messages = [m["content"] for m in messages if m.get("role") == "user"]
+        prompt = user_messages[-1] if user_messages else ""
+        first_line = next((line for line in prompt.splitlines() if line.strip()), "")
+        return " ".join(first_line.split()[:max_tokens]), prompt_chars
+
+    def _create_openai(self, model: str, messages: List[Dict[str, str]], max_tokens: int = 1000, **kwargs):
+        text, prompt_chars = self._complete(messages, max_tokens)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text))],
+            usage=SimpleNamespace(prompt_tokens=prompt_chars // 4, completion_tokens=len(text.split()))
+        )
+
+    def _create_anthropic(self, model: str, messages: List[Dict[str, str]], max_tokens: int = 1000, **kwargs):
+        text, prompt_chars = self._complete(messages, max_tokens)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=prompt_chars // 4, output_tokens=len(text.split()))
+        )
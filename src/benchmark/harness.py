@@ -0,0 +1,374 @@
+"""
+Offline RAG benchmark harness
+
+Runs the TEST_QUERIES set through a real QueryEngine wired to fake embedding
+and LLM backends, and reports per-stage latency percentiles, throughput
+under concurrent clients, retrieval recall@k, and regressions against a
+stored baseline report.
+"""
+
+import contextvars
+import functools
+import json
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..data.structured_chunks import generate_all_structured_chunks
+from ..database.chroma_store import ChromaStore
+from ..llm.answer_generator import AnswerGenerator
+from ..observability.usage import UsageTracker
+from ..search.query_engine import QueryEngine
+from .fakes import FakeEmbedder, FakeLLMClient, InjectedLatency
+from .queries import filtered_queries, iter_questions, labeled_queries
+
+
+# Pipeline stages timed for every query, in pipeline order
+STAGES = ["reformulate", "embed", "vector", "bm25", "fusion", "rerank", "generation", "total"]
+
+# Metrics where a higher value is better; everything else is a latency
+HIGHER_IS_BETTER = ("qps", "recall_at_k", "hit_rate", "mrr", "keyword_hit_rate")
+
+
+@dataclass
+class BenchmarkConfig:
+    """Settings for one benchmark run"""
+    clients: int = 4
+    repeats: int = 1
+    k: int = 5
+    embed_latency_ms: float = 0.0
+    llm_latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    seed: int = 0
+    provider: str = "openai"
+    categories: Optional[List[str]] = field(default=None)
+
+
+class StageRecorder:
+    """
+    Time pipeline stages by wrapping methods on one QueryEngine instance
+
+    Timings go to the sample active in the current context, so concurrent
+    client threads each record their own queries.
+    """
+
+    def __init__(self):
+        self._current: contextvars.ContextVar = contextvars.ContextVar("benchmark_sample", default=None)
+
+    def instrument(self, engine: QueryEngine) -> None:
+        """Wrap the engine's stage methods with timers"""
+        generator = engine.answer_generator
+        self._wrap(engine.store.embedder, "embed_query", "embed")
+        self._wrap(engine.ranker, "_vector_search", "vector")
+        self._wrap(engine.ranker, "_bm25_search", "bm25")
+        self._wrap(engine.ranker, "_reciprocal_rank_fusion", "fusion")
+        if engine.ranker.reranker is not None:
+            self._wrap(engine.ranker.reranker, "rerank", "rerank")
+        self._wrap(generator, "reformulate_query", "reformulate")
+        self._wrap(generator, "generate_answer", "generation")
+        self._wrap(generator, "generate_chat_response", "generation")
+
+    def _wrap(self, obj: Any, name: str, stage: str) -> None:
+        original = getattr(obj, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                sample = self._current.get()
+                if sample is not None:
+                    sample[stage] = sample.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+        setattr(obj, name, timed)
+
+    @contextmanager
+    def sample(self):
+        """Collect stage timings (ms) for the queries run inside this block"""
+        timings: Dict[str, float] = {}
+        token = self._current.set(timings)
+        start = time.perf_counter()
+        try:
+            yield timings
+        finally:
+            timings["total"] = (time.perf_counter() - start) * 1000
+            # Query embedding happens inside the vector search call
+            if "vector" in timings:
+                timings["vector"] = max(0.0, timings["vector"] - timings.get("embed", 0.0))
+            self._current.reset(token)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean summary of a list of milliseconds"""
+    if not values:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    array = np.asarray(values, dtype=np.float64)
+    p50, p95, p99 = np.percentile(array, [50, 95, 99])
+    return {
+        "count": int(array.size),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "mean": round(float(array.mean()), 3),
+    }
+
+
+def build_offline_engine(config: BenchmarkConfig, persist_dir: str) -> QueryEngine:
+    """
+    Build a QueryEngine over the structured lease chunks with fake backends
+
+    Args:
+        config: Benchmark settings (latency, seed, provider)
+        persist_dir: Directory for the throwaway Chroma collection
+
+    Returns:
+        QueryEngine ready to query
+    """
+    # Index without simulated latency; only query-time calls are measured
+    embedder = FakeEmbedder(seed=config.seed)
+    store = ChromaStore(persist_dir=persist_dir, collection_name="benchmark_chunks", embedder=embedder)
+    store.add_chunks(generate_all_structured_chunks(), show_progress=False)
+    embedder.latency = InjectedLatency(config.embed_latency_ms, config.jitter_ms, config.seed)
+
+    client = FakeLLMClient(latency_ms=config.llm_latency_ms, jitter_ms=config.jitter_ms, seed=config.seed)
+    usage = UsageTracker(db_path=str(Path(persist_dir) / "usage.db"), session_token_budget=0, daily_cost_budget=0)
+    generator = AnswerGenerator(provider=config.provider, model="offline-benchmark", client=client, usage_tracker=usage)
+    engine = QueryEngine(chroma_store=store, answer_generator=generator)
+    engine.ranker.refresh_bm25_index()
+    return engine
+
+
+def _run_question(engine: QueryEngine, question: str, history: List[Dict[str, str]], k: int):
+    if history:
+        return engine.chat(message=question, conversation_history=history, n_results=k)
+    return engine.query(question, n_results=k)
+
+
+def measure_latency(engine: QueryEngine, recorder: StageRecorder, config: BenchmarkConfig) -> Dict[str, Any]:
+    """Run every question serially and summarize per-stage latency"""
+    stage_values: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    for _ in range(config.repeats):
+        for _, question, history in iter_questions(config.categories):
+            with recorder.sample() as timings:
+                _run_question(engine, question, history, config.k)
+            for stage, value in timings.items():
+                stage_values[stage].append(value)
+    return {stage: percentiles(values) for stage, values in stage_values.items()}
+
+
+def measure_throughput(engine: QueryEngine, recorder: StageRecorder, config: BenchmarkConfig) -> Dict[str, Any]:
+    """Run every question from `config.clients` concurrent clients"""
+    workload = list(iter_questions(config.categories)) * config.repeats
+
+    def run(item):
+        _, question, history = item
+        with recorder.sample() as timings:
+            _run_question(engine, question, history, config.k)
+        return timings["total"]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=config.clients) as pool:
+        totals = list(pool.map(run, workload))
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "clients": config.clients,
+        "queries": len(workload),
+        "wall_seconds": round(wall_seconds, 3),
+        "qps": round(len(workload) / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_ms": percentiles(totals),
+    }
+
+
+def measure_recall(engine: QueryEngine, k: int) -> Dict[str, Any]:
+    """
+    Retrieval quality over the labeled query set
+
+    recall@k is the share of the tenant's chunks found in the top k, capped
+    at k relevant chunks; hit rate is the share of queries with at least one.
+    The "filtered" block asks each question with the tenant's name removed
+    and the tenant set as a filter, as the chat UI does: recall is how full
+    the top k stays, and keyword hit rate is the share of queries where BM25
+    still contributed a result.
+    """
+    all_chunks = engine.store.get_all_chunks()
+    relevant_counts: Dict[str, int] = {}
+    for metadata in all_chunks["metadatas"]:
+        tenant = metadata.get("tenant_name")
+        relevant_counts[tenant] = relevant_counts.get(tenant, 0) + 1
+
+    per_query = []
+    for item in labeled_queries():
+        tenant = item["tenant_name"]
+        results = engine.search_only(item["question"], n_results=k)
+        flags = [r.metadata.get("tenant_name") == tenant for r in results]
+        relevant = min(k, relevant_counts.get(tenant, 0))
+        per_query.append({
+            "category": item["category"],
+            "recall": sum(flags) / relevant if relevant else 0.0,
+            "hit": any(flags),
+            "rr": 1.0 / (flags.index(True) + 1) if any(flags) else 0.0,
+        })
+
+    filtered = []
+    for item in filtered_queries():
+        tenant = item["tenant_name"]
+        results = engine.search_only(item["question"], n_results=k, tenant_filter=tenant)
+        relevant = min(k, relevant_counts.get(tenant, 0))
+        filtered.append({
+            "recall": len(results) / relevant if relevant else 0.0,
+            "keyword_hit": any(r.bm25_rank is not None for r in results),
+        })
+
+    def summarize(rows):
+        return {
+            "queries": len(rows),
+            "recall_at_k": round(float(np.mean([r["recall"] for r in rows])), 4) if rows else 0.0,
+            "hit_rate": round(float(np.mean([r["hit"] for r in rows])), 4) if rows else 0.0,
+            "mrr": round(float(np.mean([r["rr"] for r in rows])), 4) if rows else 0.0,
+        }
+
+    categories = sorted({r["category"] for r in per_query})
+    return {
+        "k": k,
+        **summarize(per_query),
+        "by_category": {c: summarize([r for r in per_query if r["category"] == c]) for c in categories},
+        "filtered": {
+            "queries": len(filtered),
+            "recall_at_k": round(float(np.mean([r["recall"] for r in filtered])), 4) if filtered else 0.0,
+            "keyword_hit_rate": round(float(np.mean([r["keyword_hit"] for r in filtered])), 4) if filtered else 0.0,
+        },
+    }
+
+
+def run_benchmark(config: Optional[BenchmarkConfig] = None) -> Dict[str, Any]:
+    """
+    Run the full offline benchmark
+
+    Args:
+        config: Benchmark settings (defaults to BenchmarkConfig())
+
+    Returns:
+        Report dict (JSON-serializable)
+    """
+    config = config or BenchmarkConfig()
+
+    with tempfile.TemporaryDirectory(prefix="medley_benchmark_") as persist_dir:
+        engine = build_offline_engine(config, persist_dir)
+        recorder = StageRecorder()
+        recorder.instrument(engine)
+
+        client = engine.answer_generator.client
+        latency = measure_latency(engine, recorder, config)
+        llm_calls, prompt_chars = client.calls, client.prompt_chars
+        throughput = measure_throughput(engine, recorder, config)
+        retrieval = measure_recall(engine, config.k)
+        engine.answer_generator.usage.close()
+
+        return {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "config": asdict(config),
+            "corpus": {"chunks": engine.store.count()},
+            "latency_ms": latency,
+            "throughput": throughput,
+            "retrieval": retrieval,
+            "llm": {
+                "calls": llm_calls,
+                "prompt_chars_per_query": round(prompt_chars / max(1, latency["total"]["count"]), 1),
+            },
+        }
+
+
+def _flatten(report: Dict[str, Any]) -> Dict[str, float]:
+    """Comparable metrics from a report, keyed by dotted name"""
+    metrics = {}
+    for stage, summary in report.get("latency_ms", {}).items():
+        for name in ("p50", "p95", "p99"):
+            metrics[f"latency_ms.{stage}.{name}"] = summary.get(name, 0.0)
+    throughput = report.get("throughput", {})
+    if throughput:
+        metrics["throughput.qps"] = throughput.get("qps", 0.0)
+        for name in ("p50", "p95", "p99"):
+            metrics[f"throughput.latency_ms.{name}"] = throughput.get("latency_ms", {}).get(name, 0.0)
+    retrieval = report.get("retrieval", {})
+    for name in ("recall_at_k", "hit_rate", "mrr"):
+        if name in retrieval:
+            metrics[f"retrieval.{name}"] = retrieval[name]
+    for name in ("recall_at_k", "keyword_hit_rate"):
+        if name in retrieval.get("filtered", {}):
+            metrics[f"retrieval.filtered.{name}"] = retrieval["filtered"][name]
+    return metrics
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    min_latency_delta_ms: float = 1.0,
+    min_quality_delta: float = 0.01
+) -> Dict[str, Any]:
+    """
+    Diff a report against a baseline
+
+    Args:
+        current: Report from run_benchmark
+        baseline: Stored baseline report
+        tolerance: Relative change allowed before latency/throughput regress
+        min_latency_delta_ms: Latency changes smaller than this never regress
+        min_quality_delta: Retrieval drops smaller than this never regress
+
+    Returns:
+        {"metrics": [...], "regressions": [metric names]}
+    """
+    current_metrics = _flatten(current)
+    baseline_metrics = _flatten(baseline)
+
+    rows = []
+    for name in sorted(set(current_metrics) & set(baseline_metrics)):
+        before, after = baseline_metrics[name], current_metrics[name]
+        change = (after - before) / before if before else 0.0
+        higher_is_better = name.rsplit(".", 1)[-1] in HIGHER_IS_BETTER
+
+        if name.startswith("retrieval."):
+            regressed = before - after > min_quality_delta
+        elif higher_is_better:
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance and after - before > min_latency_delta_ms
+
+        rows.append({
+            "metric": name,
+            "baseline": before,
+            "current": after,
+            "change_pct": round(change * 100, 1),
+            "regressed": regressed,
+        })
+
+    return {
+        "metrics": rows,
+        "regressions": [row["metric"] for row in rows if row["regressed"]],
+    }
+
+
+def save_report(report: Dict[str, Any], path: Path) -> Path:
+    """Write a report as JSON, creating parent directories"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+
+def load_report(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a stored report, or None if it does not exist"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
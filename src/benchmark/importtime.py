@@ -0,0 +1,92 @@
+"""
+Cold-start import benchmark
+
+Runs `python -X importtime` for an entry point in a fresh interpreter and
+reports its cumulative import time and which heavy third-party packages it
+pulled in. Startup-sensitive entry points (CLI, API workers, maintenance
+scripts) should only load those packages when they actually use them.
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Packages that cost hundreds of milliseconds (or a network fetch) to import
+HEAVY_MODULES = ("chromadb", "openai", "anthropic", "streamlit", "pandas", "docx")
+
+# Entry points that must start without any HEAVY_MODULES
+LIGHT_ENTRY_POINTS = (
+    "config.settings",
+    "src.database.sql_store",
+    "src.analytics.lease_analytics",
+    "src.search.query_engine",
+    "src.ingestion.jobs",
+    "api.main",
+    "interfaces.cli",
+)
+
+# "import time: self [us] | cumulative | imported package" lines on stderr
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class ImportProfile:
+    """Import timings of one entry point in a fresh interpreter"""
+    target: str
+    total_ms: float
+    modules: Dict[str, float] = field(default_factory=dict)  # module -> cumulative ms
+
+    def loaded(self, package: str) -> bool:
+        """Whether the package (or any of its submodules) was imported"""
+        return any(name == package or name.startswith(package + ".") for name in self.modules)
+
+    def heavy(self, packages=HEAVY_MODULES) -> List[str]:
+        """Heavy packages this entry point imported"""
+        return [package for package in packages if self.loaded(package)]
+
+    def slowest(self, n: int = 10) -> List[tuple]:
+        """The n modules with the largest cumulative import time"""
+        return sorted(self.modules.items(), key=lambda item: item[1], reverse=True)[:n]
+
+
+def parse_importtime(stderr: str, target: str) -> ImportProfile:
+    """Parse -X importtime output into an ImportProfile"""
+    modules: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(3)] = int(match.group(2)) / 1000
+    # The target's own line covers its parent packages and everything they imported
+    return ImportProfile(target=target, total_ms=modules.get(target, 0.0), modules=modules)
+
+
+def measure_imports(module: str, python: Optional[str] = None) -> ImportProfile:
+    """
+    Import a module in a fresh interpreter under -X importtime
+
+    Args:
+        module: Dotted module name, importable from the repository root
+        python: Interpreter to run (defaults to the current one)
+
+    Returns:
+        ImportProfile of that import
+    """
+    # Run from a scratch directory so anything created at a relative path on
+    # import (SQLStore's default data/leases.db) doesn't land in the checkout
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory() as scratch:
+        completed = subprocess.run(
+            [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=scratch, env=env, capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr, module)
@@ -6,12 +6,14 @@ Implements semantic and fixed-size chunking strategies
 import re
 import uuid
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any
 import tiktoken
 
-from ..parsing.docx_parser import ParsedDocument
 from ..preprocessing.text_cleaner import TextCleaner
 
+if TYPE_CHECKING:
+    from ..parsing.docx_parser import ParsedDocument
+
 
 @dataclass
 class Chunk:
@@ -65,7 +67,7 @@ class Chunker:
         """Count tokens in text"""
         return len(self.tokenizer.encode(text))
 
-    def chunk_document(self, doc: ParsedDocument) -> List[Chunk]:
+    def chunk_document(self, doc: "ParsedDocument") -> List[Chunk]:
         """
         Chunk a parsed document into smaller pieces
 
@@ -95,7 +97,7 @@ class Chunker:
 
         return chunks
 
-    def _chunk_data_sheet(self, doc: ParsedDocument) -> List[Chunk]:
+    def _chunk_data_sheet(self, doc: "ParsedDocument") -> List[Chunk]:
         """Create dedicated chunks for data sheet content"""
         chunks = []
 
@@ -129,7 +131,7 @@ class Chunker:
 
         return chunks
 
-    def _chunk_rent_schedules(self, doc: ParsedDocument) -> List[Chunk]:
+    def _chunk_rent_schedules(self, doc: "ParsedDocument") -> List[Chunk]:
         """Create chunks for rent schedule tables"""
         chunks = []
 
@@ -160,13 +162,16 @@ class Chunker:
 
         return chunks
 
-    def _chunk_by_sections(self, doc: ParsedDocument) -> List[Chunk]:
+    def _chunk_by_sections(self, doc: "ParsedDocument") -> List[Chunk]:
         """Chunk document by article/section boundaries"""
         chunks = []
 
-        for section_name, section_content in doc.sections.items():
-            # Clean the content
-            cleaned_content = self.text_cleaner.clean_for_embedding(section_content)
+        # Stream sections so lazily parsed documents never build the sections dict,
+        # then clean them as one batch (spread over processes for very large documents)
+        sections = [(name, "\n".join(paragraphs)) for name, paragraphs in doc.iter_sections()]
+        cleaned = self.text_cleaner.clean_many(content for _, content in sections)
+
+        for (section_name, _), cleaned_content in zip(sections, cleaned):
             token_count = self.count_tokens(cleaned_content)
 
             # Determine section type
@@ -207,23 +212,34 @@ class Chunker:
         content: str,
         section_name: str,
         section_type: str,
-        doc: ParsedDocument
+        doc: "ParsedDocument"
     ) -> List[Chunk]:
-        """Split a large section into smaller chunks with overlap"""
+        """
+        Split a large section into smaller chunks with overlap
+
+        Each paragraph is tokenized once. Overlaps and post-overlap counts are
+        taken from short encodes of the chunk tail starting at a paragraph seam
+        (see _is_token_seam), which gives the same tokens as encoding the whole
+        chunk text, so boundaries match the straightforward implementation.
+        """
         chunks = []
 
         # Split by paragraphs first
         paragraphs = content.split('\n\n')
+        para_token_counts = [self.count_tokens(para) for para in paragraphs]
 
-        current_chunk_text = ""
+        # Paragraph texts (and their token counts) making up the current chunk
+        segments: List[str] = []
+        segment_tokens: List[int] = []
+        has_text = False
         current_tokens = 0
         chunk_number = 1
 
-        for para in paragraphs:
-            para_tokens = self.count_tokens(para)
-
+        for para, para_tokens in zip(paragraphs, para_token_counts):
             # If adding this paragraph exceeds chunk size
-            if current_tokens + para_tokens > self.chunk_size and current_chunk_text:
+            if current_tokens + para_tokens > self.chunk_size and has_text:
+                current_chunk_text = "\n\n".join(segments)
+
                 # Save current chunk
                 chunk = Chunk(
                     id=str(uuid.uuid4()),
@@ -244,19 +260,30 @@ class Chunker:
                 chunk_number += 1
 
                 # Start new chunk with overlap
-                overlap_text = self._get_overlap_text(current_chunk_text)
-                current_chunk_text = overlap_text + "\n\n" + para
-                current_tokens = self.count_tokens(current_chunk_text)
+                overlap_text = self._get_tail_overlap_text(segments, segment_tokens)
+                if self._is_token_seam(para):
+                    overlap_tokens = self.count_tokens(overlap_text + "\n\n")
+                    current_tokens = overlap_tokens + para_tokens
+                else:
+                    current_tokens = self.count_tokens(overlap_text + "\n\n" + para)
+                    overlap_tokens = current_tokens - para_tokens
+                segments = [overlap_text, para]
+                segment_tokens = [overlap_tokens, para_tokens]
             else:
                 # Add paragraph to current chunk
-                if current_chunk_text:
-                    current_chunk_text += "\n\n" + para
+                if has_text:
+                    segments.append(para)
+                    segment_tokens.append(para_tokens)
                 else:
-                    current_chunk_text = para
+                    segments = [para]
+                    segment_tokens = [para_tokens]
+                    has_text = bool(para)
                 current_tokens += para_tokens
 
         # Save final chunk
-        if current_chunk_text and self.count_tokens(current_chunk_text) >= self.min_chunk_size:
+        current_chunk_text = "\n\n".join(segments)
+        final_tokens = self.count_tokens(current_chunk_text) if current_chunk_text else 0
+        if current_chunk_text and final_tokens >= self.min_chunk_size:
             chunk = Chunk(
                 id=str(uuid.uuid4()),
                 content=current_chunk_text.strip(),
@@ -267,7 +294,7 @@ class Chunker:
                     "section_name": section_name,
                     "chunk_part": chunk_number
                 },
-                token_count=self.count_tokens(current_chunk_text),
+                token_count=final_tokens,
                 source_file=doc.file_name,
                 section_type=section_type,
                 section_name=f"{section_name} (Part {chunk_number})" if chunk_number > 1 else section_name
@@ -276,6 +303,33 @@ class Chunker:
 
         return chunks
 
+    @staticmethod
+    def _is_token_seam(paragraph: str) -> bool:
+        """
+        Whether tiktoken always starts a new token at this paragraph after "\\n\\n"
+
+        The cl100k pre-tokenizer never joins a newline run with the following
+        non-whitespace character, so encode(a + "\\n\\n" + b) equals
+        encode(a + "\\n\\n") + encode(b) whenever b starts with non-whitespace.
+        """
+        return bool(paragraph) and not paragraph[0].isspace()
+
+    def _get_tail_overlap_text(self, segments: List[str], segment_tokens: List[int]) -> str:
+        """
+        Same result as _get_overlap_text("\\n\\n".join(segments)), encoding only
+        enough trailing paragraphs to cover the overlap
+        """
+        approx_tokens = 0
+        for start in range(len(segments) - 1, 0, -1):
+            approx_tokens += segment_tokens[start] + 1
+            if approx_tokens < self.chunk_overlap or not self._is_token_seam(segments[start]):
+                continue
+            tokens = self.tokenizer.encode("\n\n".join(segments[start:]))
+            if len(tokens) >= self.chunk_overlap:
+                return self.tokenizer.decode(tokens[-self.chunk_overlap:])
+
+        return self._get_overlap_text("\n\n".join(segments))
+
     def _get_overlap_text(self, text: str) -> str:
         """Get the last portion of text for overlap"""
         tokens = self.tokenizer.encode(text)
@@ -301,7 +355,7 @@ class Chunker:
             return "general"
 
 
-def chunk_all_documents(documents: List[ParsedDocument], **kwargs) -> List[Chunk]:
+def chunk_all_documents(documents: List["ParsedDocument"], **kwargs) -> List[Chunk]:
     """
     Chunk all documents
 
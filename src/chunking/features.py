@@ -0,0 +1,44 @@
+"""
+Per-chunk features computed once at ingest and stored in chunk metadata
+The search reranker reads them back instead of re-scanning chunk text per query
+"""
+
+import re
+from typing import Any, Dict
+
+
+# Metadata keys holding ingest-time features start with this prefix
+FEATURE_PREFIX = "feat_"
+
+# Dollar amounts, percentages, comma-grouped numbers (square feet) and years
+NUMERIC_FACT_PATTERN = re.compile(
+    r'\$\s?\d[\d,]*(?:\.\d+)?|\b\d+(?:\.\d+)?\s?%|\b\d{1,3}(?:,\d{3})+\b|\b(?:19|20)\d{2}\b'
+)
+
+# Numeric facts per 100 characters at which density saturates to 1.0
+NUMERIC_DENSITY_SATURATION = 2.0
+
+
+def numeric_density(text: str) -> float:
+    """Numeric facts per 100 characters, scaled to [0, 1]"""
+    if not text:
+        return 0.0
+    facts = len(NUMERIC_FACT_PATTERN.findall(text))
+    return min(1.0, facts * 100 / len(text) / NUMERIC_DENSITY_SATURATION)
+
+
+def chunk_features(content: str, metadata: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Compute the stored features for one chunk
+
+    Args:
+        content: Chunk text
+        metadata: Chunk metadata (source_file is read)
+
+    Returns:
+        Dict of FEATURE_PREFIX-ed keys to floats, ready to merge into metadata
+    """
+    return {
+        f"{FEATURE_PREFIX}numeric_density": round(numeric_density(content), 4),
+        f"{FEATURE_PREFIX}structured": 1.0 if metadata.get("source_file") == "structured_data" else 0.0,
+    }
@@ -1,19 +1,46 @@
-from .lease_data import (
-    LEASE_DATA,
-    Lease,
-    RentInfo,
-    CAMInfo,
-    TIInfo,
-    CoTenancyInfo,
-    RentScheduleEntry,
-    get_all_leases,
-    get_lease_by_id,
-    get_lease_by_tenant,
-    get_categories,
-    get_tenants_by_category,
-    get_tenants_with_cotenancy,
-    calc_rent_for_year,
-    get_summary_stats,
-)
+from typing import TYPE_CHECKING
 
-from .structured_chunks import generate_all_structured_chunks
+from ..lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "LEASE_DATA": ".lease_data",
+    "Lease": ".lease_data",
+    "RentInfo": ".lease_data",
+    "CAMInfo": ".lease_data",
+    "TIInfo": ".lease_data",
+    "CoTenancyInfo": ".lease_data",
+    "RentScheduleEntry": ".lease_data",
+    "get_all_leases": ".lease_data",
+    "get_lease_by_id": ".lease_data",
+    "get_lease_by_tenant": ".lease_data",
+    "get_categories": ".lease_data",
+    "get_tenants_by_category": ".lease_data",
+    "get_tenants_with_cotenancy": ".lease_data",
+    "calc_rent_for_year": ".lease_data",
+    "get_summary_stats": ".lease_data",
+    "RentProjection": ".rent_projection",
+    "build_rent_projection": ".rent_projection",
+    "get_portfolio_projection": ".rent_projection",
+    "generate_all_structured_chunks": ".structured_chunks",
+})
+
+if TYPE_CHECKING:
+    from .lease_data import (
+        LEASE_DATA,
+        Lease,
+        RentInfo,
+        CAMInfo,
+        TIInfo,
+        CoTenancyInfo,
+        RentScheduleEntry,
+        get_all_leases,
+        get_lease_by_id,
+        get_lease_by_tenant,
+        get_categories,
+        get_tenants_by_category,
+        get_tenants_with_cotenancy,
+        calc_rent_for_year,
+        get_summary_stats,
+    )
+    from .rent_projection import RentProjection, build_rent_projection, get_portfolio_projection
+    from .structured_chunks import generate_all_structured_chunks
@@ -0,0 +1,188 @@
+"""
+Vectorized rent projection engine
+Builds leases x periods rent matrices in one pass with NumPy
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from .lease_data import LEASE_DATA, Lease
+
+
+# Assumed CPI growth for recoveries that escalate "CPI annually"
+DEFAULT_CPI_RATE = 0.03
+
+_PERCENT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+
+
+def _parse_cam_escalation(increases: Optional[str], cpi_rate: float) -> float:
+    """Parse an annual CAM escalation rate from the free-text lease field."""
+    if not increases:
+        return 0.0
+    match = _PERCENT_PATTERN.search(increases)
+    if match:
+        return float(match.group(1)) / 100
+    if 'cpi' in increases.lower():
+        return cpi_rate
+    return 0.0
+
+
+@dataclass
+class RentProjection:
+    """
+    Rent matrices for a set of leases over a fixed horizon.
+
+    Annual matrices are indexed by lease year (column 0 = lease year 1) and
+    only count lease years that fall entirely within the lease term, matching
+    calc_rent_for_year. Monthly matrices are indexed by calendar month from
+    `start_month` and follow each lease's own commencement date.
+    """
+    leases: List[Lease]
+    start_year: int
+    start_month: datetime
+    base_rent: np.ndarray          # (n_leases, n_years) annual base rent
+    cam: np.ndarray                # (n_leases, n_years) annual CAM recovery
+    tax: np.ndarray                # (n_leases, n_years) annual tax recovery
+    insurance: np.ndarray          # (n_leases, n_years) annual insurance recovery
+    active: np.ndarray             # (n_leases, n_years) bool, full lease year in term
+    monthly_base_rent: np.ndarray  # (n_leases, n_months) base rent per calendar month
+    monthly_active: np.ndarray     # (n_leases, n_months) bool, lease in term that month
+
+    @property
+    def horizon_years(self) -> int:
+        return self.base_rent.shape[1]
+
+    @property
+    def lease_years(self) -> np.ndarray:
+        """Lease year numbers (1-based) for each annual column."""
+        return np.arange(1, self.horizon_years + 1)
+
+    @property
+    def calendar_years(self) -> np.ndarray:
+        """Calendar year label for each annual column."""
+        return self.start_year + self.lease_years
+
+    @property
+    def total_occupancy_cost(self) -> np.ndarray:
+        """Base rent plus all recovery layers, (n_leases, n_years)."""
+        return self.base_rent + self.cam + self.tax + self.insurance
+
+    def rent_by_year(self, years: Optional[int] = None) -> np.ndarray:
+        """Portfolio base rent per lease year for the first `years` years."""
+        return self.base_rent[:, :years].sum(axis=0)
+
+    def active_by_year(self, years: Optional[int] = None) -> np.ndarray:
+        """Number of active leases per lease year for the first `years` years."""
+        return self.active[:, :years].sum(axis=0)
+
+    def rent_for_lease(self, lease_id: int) -> np.ndarray:
+        """Annual base rent row for a single lease."""
+        index = next(i for i, lease in enumerate(self.leases) if lease.id == lease_id)
+        return self.base_rent[index]
+
+    def yearly_summary(self, years: Optional[int] = None) -> List[dict]:
+        """Per-year totals in the shape the dashboards and chunks render."""
+        rent = self.rent_by_year(years)
+        active = self.active_by_year(years)
+        recoveries = (self.cam + self.tax + self.insurance)[:, :years].sum(axis=0)
+        return [
+            {
+                "year": int(year),
+                "calendar_year": int(calendar_year),
+                "total_rent": float(rent[i]),
+                "total_recoveries": float(recoveries[i]),
+                "active_leases": int(active[i]),
+            }
+            for i, (year, calendar_year) in enumerate(
+                zip(self.lease_years[:len(rent)], self.calendar_years[:len(rent)])
+            )
+        ]
+
+
+def build_rent_projection(
+    leases: Sequence[Lease],
+    horizon_years: int = 30,
+    cpi_rate: float = DEFAULT_CPI_RATE
+) -> RentProjection:
+    """
+    Build annual and monthly rent matrices for many leases at once
+
+    Args:
+        leases: Leases to project
+        horizon_years: Number of lease years to project
+        cpi_rate: Annual growth assumed for CPI-indexed CAM
+
+    Returns:
+        RentProjection holding every matrix
+    """
+    leases = list(leases)
+
+    year1 = np.array([lease.rent.year1_annual for lease in leases], dtype=np.float64)
+    rate = np.array([lease.rent.escalation_rate for lease in leases], dtype=np.float64)
+    period = np.array([max(1, lease.rent.escalation_period) for lease in leases], dtype=np.int64)
+    term_months = np.array([lease.term_months for lease in leases], dtype=np.int64)
+    sqft = np.array([lease.sqft for lease in leases], dtype=np.float64)
+    cam_psf = np.array([lease.cam.year1 or 0.0 for lease in leases], dtype=np.float64)
+    cam_rate = np.array(
+        [_parse_cam_escalation(lease.cam.increases, cpi_rate) for lease in leases],
+        dtype=np.float64
+    )
+    tax_psf = np.array([lease.tax or 0.0 for lease in leases], dtype=np.float64)
+    ins_psf = np.array([lease.insurance or 0.0 for lease in leases], dtype=np.float64)
+
+    # Annual matrices by lease year
+    years = np.arange(1, horizon_years + 1)
+    steps = (years[None, :] - 1) // period[:, None]
+    escalator = (1 + rate[:, None]) ** steps
+    active = years[None, :] * 12 <= term_months[:, None]
+
+    base_rent = np.where(active, year1[:, None] * escalator, 0.0)
+    cam = np.where(active, (cam_psf * sqft)[:, None] * (1 + cam_rate[:, None]) ** (years[None, :] - 1), 0.0)
+    tax = np.where(active, (tax_psf * sqft)[:, None], 0.0)
+    insurance = np.where(active, (ins_psf * sqft)[:, None], 0.0)
+
+    # Monthly matrix by calendar month from the earliest commencement
+    commencements = [datetime.strptime(lease.commence_date, "%Y-%m-%d") for lease in leases]
+    if commencements:
+        first = min(commencements)
+    else:
+        first = datetime(datetime.now().year, 1, 1)
+    start_month = first.replace(day=1)
+    offsets = np.array(
+        [(c.year - start_month.year) * 12 + (c.month - start_month.month) for c in commencements],
+        dtype=np.int64
+    )
+
+    months = np.arange(horizon_years * 12)
+    lease_month = months[None, :] - offsets[:, None]
+    monthly_active = (lease_month >= 0) & (lease_month < term_months[:, None])
+    monthly_steps = np.maximum(lease_month, 0) // 12 // period[:, None]
+    monthly_base_rent = np.where(
+        monthly_active,
+        (year1 / 12)[:, None] * (1 + rate[:, None]) ** monthly_steps,
+        0.0
+    )
+
+    return RentProjection(
+        leases=leases,
+        start_year=start_month.year,
+        start_month=start_month,
+        base_rent=base_rent,
+        cam=cam,
+        tax=tax,
+        insurance=insurance,
+        active=active,
+        monthly_base_rent=monthly_base_rent,
+        monthly_active=monthly_active,
+    )
+
+
+@lru_cache(maxsize=4)
+def get_portfolio_projection(horizon_years: int = 30) -> RentProjection:
+    """Projection for the full LEASE_DATA portfolio, built once per horizon."""
+    return build_rent_projection(LEASE_DATA, horizon_years=horizon_years)
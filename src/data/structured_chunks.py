@@ -11,8 +11,8 @@ from .lease_data import (
     Lease,
     get_summary_stats,
     get_tenants_with_cotenancy,
-    calc_rent_for_year,
 )
+from .rent_projection import get_portfolio_projection
 
 
 def generate_lease_summary_chunk(lease: Lease) -> Chunk:
@@ -306,6 +306,19 @@ HIGH RISK TENANTS (Opening/Operating Co-Tenancy with named tenants):
 CRITICAL DEPENDENCY:
 Trader Joe's is the anchor tenant that triggers most co-tenancy clauses.
 If Trader Joe's delays opening, HIGH RISK rent at risk: ${sum(l.co_tenancy.rent_at_risk for l in high_risk):,.0f}
+"""
+
+    # Seeded so re-ingesting produces the same chunk text
+    from ..analytics.cotenancy_simulation import simulate_cotenancy_risk
+    simulation = simulate_cotenancy_risk(n_scenarios=10000, seed=42)
+    pct = simulation["percentiles"]
+    content += f"""
+SIMULATED RENT AT RISK ({simulation['n_scenarios']:,} scenarios of anchor delays, closures and cascading triggers):
+- Probability of any co-tenancy rent reduction: {simulation['probability_of_loss'] * 100:.1f}%
+- Expected annual rent loss: ${simulation['mean_loss']:,.0f}
+- Median (P50) annual rent loss: ${pct['p50']:,.0f}
+- P95 annual rent loss: ${pct['p95']:,.0f}
+- P99 annual rent loss: ${pct['p99']:,.0f}
 """
 
     return Chunk(
@@ -331,17 +344,11 @@ def generate_ten_year_projection_chunk() -> Chunk:
 Annual rent projections based on contractual escalations:
 
 """
+    projection = get_portfolio_projection()
     projections = []
-    for year in range(1, 11):
-        total_rent = 0
-        active_leases = 0
-        for lease in LEASE_DATA:
-            term_years = lease.term_months / 12
-            if year <= term_years:
-                total_rent += calc_rent_for_year(lease, year)
-                active_leases += 1
-        projections.append((year, 2026 + year, total_rent, active_leases))
-        content += f"Year {year} ({2026 + year}): ${total_rent:,.0f} ({active_leases} active leases)\n"
+    for row in projection.yearly_summary(10):
+        projections.append((row["year"], row["calendar_year"], row["total_rent"], row["active_leases"]))
+        content += f"Year {row['year']} ({row['calendar_year']}): ${row['total_rent']:,.0f} ({row['active_leases']} active leases)\n"
 
     growth = (projections[9][2] - projections[0][2]) / projections[0][2]
     content += f"""
@@ -349,7 +356,7 @@ SUMMARY:
 - Year 1 Total Rent: ${projections[0][2]:,.0f}
 - Year 10 Total Rent: ${projections[9][2]:,.0f}
 - 10-Year Growth: {growth * 100:.1f}%
-- Leases expiring within 10 years: {29 - projections[9][3]}
+- Leases expiring within 10 years: {len(projection.leases) - projections[9][3]}
 """
 
     return Chunk(
@@ -1,3 +1,25 @@
-from .chroma_store import ChromaStore
+from typing import TYPE_CHECKING
 
-__all__ = ["ChromaStore"]
+from ..lazy import lazy_exports
+
+__all__ = [
+    "ChromaStore", "ExpirationScheduler", "FacetIndex", "InvalidationBus", "VectorIndex",
+    "create_vector_store", "get_invalidation_bus",
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "ChromaStore": ".chroma_store",
+    "ExpirationScheduler": ".expiration_scheduler",
+    "FacetIndex": ".facet_index",
+    "InvalidationBus": ".invalidation",
+    "get_invalidation_bus": ".invalidation",
+    "VectorIndex": ".vector_index",
+    "create_vector_store": ".vector_index",
+})
+
+if TYPE_CHECKING:
+    from .chroma_store import ChromaStore
+    from .expiration_scheduler import ExpirationScheduler
+    from .facet_index import FacetIndex
+    from .invalidation import InvalidationBus, get_invalidation_bus
+    from .vector_index import VectorIndex, create_vector_store
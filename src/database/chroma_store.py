@@ -3,59 +3,385 @@ ChromaDB vector store for lease documents
 Handles storage and retrieval of document chunks with embeddings
 """
 
-from typing import List, Dict, Any, Optional
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Optional
 from pathlib import Path
-import chromadb
-from chromadb.config import Settings
-
-from config.settings import CHROMA_PERSIST_DIR, COLLECTION_NAME
+from config.settings import CHROMA_PERSIST_DIR, COLLECTION_NAME, COLLECTION_GC_GRACE_SECONDS
 from ..chunking.chunker import Chunk
-from ..vectorization.embedder import Embedder
+from ..chunking.features import chunk_features
+from .facet_index import FacetIndex
+from ..observability.tracing import span
+
+if TYPE_CHECKING:
+    from ..vectorization.embedder import Embedder
+
+
+# Alias -> live versioned collection, swapped atomically on rebuild
+ALIASES_FILE = "collection_aliases.json"
+
+# Versioned collections are named "<alias>__v<n>"
+VERSION_SEPARATOR = "__v"
+
+# Facet counts live in <persist_dir>/facets/<collection>.json
+FACETS_DIR = "facets"
+
+# Called with the incoming version before a swap; may return a callable run
+# right after the swap (so derived indexes switch at the same moment)
+SwapListener = Callable[["ChromaStore"], Optional[Callable[[], None]]]
+
+
+def flatten_chunk_metadata(chunk: Chunk) -> Dict[str, Any]:
+    """Chunk fields and metadata as the primitive-valued dict vector stores accept"""
+    flat_metadata = {
+        "source_file": chunk.source_file,
+        "section_type": chunk.section_type,
+        "section_name": chunk.section_name,
+        "chunk_index": chunk.chunk_index,
+        "token_count": chunk.token_count
+    }
+
+    # Add metadata from chunk
+    for key, value in chunk.metadata.items():
+        if isinstance(value, (str, int, float, bool)):
+            flat_metadata[key] = value
+        elif value is not None:
+            flat_metadata[key] = str(value)
+
+    # Rerank features, computed once here rather than per query
+    flat_metadata.update(chunk_features(chunk.content, flat_metadata))
+    return flat_metadata
 
 
 class ChromaStore:
-    """ChromaDB vector store for lease document chunks"""
+    """
+    ChromaDB vector store for lease document chunks
+
+    The collection name is an alias. Rebuilds write a new versioned collection
+    off to the side and swap() repoints the alias in one file replace, so
+    readers never see an empty or half-built collection; other processes pick
+    up the swap on their next access. Replaced versions are dropped by
+    collect_garbage() once COLLECTION_GC_GRACE_SECONDS have passed.
+    """
 
     def __init__(
         self,
         persist_dir: Optional[str] = None,
-        collection_name: str = COLLECTION_NAME
+        collection_name: str = COLLECTION_NAME,
+        embedder: Optional["Embedder"] = None,
+        pinned: bool = False
     ):
         """
         Initialize ChromaDB store
 
         Args:
             persist_dir: Directory for persistent storage
-            collection_name: Name of the collection
+            collection_name: Name of the collection (an alias unless pinned)
+            embedder: Embedder to use (creates a cached OpenAI Embedder if None)
+            pinned: Open exactly this collection and never follow alias swaps
         """
         self.persist_dir = persist_dir or str(CHROMA_PERSIST_DIR)
-        self.collection_name = collection_name
+        self.alias = collection_name
+        self.pinned = pinned
 
         # Ensure directory exists
         Path(self.persist_dir).mkdir(parents=True, exist_ok=True)
 
-        # Initialize ChromaDB client with persistent storage
-        self.client = chromadb.PersistentClient(
-            path=self.persist_dir,
-            settings=Settings(anonymized_telemetry=False)
-        )
-
-        # Get or create collection
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
+        # The Chroma client, collection and embedder are built on first use, so
+        # commands that never touch vectors don't pay for chromadb or openai
+        self._client = None
+        self._embedder = embedder
+        self._open_lock = threading.Lock()
+
+        self._aliases_path = Path(self.persist_dir) / ALIASES_FILE
+        self._aliases_mtime = None
+        self._swap_lock = threading.Lock()
+        self._swap_listeners: List[SwapListener] = []
+        self._facet_indexes: Dict[str, FacetIndex] = {}
+
+        # Name of the live collection (opened on first access)
+        self.collection_name = collection_name if pinned else self._resolve_alias()
+        self._collection = None
+        if not pinned:
+            self._aliases_mtime = self._aliases_stamp()
+
+    @property
+    def client(self):
+        """Persistent Chroma client (chromadb is imported on first use)"""
+        if self._client is None:
+            with self._open_lock:
+                if self._client is None:
+                    import chromadb
+                    from chromadb.config import Settings
+                    self._client = chromadb.PersistentClient(
+                        path=self.persist_dir,
+                        settings=Settings(anonymized_telemetry=False)
+                    )
+        return self._client
+
+    @property
+    def embedder(self):
+        """Embedder for queries and new chunks (a cached OpenAI Embedder unless one was given)"""
+        if self._embedder is None:
+            from ..vectorization.embedder import Embedder
+            from ..vectorization.embedding_cache import get_embedding_cache
+            self._embedder = Embedder(cache=get_embedding_cache())
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, embedder) -> None:
+        self._embedder = embedder
+
+    def _open(self, name: str):
+        return self.client.get_or_create_collection(
+            name=name,
             metadata={"description": "Medley lease document chunks"}
         )
 
-        # Initialize embedder
-        self.embedder = Embedder()
+    @property
+    def is_open(self) -> bool:
+        """Whether the live collection has been opened (reading data_version() opens it)"""
+        return self._collection is not None
+
+    @property
+    def collection(self):
+        """The live Chroma collection (follows swaps made by other processes)"""
+        self.refresh()
+        collection = self._collection
+        if collection is None:
+            collection = self._collection = self._open(self.collection_name)
+        return collection
+
+    @property
+    def facets(self) -> FacetIndex:
+        """Facet counts of the live collection (built by one metadata-only scan the first time)"""
+        collection = self.collection
+        name = self.collection_name
+        index = self._facet_indexes.get(name)
+        if index is None:
+            index = FacetIndex(self._facets_path(name))
+            if not index.exists():
+                index.rebuild(collection.get(include=["metadatas"])["metadatas"])
+            self._facet_indexes[name] = index
+        return index
+
+    def _facets_path(self, name: str) -> Path:
+        return Path(self.persist_dir) / FACETS_DIR / f"{name}.json"
+
+    @property
+    def version_source(self) -> str:
+        """Name of this collection on the invalidation bus"""
+        return f"vectors:{Path(self.persist_dir).resolve()}/{self.alias}"
+
+    def data_version(self) -> int:
+        """Counter that increases on every write to the live collection and on every swap"""
+        return self.facets.current_version()
+
+    # ==================== Versioned Collections ====================
+
+    def _aliases_stamp(self) -> Optional[int]:
+        try:
+            return self._aliases_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_aliases(self) -> Dict[str, Any]:
+        try:
+            with open(self._aliases_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_aliases(self, aliases: Dict[str, Any]) -> None:
+        tmp_path = self._aliases_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(aliases, f, indent=2)
+        os.replace(tmp_path, self._aliases_path)
+
+    def _resolve_alias(self) -> str:
+        """Collection the alias points at (the alias itself before the first swap)"""
+        record = self._read_aliases().get(self.alias)
+        return record["collection"] if record else self.alias
+
+    def versions(self) -> List[str]:
+        """Every versioned collection of this alias, oldest first"""
+        pattern = re.compile(re.escape(self.alias) + re.escape(VERSION_SEPARATOR) + r"(\d+)$")
+        found = []
+        for collection in self.client.list_collections():
+            name = getattr(collection, "name", collection)
+            match = pattern.match(name)
+            if match:
+                found.append((int(match.group(1)), name))
+        return [name for _, name in sorted(found)]
+
+    def on_swap(self, listener: SwapListener) -> None:
+        """
+        Register a callback for alias swaps
+
+        Args:
+            listener: Called with a store pinned to the incoming version before
+                the swap; a callable it returns runs immediately after the swap
+        """
+        self._swap_listeners.append(listener)
+
+    def create_version(self) -> "ChromaStore":
+        """
+        Create an empty collection for the next version of this alias
+
+        Returns:
+            ChromaStore pinned to the new collection; fill it, then swap() it in
+        """
+        versions = self.versions()
+        latest = int(versions[-1].rsplit(VERSION_SEPARATOR, 1)[1]) if versions else 0
+        name = f"{self.alias}{VERSION_SEPARATOR}{latest + 1}"
+        return ChromaStore(self.persist_dir, collection_name=name, embedder=self._embedder, pinned=True)
+
+    def swap(self, version: "ChromaStore") -> str:
+        """
+        Point the alias at a new version and retire the current one
+
+        Args:
+            version: Store returned by create_version(), fully populated
+
+        Returns:
+            Name of the collection that was retired
+        """
+        if self.pinned:
+            raise ValueError("Cannot swap a pinned store; swap through the alias")
+        version.facets.advance(self.data_version())
+        commits = [listener(version) for listener in self._swap_listeners]
+
+        with self._swap_lock:
+            aliases = self._read_aliases()
+            retired = [
+                entry for entry in aliases.get(self.alias, {}).get("retired", [])
+                if entry["collection"] != version.collection_name
+            ]
+            previous = self._resolve_alias()
+            if previous != version.collection_name:
+                retired.append({"collection": previous, "retired_at": time.time()})
+            aliases[self.alias] = {
+                "collection": version.collection_name,
+                "swapped_at": datetime.now().isoformat(),
+                "retired": retired
+            }
+            self._write_aliases(aliases)
+            self.collection_name = version.collection_name
+            self._collection = version.collection
+            self._aliases_mtime = self._aliases_stamp()
+
+        for commit in commits:
+            if commit is not None:
+                commit()
+        return previous
+
+    def refresh(self) -> bool:
+        """
+        Follow an alias swap made elsewhere (one stat() when nothing changed)
+
+        Returns:
+            True if the live collection changed
+        """
+        if self.pinned:
+            return False
+        stamp = self._aliases_stamp()
+        if stamp == self._aliases_mtime:
+            return False
+
+        with self._swap_lock:
+            self._aliases_mtime = stamp
+            name = self._resolve_alias()
+            if name == self.collection_name:
+                return False
+            incoming = ChromaStore(self.persist_dir, collection_name=name, embedder=self._embedder, pinned=True)
+            commits = [listener(incoming) for listener in self._swap_listeners]
+            self.collection_name = name
+            self._collection = incoming.collection
+
+        for commit in commits:
+            if commit is not None:
+                commit()
+        return True
+
+    def rebuild(self, populate: Callable[["ChromaStore"], Any]) -> "ChromaStore":
+        """
+        Build a new version off to the side and swap it in when complete
 
-    def add_chunks(self, chunks: List[Chunk], show_progress: bool = True) -> int:
+        Args:
+            populate: Fills the store it is given (pinned to the new version)
+
+        Returns:
+            The new live version
+        """
+        version = self.create_version()
+        try:
+            populate(version)
+        except BaseException:
+            try:
+                self.client.delete_collection(version.collection_name)
+            except Exception:
+                pass  # never created (populate failed before its first write)
+            FacetIndex(self._facets_path(version.collection_name)).delete()
+            raise
+        self.swap(version)
+        self.collect_garbage()
+        return version
+
+    def collect_garbage(self, grace_seconds: Optional[float] = None) -> List[str]:
+        """
+        Drop retired versions whose grace period has passed
+
+        Args:
+            grace_seconds: Minimum age since retirement (defaults to COLLECTION_GC_GRACE_SECONDS)
+
+        Returns:
+            Names of the collections deleted
+        """
+        grace = COLLECTION_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        with self._swap_lock:
+            aliases = self._read_aliases()
+            record = aliases.get(self.alias)
+            if not record:
+                return []
+
+            now = time.time()
+            kept, dropped = [], []
+            for entry in record.get("retired", []):
+                if entry["collection"] == record["collection"] or now - entry["retired_at"] < grace:
+                    kept.append(entry)
+                    continue
+                try:
+                    self.client.delete_collection(entry["collection"])
+                except Exception:
+                    pass  # already gone
+                FacetIndex(self._facets_path(entry["collection"])).delete()
+                dropped.append(entry["collection"])
+
+            if dropped:
+                record["retired"] = kept
+                self._write_aliases(aliases)
+                self._aliases_mtime = self._aliases_stamp()
+        return dropped
+
+    # ==================== Chunks ====================
+
+    def add_chunks(
+        self,
+        chunks: List[Chunk],
+        show_progress: bool = True,
+        embeddings: Optional[List[List[float]]] = None
+    ) -> int:
         """
         Add chunks to the vector store
 
         Args:
             chunks: List of Chunk objects to add
             show_progress: Whether to show progress bar
+            embeddings: Precomputed vectors, one per chunk (embedded here if None)
 
         Returns:
             Number of chunks added
@@ -66,40 +392,56 @@ class ChromaStore:
         # Extract texts and metadata
         texts = [chunk.content for chunk in chunks]
         ids = [chunk.id for chunk in chunks]
-        metadatas = []
-
-        for chunk in chunks:
-            # Flatten metadata for ChromaDB (only supports primitive types)
-            flat_metadata = {
-                "source_file": chunk.source_file,
-                "section_type": chunk.section_type,
-                "section_name": chunk.section_name,
-                "chunk_index": chunk.chunk_index,
-                "token_count": chunk.token_count
-            }
-
-            # Add metadata from chunk
-            for key, value in chunk.metadata.items():
-                if isinstance(value, (str, int, float, bool)):
-                    flat_metadata[key] = value
-                elif value is not None:
-                    flat_metadata[key] = str(value)
-
-            metadatas.append(flat_metadata)
+        metadatas = [flatten_chunk_metadata(chunk) for chunk in chunks]
 
         # Create embeddings
-        embeddings = self.embedder.embed_texts(texts, show_progress=show_progress)
+        if embeddings is None:
+            embeddings = self.embedder.embed_texts(texts, show_progress=show_progress)
 
-        # Add to collection
+        # Add to collection, then count the new chunks
+        facets = self.facets
         self.collection.add(
             ids=ids,
             embeddings=embeddings,
             documents=texts,
             metadatas=metadatas
         )
+        facets.add(metadatas)
 
         return len(chunks)
 
+    def get_ids_by_source(self, source_file: str) -> List[str]:
+        """IDs of every chunk from one source file"""
+        return self.collection.get(where={"source_file": source_file}, include=[])["ids"]
+
+    def replace_source_chunks(
+        self,
+        source_file: str,
+        chunks: List[Chunk],
+        embeddings: Optional[List[List[float]]] = None
+    ) -> List[str]:
+        """
+        Swap every stored chunk of one source file for new chunks
+
+        Args:
+            source_file: File whose chunks are replaced
+            chunks: New chunks for that file
+            embeddings: Precomputed vectors, one per chunk (embedded here if None)
+
+        Returns:
+            IDs of the chunks that were removed
+        """
+        if embeddings is None:
+            embeddings = self.embedder.embed_texts([chunk.content for chunk in chunks], show_progress=False)
+        existing = self.collection.get(where={"source_file": source_file}, include=["metadatas"])
+        removed = existing["ids"]
+        # Add before deleting so a failed add leaves the old chunks in place
+        self.add_chunks(chunks, show_progress=False, embeddings=embeddings)
+        if removed:
+            self.collection.delete(ids=removed)
+            self.facets.remove(existing["metadatas"])
+        return removed
+
     def search(
         self,
         query: str,
@@ -120,7 +462,8 @@ class ChromaStore:
             Search results with documents, metadatas, and distances
         """
         # Create query embedding
-        query_embedding = self.embedder.embed_query(query)
+        with span("embed"):
+            query_embedding = self.embedder.embed_query(query)
 
         # Build query parameters
         query_params = {
@@ -134,7 +477,9 @@ class ChromaStore:
             query_params["where_document"] = where_document
 
         # Execute search
-        results = self.collection.query(**query_params)
+        with span("vector_search") as current:
+            results = self.collection.query(**query_params)
+            current.set(results=len(results["ids"][0]) if results["ids"] else 0)
 
         return {
             "ids": results["ids"][0] if results["ids"] else [],
@@ -177,11 +522,12 @@ class ChromaStore:
         return None
 
     def delete_all(self) -> None:
-        """Delete all chunks from the store"""
+        """Delete all chunks from the store (to rebuild without an empty window, use rebuild())"""
         # Get all IDs and delete
-        all_data = self.collection.get()
-        if all_data["ids"]:
-            self.collection.delete(ids=all_data["ids"])
+        all_ids = self.collection.get(include=[])["ids"]
+        if all_ids:
+            self.collection.delete(ids=all_ids)
+        self.facets.rebuild([])
 
     def count(self) -> int:
         """Get the number of chunks in the store"""
@@ -189,12 +535,16 @@ class ChromaStore:
 
     def get_unique_tenants(self) -> List[str]:
         """Get list of unique tenant names in the store"""
-        all_data = self.collection.get()
-        tenants = set()
-        for metadata in all_data["metadatas"]:
-            if "tenant_name" in metadata:
-                tenants.add(metadata["tenant_name"])
-        return sorted(list(tenants))
+        return sorted(self.facets.values("tenant_name"))
+
+    def get_facets(self) -> Dict[str, Any]:
+        """
+        Chunk counts per tenant, section type and source file
+
+        Returns:
+            {"total_chunks": n, "tenant_name": {...}, "section_type": {...}, "source_file": {...}}
+        """
+        return self.facets.to_dict()
 
     def search_by_tenant(
         self,
@@ -0,0 +1,105 @@
+"""
+Scheduled refresh of the expiration calendar
+SQLStore refreshes a lease's calendar row and alerts whenever that lease is
+written. The scheduler rebuilds the whole calendar once a night (syncing
+alerts to the configured horizons) and whenever the lease version shows a
+write the store didn't see, such as another process or a raw SQL update.
+Stores without a scheduler catch up on their first calendar read of the day
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from config.settings import EXPIRATION_POLL_SECONDS, EXPIRATION_REFRESH_AT
+
+from .sql_store import SQLStore
+
+logger = logging.getLogger(__name__)
+
+
+class ExpirationScheduler:
+    """
+    Keeps a database's expiration calendar materialized
+
+    Drive it either with start() (a background thread that polls every
+    poll_interval) or by calling run_pending() yourself, not both: the
+    scheduler's SQLStore connection belongs to the thread that first uses it.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        refresh_at: str = EXPIRATION_REFRESH_AT,
+        poll_interval: float = EXPIRATION_POLL_SECONDS,
+        alert_horizons: Optional[List[int]] = None
+    ):
+        """
+        Initialize the scheduler (nothing runs until start() or run_pending())
+
+        Args:
+            db_path: SQLStore database to keep refreshed
+            refresh_at: Local "HH:MM" of the nightly full refresh
+            poll_interval: Seconds between checks in the background thread
+            alert_horizons: Days' notice for expiration alerts (defaults to EXPIRATION_ALERT_HORIZONS)
+        """
+        self.db_path = str(db_path)
+        self.refresh_at = datetime.strptime(refresh_at, "%H:%M").time()
+        self.poll_interval = poll_interval
+        self.alert_horizons = alert_horizons
+        self._store: Optional[SQLStore] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _last_slot(self, now: datetime) -> datetime:
+        """Most recent nightly refresh time at or before now"""
+        slot = datetime.combine(now.date(), self.refresh_at)
+        return slot if slot <= now else slot - timedelta(days=1)
+
+    def run_pending(self, now: Optional[datetime] = None) -> bool:
+        """
+        Refresh the calendar if a nightly slot has passed or the leases changed since the last refresh
+
+        Args:
+            now: Current time (defaults to datetime.now())
+
+        Returns:
+            True if the calendar was refreshed
+        """
+        now = now or datetime.now()
+        if self._store is None:
+            self._store = SQLStore(self.db_path, alert_horizons=self.alert_horizons)
+
+        if self._store.expiration_calendar_is_current(self._last_slot(now)):
+            return False
+
+        rows = self._store.refresh_expiration_calendar(as_of=now)
+        logger.info(f"Expiration calendar refreshed: {rows} active leases")
+        return True
+
+    def start(self) -> None:
+        """Run run_pending() every poll_interval on a daemon thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="expiration-scheduler", daemon=True)
+        self._thread.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the background thread"""
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and wait:
+            thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.warning(f"Expiration calendar refresh failed: {e}")
+            self._stop.wait(self.poll_interval)
+        if self._store is not None:
+            self._store.close()
+            self._store = None
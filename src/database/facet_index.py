@@ -0,0 +1,193 @@
+"""
+Facet counts for a vector store collection
+Chunk counts per tenant, section type and source file are updated on every
+write and saved next to the collection, so tenant lists and stats never need
+a scan of the stored chunks. The same file carries the collection's data
+version, a counter that moves on every write
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Metadata fields counted by the facet index
+FACET_FIELDS = ("tenant_name", "section_type", "source_file")
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a lock file, shared by every process and thread that opens it
+
+    Args:
+        path: Lock file (created if missing; its contents are never used)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FacetIndex:
+    """
+    Per-field value counts for one collection, persisted as a JSON file
+
+    Counts are reloaded when another process has rewritten the file. Every
+    update holds an exclusive lock on a sidecar .lock file while it re-reads,
+    modifies and replaces the counts, so writers in different processes
+    don't overwrite each other's changes.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the index (nothing is read until first use)
+
+        Args:
+            path: JSON file holding the counts
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_suffix(".lock")
+        self.total = 0
+        self.version = 0
+        self.counts: Dict[str, Counter] = {field: Counter() for field in FACET_FIELDS}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Whether the counts have been saved before"""
+        return self.path.exists()
+
+    def _file_stamp(self) -> Optional[tuple]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        # Each save replaces the file, so the inode changes even when two
+        # saves land within the filesystem's mtime resolution
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold self._lock and the cross-process lock on the lock file"""
+        with self._lock, file_lock(self.lock_path):
+            yield
+
+    def _load(self) -> None:
+        """Caller holds self._lock"""
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._stamp:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.total = data.get("total", 0)
+        self.version = data.get("version", 0)
+        self.counts = {field: Counter(data.get(field, {})) for field in FACET_FIELDS}
+        self._stamp = stamp
+
+    def _save(self) -> None:
+        """Caller holds the lock from self._locked()"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            by_field = {field: dict(counts) for field, counts in self.counts.items()}
+            json.dump({"total": self.total, "version": self.version, **by_field}, f)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._file_stamp()
+
+    def _apply(self, metadatas: Iterable[Dict[str, Any]], sign: int, reset: bool = False) -> None:
+        with self._locked():
+            self._load()
+            if reset:
+                self.total = 0
+                self.counts = {field: Counter() for field in FACET_FIELDS}
+            self.version += 1
+            for metadata in metadatas:
+                self.total += sign
+                for field in FACET_FIELDS:
+                    value = metadata.get(field)
+                    if value is None:
+                        continue
+                    counts = self.counts[field]
+                    counts[value] += sign
+                    if counts[value] <= 0:
+                        del counts[value]
+            self._save()
+
+    def add(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Count newly stored chunks"""
+        self._apply(metadatas, 1)
+
+    def remove(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Uncount deleted chunks"""
+        self._apply(metadatas, -1)
+
+    def rebuild(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Replace every count with counts of the given chunks"""
+        self._apply(metadatas, 1, reset=True)
+
+    def advance(self, floor: int) -> int:
+        """
+        Move the version past another collection's (so a swapped-in version keeps counting up)
+
+        Args:
+            floor: Version the new value must exceed
+
+        Returns:
+            The new version
+        """
+        with self._locked():
+            self._load()
+            self.version = max(self.version, floor) + 1
+            self._save()
+            return self.version
+
+    def current_version(self) -> int:
+        """Data version as last saved by any writer"""
+        with self._lock:
+            self._load()
+            return self.version
+
+    def values(self, field: str) -> Dict[Any, int]:
+        """Chunk count per value of one facet field"""
+        with self._lock:
+            self._load()
+            return dict(self.counts[field])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """All counts: {"total_chunks": n, "<field>": {value: count}}"""
+        with self._lock:
+            self._load()
+            return {"total_chunks": self.total, **{field: dict(counts) for field, counts in self.counts.items()}}
+
+    def delete(self) -> None:
+        """Remove the saved counts and their lock file"""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.lock_path.unlink(missing_ok=True)
+            self._stamp = None
+
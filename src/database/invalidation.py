@@ -0,0 +1,167 @@
+"""
+Invalidation bus for caches built on top of the stores
+SQLStore, ChromaStore and VectorIndex each expose a monotonically increasing
+data_version() under a version_source name. Caches subscribe to a source and
+are told when its version moves, whether the write happened in this process
+(writers publish) or in another one (check() polls the watched stores)
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from config.settings import INVALIDATION_POLL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Called with (source name, new data version)
+Subscriber = Callable[[str, int], None]
+
+
+def _weak(fn: Callable) -> Callable[[], Optional[Callable]]:
+    """Reference to fn that doesn't keep a bound method's object alive"""
+    if hasattr(fn, "__self__"):
+        return weakref.WeakMethod(fn)
+    return lambda: fn
+
+
+def _is_open(store) -> bool:
+    """Whether data_version() can be read without opening the store (stores without is_open always can)"""
+    return getattr(store, "is_open", True)
+
+
+class InvalidationBus:
+    """
+    Tells subscribed caches when a store's data version changes
+
+    Stores and bound-method subscribers are held weakly, so registering a
+    short-lived store or ranker doesn't keep it alive.
+    """
+
+    def __init__(self, poll_interval: float = INVALIDATION_POLL_SECONDS):
+        """
+        Initialize the bus
+
+        Args:
+            poll_interval: Minimum seconds between polls of the watched stores
+        """
+        self.poll_interval = poll_interval
+        self._stores: Dict[str, Any] = {}
+        self._versions: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[Callable[[], Optional[Subscriber]]]] = defaultdict(list)
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def watch(self, store) -> str:
+        """
+        Poll a store's data version in check()
+
+        Args:
+            store: Object with version_source and data_version()
+
+        Returns:
+            The store's source name
+        """
+        name = store.version_source
+        with self._lock:
+            current = self._stores.get(name)
+            if current is None or current() is None:
+                self._stores[name] = weakref.ref(store)
+            fresh = name not in self._versions
+        # Reading the version of a store nothing has opened yet would open it
+        # (for ChromaStore: import chromadb and create its files). The first
+        # check() after something opens it publishes its version, since caches
+        # may already have been built from it
+        if fresh and _is_open(store):
+            version = store.data_version()
+            with self._lock:
+                self._versions.setdefault(name, version)
+        return name
+
+    def subscribe(self, name: str, callback: Subscriber) -> None:
+        """
+        Call back whenever a source's data version changes
+
+        Args:
+            name: Source name (a store's version_source)
+            callback: Called with (name, new version); subscribing it again is a no-op
+        """
+        with self._lock:
+            if any(ref() == callback for ref in self._subscribers[name]):
+                return
+            self._subscribers[name].append(_weak(callback))
+
+    def version(self, name: str) -> Optional[int]:
+        """Last data version seen for a source"""
+        return self._versions.get(name)
+
+    def publish(self, store) -> bool:
+        """
+        Notify subscribers if a store's data version moved since it was last seen
+
+        Args:
+            store: Object with version_source and data_version() (others are ignored)
+
+        Returns:
+            True if subscribers were notified
+        """
+        name = getattr(store, "version_source", None)
+        if name is None or not self._subscribers.get(name):
+            return False
+        version = store.data_version()
+        with self._lock:
+            if self._versions.get(name) == version:
+                return False
+            self._versions[name] = version
+            refs = list(self._subscribers[name])
+
+        for ref in refs:
+            callback = ref()
+            if callback is None:
+                continue
+            try:
+                callback(name, version)
+            except Exception as e:
+                logger.warning(f"Invalidation subscriber for {name} failed: {e}")
+        with self._lock:
+            self._subscribers[name] = [ref for ref in self._subscribers[name] if ref() is not None]
+        return True
+
+    def check(self, force: bool = False) -> List[str]:
+        """
+        Poll every watched store (at most once per poll_interval unless forced)
+
+        Returns:
+            Names of the sources whose version changed
+        """
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return []
+        self._last_poll = now
+
+        with self._lock:
+            stores = [(name, ref()) for name, ref in self._stores.items()]
+        changed = []
+        for name, store in stores:
+            if store is None:
+                with self._lock:
+                    self._stores.pop(name, None)
+                continue
+            if not _is_open(store):
+                continue  # nothing can have cached its data yet
+            try:
+                if self.publish(store):
+                    changed.append(name)
+            except Exception as e:
+                logger.warning(f"Could not read the data version of {name}: {e}")
+        return changed
+
+
+@lru_cache(maxsize=1)
+def get_invalidation_bus() -> InvalidationBus:
+    """Process-wide invalidation bus"""
+    return InvalidationBus()
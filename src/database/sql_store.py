@@ -10,22 +10,75 @@ This module provides persistent storage for:
 
 import sqlite3
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional, Any, Iterator
 from pathlib import Path
 import logging
 
+from config.settings import EXPIRATION_ALERT_HORIZONS, EXPORT_BATCH_SIZE
+
 logger = logging.getLogger(__name__)
 
+# Tables whose changes bump the data version
+VERSIONED_TABLES = ("tenants", "leases", "lease_alerts", "financial_records")
+
+# Changes the expiration calendar is built from, which bump the lease version:
+# leases and their alerts, and tenant renames (month buckets list tenant names)
+LEASE_VERSION_EVENTS = (
+    ("leases", ("INSERT", "UPDATE", "DELETE")),
+    ("lease_alerts", ("INSERT", "UPDATE", "DELETE")),
+    ("tenants", ("UPDATE", "DELETE")),
+)
+
+# Reads shared by the list methods and their streaming export counterparts
+ACTIVE_ALERTS_SQL = """
+    SELECT a.*, l.lease_file, t.tenant_name, l.end_date
+    FROM lease_alerts a
+    JOIN leases l ON a.lease_id = l.lease_id
+    JOIN tenants t ON l.tenant_id = t.tenant_id
+    WHERE a.status = 'pending'
+    AND a.alert_date <= date('now', '+' || ? || ' days')
+    ORDER BY a.alert_date
+"""
+
+REVENUE_BY_TENANT_SQL = """
+    SELECT
+        t.tenant_name,
+        l.base_rent as monthly_rent,
+        l.base_rent * 12 as annual_rent,
+        l.square_footage,
+        CASE
+            WHEN l.square_footage > 0 THEN l.base_rent / l.square_footage
+            ELSE 0
+        END as rent_per_sqft
+    FROM leases l
+    JOIN tenants t ON l.tenant_id = t.tenant_id
+    WHERE l.status = 'active' AND l.base_rent IS NOT NULL
+    ORDER BY l.base_rent DESC
+"""
+
 
 class SQLStore:
     """Structured database for lease management and analytics."""
 
-    def __init__(self, db_path: str = "data/leases.db"):
-        """Initialize SQLite database with schema."""
+    def __init__(self, db_path: str = "data/leases.db", alert_horizons: List[int] = None):
+        """
+        Initialize SQLite database with schema.
+
+        Args:
+            db_path: SQLite database file
+            alert_horizons: Days before a lease ends that an expiration alert falls due
+                (defaults to EXPIRATION_ALERT_HORIZONS)
+        """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.alert_horizons = tuple(sorted(set(EXPIRATION_ALERT_HORIZONS if alert_horizons is None
+                                               else alert_horizons), reverse=True))
         self.conn = None
+        self._transaction_depth = 0
+        self._lease_write_depth = 0
         self._init_database()
 
     def _init_database(self):
@@ -112,16 +165,177 @@ class SQLStore:
             )
         """)
 
+        # Slow query samples with per-stage timing breakdown
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS slow_query_log (
+                log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query_text TEXT NOT NULL,
+                tenant_filter TEXT,
+                response_time_ms REAL NOT NULL,
+                breakdown TEXT,
+                trace TEXT,
+                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Expiration calendar, materialized from leases and alerts by
+        # refresh_expiration_calendar(): one row per active lease with an end
+        # date, plus month buckets for the expiration timeline
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expiration_calendar (
+                lease_id INTEGER PRIMARY KEY,
+                end_date DATE NOT NULL,
+                month TEXT NOT NULL,
+                monthly_rent REAL,
+                pending_alerts INTEGER NOT NULL DEFAULT 0,
+                next_alert_date DATE,
+                FOREIGN KEY (lease_id) REFERENCES leases(lease_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS expiration_months (
+                month TEXT PRIMARY KEY,
+                lease_count INTEGER NOT NULL,
+                revenue_at_risk REAL NOT NULL,
+                tenants TEXT NOT NULL
+            )
+        """)
+
         # Create indexes for performance
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_leases_tenant ON leases(tenant_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_leases_dates ON leases(start_date, end_date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_leases_status ON leases(status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_date ON lease_alerts(alert_date, status)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_financial_date ON financial_records(record_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_financial_lease ON financial_records(lease_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_lease ON lease_alerts(lease_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_calendar_end ON expiration_calendar(end_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_calendar_month ON expiration_calendar(month)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_slow_query_time ON slow_query_log(response_time_ms)")
+
+        # Data version, bumped by a trigger on every change to lease data. It starts
+        # at the creation time in microseconds, so a deleted and recreated database
+        # never repeats a version an earlier one handed out
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', ?)",
+                       (time.time_ns() // 1000,))
+        for table in VERSIONED_TABLES:
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE meta SET value = value + 1 WHERE key = 'data_version';
+                    END
+                """)
+
+        # Same scheme for the subset of changes the expiration calendar reads
+        cursor.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('lease_version', ?)",
+                       (time.time_ns() // 1000,))
+        for table, events in LEASE_VERSION_EVENTS:
+            for event in events:
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_lease_version
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE meta SET value = value + 1 WHERE key = 'lease_version';
+                    END
+                """)
 
         self.conn.commit()
+
+        # Databases created before the calendar existed get it built once here;
+        # afterwards writes and ExpirationScheduler keep it current
+        if self._get_meta("calendar_refreshed_at") is None:
+            self.refresh_expiration_calendar()
+
         logger.info(f"Database initialized at {self.db_path}")
 
+    def _commit(self):
+        """Commit now unless a transaction() block will commit later."""
+        if not self._transaction_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one commit; everything rolls back if the block raises.
+
+        A nested block that raises rolls back only its own writes (through a
+        savepoint), so the enclosing block can carry on without them.
+        """
+        savepoint = None
+        started = not self.conn.in_transaction
+        if self._transaction_depth and not started:
+            savepoint = f"nested_{self._transaction_depth}"
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if savepoint:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
+            elif started or not self._transaction_depth:
+                self.conn.rollback()
+            raise
+        self._transaction_depth -= 1
+        if savepoint:
+            self.conn.execute(f"RELEASE {savepoint}")
+        if not self._transaction_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def _lease_write(self):
+        """
+        Run a lease write and its calendar refresh as one transaction.
+
+        The write refreshes its own lease, so a calendar that was current
+        before it is still current after it: calendar_version follows the
+        write's lease version, and the calendar is only rebuilt after lease
+        writes made outside this store.
+        """
+        with self.transaction():
+            self._lease_write_depth += 1
+            try:
+                outermost = self._lease_write_depth == 1
+                if outermost:
+                    if not self.conn.in_transaction:
+                        # Hold the write lock from here, so no other writer lands between the two reads
+                        self.conn.execute("BEGIN IMMEDIATE")
+                    was_current = self._get_meta("calendar_version") == self.lease_version()
+                yield
+                if outermost and was_current:
+                    self._set_meta("calendar_version", self.lease_version())
+            finally:
+                self._lease_write_depth -= 1
+
+    @property
+    def version_source(self) -> str:
+        """Name of this database on the invalidation bus."""
+        return f"sql:{self.db_path.resolve()}"
+
+    def data_version(self) -> int:
+        """Counter that increases on every change to tenants, leases, alerts or financial records."""
+        return self._get_meta("data_version")
+
+    def lease_version(self) -> int:
+        """Counter that increases on every change the expiration calendar is built from."""
+        return self._get_meta("lease_version")
+
+    def _get_meta(self, key: str) -> Optional[int]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: int):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
     # ==================== Tenant Operations ====================
 
     def add_tenant(self, tenant_name: str, business_type: str = None,
@@ -133,7 +347,7 @@ class SQLStore:
                 INSERT INTO tenants (tenant_name, business_type, contact_email, contact_phone)
                 VALUES (?, ?, ?, ?)
             """, (tenant_name, business_type, contact_email, contact_phone))
-            self.conn.commit()
+            self._commit()
             return cursor.lastrowid
         except sqlite3.IntegrityError:
             # Tenant already exists, return existing ID
@@ -157,38 +371,55 @@ class SQLStore:
 
     def add_lease(self, tenant_name: str, lease_file: str, **kwargs) -> int:
         """Add a new lease to the database."""
-        tenant_id = self.add_tenant(tenant_name)
+        with self._lease_write():
+            tenant_id = self.add_tenant(tenant_name)
 
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO leases (
-                tenant_id, lease_file, start_date, end_date, term_months,
-                square_footage, base_rent, rent_frequency, security_deposit,
-                renewal_options, special_provisions, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            tenant_id,
-            lease_file,
-            kwargs.get('start_date'),
-            kwargs.get('end_date'),
-            kwargs.get('term_months'),
-            kwargs.get('square_footage'),
-            kwargs.get('base_rent'),
-            kwargs.get('rent_frequency', 'monthly'),
-            kwargs.get('security_deposit'),
-            kwargs.get('renewal_options'),
-            kwargs.get('special_provisions'),
-            kwargs.get('status', 'active')
-        ))
-        self.conn.commit()
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                INSERT INTO leases (
+                    tenant_id, lease_file, start_date, end_date, term_months,
+                    square_footage, base_rent, rent_frequency, security_deposit,
+                    renewal_options, special_provisions, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                tenant_id,
+                lease_file,
+                kwargs.get('start_date'),
+                kwargs.get('end_date'),
+                kwargs.get('term_months'),
+                kwargs.get('square_footage'),
+                kwargs.get('base_rent'),
+                kwargs.get('rent_frequency', 'monthly'),
+                kwargs.get('security_deposit'),
+                kwargs.get('renewal_options'),
+                kwargs.get('special_provisions'),
+                kwargs.get('status', 'active')
+            ))
+            lease_id = cursor.lastrowid
+
+            # Expiration alerts and the calendar row follow the end date
+            self.refresh_expiration_calendar([lease_id])
 
-        lease_id = cursor.lastrowid
+            return lease_id
 
-        # Create expiration alert if end_date is provided
-        if kwargs.get('end_date'):
-            self._create_expiration_alerts(lease_id, kwargs['end_date'])
+    def upsert_lease(self, tenant_name: str, lease_file: str, **kwargs) -> tuple:
+        """
+        Insert a lease, or update the one already recorded for lease_file.
 
-        return lease_id
+        Returns:
+            (lease_id, created) where created is False for an update
+        """
+        with self._lease_write():
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT lease_id FROM leases WHERE lease_file = ? ORDER BY lease_id LIMIT 1", (lease_file,))
+            row = cursor.fetchone()
+            if row is None:
+                return self.add_lease(tenant_name, lease_file, **kwargs), True
+
+            lease_id = row[0]
+            kwargs["tenant_id"] = self.add_tenant(tenant_name)
+            self.update_lease(lease_id, **kwargs)
+            return lease_id, False
 
     def get_lease(self, lease_id: int) -> Optional[Dict]:
         """Get lease by ID with tenant information."""
@@ -236,80 +467,271 @@ class SQLStore:
 
     def update_lease(self, lease_id: int, **kwargs) -> bool:
         """Update lease information."""
-        set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
-        set_clause += ", updated_at = CURRENT_TIMESTAMP"
-        values = list(kwargs.values()) + [lease_id]
+        with self._lease_write():
+            set_clause = ", ".join([f"{key} = ?" for key in kwargs.keys()])
+            set_clause += ", updated_at = CURRENT_TIMESTAMP"
+            values = list(kwargs.values()) + [lease_id]
+
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                UPDATE leases
+                SET {set_clause}
+                WHERE lease_id = ?
+            """, values)
+            updated = cursor.rowcount > 0
+            if updated:
+                self.refresh_expiration_calendar([lease_id])
+            return updated
 
+    # ==================== Expiration Tracking ====================
+
+    def _lease_filter(self, column: str, lease_ids: Optional[List[int]]) -> tuple:
+        """(" AND column IN (...)", params) limiting a query to some leases, or ("", []) for all."""
+        if lease_ids is None:
+            return "", []
+        return f" AND {column} IN ({', '.join('?' * len(lease_ids))})", list(lease_ids)
+
+    def _sync_expiration_alerts(self, lease_ids: Optional[List[int]] = None):
+        """
+        Make expiration alerts match each lease's end date and the alert horizons.
+
+        Pending alerts for a horizon no longer configured, or dated from an
+        earlier end date, are deleted and missing ones are added. Dismissed
+        alerts are left alone and not raised again.
+        """
         cursor = self.conn.cursor()
+        clause, params = self._lease_filter("lease_id", lease_ids)
+
         cursor.execute(f"""
-            UPDATE leases
-            SET {set_clause}
-            WHERE lease_id = ?
-        """, values)
-        self.conn.commit()
-        return cursor.rowcount > 0
+            SELECT lease_id, end_date FROM leases
+            WHERE end_date IS NOT NULL AND date(end_date) IS NOT end_date{clause}
+        """, params)
+        for lease_id, end_date in cursor.fetchall():
+            logger.warning(f"Lease {lease_id} has an unreadable end date: {end_date!r}")
 
-    # ==================== Expiration Tracking ====================
+        wanted = {}
+        if self.alert_horizons:
+            horizons = ", ".join(f"({int(days)})" for days in self.alert_horizons)
+            cursor.execute(f"""
+                WITH horizons(days) AS (VALUES {horizons})
+                SELECT l.lease_id, h.days, date(l.end_date, '-' || h.days || ' days')
+                FROM leases l CROSS JOIN horizons h
+                WHERE date(l.end_date) = l.end_date{clause}
+            """, params)
+            wanted = {(lease_id, days): alert_date for lease_id, days, alert_date in cursor.fetchall()}
+
+        stale, present = [], set()
+        cursor.execute(f"""
+            SELECT alert_id, lease_id, days_notice, alert_date, status
+            FROM lease_alerts
+            WHERE alert_type = 'expiration'{clause}
+        """, params)
+        for alert_id, lease_id, days, alert_date, status in cursor.fetchall():
+            if wanted.get((lease_id, days)) == alert_date:
+                present.add((lease_id, days))
+            elif status == 'pending':
+                stale.append((alert_id,))
 
-    def _create_expiration_alerts(self, lease_id: int, end_date: str):
-        """Create alerts for lease expiration at 90, 60, and 30 days."""
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+        cursor.executemany("DELETE FROM lease_alerts WHERE alert_id = ?", stale)
+        cursor.executemany("""
+            INSERT INTO lease_alerts (lease_id, alert_type, alert_date, days_notice, message)
+            VALUES (?, 'expiration', ?, ?, ?)
+        """, [
+            (lease_id, alert_date, days, f"Lease expires in {days} days")
+            for (lease_id, days), alert_date in wanted.items() if (lease_id, days) not in present
+        ])
 
-        alert_periods = [90, 60, 30]
+    def _rebuild_expiration_months(self, months: Optional[List[str]] = None):
+        """Recompute the timeline's month buckets (all of them, or just the given months)."""
         cursor = self.conn.cursor()
+        where, params = "", []
+        if months is not None:
+            where, params = f"WHERE month IN ({', '.join('?' * len(months))})", list(months)
 
-        for days in alert_periods:
-            alert_date = end_dt - timedelta(days=days)
-            cursor.execute("""
-                INSERT INTO lease_alerts (lease_id, alert_type, alert_date, days_notice, message)
-                VALUES (?, 'expiration', ?, ?, ?)
-            """, (
-                lease_id,
-                alert_date.strftime("%Y-%m-%d"),
-                days,
-                f"Lease expires in {days} days"
-            ))
-        self.conn.commit()
+        buckets = {}
+        cursor.execute(f"""
+            SELECT c.month, c.monthly_rent, t.tenant_name
+            FROM (SELECT * FROM expiration_calendar {where}) c
+            JOIN leases l ON c.lease_id = l.lease_id
+            JOIN tenants t ON l.tenant_id = t.tenant_id
+            ORDER BY c.end_date, c.lease_id
+        """, params)
+        for month, rent, tenant_name in cursor.fetchall():
+            bucket = buckets.setdefault(month, [0, 0.0, []])
+            bucket[0] += 1
+            bucket[1] += rent or 0
+            bucket[2].append(tenant_name)
+
+        cursor.execute(f"DELETE FROM expiration_months {where}", params)
+        cursor.executemany(
+            "INSERT INTO expiration_months (month, lease_count, revenue_at_risk, tenants) VALUES (?, ?, ?, ?)",
+            [(month, count, revenue, json.dumps(tenants)) for month, (count, revenue, tenants) in buckets.items()]
+        )
+
+    def refresh_expiration_calendar(self, lease_ids: Optional[List[int]] = None,
+                                    as_of: Optional[datetime] = None) -> int:
+        """
+        Materialize the expiration calendar and sync expiration alerts.
+
+        Lease writes refresh their own lease; ExpirationScheduler refreshes
+        everything nightly and after writes made outside this store.
+
+        Args:
+            lease_ids: Only refresh these leases (None = every lease)
+            as_of: When a full refresh counts as having run (defaults to now)
+
+        Returns:
+            Calendar rows written
+        """
+        with self.transaction():
+            cursor = self.conn.cursor()
+            clause, params = self._lease_filter("lease_id", lease_ids)
+            joined_clause, _ = self._lease_filter("l.lease_id", lease_ids)
+            self._sync_expiration_alerts(lease_ids)
+
+            cursor.execute(f"SELECT DISTINCT month FROM expiration_calendar WHERE 1 = 1{clause}", params)
+            months = {row[0] for row in cursor.fetchall()}
+            cursor.execute(f"DELETE FROM expiration_calendar WHERE 1 = 1{clause}", params)
+
+            cursor.execute(f"""
+                INSERT INTO expiration_calendar
+                    (lease_id, end_date, month, monthly_rent, pending_alerts, next_alert_date)
+                SELECT l.lease_id, l.end_date, strftime('%Y-%m', l.end_date), l.base_rent,
+                       COUNT(a.alert_id), MIN(a.alert_date)
+                FROM leases l
+                LEFT JOIN lease_alerts a ON a.lease_id = l.lease_id AND a.status = 'pending'
+                WHERE l.status = 'active' AND date(l.end_date) = l.end_date{joined_clause}
+                GROUP BY l.lease_id
+            """, params)
+            written = cursor.rowcount
+
+            if lease_ids is None:
+                self._rebuild_expiration_months()
+                self._set_meta("calendar_refreshed_at", int((as_of or datetime.now()).timestamp()))
+                self._set_meta("calendar_version", self.lease_version())
+            else:
+                cursor.execute(f"SELECT DISTINCT month FROM expiration_calendar WHERE 1 = 1{clause}", params)
+                months.update(row[0] for row in cursor.fetchall())
+                self._rebuild_expiration_months(sorted(months))
+        return written
+
+    def expiration_calendar_status(self) -> Dict[str, Any]:
+        """
+        When the calendar was last fully refreshed.
+
+        Returns:
+            refreshed_at (datetime or None) and lease_version (the store's
+            lease version the calendar reflects: set by that refresh and
+            carried forward by the lease writes made since, or None)
+        """
+        refreshed_at = self._get_meta("calendar_refreshed_at")
+        return {
+            "refreshed_at": datetime.fromtimestamp(refreshed_at) if refreshed_at is not None else None,
+            "lease_version": self._get_meta("calendar_version"),
+        }
+
+    def expiration_calendar_is_current(self, since: datetime) -> bool:
+        """
+        Whether the calendar was fully refreshed at or after `since` and no
+        lease write made outside this store has landed since.
+        """
+        status = self.expiration_calendar_status()
+        return (status["refreshed_at"] is not None and status["refreshed_at"] >= since
+                and status["lease_version"] == self.lease_version())
+
+    def _ensure_expiration_calendar(self):
+        """
+        Rebuild the calendar before a read if no full refresh has run today
+        or its leases changed behind this store.
+
+        Processes without an ExpirationScheduler (the Streamlit app, scripts)
+        still see the daily refresh and outside writes this way. If the
+        database is busy the read is served from the calendar as it stands.
+        """
+        if self.expiration_calendar_is_current(datetime.combine(date.today(), datetime.min.time())):
+            return
+        try:
+            self.refresh_expiration_calendar()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Expiration calendar refresh skipped: {e}")
+
+    def get_expiration_months(self) -> List[Dict]:
+        """Month buckets of the expiration calendar: lease count, revenue at risk and tenants."""
+        self._ensure_expiration_calendar()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT month, lease_count, revenue_at_risk, tenants
+            FROM expiration_months
+            ORDER BY month
+        """)
+        return [
+            {**dict(row), "tenants": json.loads(row["tenants"])}
+            for row in cursor.fetchall()
+        ]
+
+    def _expiring_query(self, days_ahead: int) -> tuple:
+        """
+        Calendar lookup of active leases ending in the next N days.
+
+        Date-relative columns are worked out at read time, so the answers stay
+        right between nightly refreshes:
+        - days_until_expiration: days from today to end_date
+        - alert_horizon: tightest alert horizon the lease is inside
+        - alert_state: 'due' (a pending alert date has arrived), 'scheduled' or 'clear'
+
+        Returns:
+            (query, params)
+        """
+        today = date.today()
+        horizon = "NULL"
+        if self.alert_horizons:
+            cases = " ".join(f"WHEN e.days_until_expiration <= {int(days)} THEN {int(days)}"
+                             for days in sorted(self.alert_horizons))
+            horizon = f"CASE {cases} END"
+        query = f"""
+            SELECT e.*, {horizon} AS alert_horizon
+            FROM (
+                SELECT l.*, t.tenant_name,
+                       julianday(c.end_date) - julianday(?) AS days_until_expiration,
+                       c.next_alert_date,
+                       CASE WHEN c.next_alert_date IS NULL THEN 'clear'
+                            WHEN c.next_alert_date <= ? THEN 'due'
+                            ELSE 'scheduled' END AS alert_state
+                FROM expiration_calendar c
+                JOIN leases l ON c.lease_id = l.lease_id
+                JOIN tenants t ON l.tenant_id = t.tenant_id
+                WHERE c.end_date BETWEEN ? AND ?
+                ORDER BY c.end_date, c.lease_id
+            ) e
+        """
+        start = today.isoformat()
+        return query, (start, start, start, (today + timedelta(days=days_ahead)).isoformat())
 
     def get_active_alerts(self, days_ahead: int = 0) -> List[Dict]:
         """Get active alerts for the next N days."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT a.*, l.lease_file, t.tenant_name, l.end_date
-            FROM lease_alerts a
-            JOIN leases l ON a.lease_id = l.lease_id
-            JOIN tenants t ON l.tenant_id = t.tenant_id
-            WHERE a.status = 'pending'
-            AND a.alert_date <= date('now', '+' || ? || ' days')
-            ORDER BY a.alert_date
-        """, (days_ahead,))
+        cursor.execute(ACTIVE_ALERTS_SQL, (days_ahead,))
         return [dict(row) for row in cursor.fetchall()]
 
     def get_expiring_leases(self, days_ahead: int = 90) -> List[Dict]:
-        """Get leases expiring within the next N days."""
+        """Get leases expiring within the next N days (an indexed expiration calendar lookup)."""
+        self._ensure_expiration_calendar()
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT l.*, t.tenant_name,
-                   julianday(l.end_date) - julianday('now') as days_until_expiration
-            FROM leases l
-            JOIN tenants t ON l.tenant_id = t.tenant_id
-            WHERE l.status = 'active'
-            AND l.end_date IS NOT NULL
-            AND julianday(l.end_date) - julianday('now') <= ?
-            AND julianday(l.end_date) - julianday('now') >= 0
-            ORDER BY l.end_date
-        """, (days_ahead,))
+        cursor.execute(*self._expiring_query(days_ahead))
         return [dict(row) for row in cursor.fetchall()]
 
     def dismiss_alert(self, alert_id: int):
         """Dismiss an alert."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE lease_alerts
-            SET status = 'dismissed', dismissed_at = CURRENT_TIMESTAMP
-            WHERE alert_id = ?
-        """, (alert_id,))
-        self.conn.commit()
+        with self._lease_write():
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                UPDATE lease_alerts
+                SET status = 'dismissed', dismissed_at = CURRENT_TIMESTAMP
+                WHERE alert_id = ?
+            """, (alert_id,))
+            row = cursor.execute("SELECT lease_id FROM lease_alerts WHERE alert_id = ?", (alert_id,)).fetchone()
+            if row:
+                self.refresh_expiration_calendar([row[0]])
 
     # ==================== Financial Analytics ====================
 
@@ -321,7 +743,7 @@ class SQLStore:
             INSERT INTO financial_records (lease_id, record_date, record_type, amount, description)
             VALUES (?, ?, ?, ?, ?)
         """, (lease_id, record_date, record_type, amount, description))
-        self.conn.commit()
+        self._commit()
         return cursor.lastrowid
 
     def get_financial_summary(self) -> Dict[str, Any]:
@@ -363,21 +785,7 @@ class SQLStore:
     def get_revenue_by_tenant(self) -> List[Dict]:
         """Get revenue breakdown by tenant."""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT
-                t.tenant_name,
-                l.base_rent as monthly_rent,
-                l.base_rent * 12 as annual_rent,
-                l.square_footage,
-                CASE
-                    WHEN l.square_footage > 0 THEN l.base_rent / l.square_footage
-                    ELSE 0
-                END as rent_per_sqft
-            FROM leases l
-            JOIN tenants t ON l.tenant_id = t.tenant_id
-            WHERE l.status = 'active' AND l.base_rent IS NOT NULL
-            ORDER BY l.base_rent DESC
-        """)
+        cursor.execute(REVENUE_BY_TENANT_SQL)
         return [dict(row) for row in cursor.fetchall()]
 
     def get_occupancy_rate(self, total_property_sqft: float) -> Dict[str, float]:
@@ -407,7 +815,7 @@ class SQLStore:
             INSERT INTO query_log (query_text, tenant_filter, result_count, response_time_ms)
             VALUES (?, ?, ?, ?)
         """, (query_text, tenant_filter, result_count, response_time_ms))
-        self.conn.commit()
+        self._commit()
 
     def get_popular_queries(self, limit: int = 10) -> List[Dict]:
         """Get most common queries."""
@@ -422,6 +830,189 @@ class SQLStore:
         """, (limit,))
         return [dict(row) for row in cursor.fetchall()]
 
+    def log_slow_query(self, query_text: str, response_time_ms: float,
+                       breakdown: Dict[str, float] = None, trace: Dict[str, Any] = None,
+                       tenant_filter: str = None):
+        """Store a slow query with its per-stage timing breakdown and span tree."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO slow_query_log (query_text, tenant_filter, response_time_ms, breakdown, trace)
+            VALUES (?, ?, ?, ?, ?)
+        """, (query_text, tenant_filter, response_time_ms,
+              json.dumps(breakdown) if breakdown is not None else None,
+              json.dumps(trace) if trace is not None else None))
+        self._commit()
+
+    def get_slow_queries(self, limit: int = 20) -> List[Dict]:
+        """Get the slowest sampled queries with their breakdowns."""
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT * FROM slow_query_log
+            ORDER BY response_time_ms DESC
+            LIMIT ?
+        """, (limit,))
+        rows = []
+        for row in cursor.fetchall():
+            entry = dict(row)
+            for key in ('breakdown', 'trace'):
+                if entry[key]:
+                    entry[key] = json.loads(entry[key])
+            rows.append(entry)
+        return rows
+
+    # ==================== Paged Reads ====================
+
+    def _table_columns(self, table: str, alias: str) -> Dict[str, str]:
+        """Output name -> qualified column for every column of a table."""
+        return {row[1]: f"{alias}.{row[1]}" for row in self.conn.execute(f"PRAGMA table_info({table})")}
+
+    def _projection(self, columns: Dict[str, str], fields: List[str] = None) -> List[str]:
+        """SELECT list for the requested fields (all columns by default)."""
+        selected = fields or list(columns)
+        unknown = [field for field in selected if field not in columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return [f"{columns[field]} AS {field}" for field in selected]
+
+    def _page(self, columns: Dict[str, str], from_clause: str, sort: str, key: str,
+              where: List[str] = None, params: List[Any] = None, after: tuple = None,
+              limit: int = 100, fields: List[str] = None) -> tuple:
+        """
+        Read one keyset page of a query.
+
+        Rows are ordered by (sort, key); after is the (sort, key) pair of the
+        last row of the previous page, so later pages cost the same as the
+        first instead of scanning past an OFFSET.
+
+        Returns:
+            (rows, after value for the next page or None on the last page)
+        """
+        projection = self._projection(columns, fields)
+        conditions = list(where or [])
+        values = list(params or [])
+        if after is not None:
+            conditions.append(f"({sort}, {key}) > (?, ?)")
+            values.extend(after)
+
+        query = (f"SELECT {', '.join(projection)}, "
+                 f"{sort} AS _sort, {key} AS _key FROM {from_clause}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {sort}, {key} LIMIT ?"
+        values.append(limit + 1)
+
+        rows = [dict(row) for row in self.conn.execute(query, values).fetchall()]
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = (rows[-1]["_sort"], rows[-1]["_key"])
+        for row in rows:
+            del row["_sort"], row["_key"]
+        return rows, next_after
+
+    def get_leases_page(self, status: str = None, after: tuple = None, limit: int = 100,
+                        fields: List[str] = None) -> tuple:
+        """Page through leases (with tenant_name) in end-date order."""
+        columns = {**self._table_columns("leases", "l"), "tenant_name": "t.tenant_name"}
+        return self._page(
+            columns, "leases l JOIN tenants t ON l.tenant_id = t.tenant_id",
+            sort="COALESCE(l.end_date, '')", key="l.lease_id",
+            where=["l.status = ?"] if status else None, params=[status] if status else None,
+            after=after, limit=limit, fields=fields
+        )
+
+    def get_tenants_page(self, after: tuple = None, limit: int = 100, fields: List[str] = None) -> tuple:
+        """Page through tenants in name order."""
+        return self._page(
+            self._table_columns("tenants", "t"), "tenants t",
+            sort="t.tenant_name", key="t.tenant_id",
+            after=after, limit=limit, fields=fields
+        )
+
+    def get_alerts_page(self, days_ahead: int = 0, after: tuple = None, limit: int = 100,
+                        fields: List[str] = None) -> tuple:
+        """Page through pending alerts due in the next N days, in alert-date order."""
+        columns = {
+            **self._table_columns("lease_alerts", "a"),
+            "lease_file": "l.lease_file", "tenant_name": "t.tenant_name", "end_date": "l.end_date"
+        }
+        return self._page(
+            columns,
+            "lease_alerts a JOIN leases l ON a.lease_id = l.lease_id JOIN tenants t ON l.tenant_id = t.tenant_id",
+            sort="a.alert_date", key="a.alert_id",
+            where=["a.status = 'pending'", "a.alert_date <= date('now', '+' || ? || ' days')"],
+            params=[days_ahead], after=after, limit=limit, fields=fields
+        )
+
+    # ==================== Streaming Reads ====================
+
+    def stream_query(self, query: str, params: tuple = (), batch_size: int = EXPORT_BATCH_SIZE) -> tuple:
+        """
+        Run a read for an export and fetch its rows lazily.
+
+        The query runs on a connection of its own, so a long export neither
+        ties up this store's connection nor minds being iterated from a
+        worker thread (as StreamingResponse does). Rows come off the cursor
+        batch_size at a time, keeping memory flat however large the table.
+
+        Returns:
+            (column names, iterator over lists of row tuples); the connection
+            closes once the iterator is exhausted or closed
+        """
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        try:
+            cursor = conn.execute(query, params)
+        except Exception:
+            conn.close()
+            raise
+        columns = [description[0] for description in cursor.description]
+
+        def batches() -> Iterator[List[tuple]]:
+            try:
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        return
+                    yield batch
+            finally:
+                conn.close()
+
+        return columns, batches()
+
+    def stream_leases(self, status: str = None, fields: List[str] = None,
+                      batch_size: int = EXPORT_BATCH_SIZE) -> tuple:
+        """Stream leases (with tenant_name) in end-date order; see stream_query."""
+        columns = {**self._table_columns("leases", "l"), "tenant_name": "t.tenant_name"}
+        query = (f"SELECT {', '.join(self._projection(columns, fields))} "
+                 f"FROM leases l JOIN tenants t ON l.tenant_id = t.tenant_id")
+        if status:
+            query += " WHERE l.status = ?"
+        query += " ORDER BY l.end_date, l.lease_id"
+        return self.stream_query(query, (status,) if status else (), batch_size)
+
+    def stream_active_alerts(self, days_ahead: int = 0, batch_size: int = EXPORT_BATCH_SIZE) -> tuple:
+        """Stream the rows of get_active_alerts; see stream_query."""
+        return self.stream_query(ACTIVE_ALERTS_SQL, (days_ahead,), batch_size)
+
+    def stream_expiring_leases(self, days_ahead: int = 90, batch_size: int = EXPORT_BATCH_SIZE) -> tuple:
+        """Stream the rows of get_expiring_leases; see stream_query."""
+        query, params = self._expiring_query(days_ahead)
+        return self.stream_query(query, params, batch_size)
+
+    def stream_revenue_by_tenant(self, batch_size: int = EXPORT_BATCH_SIZE) -> tuple:
+        """Stream the rows of get_revenue_by_tenant; see stream_query."""
+        return self.stream_query(REVENUE_BY_TENANT_SQL, (), batch_size)
+
+    def stream_financial_records(self, batch_size: int = EXPORT_BATCH_SIZE) -> tuple:
+        """Stream every financial record (with tenant_name and lease_file) in date order; see stream_query."""
+        return self.stream_query("""
+            SELECT f.*, t.tenant_name, l.lease_file
+            FROM financial_records f
+            JOIN leases l ON f.lease_id = l.lease_id
+            JOIN tenants t ON l.tenant_id = t.tenant_id
+            ORDER BY f.record_date, f.record_id
+        """, (), batch_size)
+
     # ==================== Utility Methods ====================
 
     def execute_custom_query(self, query: str, params: tuple = None) -> List[Dict]:
@@ -0,0 +1,607 @@
+"""
+In-process vector index with the same interface as ChromaStore
+Embeddings live in a memory-mapped matrix (float32 or int8 with per-row
+scales) and metadata in dictionary-encoded columns, so several API worker
+processes can share one read-only index through the OS page cache
+"""
+
+import json
+import os
+import pickle
+import re
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import (
+    VECTOR_BACKEND, VECTOR_INDEX_DIR, VECTOR_INDEX_QUANTIZE, VECTOR_INDEX_IVF_MIN_VECTORS, VECTOR_INDEX_NPROBE
+)
+from ..chunking.chunker import Chunk
+from ..observability.tracing import span
+from .chroma_store import flatten_chunk_metadata
+from .facet_index import FACET_FIELDS, file_lock
+
+if TYPE_CHECKING:
+    from ..vectorization.embedder import Embedder
+
+
+MANIFEST_NAME = "manifest.json"
+
+# Held by writers from reading the current generation until publishing the next
+WRITE_LOCK_NAME = "write.lock"
+
+# Index files are named g<generation>.<part>
+GENERATION_FILE = re.compile(r"^g(\d+)\.")
+
+# Times refresh() rereads the manifest when a writer deletes files under it
+REFRESH_ATTEMPTS = 3
+
+# Bump whenever the on-disk layout changes
+INDEX_FORMAT_VERSION = 1
+
+# Rows with no value in a metadata column
+MISSING = -1
+
+# Lloyd iterations when training IVF centroids
+KMEANS_ITERATIONS = 10
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _quantize(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization; returns (codes, scales)"""
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def _train_ivf(vectors: np.ndarray, nlist: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Spherical k-means over unit vectors
+
+    Returns:
+        Tuple of (centroids, list_offsets, list_rows): rows of list i are
+        list_rows[list_offsets[i]:list_offsets[i + 1]]
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for i in range(nlist):
+            members = vectors[assignment == i]
+            if len(members):
+                centroids[i] = members.sum(axis=0)
+        centroids = _normalize(centroids)
+    assignment = np.argmax(vectors @ centroids.T, axis=1)
+    list_rows = np.argsort(assignment, kind="stable").astype(np.int32)
+    list_offsets = np.searchsorted(assignment[list_rows], np.arange(nlist + 1)).astype(np.int64)
+    return centroids.astype(np.float32), list_offsets, list_rows
+
+
+def _encode_columns(metadatas: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Dictionary-encode metadata into {key: {"values": [...], "codes": int32 array}}"""
+    keys = sorted({key for metadata in metadatas for key in metadata})
+    columns = {}
+    for key in keys:
+        lookup: Dict[Any, int] = {}
+        values: List[Any] = []
+        codes = np.full(len(metadatas), MISSING, dtype=np.int32)
+        for row, metadata in enumerate(metadatas):
+            if key not in metadata:
+                continue
+            value = metadata[key]
+            # bool == int in a dict key, so keep the type in the lookup key
+            lookup_key = (type(value).__name__, value)
+            if lookup_key not in lookup:
+                lookup[lookup_key] = len(values)
+                values.append(value)
+            codes[row] = lookup[lookup_key]
+        columns[key] = {"values": values, "codes": codes}
+    return columns
+
+
+class VectorIndex:
+    """
+    Read-optimized local vector store for lease document chunks
+
+    Drop-in for ChromaStore in HybridRanker and QueryEngine. Writes rewrite
+    the index files under a new generation and swap the manifest last, so
+    readers keep a consistent snapshot until they call refresh(). The
+    previous generation's files are kept until the write after. Writers in
+    different processes take turns through a lock file and always build on
+    the newest generation.
+    """
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        embedder: Optional["Embedder"] = None,
+        quantize: bool = VECTOR_INDEX_QUANTIZE,
+        ivf_min_vectors: int = VECTOR_INDEX_IVF_MIN_VECTORS,
+        nprobe: int = VECTOR_INDEX_NPROBE
+    ):
+        """
+        Open (or create) an index directory
+
+        Args:
+            index_dir: Directory holding the index files
+            embedder: Embedder for queries and new chunks (creates a cached OpenAI Embedder on first use if None)
+            quantize: Store vectors as int8 with per-row scales on the next write
+            ivf_min_vectors: Train an IVF coarse index at or above this many vectors
+            nprobe: IVF lists scanned per unfiltered query
+        """
+        self.index_dir = Path(index_dir or VECTOR_INDEX_DIR)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self._embedder = embedder
+        self.quantize = quantize
+        self.ivf_min_vectors = ivf_min_vectors
+        self.nprobe = nprobe
+        self._generation = None
+        self._load_empty()
+        self.refresh()
+
+    @property
+    def embedder(self) -> "Embedder":
+        """Embedder for queries and new chunks (a cached OpenAI Embedder unless one was given)"""
+        if self._embedder is None:
+            from ..vectorization.embedder import Embedder
+            from ..vectorization.embedding_cache import get_embedding_cache
+            self._embedder = Embedder(cache=get_embedding_cache())
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, embedder: "Embedder") -> None:
+        self._embedder = embedder
+
+    # ==================== Loading ====================
+
+    def _load_empty(self) -> None:
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._columns: Dict[str, Dict[str, Any]] = {}
+        self._row_of: Dict[str, int] = {}
+        self._tenant_rows: Dict[str, np.ndarray] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+        self._list_rows: Optional[np.ndarray] = None
+
+    def _read_manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.index_dir / MANIFEST_NAME, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("format") != INDEX_FORMAT_VERSION:
+            return None
+        return manifest
+
+    def refresh(self) -> bool:
+        """
+        Reopen the index if a writer published a newer generation
+
+        Returns:
+            True if a new generation was loaded
+        """
+        for _ in range(REFRESH_ATTEMPTS):
+            manifest = self._read_manifest()
+            if manifest is None or manifest["generation"] == self._generation:
+                return False
+            try:
+                self._load(manifest)
+                return True
+            except FileNotFoundError:
+                # Writers published twice since that manifest was read; read the newer one
+                continue
+        return False
+
+    def _load(self, manifest: Dict[str, Any]) -> None:
+        """Open a generation's files, replacing the current snapshot only once all are read"""
+        prefix = self.index_dir / f"g{manifest['generation']}"
+        with open(f"{prefix}.meta.pkl", "rb") as f:
+            meta = pickle.load(f)
+
+        vectors = scales = centroids = list_offsets = list_rows = None
+        count, dimension = manifest["count"], manifest["dimension"]
+        if count:
+            dtype = np.int8 if manifest["quantized"] else np.float32
+            vectors = np.memmap(f"{prefix}.vectors", dtype=dtype, mode="r", shape=(count, dimension))
+            if manifest["quantized"]:
+                scales = np.load(f"{prefix}.scales.npy")
+            if manifest["nlist"]:
+                centroids = np.load(f"{prefix}.centroids.npy")
+                list_offsets = np.load(f"{prefix}.list_offsets.npy")
+                list_rows = np.load(f"{prefix}.list_rows.npy")
+
+        self._load_empty()  # drops this instance's maps of the previous generation
+        self._ids = meta["ids"]
+        self._documents = meta["documents"]
+        self._columns = meta["columns"]
+        self._row_of = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+        self._generation = manifest["generation"]
+        self._vectors, self._scales = vectors, scales
+        self._centroids, self._list_offsets, self._list_rows = centroids, list_offsets, list_rows
+
+        # Per-tenant row lists for filtered search
+        tenant_column = self._columns.get("tenant_name")
+        if tenant_column is not None:
+            codes = tenant_column["codes"]
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            bounds = np.searchsorted(codes[order], np.arange(len(tenant_column["values"]) + 1))
+            for code, tenant in enumerate(tenant_column["values"]):
+                self._tenant_rows[tenant] = order[bounds[code]:bounds[code + 1]]
+
+    def _remove_old_generations(self, generation: int) -> None:
+        """
+        Delete files older than the generation before `generation`
+
+        The previous generation stays until the next write, so a reader that
+        has read its manifest can still open it. Files another process still
+        maps can't be deleted on Windows; they are retried on the next write.
+        """
+        for path in self.index_dir.glob("g*.*"):
+            match = GENERATION_FILE.match(path.name)
+            if match and int(match.group(1)) < generation - 1:
+                try:
+                    path.unlink(missing_ok=True)
+                except PermissionError:
+                    pass
+
+    # ==================== Writing ====================
+
+    def _dense_vectors(self) -> np.ndarray:
+        """Current vectors as a float32 array (dequantized if needed)"""
+        if self._vectors is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        if self._scales is not None:
+            return self._vectors.astype(np.float32) * self._scales[:, None]
+        return np.asarray(self._vectors, dtype=np.float32)
+
+    def _metadatas(self, rows) -> List[Dict[str, Any]]:
+        return [self._row_metadata(row) for row in rows]
+
+    def _write(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+               vectors: np.ndarray) -> None:
+        """Write a complete new generation and publish it through the manifest (caller holds the write lock)"""
+        generation = (self._read_manifest() or {}).get("generation", 0) + 1
+        prefix = self.index_dir / f"g{generation}"
+        count = len(ids)
+        dimension = vectors.shape[1] if count else 0
+
+        nlist = 0
+        if count:
+            vectors = _normalize(vectors.astype(np.float32))
+            if count >= self.ivf_min_vectors:
+                nlist = max(1, int(np.sqrt(count)))
+                centroids, list_offsets, list_rows = _train_ivf(vectors, nlist)
+                np.save(f"{prefix}.centroids.npy", centroids)
+                np.save(f"{prefix}.list_offsets.npy", list_offsets)
+                np.save(f"{prefix}.list_rows.npy", list_rows)
+            if self.quantize:
+                codes, scales = _quantize(vectors)
+                codes.tofile(f"{prefix}.vectors")
+                np.save(f"{prefix}.scales.npy", scales)
+            else:
+                vectors.tofile(f"{prefix}.vectors")
+
+        with open(f"{prefix}.meta.pkl", "wb") as f:
+            pickle.dump({"ids": ids, "documents": documents, "columns": _encode_columns(metadatas)},
+                        f, protocol=5)
+
+        manifest = {
+            "format": INDEX_FORMAT_VERSION,
+            "generation": generation,
+            "count": count,
+            "dimension": dimension,
+            "quantized": bool(self.quantize and count),
+            "nlist": nlist,
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.index_dir / MANIFEST_NAME)
+
+        # Switch this instance to the new files before deleting any old ones
+        self.refresh()
+        self._remove_old_generations(generation)
+
+    def add_chunks(
+        self,
+        chunks: List[Chunk],
+        show_progress: bool = True,
+        embeddings: Optional[List[List[float]]] = None
+    ) -> int:
+        """
+        Add chunks to the index
+
+        Args:
+            chunks: List of Chunk objects to add
+            show_progress: Whether to show progress bar
+            embeddings: Precomputed vectors, one per chunk (embedded here if None)
+
+        Returns:
+            Number of chunks added
+        """
+        if not chunks:
+            return 0
+        self._rewrite(None, chunks, embeddings, show_progress)
+        return len(chunks)
+
+    def get_ids_by_source(self, source_file: str) -> List[str]:
+        """IDs of every chunk from one source file"""
+        return [self._ids[row] for row in self._filter_rows({"source_file": source_file})]
+
+    def replace_source_chunks(
+        self,
+        source_file: str,
+        chunks: List[Chunk],
+        embeddings: Optional[List[List[float]]] = None
+    ) -> List[str]:
+        """
+        Swap every stored chunk of one source file for new chunks
+
+        Args:
+            source_file: File whose chunks are replaced
+            chunks: New chunks for that file
+            embeddings: Precomputed vectors, one per chunk (embedded here if None)
+
+        Returns:
+            IDs of the chunks that were removed
+        """
+        return self._rewrite(source_file, chunks, embeddings, show_progress=False)
+
+    def _write_lock(self):
+        return file_lock(self.index_dir / WRITE_LOCK_NAME)
+
+    def _rewrite(self, drop_source: Optional[str], chunks: List[Chunk], embeddings: Optional[List[List[float]]],
+                 show_progress: bool) -> List[str]:
+        """Write a generation of the newest rows minus drop_source's, plus new chunks; returns dropped IDs"""
+        texts = [chunk.content for chunk in chunks]
+        if embeddings is None:
+            embeddings = self.embedder.embed_texts(texts, show_progress=show_progress) if texts else []
+
+        with self._write_lock():
+            # Build on whatever another writer published since this instance last loaded
+            self.refresh()
+            removed = self.get_ids_by_source(drop_source) if drop_source is not None else []
+            dropped = set(removed)
+            keep = [row for row, chunk_id in enumerate(self._ids) if chunk_id not in dropped]
+
+            existing = self._dense_vectors()[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+            new_vectors = np.asarray(embeddings, dtype=np.float32)
+            if len(existing) and len(new_vectors):
+                vectors = np.vstack([existing, new_vectors])
+            elif len(existing):
+                vectors = existing
+            else:
+                vectors = new_vectors.reshape(len(new_vectors), -1) if len(new_vectors) else existing
+
+            self._write(
+                [self._ids[row] for row in keep] + [chunk.id for chunk in chunks],
+                [self._documents[row] for row in keep] + texts,
+                self._metadatas(keep) + [flatten_chunk_metadata(chunk) for chunk in chunks],
+                vectors
+            )
+        return removed
+
+    @classmethod
+    def from_store(cls, store, index_dir: Optional[str] = None, **kwargs) -> "VectorIndex":
+        """
+        Build an index from every chunk and embedding in a ChromaStore
+
+        Args:
+            store: Source ChromaStore
+            index_dir: Directory for the index files
+            **kwargs: Passed to VectorIndex (quantize, nprobe, ...)
+
+        Returns:
+            The new VectorIndex, sharing the store's embedder
+        """
+        index = cls(index_dir=index_dir, embedder=store.embedder, **kwargs)
+        data = store.collection.get(include=["documents", "metadatas", "embeddings"])
+        vectors = np.asarray(data["embeddings"], dtype=np.float32) if len(data["ids"]) else np.zeros((0, 0))
+        with index._write_lock():
+            index._write(list(data["ids"]), list(data["documents"]), list(data["metadatas"]), vectors)
+        return index
+
+    # ==================== Search ====================
+
+    def _row_metadata(self, row: int) -> Dict[str, Any]:
+        metadata = {}
+        for key, column in self._columns.items():
+            code = column["codes"][row]
+            if code != MISSING:
+                metadata[key] = column["values"][code]
+        return metadata
+
+    def _filter_rows(self, where: Dict[str, Any]) -> np.ndarray:
+        """Rows matching equality conditions, using tenant lists where possible"""
+        rows = None
+        for key, condition in where.items():
+            if isinstance(condition, dict):
+                if set(condition) != {"$eq"}:
+                    raise ValueError(f"Unsupported filter for {key}: {condition}")
+                condition = condition["$eq"]
+            if key == "tenant_name":
+                matched = self._tenant_rows.get(condition, np.zeros(0, dtype=np.int32))
+            else:
+                column = self._columns.get(key)
+                if column is None:
+                    return np.zeros(0, dtype=np.int32)
+                codes = [code for code, value in enumerate(column["values"])
+                         if value == condition and type(value) is type(condition)]
+                matched = np.flatnonzero(np.isin(column["codes"], codes)).astype(np.int32)
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+        return rows
+
+    def _candidate_rows(self, query_vector: np.ndarray, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Rows to score; None means every row"""
+        if where:
+            return self._filter_rows(where)
+        if self._centroids is None:
+            return None
+        nprobe = min(self.nprobe, len(self._centroids))
+        lists = np.argpartition(-(self._centroids @ query_vector), nprobe - 1)[:nprobe]
+        return np.concatenate([
+            self._list_rows[self._list_offsets[i]:self._list_offsets[i + 1]] for i in lists
+        ])
+
+    def _similarities(self, query_vector: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        vectors = self._vectors if rows is None else self._vectors[rows]
+        if self._scales is None:
+            return vectors @ query_vector
+        scales = self._scales if rows is None else self._scales[rows]
+        return (vectors.astype(np.float32) @ query_vector) * scales
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        where_document: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Search for similar chunks
+
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            where: Metadata equality conditions
+            where_document: {"$contains": text} document filter
+
+        Returns:
+            Search results with documents, metadatas, and distances (squared
+            L2 between unit vectors, as Chroma reports them)
+        """
+        with span("embed"):
+            query_vector = np.asarray(self.embedder.embed_query(query), dtype=np.float32)
+
+        with span("vector_search") as current:
+            ids, documents, metadatas, distances = [], [], [], []
+            if self._vectors is not None:
+                query_vector = _normalize(query_vector[None, :])[0]
+                rows = self._candidate_rows(query_vector, where)
+                if where_document:
+                    if set(where_document) != {"$contains"}:
+                        raise ValueError(f"Unsupported document filter: {where_document}")
+                    needle = where_document["$contains"]
+                    candidates = range(len(self._ids)) if rows is None else rows
+                    rows = np.array([row for row in candidates if needle in self._documents[row]], dtype=np.int32)
+
+                if rows is None or len(rows):
+                    similarities = self._similarities(query_vector, rows)
+                    k = min(n_results, len(similarities))
+                    top = np.argpartition(-similarities, k - 1)[:k]
+                    top = top[np.argsort(-similarities[top], kind="stable")]
+                    for position in top:
+                        row = int(position if rows is None else rows[position])
+                        ids.append(self._ids[row])
+                        documents.append(self._documents[row])
+                        metadatas.append(self._row_metadata(row))
+                        distances.append(float(2.0 - 2.0 * similarities[position]))
+            current.set(results=len(ids))
+
+        return {"ids": ids, "documents": documents, "metadatas": metadatas, "distances": distances}
+
+    def search_by_tenant(
+        self,
+        tenant_name: str,
+        query: str,
+        n_results: int = 10
+    ) -> Dict[str, Any]:
+        """Search within a specific tenant's documents"""
+        return self.search(query=query, n_results=n_results, where={"tenant_name": tenant_name})
+
+    # ==================== Store Interface ====================
+
+    def get_all_chunks(self) -> Dict[str, Any]:
+        """
+        Get all chunks from the index
+
+        Returns:
+            All stored chunks with their metadata
+        """
+        return {
+            "ids": list(self._ids),
+            "documents": list(self._documents),
+            "metadatas": self._metadatas(range(len(self._ids)))
+        }
+
+    def get_chunk_by_id(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a specific chunk by ID
+
+        Args:
+            chunk_id: ID of the chunk to retrieve
+
+        Returns:
+            Chunk data or None if not found
+        """
+        row = self._row_of.get(chunk_id)
+        if row is None:
+            return None
+        return {"id": chunk_id, "document": self._documents[row], "metadata": self._row_metadata(row)}
+
+    @property
+    def version_source(self) -> str:
+        """Name of this index on the invalidation bus"""
+        return f"vectors:{self.index_dir.resolve()}"
+
+    def data_version(self) -> int:
+        """Generation of the newest published index files (increases on every write)"""
+        return (self._read_manifest() or {}).get("generation", 0)
+
+    def delete_all(self) -> None:
+        """Delete all chunks from the index"""
+        with self._write_lock():
+            self._write([], [], [], np.zeros((0, 0), dtype=np.float32))
+
+    def count(self) -> int:
+        """Get the number of chunks in the index"""
+        return len(self._ids)
+
+    def get_unique_tenants(self) -> List[str]:
+        """Get list of unique tenant names in the index"""
+        return sorted(tenant for tenant, rows in self._tenant_rows.items() if len(rows))
+
+    def get_facets(self) -> Dict[str, Any]:
+        """Chunk counts per tenant, section type and source file (from the encoded columns)"""
+        facets: Dict[str, Any] = {"total_chunks": len(self._ids)}
+        for field in FACET_FIELDS:
+            column = self._columns.get(field)
+            counts: Dict[Any, int] = {}
+            if column is not None:
+                codes = column["codes"]
+                tally = np.bincount(codes[codes != MISSING], minlength=len(column["values"]))
+                counts = {value: int(n) for value, n in zip(column["values"], tally) if n}
+            facets[field] = counts
+        return facets
+
+
+def create_vector_store(backend: Optional[str] = None, **kwargs):
+    """
+    Open the configured vector store
+
+    Args:
+        backend: "chroma" or "index" (defaults to VECTOR_BACKEND)
+        **kwargs: Passed to the store constructor
+
+    Returns:
+        ChromaStore or VectorIndex
+    """
+    backend = backend or VECTOR_BACKEND
+    if backend == "index":
+        return VectorIndex(**kwargs)
+    if backend == "chroma":
+        from .chroma_store import ChromaStore
+        return ChromaStore(**kwargs)
+    raise ValueError(f"Unknown vector backend: {backend}")
@@ -1,5 +1,6 @@
 """Export module for generating reports and exporting data."""
 
-from .report_generator import ReportGenerator, export_to_file
+from .report_generator import ReportGenerator, export_to_file, iter_csv
+from .report_fragments import FragmentCache, get_fragment_cache
 
-__all__ = ['ReportGenerator', 'export_to_file']
+__all__ = ['ReportGenerator', 'export_to_file', 'iter_csv', 'FragmentCache', 'get_fragment_cache']
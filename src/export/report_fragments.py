@@ -0,0 +1,413 @@
+"""
+Reusable sections of the portfolio PDF report.
+
+A report is assembled from fragments: the portfolio summary, the health and
+risk section (with its risk matrix) and one page per tenant. A fragment is a
+plain list of blocks (headings, paragraphs, tables) holding everything its
+section needs, so building one is where the SQL and LeaseAnalytics work
+happens, while turning it into reportlab flowables is cheap.
+
+Fragments are cached on disk under a fingerprint of their inputs: the
+database's data version for portfolio-wide sections, and a hash of the
+tenant's own rows for tenant pages. After one lease changes, only the
+portfolio sections and that tenant's page are built again. Stale tenant
+pages are built in parallel worker processes.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from config.settings import REPORT_CACHE_DIR, REPORT_CACHE_ENABLED, REPORT_WORKERS
+
+
+# Bump whenever the blocks a builder produces change for the same inputs
+FRAGMENT_VERSION = 1
+
+# Below this many stale tenant pages (about 1ms each to build), starting worker
+# processes costs more than it saves
+PARALLEL_MIN_PAGES = 500
+
+# Table palettes: header color, body color, header font size
+PALETTES = {
+    'summary': ('#3498DB', '#F5F5DC', 12),
+    'tenants': ('#2ECC71', '#D3D3D3', 10),
+    'expiring': ('#E74C3C', '#FFE6E6', 10),
+    'risk': ('#8E44AD', '#EFE6F5', 10),
+}
+
+# Rows per tenant that make up a tenant page, each ordered for a stable fingerprint
+_TENANT_INPUTS = (
+    "SELECT t.tenant_name, t.* FROM tenants t ORDER BY t.tenant_name",
+    """SELECT t.tenant_name, l.* FROM leases l JOIN tenants t ON l.tenant_id = t.tenant_id
+       ORDER BY t.tenant_name, l.lease_id""",
+    """SELECT t.tenant_name, f.* FROM financial_records f
+       JOIN leases l ON f.lease_id = l.lease_id JOIN tenants t ON l.tenant_id = t.tenant_id
+       ORDER BY t.tenant_name, f.record_id""",
+    """SELECT t.tenant_name, a.* FROM lease_alerts a
+       JOIN leases l ON a.lease_id = l.lease_id JOIN tenants t ON l.tenant_id = t.tenant_id
+       ORDER BY t.tenant_name, a.alert_id""",
+)
+
+
+# ==================== Fragment Cache ====================
+
+class FragmentCache:
+    """
+    Directory of pickled fragments, one file per (section, fingerprint).
+
+    Saving a section's fragment removes the entries of its older
+    fingerprints, so the cache holds one entry per section.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (defaults to REPORT_CACHE_DIR)
+        """
+        self.cache_dir = Path(cache_dir or REPORT_CACHE_DIR)
+        self.hits = 0
+        self.misses = 0
+
+    def _prefix(self, section: str) -> str:
+        return hashlib.sha256(f"{section}.v{FRAGMENT_VERSION}".encode("utf-8")).hexdigest()[:24]
+
+    def _entry_path(self, section: str, fingerprint: str) -> Path:
+        return self.cache_dir / f"{self._prefix(section)}-{fingerprint}.pkl"
+
+    def load(self, section: str, fingerprint: str) -> Optional[List[tuple]]:
+        """Return the fragment stored for a section's fingerprint, or None on a miss."""
+        try:
+            with open(self._entry_path(section, fingerprint), "rb") as f:
+                blocks = pickle.load(f)
+        except Exception:
+            # Missing, truncated or unreadable entry: rebuild and rewrite it
+            self.misses += 1
+            return None
+        self.hits += 1
+        return blocks
+
+    def save(self, section: str, fingerprint: str, blocks: List[tuple]):
+        """Store a section's fragment atomically and drop its stale entries."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        target = self._entry_path(section, fingerprint)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(blocks, f, protocol=5)
+            os.replace(tmp_path, target)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        for entry in self.cache_dir.glob(f"{self._prefix(section)}-*.pkl"):
+            if entry != target:
+                entry.unlink(missing_ok=True)
+
+    def clear(self) -> int:
+        """Delete every entry; returns how many were removed."""
+        removed = 0
+        for entry in self.cache_dir.glob("*.pkl"):
+            entry.unlink()
+            removed += 1
+        return removed
+
+
+@lru_cache(maxsize=1)
+def get_fragment_cache() -> Optional[FragmentCache]:
+    """Process-wide cache in REPORT_CACHE_DIR, or None when REPORT_CACHE_ENABLED is off."""
+    return FragmentCache() if REPORT_CACHE_ENABLED else None
+
+
+# ==================== Fingerprints ====================
+
+def portfolio_fingerprint(db) -> str:
+    """Fingerprint of the portfolio-wide sections: every lease row, on today's date."""
+    return f"{db.data_version()}-{date.today().isoformat()}"
+
+
+def tenant_fingerprints(db) -> Dict[str, str]:
+    """
+    Fingerprint of every tenant page, in tenant-name order.
+
+    Hashes the tenant's own tenant, lease, financial and alert rows (streamed,
+    so a large portfolio isn't loaded at once) plus the month, which the
+    remaining-value figures depend on.
+    """
+    digests = defaultdict(hashlib.sha256)
+    for query in _TENANT_INPUTS:
+        _, batches = db.stream_query(query)
+        for batch in batches:
+            for row in batch:
+                digests[row[0]].update(repr(row[1:]).encode("utf-8"))
+
+    month = date.today().strftime("%Y-%m").encode("utf-8")
+    fingerprints = {}
+    for tenant_name in sorted(digests):
+        digests[tenant_name].update(month)
+        fingerprints[tenant_name] = digests[tenant_name].hexdigest()[:32]
+    return fingerprints
+
+
+# ==================== Section Builders ====================
+
+def _money(value) -> str:
+    return f"${value:,.2f}" if value else 'N/A'
+
+
+def summary_fragment(db) -> List[tuple]:
+    """Financial summary, top tenants and expiring leases."""
+    summary = db.get_financial_summary()
+    blocks = [
+        ('heading', "Financial Summary", 'Heading2'),
+        ('table', [
+            ['Metric', 'Value'],
+            ['Active Leases', str(summary['active_leases'])],
+            ['Monthly Revenue', f"${summary['monthly_revenue']:,.2f}"],
+            ['Annual Revenue', f"${summary['annual_revenue']:,.2f}"],
+            ['Total Square Footage', f"{summary['total_square_footage']:,.0f} sq ft"],
+            ['Avg Rent per Sq Ft', f"${summary['avg_rent_per_sqft']:.2f}"],
+            ['Expiring in 90 Days', str(summary['expiring_within_90_days'])]
+        ], [3, 2.5], 'summary', None),
+        ('spacer', 0.5),
+        ('heading', "Top Tenants by Revenue", 'Heading2'),
+    ]
+
+    revenue_data = db.get_revenue_by_tenant()[:10]  # Top 10
+    if revenue_data:
+        rows = [['Tenant', 'Monthly Rent', 'Annual Rent', 'Sq Ft']]
+        for tenant in revenue_data:
+            rows.append([
+                tenant['tenant_name'],
+                f"${tenant['monthly_rent']:,.2f}",
+                f"${tenant['annual_rent']:,.2f}",
+                f"{tenant.get('square_footage', 0):,.0f}" if tenant.get('square_footage') else 'N/A'
+            ])
+        blocks += [('table', rows, [2.5, 1.5, 1.5, 1], 'tenants', 1), ('spacer', 0.5)]
+
+    blocks.append(('heading', "Leases Expiring in Next 90 Days", 'Heading2'))
+    expiring = db.get_expiring_leases(90)
+    if expiring:
+        rows = [['Tenant', 'Expiration Date', 'Days Until', 'Monthly Rent']]
+        for lease in expiring:
+            rows.append([
+                lease['tenant_name'],
+                lease['end_date'],
+                f"{int(lease['days_until_expiration'])} days",
+                _money(lease.get('base_rent'))
+            ])
+        blocks.append(('table', rows, [2.5, 1.5, 1.5, 1.5], 'expiring', 2))
+    else:
+        blocks.append(('paragraph', "No leases expiring in the next 90 days."))
+
+    blocks.append(('spacer', 0.5))
+    return blocks
+
+
+def health_fragment(analytics) -> List[tuple]:
+    """Portfolio health score, risk assessment and a severity-by-type risk matrix."""
+    health = analytics.calculate_portfolio_health_score()
+    health_text = (f"<b>Health Score:</b> {health['health_score']}/100 ({health['health_status'].upper()})<br/>"
+                   f"<br/><b>Recommendations:</b><br/>")
+    for rec in health['recommendations']:
+        health_text += f"• {rec}<br/>"
+
+    risk = analytics.assess_portfolio_risk()
+    risk_text = f"<b>Risk Level:</b> {risk['risk_level'].upper()}<br/><br/>"
+    if risk['risks']:
+        risk_text += "<b>Identified Risks:</b><br/>"
+        for r in risk['risks']:
+            risk_text += f"• [{r['severity'].upper()}] {r['description']}<br/>"
+
+    blocks = [
+        ('page_break',),
+        ('heading', "Portfolio Health Analysis", 'Heading2'),
+        ('paragraph', health_text),
+        ('spacer', 0.3),
+        ('heading', "Risk Assessment", 'Heading3'),
+        ('paragraph', risk_text),
+    ]
+
+    if risk['risks']:
+        severities = ['high', 'medium', 'low']
+        counts = defaultdict(lambda: dict.fromkeys(severities, 0))
+        for r in risk['risks']:
+            counts[r['type']][r['severity']] += 1
+        rows = [['Risk Type', 'High', 'Medium', 'Low']]
+        for risk_type in sorted(counts):
+            rows.append([risk_type.replace('_', ' ').title()] + [str(counts[risk_type][s]) for s in severities])
+        blocks += [('spacer', 0.3), ('heading', "Risk Matrix", 'Heading3'),
+                   ('table', rows, [2.5, 1, 1, 1], 'risk', 1)]
+    return blocks
+
+
+def tenant_fragment(db, analytics, tenant_name: str) -> List[tuple]:
+    """One tenant's page: leases, lease value, financial records and pending alerts."""
+    blocks = [('page_break',), ('heading', escape(tenant_name), 'Heading2')]
+
+    tenant = db.get_tenant(tenant_name) or {}
+    if tenant.get('business_type'):
+        blocks.append(('paragraph', f"<b>Business Type:</b> {escape(tenant['business_type'])}"))
+
+    leases = db.get_leases_by_tenant(tenant_name)
+    if not leases:
+        blocks.append(('paragraph', "No leases on file."))
+        return blocks
+
+    lease_rows = [['Lease', 'Start', 'End', 'Sq Ft', 'Monthly Rent', 'Status']]
+    value_rows = [['Lease', 'Annual Value', 'Remaining Value', 'Months Left']]
+    for lease in leases:
+        lease_rows.append([
+            lease['lease_file'],
+            lease.get('start_date') or 'N/A',
+            lease.get('end_date') or 'N/A',
+            f"{lease['square_footage']:,.0f}" if lease.get('square_footage') else 'N/A',
+            _money(lease.get('base_rent')),
+            lease.get('status') or 'N/A'
+        ])
+        value = analytics.calculate_lease_value(lease['lease_id'])
+        if value:
+            months = value['months_remaining']
+            value_rows.append([
+                lease['lease_file'],
+                _money(value['annual_value']),
+                _money(value['remaining_value']),
+                str(months) if months is not None else 'N/A'
+            ])
+
+    blocks += [
+        ('heading', "Leases", 'Heading3'),
+        ('table', lease_rows, [2, 0.9, 0.9, 0.8, 1.1, 0.8], 'tenants', 3),
+        ('spacer', 0.3),
+        ('heading', "Lease Value", 'Heading3'),
+        ('table', value_rows, [2.5, 1.4, 1.4, 1], 'summary', 1),
+    ]
+
+    records = db.execute_custom_query("""
+        SELECT f.record_type, COUNT(*) AS entries, SUM(f.amount) AS total
+        FROM financial_records f
+        JOIN leases l ON f.lease_id = l.lease_id
+        JOIN tenants t ON l.tenant_id = t.tenant_id
+        WHERE t.tenant_name = ?
+        GROUP BY f.record_type
+        ORDER BY f.record_type
+    """, (tenant_name,))
+    if records:
+        rows = [['Record Type', 'Entries', 'Total']]
+        rows += [[r['record_type'], str(r['entries']), f"${r['total']:,.2f}"] for r in records]
+        blocks += [('spacer', 0.3), ('heading', "Financial Records", 'Heading3'),
+                   ('table', rows, [2.5, 1, 1.5], 'tenants', 1)]
+
+    alerts = db.execute_custom_query("""
+        SELECT a.alert_date, a.alert_type, a.message
+        FROM lease_alerts a
+        JOIN leases l ON a.lease_id = l.lease_id
+        JOIN tenants t ON l.tenant_id = t.tenant_id
+        WHERE t.tenant_name = ? AND a.status = 'pending'
+        ORDER BY a.alert_date
+    """, (tenant_name,))
+    if alerts:
+        rows = [['Alert Date', 'Type', 'Message']]
+        rows += [[a['alert_date'], a['alert_type'], a['message'] or ''] for a in alerts]
+        blocks += [('spacer', 0.3), ('heading', "Pending Alerts", 'Heading3'),
+                   ('table', rows, [1.2, 1.5, 3.8], 'expiring', None)]
+    return blocks
+
+
+def _tenant_fragments_worker(db_path: str, tenant_names: List[str]) -> List[Tuple[str, List[tuple]]]:
+    """Build tenant pages in a worker process, on its own database connection."""
+    from src.analytics.lease_analytics import LeaseAnalytics
+    from src.database.sql_store import SQLStore
+
+    with SQLStore(db_path) as db:
+        analytics = LeaseAnalytics(db)
+        return [(name, tenant_fragment(db, analytics, name)) for name in tenant_names]
+
+
+def build_tenant_fragments(db, analytics, tenant_names: List[str],
+                           workers: int = REPORT_WORKERS) -> Dict[str, List[tuple]]:
+    """
+    Build several tenant pages, spread across worker processes when there are enough of them.
+
+    Args:
+        db: SQLStore the pages are read from
+        analytics: LeaseAnalytics used when building in this process
+        tenant_names: Tenants whose pages to build
+        workers: Worker processes (1 builds everything here)
+
+    Returns:
+        Tenant name -> fragment
+    """
+    workers = min(workers, len(tenant_names))
+    if workers <= 1 or len(tenant_names) < PARALLEL_MIN_PAGES:
+        return {name: tenant_fragment(db, analytics, name) for name in tenant_names}
+
+    # Contiguous slices, a few per worker so a slow tenant doesn't hold up the rest
+    size = max(1, len(tenant_names) // (workers * 4))
+    slices = [tenant_names[i:i + size] for i in range(0, len(tenant_names), size)]
+    # spawn, not fork: the API and Streamlit processes run threads that fork would copy mid-lock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        results = executor.map(_tenant_fragments_worker, [str(db.db_path)] * len(slices), slices)
+        return {name: blocks for chunk in results for name, blocks in chunk}
+
+
+# ==================== Rendering ====================
+
+def render_blocks(blocks: List[tuple], styles) -> List[Any]:
+    """
+    Turn fragment blocks into reportlab flowables.
+
+    Args:
+        blocks: Fragment blocks
+        styles: reportlab stylesheet (getSampleStyleSheet())
+
+    Returns:
+        Flowables for SimpleDocTemplate.build
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import PageBreak, Paragraph, Spacer, Table, TableStyle
+
+    flowables = []
+    for block in blocks:
+        kind = block[0]
+        if kind == 'heading':
+            flowables.append(Paragraph(block[1], styles[block[2]]))
+        elif kind == 'paragraph':
+            flowables.append(Paragraph(block[1], styles['Normal']))
+        elif kind == 'spacer':
+            flowables.append(Spacer(1, block[1] * inch))
+        elif kind == 'page_break':
+            flowables.append(PageBreak())
+        elif kind == 'table':
+            _, rows, widths, palette, right_from = block
+            header, body, font_size = PALETTES[palette]
+            commands = [
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header)),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), font_size),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor(body)),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]
+            if right_from is not None:
+                commands.append(('ALIGN', (right_from, 1), (-1, -1), 'RIGHT'))
+            table = Table(rows, colWidths=[w * inch for w in widths], repeatRows=1)
+            table.setStyle(TableStyle(commands))
+            flowables.append(table)
+        else:
+            raise ValueError(f"Unknown fragment block: {kind}")
+    return flowables
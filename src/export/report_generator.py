@@ -8,89 +8,169 @@ Supports:
 - Portfolio analytics reports
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 import csv
 import io
 
+from config.settings import REPORT_WORKERS
+from .report_fragments import (
+    FragmentCache,
+    build_tenant_fragments,
+    get_fragment_cache,
+    health_fragment,
+    portfolio_fingerprint,
+    render_blocks,
+    summary_fragment,
+    tenant_fingerprints,
+)
+
+
+# Streamable datasets -> SQLStore method that streams them
+EXPORT_DATASETS = {
+    'leases': 'stream_leases',
+    'revenue': 'stream_revenue_by_tenant',
+    'expiring': 'stream_expiring_leases',
+    'alerts': 'stream_active_alerts',
+    'financials': 'stream_financial_records',
+}
+
+# Columns of the lease CSV export
+LEASE_EXPORT_COLUMNS = [
+    'lease_id', 'tenant_name', 'lease_file', 'start_date', 'end_date',
+    'term_months', 'square_footage', 'base_rent', 'rent_frequency',
+    'status', 'created_at'
+]
+
+# (sheet title, dataset, filters) of the portfolio workbook, before the summary sheet
+EXCEL_SHEETS = [
+    ('Leases', 'leases', {}),
+    ('Revenue by Tenant', 'revenue', {}),
+    ('Expiring Soon', 'expiring', {'days_ahead': 90}),
+    ('Active Alerts', 'alerts', {'days_ahead': 30}),
+]
+
+
+def iter_csv(columns: List[str], batches: Iterable[List[tuple]]) -> Iterator[str]:
+    """
+    Encode batches of rows as CSV, yielding the header and then one chunk per batch.
+
+    Args:
+        columns: Header row
+        batches: Lists of row tuples (e.g. from SQLStore.stream_query)
+
+    Yields:
+        CSV text chunks
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(columns)
+    yield buffer.getvalue()
+
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
 
 class ReportGenerator:
     """Generate reports and export data in various formats."""
 
-    def __init__(self, sql_store, analytics=None):
+    def __init__(self, sql_store, analytics=None, fragment_cache: Optional[FragmentCache] = None,
+                 workers: int = REPORT_WORKERS):
         """
         Initialize report generator.
 
         Args:
             sql_store: SQLStore instance
             analytics: LeaseAnalytics instance (optional)
+            fragment_cache: Cache of PDF report sections (defaults to the shared one)
+            workers: Processes that build stale tenant pages of the PDF report
         """
         self.db = sql_store
         self.analytics = analytics
+        self.fragment_cache = fragment_cache if fragment_cache is not None else get_fragment_cache()
+        self.workers = workers
 
-    # ==================== CSV Export ====================
+    # ==================== Streaming Export ====================
 
-    def export_leases_csv(self, status: str = None) -> str:
+    def open_dataset(self, dataset: str, **filters) -> tuple:
         """
-        Export leases to CSV format.
+        Start streaming one of EXPORT_DATASETS from the database.
 
         Args:
-            status: Filter by status (optional)
+            dataset: Dataset name (leases, revenue, expiring, alerts, financials)
+            **filters: Keyword arguments of the matching SQLStore.stream_* method
 
         Returns:
-            CSV data as string
+            (column names, iterator over batches of row tuples)
         """
-        leases = self.db.get_all_leases(status=status)
+        if dataset not in EXPORT_DATASETS:
+            raise KeyError(f"Unknown export dataset: {dataset}")
+        return getattr(self.db, EXPORT_DATASETS[dataset])(**filters)
 
-        if not leases:
-            return ""
+    def stream_csv(self, dataset: str, **filters) -> Iterator[str]:
+        """
+        Export a dataset as CSV text, one chunk per fetched batch.
 
-        # Define columns
-        columns = [
-            'lease_id', 'tenant_name', 'lease_file', 'start_date', 'end_date',
-            'term_months', 'square_footage', 'base_rent', 'rent_frequency',
-            'status', 'created_at'
-        ]
+        The header is the first chunk, so a consumer (a file or an HTTP
+        response) receives bytes before the whole table has been read.
 
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=columns, extrasaction='ignore')
+        Args:
+            dataset: Dataset name, see open_dataset
+            **filters: Dataset filters, see open_dataset
 
-        writer.writeheader()
-        writer.writerows(leases)
+        Yields:
+            CSV text chunks
+        """
+        columns, batches = self.open_dataset(dataset, **filters)
+        return iter_csv(columns, batches)
 
-        return output.getvalue()
+    def write_csv(self, dataset: str, output_path: str, **filters) -> str:
+        """
+        Stream a dataset's CSV export into a file.
 
-    def export_financial_summary_csv(self) -> str:
-        """Export financial summary to CSV."""
-        revenue_data = self.db.get_revenue_by_tenant()
+        Returns:
+            Path of the written file
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if not revenue_data:
-            return ""
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in self.stream_csv(dataset, **filters):
+                f.write(chunk)
 
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=revenue_data[0].keys())
+        return str(output_path)
 
-        writer.writeheader()
-        writer.writerows(revenue_data)
+    # ==================== CSV Export ====================
 
-        return output.getvalue()
+    def _csv_text(self, dataset: str, **filters) -> str:
+        """Whole CSV export as a string ("" when there are no rows)."""
+        chunks = list(self.stream_csv(dataset, **filters))
+        return "".join(chunks) if len(chunks) > 1 else ""
 
-    def export_expiring_leases_csv(self, days_ahead: int = 90) -> str:
-        """Export expiring leases to CSV."""
-        expiring = self.db.get_expiring_leases(days_ahead=days_ahead)
+    def export_leases_csv(self, status: str = None) -> str:
+        """
+        Export leases to CSV format.
 
-        if not expiring:
-            return ""
+        Args:
+            status: Filter by status (optional)
 
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=expiring[0].keys())
+        Returns:
+            CSV data as string
+        """
+        return self._csv_text("leases", status=status, fields=LEASE_EXPORT_COLUMNS)
 
-        writer.writeheader()
-        writer.writerows(expiring)
+    def export_financial_summary_csv(self) -> str:
+        """Export financial summary to CSV."""
+        return self._csv_text("revenue")
 
-        return output.getvalue()
+    def export_expiring_leases_csv(self, days_ahead: int = 90) -> str:
+        """Export expiring leases to CSV."""
+        return self._csv_text("expiring", days_ahead=days_ahead)
 
     # ==================== Excel Export ====================
 
@@ -100,52 +180,88 @@ class ReportGenerator:
 
         Creates multiple sheets:
         - Leases: All lease data
-        - Financial Summary: Revenue by tenant
-        - Expiring: Leases expiring soon
-        - Alerts: Active alerts
+        - Revenue by Tenant: Revenue by tenant
+        - Expiring Soon: Leases expiring soon
+        - Active Alerts: Active alerts
+        - Portfolio Summary: Headline financials
+
+        The workbook is written in openpyxl's write-only mode straight from
+        the database cursors, so memory stays flat however many rows there are.
         """
         try:
-            import pandas as pd
-
-            # Create Excel writer
-            with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-
-                # Sheet 1: All Leases
-                leases = self.db.get_all_leases()
-                if leases:
-                    df_leases = pd.DataFrame(leases)
-                    df_leases.to_excel(writer, sheet_name='Leases', index=False)
-
-                # Sheet 2: Financial Summary
-                revenue = self.db.get_revenue_by_tenant()
-                if revenue:
-                    df_revenue = pd.DataFrame(revenue)
-                    df_revenue.to_excel(writer, sheet_name='Revenue by Tenant', index=False)
-
-                # Sheet 3: Expiring Leases
-                expiring = self.db.get_expiring_leases(90)
-                if expiring:
-                    df_expiring = pd.DataFrame(expiring)
-                    df_expiring.to_excel(writer, sheet_name='Expiring Soon', index=False)
-
-                # Sheet 4: Active Alerts
-                alerts = self.db.get_active_alerts(30)
-                if alerts:
-                    df_alerts = pd.DataFrame(alerts)
-                    df_alerts.to_excel(writer, sheet_name='Active Alerts', index=False)
-
-                # Sheet 5: Portfolio Summary
-                summary = self.db.get_financial_summary()
-                df_summary = pd.DataFrame([summary])
-                df_summary.to_excel(writer, sheet_name='Portfolio Summary', index=False)
-
-            return True
-
+            from openpyxl import Workbook
         except ImportError:
-            raise ImportError("pandas and openpyxl required for Excel export. Install with: pip install pandas openpyxl")
+            raise ImportError("openpyxl required for Excel export. Install with: pip install openpyxl")
+
+        workbook = Workbook(write_only=True)
+
+        for title, dataset, filters in EXCEL_SHEETS:
+            columns, batches = self.open_dataset(dataset, **filters)
+            sheet = workbook.create_sheet(title)
+            sheet.append(columns)
+            for batch in batches:
+                for row in batch:
+                    sheet.append(row)
+
+        summary = self.db.get_financial_summary()
+        sheet = workbook.create_sheet('Portfolio Summary')
+        sheet.append(list(summary.keys()))
+        sheet.append(list(summary.values()))
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        workbook.save(str(output_path))
+        return True
 
     # ==================== PDF Export ====================
 
+    def build_fragments(self) -> List[List[tuple]]:
+        """
+        Section fragments of the portfolio PDF, in page order.
+
+        Fragments whose inputs haven't changed come from the fragment cache;
+        the rest are built (stale tenant pages in parallel) and cached.
+
+        Returns:
+            Block lists for render_blocks, one per section
+        """
+        from ..analytics.lease_analytics import LeaseAnalytics
+
+        cache = self.fragment_cache
+
+        def cached(section: str, fingerprint: str, build) -> List[tuple]:
+            blocks = cache.load(section, fingerprint) if cache else None
+            if blocks is None:
+                blocks = build()
+                if cache:
+                    cache.save(section, fingerprint, blocks)
+            return blocks
+
+        portfolio = portfolio_fingerprint(self.db)
+        fragments = [cached('summary', portfolio, lambda: summary_fragment(self.db))]
+        if self.analytics:
+            fragments.append(cached('health', portfolio, lambda: health_fragment(self.analytics)))
+
+        tenants = tenant_fingerprints(self.db)
+        pages = {}
+        if cache:
+            for tenant_name, fingerprint in tenants.items():
+                blocks = cache.load(f"tenant:{tenant_name}", fingerprint)
+                if blocks is not None:
+                    pages[tenant_name] = blocks
+
+        stale = [tenant_name for tenant_name in tenants if tenant_name not in pages]
+        if stale:
+            built = build_tenant_fragments(self.db, self.analytics or LeaseAnalytics(self.db), stale,
+                                           workers=self.workers)
+            for tenant_name in stale:
+                if cache:
+                    cache.save(f"tenant:{tenant_name}", tenants[tenant_name], built[tenant_name])
+                pages[tenant_name] = built[tenant_name]
+
+        fragments.extend(pages[tenant_name] for tenant_name in tenants)
+        return fragments
+
     def export_portfolio_pdf(self, output_path: str):
         """
         Generate comprehensive PDF report of portfolio.
@@ -154,172 +270,52 @@ class ReportGenerator:
         - Financial summary
         - Top tenants
         - Expiring leases
-        - Portfolio health metrics
+        - Portfolio health metrics and risk matrix
+        - One page per tenant
+
+        Sections are assembled from cached fragments (see build_fragments),
+        so only the sections whose data changed are rebuilt.
         """
         try:
-            from reportlab.lib.pagesizes import letter, A4
+            from reportlab.lib.pagesizes import letter
             from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
             from reportlab.lib.units import inch
             from reportlab.lib import colors
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-            from reportlab.lib.enums import TA_CENTER, TA_LEFT
-
-            # Create PDF
-            doc = SimpleDocTemplate(output_path, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-
-            # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor=colors.HexColor('#2C3E50'),
-                spaceAfter=30,
-                alignment=TA_CENTER
-            )
-
-            title = Paragraph("Medley Lease Portfolio Report", title_style)
-            story.append(title)
-
-            # Report date
-            date_text = f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
-            story.append(Paragraph(date_text, styles['Normal']))
-            story.append(Spacer(1, 0.3 * inch))
-
-            # Financial Summary Section
-            story.append(Paragraph("Financial Summary", styles['Heading2']))
-            summary = self.db.get_financial_summary()
-
-            summary_data = [
-                ['Metric', 'Value'],
-                ['Active Leases', str(summary['active_leases'])],
-                ['Monthly Revenue', f"${summary['monthly_revenue']:,.2f}"],
-                ['Annual Revenue', f"${summary['annual_revenue']:,.2f}"],
-                ['Total Square Footage', f"{summary['total_square_footage']:,.0f} sq ft"],
-                ['Avg Rent per Sq Ft', f"${summary['avg_rent_per_sqft']:.2f}"],
-                ['Expiring in 90 Days', str(summary['expiring_within_90_days'])]
-            ]
-
-            summary_table = Table(summary_data, colWidths=[3 * inch, 2.5 * inch])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-
-            story.append(summary_table)
-            story.append(Spacer(1, 0.5 * inch))
-
-            # Top Tenants Section
-            story.append(Paragraph("Top Tenants by Revenue", styles['Heading2']))
-            revenue_data = self.db.get_revenue_by_tenant()[:10]  # Top 10
-
-            if revenue_data:
-                tenant_data = [['Tenant', 'Monthly Rent', 'Annual Rent', 'Sq Ft']]
-
-                for tenant in revenue_data:
-                    tenant_data.append([
-                        tenant['tenant_name'],
-                        f"${tenant['monthly_rent']:,.2f}",
-                        f"${tenant['annual_rent']:,.2f}",
-                        f"{tenant.get('square_footage', 0):,.0f}" if tenant.get('square_footage') else 'N/A'
-                    ])
-
-                tenant_table = Table(tenant_data, colWidths=[2.5 * inch, 1.5 * inch, 1.5 * inch, 1 * inch])
-                tenant_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2ECC71')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ALIGN', (1, 1), (-1, -1), 'RIGHT')
-                ]))
-
-                story.append(tenant_table)
-                story.append(Spacer(1, 0.5 * inch))
-
-            # Expiring Leases Section
-            story.append(Paragraph("Leases Expiring in Next 90 Days", styles['Heading2']))
-            expiring = self.db.get_expiring_leases(90)
-
-            if expiring:
-                expiring_data = [['Tenant', 'Expiration Date', 'Days Until', 'Monthly Rent']]
-
-                for lease in expiring:
-                    expiring_data.append([
-                        lease['tenant_name'],
-                        lease['end_date'],
-                        f"{int(lease['days_until_expiration'])} days",
-                        f"${lease.get('base_rent', 0):,.2f}" if lease.get('base_rent') else 'N/A'
-                    ])
-
-                expiring_table = Table(expiring_data, colWidths=[2.5 * inch, 1.5 * inch, 1.5 * inch, 1.5 * inch])
-                expiring_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E74C3C')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.Color(1, 0.9, 0.9)),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ALIGN', (2, 1), (-1, -1), 'RIGHT')
-                ]))
-
-                story.append(expiring_table)
-            else:
-                story.append(Paragraph("No leases expiring in the next 90 days.", styles['Normal']))
-
-            story.append(Spacer(1, 0.5 * inch))
-
-            # Portfolio Health (if analytics available)
-            if self.analytics:
-                story.append(PageBreak())
-                story.append(Paragraph("Portfolio Health Analysis", styles['Heading2']))
-
-                health = self.analytics.calculate_portfolio_health_score()
-
-                health_text = f"""
-                <b>Health Score:</b> {health['health_score']}/100 ({health['health_status'].upper()})<br/>
-                <br/>
-                <b>Recommendations:</b><br/>
-                """
-
-                for rec in health['recommendations']:
-                    health_text += f"• {rec}<br/>"
-
-                story.append(Paragraph(health_text, styles['Normal']))
-                story.append(Spacer(1, 0.3 * inch))
-
-                # Risk Assessment
-                risk = self.analytics.assess_portfolio_risk()
-                story.append(Paragraph("Risk Assessment", styles['Heading3']))
-
-                risk_text = f"<b>Risk Level:</b> {risk['risk_level'].upper()}<br/><br/>"
-
-                if risk['risks']:
-                    risk_text += "<b>Identified Risks:</b><br/>"
-                    for r in risk['risks']:
-                        risk_text += f"• [{r['severity'].upper()}] {r['description']}<br/>"
-
-                story.append(Paragraph(risk_text, styles['Normal']))
-
-            # Build PDF
-            doc.build(story)
-            return True
-
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+            from reportlab.lib.enums import TA_CENTER
         except ImportError:
             raise ImportError("reportlab required for PDF export. Install with: pip install reportlab")
 
+        # Create PDF
+        doc = SimpleDocTemplate(output_path, pagesize=letter)
+        styles = getSampleStyleSheet()
+        story = []
+
+        # Title
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#2C3E50'),
+            spaceAfter=30,
+            alignment=TA_CENTER
+        )
+
+        title = Paragraph("Medley Lease Portfolio Report", title_style)
+        story.append(title)
+
+        # Report date
+        date_text = f"Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+        story.append(Paragraph(date_text, styles['Normal']))
+        story.append(Spacer(1, 0.3 * inch))
+
+        for blocks in self.build_fragments():
+            story.extend(render_blocks(blocks, styles))
+
+        # Build PDF
+        doc.build(story)
+        return True
+
     # ==================== Text Report ====================
 
     def generate_text_report(self) -> str:
@@ -0,0 +1,17 @@
+from typing import TYPE_CHECKING
+
+from ..lazy import lazy_exports
+
+__all__ = ["IngestionService", "IngestResult", "ingest_document", "Job", "JobQueue"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "IngestionService": ".service",
+    "IngestResult": ".service",
+    "ingest_document": ".service",
+    "Job": ".jobs",
+    "JobQueue": ".jobs",
+})
+
+if TYPE_CHECKING:
+    from .service import IngestionService, IngestResult, ingest_document
+    from .jobs import Job, JobQueue
@@ -0,0 +1,522 @@
+"""
+Background ingestion jobs
+Jobs live in a SQLite table so their status survives restarts; a bounded
+thread pool runs them through IngestionService while API requests and chat
+turns return immediately with a job id
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import INGEST_HEARTBEAT_SECONDS, INGEST_JOBS_DB_PATH, INGEST_MAX_WORKERS, INGEST_STALE_SECONDS
+from ..parsing.parse_cache import file_digest
+from .service import STAGES, IngestionService
+
+logger = logging.getLogger(__name__)
+
+
+# Job kinds
+INGEST = "ingest"      # one DOCX file
+REEMBED = "reembed"    # re-ingest every lease in a directory
+REINDEX = "reindex"    # rebuild the BM25 index from the vector store
+JOB_KINDS = (INGEST, REEMBED, REINDEX)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+@dataclass
+class Job:
+    """One row of the ingest_jobs table"""
+    id: int
+    kind: str
+    target: str
+    status: str
+    content_hash: Optional[str] = None
+    stage: Optional[str] = None
+    progress: float = 0.0
+    items_done: int = 0
+    items_total: int = 0
+    chunks_indexed: int = 0
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    owner: Optional[str] = None  # "host:pid:queue" of the queue running it
+    heartbeat_at: Optional[float] = None  # epoch seconds the owner last marked it alive
+
+    @property
+    def duration_s(self) -> Optional[float]:
+        """Seconds from start to finish (or to now while running)"""
+        if not self.started_at:
+            return None
+        end = datetime.fromisoformat(self.finished_at) if self.finished_at else datetime.now()
+        return (end - datetime.fromisoformat(self.started_at)).total_seconds()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-friendly dictionary"""
+        duration = self.duration_s
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "target": self.target,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "items_done": self.items_done,
+            "items_total": self.items_total,
+            "chunks_indexed": self.chunks_indexed,
+            "chunks_per_second": round(self.chunks_indexed / duration, 2) if duration else None,
+            "duration_s": round(duration, 2) if duration is not None else None,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "owner": self.owner,
+        }
+
+
+class JobQueue:
+    """
+    SQLite-backed queue of ingest, re-embed and reindex jobs
+
+    Identical submissions are deduplicated: an ingest of a file whose bytes
+    are already queued or running returns the existing job, as does one whose
+    earlier job finished and whose chunks are still in the store (a rebuild or
+    a deleted lease lets the file be ingested again). A re-embed or reindex
+    returns the same one while it is still queued. Each worker thread
+    gets its own IngestionService (and SQLStore connection); the store and
+    ranker are shared.
+
+    Several processes may share the jobs database (the API and the chat
+    agent each have a queue). A claimed job records its queue as owner,
+    and the owner refreshes its heartbeat while it runs; other queues only
+    requeue running jobs whose heartbeat has gone stale.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        store=None,
+        ranker=None,
+        sql_db_path: Optional[str] = None,
+        max_workers: int = INGEST_MAX_WORKERS,
+        heartbeat_interval: float = INGEST_HEARTBEAT_SECONDS,
+        stale_after: float = INGEST_STALE_SECONDS
+    ):
+        """
+        Initialize the queue (the database is opened on first use and no threads start until a job is submitted)
+
+        Args:
+            db_path: SQLite file for the jobs table (defaults to INGEST_JOBS_DB_PATH)
+            store: ChromaStore or VectorIndex to write to (opens the configured backend if None)
+            ranker: HybridRanker to keep up to date and to rebuild on reindex (optional)
+            sql_db_path: SQLStore database for lease rows (None = vector store only)
+            max_workers: Jobs that run at the same time
+            heartbeat_interval: Seconds between heartbeats of this queue's running jobs
+            stale_after: Seconds without a heartbeat before a running job counts as abandoned
+        """
+        self.db_path = Path(db_path or INGEST_JOBS_DB_PATH)
+        self.store = store
+        self.ranker = ranker
+        self.sql_db_path = sql_db_path
+        self.max_workers = max(1, max_workers)
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Jobs database, created on first use (callers hold self._lock)"""
+        if self._db is None:
+            self._db = self._connect()
+        return self._db
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ingest_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                target TEXT NOT NULL,
+                content_hash TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                stage TEXT,
+                progress REAL NOT NULL DEFAULT 0,
+                items_done INTEGER NOT NULL DEFAULT 0,
+                items_total INTEGER NOT NULL DEFAULT 0,
+                chunks_indexed INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                owner TEXT,
+                heartbeat_at REAL
+            )
+        """)
+        # Databases created before jobs had owners
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(ingest_jobs)")}
+        for column, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE ingest_jobs ADD COLUMN {column} {kind}")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_jobs_status ON ingest_jobs(status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_jobs_hash ON ingest_jobs(kind, content_hash)")
+        conn.commit()
+        return conn
+
+    # ==================== Submission ====================
+
+    def submit(self, kind: str, target: str = "", force: bool = False) -> Job:
+        """
+        Queue a job, or return the identical job that already covers it
+
+        Args:
+            kind: One of JOB_KINDS
+            target: File path for ingest, lease directory for reembed, unused for reindex
+            force: Queue even if an identical job exists
+
+        Returns:
+            The queued (or existing) Job
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {JOB_KINDS}")
+
+        content_hash = None
+        if kind == INGEST:
+            path = Path(target)
+            if not path.is_file():
+                raise FileNotFoundError(f"File not found: {target}")
+            target = str(path.resolve())
+            content_hash = file_digest(target)
+
+        with self._lock:
+            if not force:
+                existing = self._find_duplicate(kind, target, content_hash)
+                if existing is not None:
+                    return existing
+            cursor = self._conn.execute(
+                "INSERT INTO ingest_jobs (kind, target, content_hash, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, target, content_hash, QUEUED, datetime.now().isoformat())
+            )
+            self._conn.commit()
+            job_id = cursor.lastrowid
+
+        self._dispatch(job_id)
+        return self.get(job_id)
+
+    def _find_duplicate(self, kind: str, target: str, content_hash: Optional[str]) -> Optional[Job]:
+        """Caller holds self._lock"""
+        if content_hash is not None:
+            # The same bytes, under any name, queued, running or already ingested
+            row = self._conn.execute(
+                "SELECT * FROM ingest_jobs WHERE kind = ? AND content_hash = ? AND status != ? "
+                "ORDER BY id DESC LIMIT 1",
+                (kind, content_hash, FAILED)
+            ).fetchone()
+            if row is not None and row["status"] == DONE and not self._still_ingested(row["target"]):
+                row = None
+        else:
+            row = self._conn.execute(
+                "SELECT * FROM ingest_jobs WHERE kind = ? AND target = ? AND status = ? ORDER BY id DESC LIMIT 1",
+                (kind, target, QUEUED)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def _still_ingested(self, target: str) -> bool:
+        """Whether the store still holds chunks from a file a finished job ingested"""
+        if self.store is None or not hasattr(self.store, "get_ids_by_source"):
+            return False
+        return bool(self.store.get_ids_by_source(Path(target).name))
+
+    def start(self) -> int:
+        """
+        Resume jobs left queued, or running by a queue that stopped heartbeating
+
+        Jobs another live queue is running are left alone. The heartbeat
+        thread keeps adopting jobs whose owner goes quiet later on.
+
+        Returns:
+            Number of jobs dispatched
+        """
+        self._requeue_stale()
+        with self._lock:
+            job_ids = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM ingest_jobs WHERE status = ? ORDER BY id", (QUEUED,)
+            )]
+        for job_id in job_ids:
+            self._dispatch(job_id)
+        self._start_heartbeat()
+        return len(job_ids)
+
+    def _requeue_stale(self) -> List[int]:
+        """Put running jobs whose owner stopped heartbeating back in the queue"""
+        cutoff = time.time() - self.stale_after
+        with self._lock:
+            job_ids = [row["id"] for row in self._conn.execute(
+                "SELECT id FROM ingest_jobs WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (RUNNING, cutoff)
+            )]
+            for job_id in job_ids:
+                self._conn.execute(
+                    "UPDATE ingest_jobs SET status = ?, stage = NULL, started_at = NULL, owner = NULL "
+                    "WHERE id = ? AND status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                    (QUEUED, job_id, RUNNING, cutoff)
+                )
+            self._conn.commit()
+        return job_ids
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._stop.clear()
+            self._heartbeat = threading.Thread(target=self._beat, name="ingest-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _beat(self) -> None:
+        """Mark this queue's running jobs alive and adopt jobs abandoned by other queues"""
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE ingest_jobs SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+                        (time.time(), self.owner, RUNNING)
+                    )
+                    self._conn.commit()
+                for job_id in self._requeue_stale():
+                    logger.warning(f"Ingest job {job_id} lost its owner; running it again")
+                    self._dispatch(job_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Ingest job heartbeat failed: {e}")
+
+    def _dispatch(self, job_id: int) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+            self._executor.submit(self._run, job_id)
+        self._start_heartbeat()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no job is queued or running
+
+        Args:
+            timeout: Seconds to wait at most (None = no limit)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.counts().get(QUEUED, 0) or self.counts().get(RUNNING, 0):
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads (queued jobs stay queued for the next start())"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        self._stop.set()
+        with self._lock:
+            heartbeat, self._heartbeat = self._heartbeat, None
+        if heartbeat is not None:
+            heartbeat.join()
+
+    # ==================== Execution ====================
+
+    def _service(self) -> IngestionService:
+        """This worker thread's IngestionService"""
+        service = getattr(self._local, "service", None)
+        if service is None:
+            with self._lock:
+                if self.store is None:
+                    from ..database.vector_index import create_vector_store
+                    self.store = create_vector_store()
+            sql_store = None
+            if self.sql_db_path is not None:
+                from ..database.sql_store import SQLStore
+                sql_store = SQLStore(str(self.sql_db_path))
+            service = IngestionService(store=self.store, sql_store=sql_store, ranker=self.ranker)
+            self._local.service = service
+        return service
+
+    def _run(self, job_id: int) -> None:
+        with self._lock:
+            claimed = self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ? "
+                "WHERE id = ? AND status = ?",
+                (RUNNING, datetime.now().isoformat(), self.owner, time.time(), job_id, QUEUED)
+            ).rowcount
+            self._conn.commit()
+        if not claimed:
+            return  # already picked up (e.g. dispatched again by start())
+
+        job = self.get(job_id)
+        try:
+            if job.kind == INGEST:
+                result = self._run_ingest(job)
+            elif job.kind == REEMBED:
+                result = self._run_reembed(job)
+            else:
+                result = self._run_reindex(job)
+        except Exception as e:
+            self._finish(job_id, status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+            return
+        self._finish(
+            job_id, status=DONE, stage=None, progress=1.0,
+            result=json.dumps(result, default=str), finished_at=datetime.now().isoformat()
+        )
+
+    def _run_ingest(self, job: Job) -> Dict[str, Any]:
+        self._update(job.id, items_total=1)
+
+        def report(stage: str) -> None:
+            self._update(job.id, stage=stage, progress=STAGES.index(stage) / len(STAGES))
+
+        result = self._service().ingest_document(job.target, progress=report)
+        self._update(job.id, items_done=1, chunks_indexed=result.chunks_indexed)
+        return result.to_dict()
+
+    def _run_reembed(self, job: Job) -> Dict[str, Any]:
+        from config.settings import LEASE_CONTRACTS_DIR
+
+        lease_dir = Path(job.target or LEASE_CONTRACTS_DIR)
+        files = sorted(p for p in lease_dir.glob("*.docx") if not p.name.startswith("~$"))
+        self._update(job.id, items_total=len(files))
+
+        chunks, errors = 0, {}
+        for i, path in enumerate(files):
+            self._update(job.id, stage=path.name, progress=i / len(files))
+            try:
+                chunks += self._service().ingest_document(str(path)).chunks_indexed
+            except Exception as e:
+                errors[path.name] = str(e)
+            self._update(job.id, items_done=i + 1, chunks_indexed=chunks)
+
+        if files and len(errors) == len(files):
+            raise RuntimeError(f"Every document failed; first error: {next(iter(errors.values()))}")
+        return {"documents": len(files) - len(errors), "chunks_indexed": chunks, "errors": errors}
+
+    def _run_reindex(self, job: Job) -> Dict[str, Any]:
+        service = self._service()
+        if service.ranker is None:
+            raise RuntimeError("No ranker to reindex")
+        self._update(job.id, stage="bm25", items_total=1)
+        service.ranker.refresh_bm25_index()
+        self._update(job.id, items_done=1)
+        return {"chunks": service.store.count()}
+
+    # ==================== Status ====================
+
+    def _update(self, job_id: int, **fields) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE ingest_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def _finish(self, job_id: int, **fields) -> None:
+        """Record the outcome, unless another queue adopted the job after this one went quiet"""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            finished = self._conn.execute(
+                f"UPDATE ingest_jobs SET {assignments} WHERE id = ? AND owner = ?",
+                (*fields.values(), job_id, self.owner)
+            ).rowcount
+            self._conn.commit()
+        if not finished:
+            logger.warning(f"Ingest job {job_id} was adopted by another queue; dropping this run's outcome")
+
+    def _row_to_job(self, row: sqlite3.Row) -> Job:
+        data = dict(row)
+        if data.get("result"):
+            data["result"] = json.loads(data["result"])
+        return Job(**data)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Fetch one job by id"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        """Most recent jobs first, optionally only those in one state"""
+        query = "SELECT * FROM ingest_jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, (*params, limit)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM ingest_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and throughput of finished jobs
+
+        Returns:
+            Dict with per-state counts, worker limit, and documents/chunks
+            processed with their rate over all finished jobs
+        """
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(items_done), 0), COALESCE(SUM(chunks_indexed), 0),
+                       COALESCE(SUM((julianday(finished_at) - julianday(started_at)) * 86400.0), 0)
+                FROM ingest_jobs WHERE status = ? AND kind != ?
+                """,
+                (DONE, REINDEX)
+            ).fetchone()
+        jobs, documents, chunks, seconds = row
+        return {
+            "counts": self.counts(),
+            "max_workers": self.max_workers,
+            "documents_processed": documents,
+            "chunks_indexed": chunks,
+            "busy_seconds": round(seconds, 2),
+            "documents_per_minute": round(documents * 60 / seconds, 2) if seconds else None,
+            "chunks_per_second": round(chunks / seconds, 2) if seconds else None,
+        }
+
+    def close(self) -> None:
+        """Stop the workers and close the database connection"""
+        self.shutdown()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,236 @@
+"""
+Single-document ingestion shared by the agent, scripts/ingest.py and the API
+One call parses a lease once, extracts its terms, chunks and embeds it, swaps
+its chunks into the vector store, upserts its lease row in SQLite and patches
+the BM25 index in place, so a new lease is searchable without a rebuild
+"""
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+from ..chunking.chunker import Chunker
+from ..database.chroma_store import flatten_chunk_metadata
+from ..database.invalidation import get_invalidation_bus
+from ..database.vector_index import create_vector_store
+from ..metadata.extractor import LeaseMetadata, MetadataExtractor
+from ..observability.tracing import span
+from ..parsing.parse_cache import get_parse_cache
+
+if TYPE_CHECKING:
+    from ..parsing.docx_parser import DocxParser, ParsedDocument
+
+
+# Stages reported to progress callbacks, in the order they run
+STAGES = ("parse", "extract", "chunk", "embed", "write", "index")
+
+# Lease upserts and vector swaps from concurrent ingests run one at a time
+_write_lock = threading.Lock()
+
+# Date formats the extractor returns, tried in order
+DATE_FORMATS = ("%Y-%m-%d", "%B %d, %Y", "%B %d %Y", "%m/%d/%Y", "%m/%d/%y")
+
+
+def iso_date(value: Optional[str]) -> Optional[str]:
+    """Normalize an extracted date to YYYY-MM-DD, or None if it cannot be read"""
+    if not value:
+        return None
+    text = " ".join(value.replace(",", ", ").split()).replace(" ,", ",")
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
+def lease_fields(metadata: LeaseMetadata) -> Dict[str, Any]:
+    """Map extracted lease terms onto SQLStore lease columns"""
+    monthly_rent = metadata.year1_monthly_rent
+    if monthly_rent is None and metadata.year1_annual_rent is not None:
+        monthly_rent = round(metadata.year1_annual_rent / 12, 2)
+    return {
+        "start_date": iso_date(metadata.commencement_date),
+        "end_date": iso_date(metadata.expiration_date),
+        "term_months": metadata.lease_term_years * 12 if metadata.lease_term_years else None,
+        "square_footage": metadata.premises_sqft,
+        "base_rent": monthly_rent,
+        "rent_frequency": "monthly",
+        "security_deposit": metadata.security_deposit,
+    }
+
+
+@dataclass
+class IngestResult:
+    """Outcome of ingesting one lease document"""
+    file_path: str
+    source_file: str
+    tenant_name: str
+    chunks_indexed: int = 0
+    chunks_replaced: int = 0
+    lease_id: Optional[int] = None
+    lease_created: bool = False
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-friendly dictionary"""
+        return {
+            "file_path": self.file_path,
+            "source_file": self.source_file,
+            "tenant_name": self.tenant_name,
+            "chunks_indexed": self.chunks_indexed,
+            "chunks_replaced": self.chunks_replaced,
+            "lease_id": self.lease_id,
+            "lease_created": self.lease_created,
+            "metadata": self.metadata,
+            "timings_ms": self.timings_ms,
+        }
+
+
+class IngestionService:
+    """
+    Parse, extract, chunk, embed and index one lease at a time
+
+    Everything that can be slow or fail on bad input (parsing, extraction,
+    embedding) happens before any write. The SQLite upsert and the vector
+    store swap then run inside one SQLite transaction, so a failed vector
+    write leaves no lease row behind.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        sql_store=None,
+        ranker=None,
+        parser: Optional["DocxParser"] = None,
+        extractor: Optional[MetadataExtractor] = None,
+        chunker: Optional[Chunker] = None
+    ):
+        """
+        Initialize the service
+
+        Args:
+            store: ChromaStore or VectorIndex (opens the configured backend if None)
+            sql_store: SQLStore for lease rows (None = vector store only)
+            ranker: HybridRanker whose BM25 index is patched in place (optional)
+            parser: DocxParser (defaults to one using the shared parse cache)
+            extractor: MetadataExtractor
+            chunker: Chunker
+        """
+        self.store = store if store is not None else create_vector_store()
+        self.sql_store = sql_store
+        self.ranker = ranker
+        if parser is None:
+            from ..parsing.docx_parser import DocxParser  # python-docx is only needed once a job runs
+            parser = DocxParser(cache=get_parse_cache())
+        self.parser = parser
+        self.extractor = extractor or MetadataExtractor()
+        self.chunker = chunker or Chunker()
+
+    def ingest_document(self, file_path: str, progress: Optional[Callable[[str], None]] = None) -> IngestResult:
+        """
+        Ingest one DOCX lease, replacing anything previously ingested from it
+
+        Args:
+            file_path: Path to the DOCX file
+            progress: Called with each name in STAGES as that stage starts
+
+        Returns:
+            IngestResult with chunk counts, the lease row and stage timings
+        """
+        return self._ingest(file_path=file_path, progress=progress)
+
+    def ingest_parsed(self, doc: "ParsedDocument", progress: Optional[Callable[[str], None]] = None) -> IngestResult:
+        """
+        Ingest an already parsed document
+
+        Args:
+            doc: ParsedDocument (lazy documents are read here)
+            progress: Called with each name in STAGES as that stage starts
+
+        Returns:
+            IngestResult with chunk counts, the lease row and stage timings
+        """
+        return self._ingest(doc=doc, progress=progress)
+
+    def _ingest(self, file_path: Optional[str] = None, doc: Optional["ParsedDocument"] = None,
+                progress: Optional[Callable[[str], None]] = None) -> IngestResult:
+        report = progress or (lambda stage: None)
+        with span("ingest") as root:
+            report("parse")
+            if doc is None:
+                with span("ingest_parse"):
+                    doc = self.parser.parse(file_path)
+            root.set(file=doc.file_name)
+
+            report("extract")
+            with span("ingest_extract"):
+                metadata = self.extractor.extract(doc)
+            report("chunk")
+            with span("ingest_chunk"):
+                chunks = self.chunker.chunk_document(doc)
+            report("embed")
+            with span("ingest_embed") as current:
+                embeddings = self.store.embedder.embed_texts([chunk.content for chunk in chunks], show_progress=False)
+                current.set(chunks=len(chunks))
+
+            result = IngestResult(
+                file_path=doc.file_path,
+                source_file=doc.file_name,
+                tenant_name=metadata.tenant_name or doc.tenant_name,
+                chunks_indexed=len(chunks),
+                metadata=metadata.to_dict(),
+            )
+
+            report("write")
+            with span("ingest_write"), _write_lock:
+                removed = self._write(doc, metadata, chunks, embeddings, result)
+            result.chunks_replaced = len(removed)
+
+            report("index")
+            if self.ranker is not None:
+                self.ranker.update_bm25_index(
+                    [chunk.id for chunk in chunks],
+                    [chunk.content for chunk in chunks],
+                    [flatten_chunk_metadata(chunk) for chunk in chunks],
+                    removed_ids=removed
+                )
+
+            # Let caches in this process drop what the write made stale
+            bus = get_invalidation_bus()
+            bus.publish(self.store)
+            if self.sql_store is not None:
+                bus.publish(self.sql_store)
+
+        result.timings_ms = root.breakdown()
+        return result
+
+    def _write(self, doc: "ParsedDocument", metadata: LeaseMetadata, chunks, embeddings,
+               result: IngestResult) -> List[str]:
+        """Upsert the lease row and swap the vector chunks as one unit"""
+        if self.sql_store is None:
+            return self.store.replace_source_chunks(doc.file_name, chunks, embeddings)
+
+        with self.sql_store.transaction():
+            result.lease_id, result.lease_created = self.sql_store.upsert_lease(
+                result.tenant_name, doc.file_name, **lease_fields(metadata)
+            )
+            return self.store.replace_source_chunks(doc.file_name, chunks, embeddings)
+
+
+def ingest_document(file_path: str, store=None, sql_store=None, ranker=None) -> IngestResult:
+    """
+    Ingest one DOCX lease with a one-off IngestionService
+
+    Args:
+        file_path: Path to the DOCX file
+        store: ChromaStore or VectorIndex (opens the configured backend if None)
+        sql_store: SQLStore for the lease row (None = vector store only)
+        ranker: HybridRanker to update incrementally (optional)
+
+    Returns:
+        IngestResult
+    """
+    return IngestionService(store=store, sql_store=sql_store, ranker=ranker).ingest_document(file_path)
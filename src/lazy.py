@@ -0,0 +1,36 @@
+"""
+Lazy package exports
+Package __init__ modules list their public names here instead of importing
+every submodule up front, so `from src.database.sql_store import SQLStore`
+doesn't drag in chromadb and numpy, and `import src.search` costs nothing
+until a class is actually used
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Module-level __getattr__ and __dir__ that import an export's submodule on first access
+
+    Args:
+        package: The package's __name__
+        exports: Public name -> relative submodule defining it (e.g. ".chroma_store")
+
+    Returns:
+        (__getattr__, __dir__) to assign in the package __init__
+    """
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)  # later lookups skip __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
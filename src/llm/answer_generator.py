@@ -3,14 +3,21 @@ LLM-based answer generation for lease queries
 Supports both OpenAI and Anthropic models
 """
 
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
-from anthropic import Anthropic
 
 from config.settings import (
     OPENAI_API_KEY, ANTHROPIC_API_KEY,
     LLM_MODEL, LLM_PROVIDER
 )
+from ..memory.history_budget import HistoryWindow, TokenBudgetedHistory
+from ..observability.tracing import traced
+from ..observability.usage import UsageTracker, cheaper_model, get_usage_tracker, usage_from_response
+from .context_packer import ContextPacker
 
 
 SYSTEM_PROMPT = """You are a helpful assistant specialized in analyzing commercial lease agreements for the Medley retail development. Your role is to answer questions about lease terms, rent amounts, tenant obligations, and other lease-related information.
@@ -37,6 +44,16 @@ When answering questions:
 
 Always base your answers on the provided lease document excerpts. Do not make up information."""
 
+# History token budget for query reformulation, which only needs recent context
+REFORMULATE_HISTORY_TOKENS = 800
+
+REFORMULATE_SYSTEM_PROMPT = "You reformulate vague follow-up questions into complete, searchable questions by adding context from conversation history. Output only the reformulated question, nothing else."
+
+# Recent completions kept for answering repeat prompts once a budget is exhausted
+COMPLETION_CACHE_SIZE = 256
+
+SUMMARY_SYSTEM_PROMPT = """You maintain a running summary of a conversation about commercial lease agreements. Update the summary with the new messages. Keep tenant names, numbers, dates and open questions; drop pleasantries. Output only the updated summary."""
+
 
 class AnswerGenerator:
     """Generate answers using LLM based on retrieved context"""
@@ -46,7 +63,9 @@ class AnswerGenerator:
         provider: str = LLM_PROVIDER,
         model: str = LLM_MODEL,
         openai_api_key: Optional[str] = None,
-        anthropic_api_key: Optional[str] = None
+        anthropic_api_key: Optional[str] = None,
+        client: Optional[Any] = None,
+        usage_tracker: Optional[UsageTracker] = None
     ):
         """
         Initialize the answer generator
@@ -56,29 +75,63 @@ class AnswerGenerator:
             model: Model name to use
             openai_api_key: OpenAI API key
             anthropic_api_key: Anthropic API key
+            client: Pre-built client with the provider's API shape (skips key lookup)
+            usage_tracker: Sink for token/cost records and budgets (defaults to the shared tracker)
         """
         self.provider = provider.lower()
         self.model = model
 
-        if self.provider == "openai":
-            api_key = openai_api_key or OPENAI_API_KEY
-            if not api_key:
+        if self.provider not in ("openai", "anthropic"):
+            raise ValueError(f"Unknown provider: {provider}")
+
+        # Keys are checked now; the provider SDK is imported on the first call
+        self._client = client
+        if client is not None:
+            self._api_key = None
+        elif self.provider == "openai":
+            self._api_key = openai_api_key or OPENAI_API_KEY
+            if not self._api_key:
                 raise ValueError("OpenAI API key required for OpenAI provider")
-            self.client = OpenAI(api_key=api_key)
         elif self.provider == "anthropic":
-            api_key = anthropic_api_key or ANTHROPIC_API_KEY
-            if not api_key:
+            self._api_key = anthropic_api_key or ANTHROPIC_API_KEY
+            if not self._api_key:
                 raise ValueError("Anthropic API key required for Anthropic provider")
-            self.client = Anthropic(api_key=api_key)
-        else:
-            raise ValueError(f"Unknown provider: {provider}")
 
+        # Keeps chat history under a fixed token budget across long conversations
+        self.history_budget = TokenBudgetedHistory(summarizer=self.summarize_history)
+
+        # Merges, dedupes and budgets retrieved excerpts before prompting
+        self.context_packer = ContextPacker()
+
+        # Token/cost accounting and budget fallbacks for every provider call
+        self.usage = usage_tracker or get_usage_tracker()
+        self._completion_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @property
+    def client(self):
+        """Provider client, built on first use"""
+        if self._client is None:
+            if self.provider == "openai":
+                from openai import OpenAI
+                self._client = OpenAI(api_key=self._api_key)
+            else:
+                from anthropic import Anthropic
+                self._client = Anthropic(api_key=self._api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    @traced("generate")
     def generate_answer(
         self,
         question: str,
         contexts: List[str],
         metadatas: Optional[List[Dict[str, Any]]] = None,
-        max_tokens: int = 1000
+        max_tokens: int = 1000,
+        scores: Optional[List[float]] = None
     ) -> str:
         """
         Generate an answer based on question and retrieved contexts
@@ -88,12 +141,13 @@ class AnswerGenerator:
             contexts: List of relevant text chunks
             metadatas: Optional metadata for each context
             max_tokens: Maximum tokens in response
+            scores: Optional retrieval score for each context
 
         Returns:
             Generated answer string
         """
         # Build context string
-        context_str = self._format_contexts(contexts, metadatas)
+        context_str = self._format_contexts(contexts, metadatas, scores)
 
         # Build the prompt
         user_prompt = f"""Based on the following excerpts from lease agreements, please answer this question:
@@ -106,23 +160,23 @@ Lease Document Excerpts:
 Please provide a clear, accurate answer based only on the information provided above."""
 
         # Generate response
-        if self.provider == "openai":
-            return self._generate_openai(user_prompt, max_tokens)
-        else:
-            return self._generate_anthropic(user_prompt, max_tokens)
+        return self._complete("answer", SYSTEM_PROMPT, [{"role": "user", "content": user_prompt}], max_tokens)
 
+    @traced("context_pack")
     def _format_contexts(
         self,
         contexts: List[str],
-        metadatas: Optional[List[Dict[str, Any]]] = None
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        scores: Optional[List[float]] = None
     ) -> str:
-        """Format contexts for the prompt"""
+        """Pack contexts into the token budget and format them for the prompt"""
+        packed = self.context_packer.pack(contexts, metadatas, scores)
         formatted_parts = []
 
-        for i, context in enumerate(contexts):
+        for i, excerpt in enumerate(packed.excerpts):
             header = f"--- Excerpt {i + 1}"
-            if metadatas and i < len(metadatas):
-                meta = metadatas[i]
+            if excerpt.metadata:
+                meta = excerpt.metadata
                 tenant = meta.get("tenant_name", "Unknown")
                 section = meta.get("section_name", "")
                 header += f" (Tenant: {tenant}"
@@ -131,35 +185,88 @@ Please provide a clear, accurate answer based only on the information provided a
                 header += ")"
             header += " ---"
 
-            formatted_parts.append(f"{header}\n{context}")
+            formatted_parts.append(f"{header}\n{excerpt.content}")
 
         return "\n\n".join(formatted_parts)
 
-    def _generate_openai(self, user_prompt: str, max_tokens: int) -> str:
-        """Generate response using OpenAI"""
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_tokens=max_tokens,
-            temperature=0.1  # Low temperature for factual responses
-        )
-        return response.choices[0].message.content
-
-    def _generate_anthropic(self, user_prompt: str, max_tokens: int) -> str:
-        """Generate response using Anthropic Claude"""
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
+    def _complete(
+        self,
+        operation: str,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float = 0.1
+    ) -> str:
+        """
+        Call the provider, recording token usage and applying budgets
+
+        Once the session or daily budget is exhausted, a prompt seen before is
+        answered from the completion cache and anything else goes to the
+        cheaper fallback model.
+
+        Args:
+            operation: Usage label (answer, chat, reformulate, summarize, comparison)
+            system_prompt: System prompt
+            messages: Conversation messages ending with the user turn
+            max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (OpenAI only; low for factual responses)
+
+        Returns:
+            Completion text
+        """
+        model = self.model
+        cache_key = self._completion_key(system_prompt, messages, max_tokens)
+        if self.usage.over_budget():
+            with self._cache_lock:
+                cached = self._completion_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            model = cheaper_model(self.model)
+
+        start = time.perf_counter()
+        if self.provider == "openai":
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[{"role": "system", "content": system_prompt}] + messages,
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+            text = response.choices[0].message.content
+        else:
+            response = self.client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                system=system_prompt,
+                messages=messages
+            )
+            text = response.content[0].text
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        prompt_tokens, completion_tokens = usage_from_response(response)
+        self.usage.record(
+            operation, self.provider, model, prompt_tokens, completion_tokens, latency_ms,
+            prompt_chars=len(system_prompt) + sum(len(m["content"]) for m in messages),
+            completion_chars=len(text or "")
         )
-        return response.content[0].text
 
+        with self._cache_lock:
+            self._completion_cache[cache_key] = text
+            self._completion_cache.move_to_end(cache_key)
+            while len(self._completion_cache) > COMPLETION_CACHE_SIZE:
+                self._completion_cache.popitem(last=False)
+        return text
+
+    @staticmethod
+    def _completion_key(system_prompt: str, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        payload = json.dumps([system_prompt, messages, max_tokens], sort_keys=True)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def clear_cache(self) -> None:
+        """Drop cached completions (e.g. after the document collection is rebuilt)"""
+        with self._cache_lock:
+            self._completion_cache.clear()
+
+    @traced("generate")
     def generate_chat_response(
         self,
         message: str,
@@ -167,7 +274,9 @@ Please provide a clear, accurate answer based only on the information provided a
         conversation_history: List[Dict[str, str]],
         metadatas: Optional[List[Dict[str, Any]]] = None,
         max_tokens: int = 1000,
-        max_history_turns: int = 5
+        max_history_turns: Optional[int] = None,
+        scores: Optional[List[float]] = None,
+        window: Optional[HistoryWindow] = None
     ) -> str:
         """
         Generate a conversational response with history context
@@ -178,67 +287,85 @@ Please provide a clear, accurate answer based only on the information provided a
             conversation_history: List of {"role": "user/assistant", "content": "..."}
             metadatas: Optional metadata for each context
             max_tokens: Maximum tokens in response
-            max_history_turns: Maximum conversation turns to include
+            max_history_turns: Recent turns kept verbatim (older turns are summarized)
+            scores: Optional retrieval score for each context
+            window: This turn's fit_history() result (fitted here if None)
 
         Returns:
             Generated response string
         """
         # Build context string from RAG results
-        context_str = self._format_contexts(contexts, metadatas)
+        context_str = self._format_contexts(contexts, metadatas, scores)
 
-        # Build conversation history string (limit to recent turns)
-        history_messages = conversation_history[-(max_history_turns * 2):]
+        # Fit history into the token budget: rolling summary + recent turns
+        window = window or self.fit_history(conversation_history, max_history_turns)
+        system_prompt = self._with_summary(CHAT_SYSTEM_PROMPT, window)
 
-        if self.provider == "openai":
-            return self._generate_chat_openai(message, context_str, history_messages, max_tokens)
-        else:
-            return self._generate_chat_anthropic(message, context_str, history_messages, max_tokens)
+        messages = self._chat_messages(message, context_str, window.messages)
+        return self._complete("chat", system_prompt, messages, max_tokens)
 
-    def _generate_chat_openai(
+    def fit_history(
         self,
-        message: str,
-        context_str: str,
-        history: List[Dict[str, str]],
-        max_tokens: int
-    ) -> str:
-        """Generate chat response using OpenAI"""
-        messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
-
-        # Add conversation history
-        for msg in history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
-
-        # Add current message with context
-        user_content = f"""Based on the following lease document excerpts, please answer my question.
+        conversation_history: List[Dict[str, str]],
+        max_history_turns: Optional[int] = None
+    ) -> HistoryWindow:
+        """
+        Split one turn's history into a rolling summary and recent messages
 
-Lease Document Excerpts:
-{context_str}
+        Pass the result to reformulate_query and generate_chat_response so
+        both calls of the turn share one split point and one summary.
 
-My question: {message}"""
+        Args:
+            conversation_history: List of {"role": "user/assistant", "content": "..."}
+            max_history_turns: Recent turns kept verbatim (older turns are summarized)
 
-        messages.append({"role": "user", "content": user_content})
+        Returns:
+            HistoryWindow within the history token budget
+        """
+        return self.history_budget.fit(conversation_history, keep_turns=max_history_turns)
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=max_tokens,
-            temperature=0.1
-        )
-        return response.choices[0].message.content
+    @staticmethod
+    def _with_summary(system_prompt: str, window: HistoryWindow) -> str:
+        """Append the summary of older turns to a system prompt."""
+        if not window.summary:
+            return system_prompt
+        return f"{system_prompt}\n\nSummary of the earlier conversation:\n{window.summary}"
 
-    def _generate_chat_anthropic(
+    @traced("summarize")
+    def summarize_history(
         self,
-        message: str,
-        context_str: str,
-        history: List[Dict[str, str]],
-        max_tokens: int
+        previous_summary: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 300
     ) -> str:
-        """Generate chat response using Anthropic Claude"""
-        messages = []
+        """
+        Fold older conversation messages into a running summary
+
+        Args:
+            previous_summary: Summary of everything before `messages`
+            messages: Messages that just aged out of the verbatim window
+            max_tokens: Maximum tokens for the updated summary
 
-        # Add conversation history
-        for msg in history:
-            messages.append({"role": msg["role"], "content": msg["content"]})
+        Returns:
+            Updated summary string
+        """
+        transcript = "\n".join(f"{msg['role'].capitalize()}: {msg['content']}" for msg in messages)
+        prompt = f"""Current summary:
+{previous_summary or "(none)"}
+
+New messages:
+{transcript}
+
+Updated summary:"""
+
+        return self._complete(
+            "summarize", SUMMARY_SYSTEM_PROMPT, [{"role": "user", "content": prompt}], max_tokens
+        ).strip()
+
+    @staticmethod
+    def _chat_messages(message: str, context_str: str, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Conversation history followed by the current message with its context"""
+        messages = [{"role": msg["role"], "content": msg["content"]} for msg in history]
 
         # Add current message with context
         user_content = f"""Based on the following lease document excerpts, please answer my question.
@@ -249,20 +376,15 @@ Lease Document Excerpts:
 My question: {message}"""
 
         messages.append({"role": "user", "content": user_content})
+        return messages
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=max_tokens,
-            system=CHAT_SYSTEM_PROMPT,
-            messages=messages
-        )
-        return response.content[0].text
-
+    @traced("reformulate")
     def reformulate_query(
         self,
         message: str,
         conversation_history: List[Dict[str, str]],
-        max_tokens: int = 100
+        max_tokens: int = 100,
+        window: Optional[HistoryWindow] = None
     ) -> str:
         """
         Reformulate a vague follow-up question into a complete, standalone question
@@ -271,6 +393,7 @@ My question: {message}"""
             message: Current user message (may be vague like "what about per month?")
             conversation_history: Recent conversation history
             max_tokens: Maximum tokens for reformulation
+            window: This turn's fit_history() result (fitted here if None)
 
         Returns:
             Reformulated complete question that can be searched independently
@@ -278,12 +401,14 @@ My question: {message}"""
         if not conversation_history:
             return message
 
-        # Build recent history (last 2-3 turns)
-        recent_history = conversation_history[-(min(6, len(conversation_history))):]
+        # The turn's summary plus as many recent messages as a small token budget allows
+        window = (window or self.fit_history(conversation_history)).within(REFORMULATE_HISTORY_TOKENS)
         history_str = "\n".join([
-            f"{msg['role'].capitalize()}: {msg['content'][:200]}"
-            for msg in recent_history
+            f"{msg['role'].capitalize()}: {msg['content']}"
+            for msg in window.messages
         ])
+        if window.summary:
+            history_str = f"Earlier conversation (summary):\n{window.summary}\n\nRecent messages:\n{history_str}"
 
         prompt = f"""Given this conversation history, reformulate the user's latest message into a complete, standalone question that includes all necessary context (like tenant names, specific topics, etc.).
 
@@ -294,27 +419,9 @@ Latest User Message: {message}
 
 Reformulated Complete Question:"""
 
-        if self.provider == "openai":
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You reformulate vague follow-up questions into complete, searchable questions by adding context from conversation history. Output only the reformulated question, nothing else."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.1
-            )
-            reformulated = response.choices[0].message.content.strip()
-        else:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=max_tokens,
-                system="You reformulate vague follow-up questions into complete, searchable questions by adding context from conversation history. Output only the reformulated question, nothing else.",
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            reformulated = response.content[0].text.strip()
+        reformulated = self._complete(
+            "reformulate", REFORMULATE_SYSTEM_PROMPT, [{"role": "user", "content": prompt}], max_tokens
+        ).strip()
 
         return reformulated
 
@@ -353,7 +460,6 @@ Lease Information by Tenant:
 
 Please provide a clear comparison showing how each tenant's lease addresses this topic."""
 
-        if self.provider == "openai":
-            return self._generate_openai(user_prompt, max_tokens)
-        else:
-            return self._generate_anthropic(user_prompt, max_tokens)
+        return self._complete(
+            "comparison", SYSTEM_PROMPT, [{"role": "user", "content": user_prompt}], max_tokens
+        )
@@ -0,0 +1,214 @@
+"""
+Context packing for LLM prompts
+Merges split sections, removes overlap and near-duplicate excerpts, and
+fills a token budget by retrieval score
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config.settings import CONTEXT_TOKEN_BUDGET
+from ..memory.history_budget import count_tokens, truncate_tokens
+
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+@dataclass
+class PackedExcerpt:
+    """One excerpt in the packed prompt, possibly merged from several chunks"""
+    content: str
+    metadata: Dict[str, Any]
+    score: float
+    rank: int
+    parts: List[int] = field(default_factory=list)
+    tokens: int = 0
+
+
+@dataclass
+class PackedContext:
+    """Excerpts selected for the prompt plus packing statistics"""
+    excerpts: List[PackedExcerpt]
+    input_tokens: int = 0
+    output_tokens: int = 0
+    merged: int = 0
+    duplicates_removed: int = 0
+    dropped_for_budget: int = 0
+
+
+def _shingles(text: str, size: int) -> Set[int]:
+    """Hashed word shingles for near-duplicate detection"""
+    words = _WORD_PATTERN.findall(text.lower())
+    if not words:
+        return set()
+    grams = [" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))]
+    return {
+        int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "big")
+        for gram in grams
+    }
+
+
+def find_overlap(previous: str, following: str, max_chars: int = 4000, probe_chars: int = 32) -> int:
+    """
+    Length of the longest suffix of `previous` that starts `following`
+
+    Chunker carries the last chunk_overlap tokens of each part into the next,
+    so consecutive parts of a section share exactly such a span. Spans shorter
+    than `probe_chars` are ignored so coincidental matches are never trimmed.
+
+    Returns:
+        Number of leading characters of `following` already in `previous`
+    """
+    probe = following[:probe_chars]
+    if not probe:
+        return 0
+
+    window_start = max(0, len(previous) - max_chars)
+    position = previous.find(probe, window_start)
+    while position != -1:
+        tail = previous[position:]
+        if following.startswith(tail):
+            return len(tail)
+        position = previous.find(probe, position + 1)
+    return 0
+
+
+class ContextPacker:
+    """
+    Pack retrieved chunks into a token budget
+
+    - Adjacent parts of the same section are merged with their overlap removed
+    - Excerpts whose shingles are mostly covered by a higher-scored excerpt are dropped
+    - Remaining excerpts are added by score until the budget is full
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = CONTEXT_TOKEN_BUDGET,
+        duplicate_threshold: float = 0.8,
+        shingle_size: int = 5,
+        token_counter: Callable[[str], int] = count_tokens
+    ):
+        """
+        Initialize the context packer
+
+        Args:
+            max_tokens: Token budget for all excerpt text
+            duplicate_threshold: Fraction of an excerpt's shingles already present
+                in a kept excerpt at which it is dropped as a near-duplicate
+            shingle_size: Words per shingle
+            token_counter: Function counting tokens in a string
+        """
+        self.max_tokens = max_tokens
+        self.duplicate_threshold = duplicate_threshold
+        self.shingle_size = shingle_size
+        self.count_tokens = token_counter
+
+    def pack(
+        self,
+        contexts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        scores: Optional[List[float]] = None,
+        max_tokens: Optional[int] = None
+    ) -> PackedContext:
+        """
+        Select and merge excerpts for the prompt
+
+        Args:
+            contexts: Retrieved chunk texts, best first
+            metadatas: Optional metadata for each context
+            scores: Optional retrieval scores (defaults to rank order)
+            max_tokens: Override the token budget for this call
+
+        Returns:
+            PackedContext with excerpts in score order
+        """
+        budget = max_tokens if max_tokens is not None else self.max_tokens
+        metadatas = metadatas or []
+
+        excerpts = []
+        for i, content in enumerate(contexts):
+            meta = metadatas[i] if i < len(metadatas) and metadatas[i] else {}
+            score = scores[i] if scores and i < len(scores) else -float(i)
+            excerpts.append(PackedExcerpt(content=content, metadata=meta, score=score, rank=i, parts=[i]))
+
+        packed = PackedContext(excerpts=[])
+        packed.input_tokens = sum(self.count_tokens(e.content) for e in excerpts)
+
+        excerpts, packed.merged = self._merge_adjacent_parts(excerpts)
+        excerpts.sort(key=lambda e: (-e.score, e.rank))
+        excerpts, packed.duplicates_removed = self._remove_near_duplicates(excerpts)
+
+        used = 0
+        for excerpt in excerpts:
+            excerpt.tokens = self.count_tokens(excerpt.content)
+            if used + excerpt.tokens <= budget:
+                packed.excerpts.append(excerpt)
+                used += excerpt.tokens
+            elif not packed.excerpts and budget > 0:
+                # Never send an empty prompt because the best excerpt is too long
+                excerpt.content = truncate_tokens(excerpt.content, budget)
+                excerpt.tokens = self.count_tokens(excerpt.content)
+                packed.excerpts.append(excerpt)
+                used += excerpt.tokens
+            else:
+                packed.dropped_for_budget += 1
+
+        packed.output_tokens = used
+        return packed
+
+    def _merge_adjacent_parts(self, excerpts: List[PackedExcerpt]):
+        """Merge consecutive chunk_parts of one section into a single excerpt"""
+        groups: Dict[tuple, List[PackedExcerpt]] = {}
+        ungrouped = []
+        for excerpt in excerpts:
+            meta = excerpt.metadata
+            part = meta.get("chunk_part")
+            if part is None or not meta.get("section_name"):
+                ungrouped.append(excerpt)
+                continue
+            key = (meta.get("source_file"), meta.get("tenant_name"), meta.get("section_name"))
+            groups.setdefault(key, []).append(excerpt)
+
+        merged_count = 0
+        result = list(ungrouped)
+        for group in groups.values():
+            group.sort(key=lambda e: int(e.metadata["chunk_part"]))
+            current = group[0]
+            for following in group[1:]:
+                if int(following.metadata["chunk_part"]) == int(current.metadata["chunk_part"]) + 1:
+                    overlap = find_overlap(current.content, following.content)
+                    remainder = following.content[overlap:].lstrip("\n")
+                    current = PackedExcerpt(
+                        content=current.content + "\n\n" + remainder if remainder else current.content,
+                        metadata={**current.metadata, "chunk_part": following.metadata["chunk_part"]},
+                        score=max(current.score, following.score),
+                        rank=min(current.rank, following.rank),
+                        parts=current.parts + following.parts
+                    )
+                    merged_count += 1
+                else:
+                    result.append(current)
+                    current = following
+            result.append(current)
+
+        return result, merged_count
+
+    def _remove_near_duplicates(self, excerpts: List[PackedExcerpt]):
+        """Drop excerpts mostly contained in a higher-scored kept excerpt"""
+        kept = []
+        kept_shingles: List[Set[int]] = []
+        removed = 0
+        for excerpt in excerpts:
+            shingles = _shingles(excerpt.content, self.shingle_size)
+            if shingles and any(
+                len(shingles & other) / len(shingles) >= self.duplicate_threshold
+                for other in kept_shingles
+            ):
+                removed += 1
+                continue
+            kept.append(excerpt)
+            kept_shingles.append(shingles)
+        return kept, removed
@@ -1,5 +1,15 @@
 """Memory module for conversation tracking and context management."""
 
-from .conversation_memory import ConversationMemory, ConversationManager, ConversationTurn
+from .conversation_memory import (
+    ConversationMemory,
+    ConversationManager,
+    ConversationTurn,
+    SQLiteSessionBackend,
+    get_conversation_manager,
+)
+from .history_budget import HistoryWindow, TokenBudgetedHistory
 
-__all__ = ['ConversationMemory', 'ConversationManager', 'ConversationTurn']
+__all__ = [
+    'ConversationMemory', 'ConversationManager', 'ConversationTurn', 'SQLiteSessionBackend',
+    'get_conversation_manager', 'HistoryWindow', 'TokenBudgetedHistory'
+]
@@ -8,11 +8,19 @@ Features:
 - Conversation summarization
 """
 
-from typing import List, Dict, Optional, Any
-from datetime import datetime
-from collections import deque
+from typing import Callable, List, Dict, Optional, Any
+from datetime import datetime, timedelta
+from collections import OrderedDict, deque
+from functools import lru_cache
+from pathlib import Path
 import json
-import hashlib
+import sqlite3
+import threading
+import uuid
+
+from config.settings import (
+    CHAT_MAX_SESSIONS, CHAT_SESSION_MAX_TURNS, CHAT_SESSION_TTL_MINUTES, CHAT_SESSIONS_DB_PATH
+)
 
 
 class ConversationTurn:
@@ -33,6 +41,13 @@ class ConversationTurn:
             'timestamp': self.timestamp.isoformat()
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ConversationTurn':
+        """Rebuild a turn from its dictionary form."""
+        turn = cls(data['query'], data['response'], data.get('context'))
+        turn.timestamp = datetime.fromisoformat(data['timestamp'])
+        return turn
+
 
 class ConversationMemory:
     """
@@ -63,11 +78,14 @@ class ConversationMemory:
             'mentioned_dates': []
         }
         self.session_start = datetime.now()
+        self.last_activity = self.session_start
+
+        # Called with this memory whenever it changes (set by ConversationManager)
+        self.on_change: Optional[Callable[['ConversationMemory'], None]] = None
 
     def _generate_session_id(self) -> str:
-        """Generate unique session ID."""
-        timestamp = datetime.now().isoformat()
-        return hashlib.md5(timestamp.encode()).hexdigest()[:8]
+        """Generate an unguessable session ID (clients send it back to resume the chat)."""
+        return uuid.uuid4().hex
 
     def add_turn(self, query: str, response: str, context: Dict[str, Any] = None):
         """
@@ -83,6 +101,21 @@ class ConversationMemory:
 
         # Update active context based on the query
         self._update_context(query, context)
+        self._changed()
+
+    def touch(self):
+        """Mark the session as active now."""
+        self.last_activity = datetime.now()
+
+    def idle_seconds(self, now: datetime = None) -> float:
+        """Seconds since the last activity on this session."""
+        return ((now or datetime.now()) - self.last_activity).total_seconds()
+
+    def _changed(self):
+        """Record activity and notify the owning manager, if any."""
+        self.touch()
+        if self.on_change:
+            self.on_change(self)
 
     def _update_context(self, query: str, context: Dict[str, Any]):
         """Update active context based on query content."""
@@ -118,6 +151,14 @@ class ConversationMemory:
         recent = list(self.history)[-count:]
         return [turn.to_dict() for turn in recent]
 
+    def get_messages(self) -> List[Dict[str, str]]:
+        """History as {"role", "content"} messages, the form QueryEngine.chat takes."""
+        messages = []
+        for turn in self.history:
+            messages.append({"role": "user", "content": turn.query})
+            messages.append({"role": "assistant", "content": turn.response})
+        return messages
+
     def get_conversation_context(self) -> str:
         """
         Build a formatted context string for the LLM.
@@ -154,10 +195,12 @@ class ConversationMemory:
         """Set active tenant context."""
         self.active_context['tenant'] = tenant_name
         self.active_context['mentioned_tenants'].add(tenant_name)
+        self._changed()
 
     def clear_active_tenant(self):
         """Clear active tenant context."""
         self.active_context['tenant'] = None
+        self._changed()
 
     def get_mentioned_tenants(self) -> List[str]:
         """Get all tenants mentioned in this conversation."""
@@ -221,7 +264,7 @@ class ConversationMemory:
         return {
             'session_id': self.session_id,
             'turn_count': len(self.history),
-            'duration_minutes': (datetime.now() - self.session_start).seconds / 60,
+            'duration_minutes': (datetime.now() - self.session_start).total_seconds() / 60,
             'tenants_discussed': list(self.active_context['mentioned_tenants']),
             'topics': self._extract_topics(),
             'session_start': self.session_start.isoformat()
@@ -249,6 +292,33 @@ class ConversationMemory:
         }
         return json.dumps(data, indent=2)
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the full session state for a session backend."""
+        return {
+            'session_id': self.session_id,
+            'max_history': self.max_history,
+            'session_start': self.session_start.isoformat(),
+            'last_activity': self.last_activity.isoformat(),
+            'history': [turn.to_dict() for turn in self.history],
+            'active_context': {
+                **self.active_context,
+                'mentioned_tenants': sorted(self.active_context['mentioned_tenants'])
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ConversationMemory':
+        """Rebuild a session from `to_dict` output."""
+        memory = cls(max_history=data.get('max_history', 10))
+        memory.session_id = data['session_id']
+        memory.session_start = datetime.fromisoformat(data['session_start'])
+        memory.last_activity = datetime.fromisoformat(data['last_activity'])
+        memory.history.extend(ConversationTurn.from_dict(turn) for turn in data.get('history', []))
+        context = data.get('active_context', {})
+        memory.active_context.update(context)
+        memory.active_context['mentioned_tenants'] = set(context.get('mentioned_tenants', []))
+        return memory
+
     def clear(self):
         """Clear conversation history and reset context."""
         self.history.clear()
@@ -259,65 +329,327 @@ class ConversationMemory:
             'mentioned_tenants': set(),
             'mentioned_dates': []
         }
+        self._changed()
 
     def __len__(self) -> int:
         """Return number of turns in history."""
         return len(self.history)
 
 
+class SQLiteSessionBackend:
+    """
+    SQLite session store shared by every process that opens the same file.
+
+    Sessions are stored as JSON alongside their last-activity time so idle
+    sessions can be expired with a single indexed delete.
+    """
+
+    def __init__(self, db_path: str = "data/sessions.db"):
+        """
+        Initialize the session backend.
+
+        Args:
+            db_path: Path to the SQLite file (":memory:" for a private store)
+        """
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            if db_path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_sessions (
+                    session_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    last_activity REAL NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_sessions_activity "
+                "ON conversation_sessions(last_activity)"
+            )
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Load a serialized session, or None if it is not stored."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT data FROM conversation_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, memory: ConversationMemory):
+        """Insert or replace a session."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO conversation_sessions (session_id, data, last_activity) "
+                "VALUES (?, ?, ?)",
+                (memory.session_id, json.dumps(memory.to_dict()), memory.last_activity.timestamp())
+            )
+
+    def touch(self, session_id: str, last_activity: datetime):
+        """Update a session's last-activity time without rewriting it."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE conversation_sessions SET last_activity = ? WHERE session_id = ?",
+                (last_activity.timestamp(), session_id)
+            )
+
+    def delete(self, session_id: str):
+        """Remove a session."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM conversation_sessions WHERE session_id = ?", (session_id,))
+
+    def delete_idle(self, before: datetime) -> int:
+        """Remove sessions with no activity since `before`. Returns rows deleted."""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM conversation_sessions WHERE last_activity < ?", (before.timestamp(),)
+            )
+        return cursor.rowcount
+
+    def session_ids(self, active_since: datetime = None) -> List[str]:
+        """IDs of stored sessions, optionally only those active since a time."""
+        since = active_since.timestamp() if active_since else float('-inf')
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT session_id FROM conversation_sessions WHERE last_activity >= ? "
+                "ORDER BY last_activity",
+                (since,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
 class ConversationManager:
     """
     Manages multiple conversation sessions.
 
     Useful for web applications handling multiple concurrent users.
+
+    Sessions are kept in an OrderedDict ordered by last activity, so the
+    least recently used session is always at the front. That gives:
+    - Lazy idle-TTL expiry: every access pops expired sessions off the front
+    - A hard max_sessions cap: the LRU session is evicted on overflow
+    - Optional persistence: with a backend, changes are written through and
+      sessions evicted from memory can be reloaded by any worker
     """
 
-    def __init__(self):
-        """Initialize conversation manager."""
-        self.sessions = {}
+    # Minimum seconds between idle sweeps of the backend
+    BACKEND_SWEEP_INTERVAL = 60
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        idle_ttl_minutes: float = 60,
+        max_history: int = 10,
+        backend: Optional[SQLiteSessionBackend] = None
+    ):
+        """
+        Initialize conversation manager.
+
+        Args:
+            max_sessions: Maximum sessions held in memory
+            idle_ttl_minutes: Sessions idle longer than this are expired
+            max_history: Turns kept per session
+            backend: Optional persistent session store
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl = timedelta(minutes=idle_ttl_minutes)
+        self.max_history = max_history
+        self.backend = backend
+        self.sessions: 'OrderedDict[str, ConversationMemory]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._last_backend_sweep = datetime.min
+
+    def __len__(self) -> int:
+        """Return number of sessions held in memory."""
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get_session(session_id) is not None
+
+    # ==================== Internal ====================
+
+    def _is_expired(self, memory: ConversationMemory, now: datetime) -> bool:
+        return now - memory.last_activity > self.idle_ttl
+
+    def _pop_idle(self, cutoff: datetime) -> int:
+        """Pop sessions idle since before cutoff off the LRU end."""
+        removed = 0
+        while self.sessions:
+            memory = next(iter(self.sessions.values()))
+            if memory.last_activity >= cutoff:
+                break
+            self.sessions.popitem(last=False)
+            memory.on_change = None
+            removed += 1
+        return removed
+
+    def _expire_idle(self, now: datetime):
+        """Lazy expiry run on every access. Amortized O(1) in memory."""
+        self._pop_idle(now - self.idle_ttl)
+
+        if self.backend and (now - self._last_backend_sweep).total_seconds() >= self.BACKEND_SWEEP_INTERVAL:
+            self._last_backend_sweep = now
+            self.backend.delete_idle(now - self.idle_ttl)
+
+    def _evict_overflow(self):
+        """Drop least recently used sessions beyond max_sessions."""
+        while len(self.sessions) > self.max_sessions:
+            _, memory = self.sessions.popitem(last=False)
+            memory.on_change = None
+
+    def _register(self, memory: ConversationMemory):
+        """Start tracking a session as the most recently used."""
+        memory.on_change = self._on_session_change
+        self.sessions[memory.session_id] = memory
+        self.sessions.move_to_end(memory.session_id)
+        self._evict_overflow()
+
+    def _on_session_change(self, memory: ConversationMemory):
+        """Keep LRU order and the backend in sync with a changed session."""
+        with self._lock:
+            if memory.session_id in self.sessions:
+                self.sessions.move_to_end(memory.session_id)
+            if self.backend:
+                self.backend.save(memory)
+
+    # ==================== Sessions ====================
 
     def get_or_create_session(self, session_id: str = None) -> ConversationMemory:
         """
         Get existing session or create new one.
 
         Args:
-            session_id: Optional session ID. If None, creates new session.
+            session_id: Optional session ID. If None, unknown or expired,
+                creates new session.
 
         Returns:
             ConversationMemory instance
         """
-        if session_id and session_id in self.sessions:
-            return self.sessions[session_id]
-
-        # Create new session
-        memory = ConversationMemory()
-        self.sessions[memory.session_id] = memory
-        return memory
+        with self._lock:
+            if session_id:
+                memory = self.get_session(session_id)
+                if memory is not None:
+                    return memory
+
+            # Create new session
+            memory = ConversationMemory(max_history=self.max_history)
+            self._register(memory)
+            if self.backend:
+                self.backend.save(memory)
+            return memory
+
+    def create_session(self) -> str:
+        """Create a new session and return its ID."""
+        return self.get_or_create_session().session_id
 
     def get_session(self, session_id: str) -> Optional[ConversationMemory]:
-        """Get existing session by ID."""
-        return self.sessions.get(session_id)
+        """
+        Get existing session by ID, marking it as recently used.
+
+        Returns None if the session is unknown or has been idle past the TTL.
+        """
+        with self._lock:
+            now = datetime.now()
+            self._expire_idle(now)
+
+            memory = self.sessions.get(session_id)
+            if self.backend:
+                # The backend is the source of truth; another worker may have
+                # created or updated this session since we last saw it
+                data = self.backend.load(session_id)
+                if data is None:
+                    if memory is not None:
+                        self.sessions.pop(session_id).on_change = None
+                    return None
+                stored = ConversationMemory.from_dict(data)
+                if self._is_expired(stored, now):
+                    self.delete_session(session_id)
+                    return None
+                if memory is None or stored.last_activity > memory.last_activity:
+                    if memory is not None:
+                        memory.on_change = None
+                    memory = stored
+                    self._register(memory)
+
+            if memory is None:
+                return None
+
+            memory.touch()
+            self.sessions.move_to_end(session_id)
+            if self.backend:
+                self.backend.touch(session_id, memory.last_activity)
+            return memory
+
+    def add_turn(self, session_id: str, query: str, response: str, context: Dict[str, Any] = None):
+        """
+        Add a conversation turn to a session.
+
+        Raises:
+            KeyError: If the session is unknown or expired
+        """
+        memory = self.get_session(session_id)
+        if memory is None:
+            raise KeyError(f"Unknown or expired session: {session_id}")
+        memory.add_turn(query, response, context)
 
     def delete_session(self, session_id: str):
         """Delete a session."""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        with self._lock:
+            memory = self.sessions.pop(session_id, None)
+            if memory is not None:
+                memory.on_change = None
+            if self.backend:
+                self.backend.delete(session_id)
 
     def get_active_sessions(self) -> List[str]:
-        """Get list of active session IDs."""
-        return list(self.sessions.keys())
-
-    def cleanup_old_sessions(self, max_age_minutes: int = 60):
-        """Remove sessions older than specified age."""
-        now = datetime.now()
-        to_remove = []
+        """Get list of active session IDs, least recently used first."""
+        with self._lock:
+            now = datetime.now()
+            self._expire_idle(now)
+            session_ids = list(self.sessions.keys())
+            if self.backend:
+                in_memory = set(session_ids)
+                stored = self.backend.session_ids(active_since=now - self.idle_ttl)
+                session_ids = [sid for sid in stored if sid not in in_memory] + session_ids
+            return session_ids
+
+    def cleanup_old_sessions(self, max_age_minutes: float = None) -> int:
+        """
+        Remove sessions idle longer than specified age.
 
-        for session_id, memory in self.sessions.items():
-            age_minutes = (now - memory.session_start).seconds / 60
-            if age_minutes > max_age_minutes:
-                to_remove.append(session_id)
+        Expiry already happens lazily on access; this forces a sweep.
 
-        for session_id in to_remove:
-            del self.sessions[session_id]
+        Args:
+            max_age_minutes: Idle limit, defaults to the manager's TTL
 
-        return len(to_remove)
+        Returns:
+            Number of sessions removed
+        """
+        with self._lock:
+            cutoff = datetime.now() - (
+                timedelta(minutes=max_age_minutes) if max_age_minutes is not None else self.idle_ttl
+            )
+            removed = self._pop_idle(cutoff)
+
+            # Every in-memory session is also stored, so the backend count is the total
+            if self.backend:
+                removed = self.backend.delete_idle(cutoff)
+            return removed
+
+
+@lru_cache(maxsize=1)
+def get_conversation_manager() -> ConversationManager:
+    """Process-wide chat sessions, stored in CHAT_SESSIONS_DB_PATH so restarts and other workers see them"""
+    return ConversationManager(
+        max_sessions=CHAT_MAX_SESSIONS,
+        idle_ttl_minutes=CHAT_SESSION_TTL_MINUTES,
+        max_history=CHAT_SESSION_MAX_TURNS,
+        backend=SQLiteSessionBackend(str(CHAT_SESSIONS_DB_PATH))
+    )
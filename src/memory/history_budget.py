@@ -0,0 +1,229 @@
+"""
+Token-budgeted conversation history for LLM calls.
+
+Keeps the most recent turns verbatim and folds older turns into a rolling
+summary, so the history sent with each call stays under a fixed token
+budget no matter how long the chat runs.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+import hashlib
+
+import tiktoken
+
+from config.settings import HISTORY_TOKEN_BUDGET, HISTORY_KEEP_TURNS, HISTORY_SUMMARY_TOKENS
+
+
+# summarizer(previous_summary, new_messages, max_tokens) -> updated summary
+Summarizer = Callable[[str, List[Dict[str, str]], int], str]
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> tiktoken.Encoding:
+    """Load the cl100k_base encoding on first use rather than at import."""
+    return tiktoken.get_encoding("cl100k_base")
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Count cl100k_base tokens, cached since history messages repeat every turn."""
+    return len(get_tokenizer().encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Truncate text to at most max_tokens tokens."""
+    tokens = get_tokenizer().encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return get_tokenizer().decode(tokens[:max_tokens])
+
+
+def _message_tokens(message: Dict[str, str]) -> int:
+    # Roles and message framing cost a few tokens on top of the content
+    return count_tokens(message["content"]) + 4
+
+
+@dataclass
+class HistoryWindow:
+    """History that fits the budget: a summary of older turns plus recent messages."""
+    summary: str
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    tokens: int = 0
+    summarized_messages: int = 0
+
+    def within(self, max_tokens: int) -> "HistoryWindow":
+        """
+        The same summary with only the newest messages that fit max_tokens
+
+        A smaller call on the same turn (e.g. query reformulation) narrows the
+        turn's window instead of fitting the history again: a second split
+        point would be a second conversation prefix, and a second summary.
+        """
+        summary = TokenBudgetedHistory._trim_summary(self.summary, max_tokens // 2) if self.summary else ""
+        summary_tokens = count_tokens(summary) if summary else 0
+        messages = list(self.messages)
+        recent_tokens = sum(_message_tokens(m) for m in messages)
+
+        while len(messages) > 1 and summary_tokens + recent_tokens > max_tokens:
+            recent_tokens -= _message_tokens(messages.pop(0))
+        if messages and summary_tokens + recent_tokens > max_tokens:
+            last = messages[-1]
+            allowed = max(0, max_tokens - summary_tokens - 4)
+            messages[-1] = {**last, "content": truncate_tokens(last["content"], allowed)}
+            recent_tokens = _message_tokens(messages[-1])
+
+        return HistoryWindow(
+            summary=summary,
+            messages=messages,
+            tokens=summary_tokens + recent_tokens,
+            summarized_messages=self.summarized_messages
+        )
+
+
+class TokenBudgetedHistory:
+    """
+    Fit conversation history into a token budget.
+
+    Summaries are cached by a hash of the conversation prefix they cover, so
+    each new turn only folds the newly aged-out messages into the previous
+    summary. Conversations sharing one instance never see each other's
+    summaries, and a cleared chat simply starts a new prefix.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = HISTORY_TOKEN_BUDGET,
+        keep_turns: int = HISTORY_KEEP_TURNS,
+        summary_tokens: int = HISTORY_SUMMARY_TOKENS,
+        summarizer: Optional[Summarizer] = None,
+        cache_size: int = 256
+    ):
+        """
+        Initialize the history budget
+
+        Args:
+            max_tokens: Max tokens for summary plus recent messages
+            keep_turns: Most recent user/assistant turns kept verbatim
+            summary_tokens: Max tokens for the rolling summary
+            summarizer: LLM callback that folds messages into a summary;
+                without one, an extractive summary of the user's questions is kept
+            cache_size: Number of conversation prefixes to keep summaries for
+        """
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.cache_size = cache_size
+        self._summaries: 'OrderedDict[str, str]' = OrderedDict()
+
+    def fit(
+        self,
+        conversation_history: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        keep_turns: Optional[int] = None
+    ) -> HistoryWindow:
+        """
+        Split history into a rolling summary and verbatim recent messages
+
+        Args:
+            conversation_history: List of {"role": "user/assistant", "content": "..."}
+            max_tokens: Override the token budget for this call
+            keep_turns: Override the number of verbatim turns for this call
+
+        Returns:
+            HistoryWindow whose summary and messages fit the budget
+        """
+        budget = max_tokens if max_tokens is not None else self.max_tokens
+        keep = (keep_turns if keep_turns is not None else self.keep_turns) * 2
+
+        history = list(conversation_history)
+        split = max(0, len(history) - keep)
+        recent = history[split:]
+
+        summary_reserve = min(self.summary_tokens, budget // 2)
+        recent_tokens = sum(_message_tokens(m) for m in recent)
+
+        def reserve() -> int:
+            return summary_reserve if split else 0
+
+        # Age out whole messages until the recent window fits
+        while len(recent) > 1 and recent_tokens + reserve() > budget:
+            recent_tokens -= _message_tokens(recent.pop(0))
+            split += 1
+
+        # Anthropic requires the message list to start with a user turn
+        while recent and recent[0]["role"] != "user":
+            recent_tokens -= _message_tokens(recent.pop(0))
+            split += 1
+
+        # A single oversized message is truncated rather than dropped
+        if recent and recent_tokens + reserve() > budget:
+            last = recent[-1]
+            allowed = max(0, budget - reserve() - 4)
+            recent[-1] = {**last, "content": truncate_tokens(last["content"], allowed)}
+            recent_tokens = _message_tokens(recent[-1])
+
+        summary = self._summarize(history[:split], summary_reserve) if split else ""
+        return HistoryWindow(
+            summary=summary,
+            messages=recent,
+            tokens=recent_tokens + (count_tokens(summary) if summary else 0),
+            summarized_messages=split
+        )
+
+    def _summarize(self, older: List[Dict[str, str]], max_tokens: int) -> str:
+        """Summary of `older`, extending the longest cached prefix summary."""
+        prefix_hashes = [""]
+        for message in older:
+            digest = hashlib.sha1(
+                f"{prefix_hashes[-1]}\x00{message['role']}\x00{message['content']}".encode()
+            ).hexdigest()
+            prefix_hashes.append(digest)
+
+        start, summary = 0, ""
+        for i in range(len(older), 0, -1):
+            cached = self._summaries.get(prefix_hashes[i])
+            if cached is not None:
+                start, summary = i, cached
+                self._summaries.move_to_end(prefix_hashes[i])
+                break
+
+        if start == len(older):
+            return summary
+
+        new_messages = older[start:]
+        if self.summarizer:
+            try:
+                summary = self.summarizer(summary, new_messages, max_tokens)
+            except Exception:
+                summary = self._extractive_summary(summary, new_messages)
+        else:
+            summary = self._extractive_summary(summary, new_messages)
+        summary = self._trim_summary(summary, max_tokens)
+
+        self._summaries[prefix_hashes[-1]] = summary
+        while len(self._summaries) > self.cache_size:
+            self._summaries.popitem(last=False)
+        return summary
+
+    @staticmethod
+    def _extractive_summary(previous: str, messages: List[Dict[str, str]]) -> str:
+        """Fallback summary listing the user's earlier questions."""
+        lines = previous.splitlines() if previous else []
+        for message in messages:
+            if message["role"] == "user":
+                lines.append(f"- User asked: {truncate_tokens(message['content'], 40)}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _trim_summary(summary: str, max_tokens: int) -> str:
+        """Keep the newest summary lines that fit max_tokens."""
+        if count_tokens(summary) <= max_tokens:
+            return summary
+        lines = summary.splitlines()
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+            lines.pop(0)
+        return truncate_tokens("\n".join(lines), max_tokens)
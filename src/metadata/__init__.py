@@ -1,3 +1,3 @@
-from .extractor import MetadataExtractor
+from .extractor import ExtractionRule, MetadataExtractor, RuleScanner
 
-__all__ = ["MetadataExtractor"]
+__all__ = ["ExtractionRule", "MetadataExtractor", "RuleScanner"]
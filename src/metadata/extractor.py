@@ -3,12 +3,111 @@ Metadata extraction for lease documents
 Extracts structured data like tenant names, dates, rent amounts, etc.
 """
 
+import os
 import re
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, Optional, List, Sequence
 from datetime import datetime
 
-from ..parsing.docx_parser import ParsedDocument
+if TYPE_CHECKING:
+    from ..parsing.docx_parser import ParsedDocument
+
+
+# ==================== Rule Engine ====================
+
+@dataclass(frozen=True)
+class ExtractionRule:
+    """A named pattern whose first group (if any) is the extracted value"""
+    name: str
+    pattern: str
+    flags: int = 0
+    lead: str = ""  # character-class body every match starts with, e.g. r'\d'
+
+
+@dataclass
+class RuleMatch:
+    """One rule hit in a scanned text"""
+    rule: str
+    start: int
+    end: int
+    text: str
+    value: str
+
+
+@dataclass
+class FieldSpan:
+    """Character offsets in ParsedDocument.full_text that a field was read from"""
+    start: int
+    end: int
+    text: str
+    source: str  # "data_sheet" or the rule that matched
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start, "end": self.end, "text": self.text, "source": self.source}
+
+
+class RuleScanner:
+    """
+    Compile several extraction rules into a single alternation
+
+    The text is scanned once; each stretch of text is claimed by the leftmost
+    rule that matches it (ties go to the earlier rule in the list). When every
+    rule declares its lead characters, the alternation is guarded by a
+    lookahead so positions that cannot start any rule are skipped cheaply.
+    """
+
+    def __init__(self, rules: Sequence[ExtractionRule]):
+        self.rules = list(rules)
+        parts = []
+        self._value_groups: Dict[str, Optional[int]] = {}
+        group_index = 1
+        for rule in self.rules:
+            compiled = re.compile(rule.pattern, rule.flags)
+            body = f"(?i:{rule.pattern})" if rule.flags & re.IGNORECASE else rule.pattern
+            parts.append(f"(?P<{rule.name}>{body})")
+            self._value_groups[rule.name] = group_index + 1 if compiled.groups else None
+            group_index += compiled.groups + 1
+        pattern = "|".join(parts)
+        if all(rule.lead for rule in self.rules):
+            pattern = f"(?=[{''.join(rule.lead for rule in self.rules)}])(?:{pattern})"
+        self.pattern = re.compile(pattern)
+
+    def scan(self, text: str) -> Iterator[RuleMatch]:
+        """Yield every rule match in text, in order"""
+        for match in self.pattern.finditer(text):
+            rule = match.lastgroup
+            value_group = self._value_groups[rule]
+            yield RuleMatch(
+                rule=rule,
+                start=match.start(),
+                end=match.end(),
+                text=match.group(),
+                value=match.group(value_group) if value_group else match.group()
+            )
+
+
+DEFAULT_RULES = [
+    ExtractionRule(
+        "sqft", r'(\d{1,3}(?:,\d{3})*)\s*(?:square\s*feet|sq\.?\s*ft\.?|SF)', re.IGNORECASE, lead=r'\d'
+    ),
+    ExtractionRule("percentage", r'(\d+(?:\.\d+)?)\s*%', lead=r'\d'),
+    ExtractionRule("term", r'(\d+)\s*(?:year|yr)s?\s*(?:term|lease)?', re.IGNORECASE, lead=r'\d'),
+    ExtractionRule("currency", r'\$\s*([\d,]+(?:\.\d{2})?)', lead=r'$'),
+    ExtractionRule(
+        "date",
+        r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+        r'\s+\d{1,2},?\s+\d{4}',
+        re.IGNORECASE,
+        lead='ADFJMNOSadfjmnos'
+    ),
+]
+
+# Shared by every extractor (and every worker process) in this interpreter
+DEFAULT_SCANNER = RuleScanner(DEFAULT_RULES)
+
+# Below this much document text a process pool costs more than it saves
+PARALLEL_MIN_CHARS = 1_000_000
 
 
 @dataclass
@@ -28,6 +127,7 @@ class LeaseMetadata:
     permitted_use: str = ""
     execution_date: Optional[str] = None
     source_file: str = ""
+    spans: Dict[str, FieldSpan] = field(default_factory=dict)  # field -> where it came from
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for storage"""
@@ -45,36 +145,37 @@ class LeaseMetadata:
             "security_deposit": self.security_deposit,
             "permitted_use": self.permitted_use,
             "execution_date": self.execution_date,
-            "source_file": self.source_file
+            "source_file": self.source_file,
+            "spans": {name: span.to_dict() for name, span in self.spans.items()}
         }
 
 
 class MetadataExtractor:
     """Extract structured metadata from lease documents"""
 
-    def __init__(self):
-        # Patterns for extracting data
-        self.sqft_pattern = re.compile(
-            r'(\d{1,3}(?:,\d{3})*)\s*(?:square\s*feet|sq\.?\s*ft\.?|SF)',
-            re.IGNORECASE
-        )
-        self.currency_pattern = re.compile(
-            r'\$\s*([\d,]+(?:\.\d{2})?)'
-        )
-        self.percentage_pattern = re.compile(
-            r'(\d+(?:\.\d+)?)\s*%'
-        )
-        self.term_pattern = re.compile(
-            r'(\d+)\s*(?:year|yr)s?\s*(?:term|lease)?',
-            re.IGNORECASE
-        )
-        self.date_pattern = re.compile(
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
-            r'\s+\d{1,2},?\s+\d{4}',
-            re.IGNORECASE
-        )
+    def __init__(self, scanner: Optional[RuleScanner] = None):
+        """
+        Initialize the extractor
 
-    def extract(self, doc: ParsedDocument) -> LeaseMetadata:
+        Args:
+            scanner: Compiled rule engine for document text (defaults to DEFAULT_SCANNER)
+        """
+        self.scanner = scanner or DEFAULT_SCANNER
+
+        # The square-footage fallback only needs its own rule; scanning with
+        # every rule would cost several times as much for matches nobody reads
+        sqft_rules = [rule for rule in self.scanner.rules if rule.name == "sqft"]
+        self.sqft_scanner = RuleScanner(sqft_rules) if sqft_rules else None
+
+        # Single-rule patterns for parsing short data sheet values
+        rules = {rule.name: re.compile(rule.pattern, rule.flags) for rule in DEFAULT_RULES}
+        self.sqft_pattern = rules["sqft"]
+        self.currency_pattern = rules["currency"]
+        self.percentage_pattern = rules["percentage"]
+        self.term_pattern = rules["term"]
+        self.date_pattern = rules["date"]
+
+    def extract(self, doc: "ParsedDocument") -> LeaseMetadata:
         """
         Extract metadata from a parsed document
 
@@ -82,7 +183,7 @@ class MetadataExtractor:
             doc: ParsedDocument to extract from
 
         Returns:
-            LeaseMetadata with extracted values
+            LeaseMetadata with extracted values and the spans they came from
         """
         # Start with values from data sheet
         data_sheet = doc.data_sheet
@@ -92,42 +193,54 @@ class MetadataExtractor:
             source_file=doc.file_name
         )
 
+        def from_data_sheet(field_name: str, keys: List[str]) -> str:
+            value = self._get_value(data_sheet, keys)
+            if value:
+                span = self._locate(doc.full_text, value)
+                if span:
+                    metadata.spans[field_name] = span
+            return value
+
         # Extract from data sheet
-        metadata.tenant_trade_name = self._get_value(
-            data_sheet, ["trade_name", "tenant_trade_name", "dba"]
+        metadata.tenant_trade_name = from_data_sheet(
+            "tenant_trade_name", ["trade_name", "tenant_trade_name", "dba"]
         )
-        metadata.landlord_name = self._get_value(
-            data_sheet, ["landlord", "landlord_name"]
+        metadata.landlord_name = from_data_sheet(
+            "landlord_name", ["landlord", "landlord_name"]
         )
-        metadata.permitted_use = self._get_value(
-            data_sheet, ["permitted_use", "use", "permitted_uses"]
+        metadata.permitted_use = from_data_sheet(
+            "permitted_use", ["permitted_use", "use", "permitted_uses"]
         )
 
         # Extract square footage
-        sqft_str = self._get_value(
-            data_sheet, ["gla", "square_feet", "sqft", "premises_area", "rentable_area"]
+        sqft_str = from_data_sheet(
+            "premises_sqft", ["gla", "square_feet", "sqft", "premises_area", "rentable_area"]
         )
         if sqft_str:
             metadata.premises_sqft = self._parse_sqft(sqft_str)
-        else:
-            metadata.premises_sqft = self._extract_sqft_from_text(doc.full_text)
+        elif self.sqft_scanner is not None:
+            # Only scan the text when the data sheet has no area
+            match = self._sqft_from_matches(self.sqft_scanner.scan(doc.full_text))
+            if match:
+                metadata.premises_sqft = int(match.value.replace(",", ""))
+                metadata.spans["premises_sqft"] = FieldSpan(match.start, match.end, match.text, match.rule)
 
         # Extract lease term
-        term_str = self._get_value(
-            data_sheet, ["original_term", "term", "lease_term"]
+        term_str = from_data_sheet(
+            "lease_term_years", ["original_term", "term", "lease_term"]
         )
         if term_str:
             metadata.lease_term_years = self._parse_term(term_str)
 
         # Extract rent amounts
-        rent_str = self._get_value(
-            data_sheet, ["annual_minimum_rent", "year_1_rent", "annual_rent"]
+        rent_str = from_data_sheet(
+            "year1_annual_rent", ["annual_minimum_rent", "year_1_rent", "annual_rent"]
         )
         if rent_str:
             metadata.year1_annual_rent = self._parse_currency(rent_str)
 
-        monthly_rent_str = self._get_value(
-            data_sheet, ["monthly_minimum_rent", "monthly_rent"]
+        monthly_rent_str = from_data_sheet(
+            "year1_monthly_rent", ["monthly_minimum_rent", "monthly_rent"]
         )
         if monthly_rent_str:
             metadata.year1_monthly_rent = self._parse_currency(monthly_rent_str)
@@ -135,28 +248,28 @@ class MetadataExtractor:
             metadata.year1_monthly_rent = metadata.year1_annual_rent / 12
 
         # Extract percentage rent
-        pct_rent_str = self._get_value(
-            data_sheet, ["percentage_rent", "percentage_rent_rate", "percentage"]
+        pct_rent_str = from_data_sheet(
+            "percentage_rent_rate", ["percentage_rent", "percentage_rent_rate", "percentage"]
         )
         if pct_rent_str:
             metadata.percentage_rent_rate = self._parse_percentage(pct_rent_str)
 
         # Extract security deposit
-        deposit_str = self._get_value(
-            data_sheet, ["security_deposit", "deposit"]
+        deposit_str = from_data_sheet(
+            "security_deposit", ["security_deposit", "deposit"]
         )
         if deposit_str:
             metadata.security_deposit = self._parse_currency(deposit_str)
 
         # Extract dates
-        comm_date = self._get_value(
-            data_sheet, ["commencement_date", "lease_commencement", "start_date"]
+        comm_date = from_data_sheet(
+            "commencement_date", ["commencement_date", "lease_commencement", "start_date"]
         )
         if comm_date:
             metadata.commencement_date = comm_date
 
-        exp_date = self._get_value(
-            data_sheet, ["expiration_date", "lease_expiration", "end_date"]
+        exp_date = from_data_sheet(
+            "expiration_date", ["expiration_date", "lease_expiration", "end_date"]
         )
         if exp_date:
             metadata.expiration_date = exp_date
@@ -166,6 +279,51 @@ class MetadataExtractor:
 
         return metadata
 
+    def extract_many(
+        self,
+        documents: Sequence["ParsedDocument"],
+        workers: Optional[int] = None,
+        chunksize: int = 2
+    ) -> List[LeaseMetadata]:
+        """
+        Extract metadata from many documents, in worker processes for large batches
+
+        Args:
+            documents: ParsedDocuments to extract from
+            workers: Worker processes (None = CPU count, 1 = run in-process)
+            chunksize: Documents handed to a worker at a time
+
+        Returns:
+            LeaseMetadata objects in input order
+        """
+        documents = list(documents)
+        workers = workers or os.cpu_count() or 1
+        total_chars = sum(len(doc.full_text) for doc in documents)
+        if workers == 1 or len(documents) < 2 or total_chars < PARALLEL_MIN_CHARS:
+            return [self.extract(doc) for doc in documents]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_extract_worker, documents, chunksize=chunksize))
+
+    def _locate(self, text: str, value: str) -> Optional[FieldSpan]:
+        """Find where a data sheet value appears in the document text"""
+        start = text.find(value)
+        if start < 0:
+            return None
+        return FieldSpan(start, start + len(value), value, "data_sheet")
+
+    def _sqft_from_matches(self, matches: Iterable[RuleMatch]) -> Optional[RuleMatch]:
+        """Pick the premises area from scanned square-footage matches"""
+        # Filter to reasonable range; usually the smallest is the actual premises
+        best = None
+        for match in matches:
+            if match.rule != "sqft":
+                continue
+            value = int(match.value.replace(",", ""))
+            if 100 < value < 100000 and (best is None or value < int(best.value.replace(",", ""))):
+                best = match
+        return best
+
     def _get_value(self, data: Dict[str, Any], keys: List[str]) -> str:
         """Get value from dict trying multiple keys"""
         for key in keys:
@@ -199,27 +357,6 @@ class MetadataExtractor:
 
         return None
 
-    def _extract_sqft_from_text(self, text: str) -> Optional[int]:
-        """Extract square footage from document text"""
-        # Look for patterns like "1,167 square feet" or "1167 SF"
-        matches = self.sqft_pattern.findall(text)
-        if matches:
-            # Return the most common value or first one
-            sqft_values = []
-            for match in matches:
-                try:
-                    sqft_values.append(int(match.replace(",", "")))
-                except ValueError:
-                    pass
-
-            if sqft_values:
-                # Filter to reasonable range
-                valid = [v for v in sqft_values if 100 < v < 100000]
-                if valid:
-                    return min(valid)  # Usually the smallest is the actual premises
-
-        return None
-
     def _parse_term(self, text: str) -> Optional[int]:
         """Parse lease term in years"""
         match = self.term_pattern.search(text)
@@ -297,7 +434,7 @@ class MetadataExtractor:
         return None
 
 
-def extract_all_metadata(documents: List[ParsedDocument]) -> List[LeaseMetadata]:
+def extract_all_metadata(documents: List["ParsedDocument"]) -> List[LeaseMetadata]:
     """
     Extract metadata from all documents
 
@@ -307,5 +444,17 @@ def extract_all_metadata(documents: List[ParsedDocument]) -> List[LeaseMetadata]
     Returns:
         List of LeaseMetadata objects
     """
-    extractor = MetadataExtractor()
-    return [extractor.extract(doc) for doc in documents]
+    return MetadataExtractor().extract_many(documents)
+
+
+# ==================== Process Pool Workers ====================
+# Module-level so it pickles by reference for ProcessPoolExecutor
+
+_WORKER_EXTRACTOR = None
+
+
+def _extract_worker(doc: "ParsedDocument") -> LeaseMetadata:
+    global _WORKER_EXTRACTOR
+    if _WORKER_EXTRACTOR is None:
+        _WORKER_EXTRACTOR = MetadataExtractor()
+    return _WORKER_EXTRACTOR.extract(doc)
@@ -0,0 +1,10 @@
+"""Request tracing, in-process metrics and provider usage accounting."""
+
+from .metrics import REGISTRY, MetricsRegistry
+from .tracing import Span, current_span, span, traced
+from .usage import UsageRecord, UsageTracker, estimate_cost, get_usage_tracker, usage_context
+
+__all__ = [
+    "REGISTRY", "MetricsRegistry", "Span", "current_span", "span", "traced",
+    "UsageRecord", "UsageTracker", "estimate_cost", "get_usage_tracker", "usage_context"
+]
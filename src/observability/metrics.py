@@ -0,0 +1,151 @@
+"""
+In-process metrics registry with Prometheus text exposition
+
+Keeps cumulative histograms and counters in memory so an API process can
+serve them at /api/metrics without an external metrics library.
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, spanning fast local stages to slow LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Cumulative histogram with one series per label set"""
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # bucket counts..., sum, count
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        """Record one observation"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def snapshot(self) -> Dict[LabelKey, Dict[str, float]]:
+        """Copy of every series as {"sum", "count", "buckets": {le: count}}"""
+        with self._lock:
+            return {
+                key: {
+                    "sum": series[-2],
+                    "count": series[-1],
+                    "buckets": dict(zip(self.buckets, series[:len(self.buckets)])),
+                }
+                for key, series in self._series.items()
+            }
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.snapshot().items()):
+            for bound, count in series["buckets"].items():
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {int(count)}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {int(series['count'])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {int(series['count'])}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with one series per label set"""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._series: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, labels: Optional[Dict[str, str]] = None) -> None:
+        """Add to the counter"""
+        key = _label_key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+    def value(self, labels: Optional[Dict[str, str]] = None) -> float:
+        with self._lock:
+            return self._series.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, description, buckets)
+            return self._metrics[name]
+
+    def counter(self, name: str, description: str) -> Counter:
+        """Get or create a counter"""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, description)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Drop all metrics (for tests)"""
+        with self._lock:
+            self._metrics.clear()
+
+
+# Process-wide registry served at /api/metrics
+REGISTRY = MetricsRegistry()
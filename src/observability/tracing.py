@@ -0,0 +1,126 @@
+"""
+Lightweight span tracing for the query pipeline
+
+Spans nest through a context variable, so a stage opened anywhere below a
+request (embedding inside ChromaStore, BM25 inside HybridRanker, the LLM
+call inside AnswerGenerator) attaches to that request's trace without
+passing anything through call signatures. Every finished span is also
+recorded in the process-wide stage latency histogram.
+"""
+
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .metrics import REGISTRY
+
+
+STAGE_HISTOGRAM = "medley_stage_duration_seconds"
+STAGE_ERRORS = "medley_stage_errors_total"
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("medley_current_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed stage, with the stages it called as children"""
+    name: str
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List["Span"] = field(default_factory=list)
+    start: float = field(default_factory=time.perf_counter)
+    end: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes (result counts, model names, ...)"""
+        self.attributes.update(attributes)
+
+    def walk(self) -> Iterator["Span"]:
+        """This span and all descendants, depth first"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def breakdown(self) -> Dict[str, float]:
+        """
+        Milliseconds per stage name, summed over all descendants
+
+        Returns:
+            {"total": ..., "<stage>": ...} rounded to 0.01 ms
+        """
+        totals: Dict[str, float] = {}
+        for span in self.walk():
+            if span is self:
+                continue
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        return {"total": round(self.duration_ms, 2), **{k: round(v, 2) for k, v in totals.items()}}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Span tree as JSON-serializable dicts"""
+        data = {"name": self.name, "duration_ms": round(self.duration_ms, 2)}
+        if self.attributes:
+            data["attributes"] = dict(self.attributes)
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict() for child in self.children]
+        return data
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span in this context, if any"""
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a block as a stage
+
+    Opens a root span when nothing is active, otherwise a child of the
+    current span.
+
+    Args:
+        name: Stage name (also the histogram's `stage` label)
+        **attributes: Initial span attributes
+
+    Yields:
+        The open Span
+    """
+    parent = _current_span.get()
+    current = Span(name=name, attributes=attributes)
+    if parent is not None:
+        parent.children.append(current)
+
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        REGISTRY.counter(STAGE_ERRORS, "Pipeline stages that raised").inc(labels={"stage": name})
+        raise
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+        REGISTRY.histogram(STAGE_HISTOGRAM, "Duration of query pipeline stages").observe(
+            current.end - current.start, labels={"stage": name}
+        )
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span() for whole functions and methods"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,434 @@
+"""
+Token and cost accounting for LLM and embedding calls
+
+Every provider call is recorded with its token usage, model, latency and an
+estimated cost. Records are attributed to the endpoint, agent, tenant filter
+and session active in the current context (see usage_context), aggregated
+in memory, and flushed to SQLite in batches. The same totals drive the
+per-session and per-day budgets that AnswerGenerator checks before calling
+the provider.
+"""
+
+import atexit
+import contextvars
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import (
+    CHEAPER_MODELS, DAILY_COST_BUDGET_USD, MODEL_PRICING, SESSION_TOKEN_BUDGET,
+    USAGE_DB_PATH, USAGE_FLUSH_EVERY, USAGE_FLUSH_INTERVAL_SECONDS
+)
+from .metrics import REGISTRY
+
+
+# Dimensions usage is attributed to, in addition to model and operation
+ATTRIBUTION_KEYS = ("endpoint", "agent", "tenant_filter", "session_id")
+
+# Dimensions with in-memory aggregates
+AGGREGATE_KEYS = ("endpoint", "agent", "tenant_filter", "model", "operation")
+
+_usage_context: contextvars.ContextVar = contextvars.ContextVar("medley_usage_context", default={})
+
+
+@contextmanager
+def usage_context(**attributes: Optional[str]) -> Iterator[Dict[str, str]]:
+    """
+    Attribute provider calls made inside this block
+
+    Nested blocks inherit outer attributes; None values leave the outer
+    value in place.
+
+    Args:
+        **attributes: Any of endpoint, agent, tenant_filter, session_id
+    """
+    unknown = set(attributes) - set(ATTRIBUTION_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown usage attributes: {sorted(unknown)}")
+    merged = {**_usage_context.get(), **{k: v for k, v in attributes.items() if v is not None}}
+    token = _usage_context.set(merged)
+    try:
+        yield merged
+    finally:
+        _usage_context.reset(token)
+
+
+def current_usage_context() -> Dict[str, str]:
+    """Attribution active in this context"""
+    return dict(_usage_context.get())
+
+
+def _match_model(model: str, table: Dict[str, Any]) -> Optional[str]:
+    """Longest key in `table` that prefixes `model` (handles dated model names)"""
+    matches = [key for key in table if model == key or model.startswith(key + "-")]
+    return max(matches, key=len) if matches else None
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int = 0) -> float:
+    """
+    Estimated USD cost of one call from MODEL_PRICING
+
+    Args:
+        model: Model name as sent to the provider
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+
+    Returns:
+        Cost in USD (0.0 for models without a price)
+    """
+    key = _match_model(model, MODEL_PRICING)
+    if key is None:
+        return 0.0
+    input_price, output_price = MODEL_PRICING[key]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def cheaper_model(model: str) -> str:
+    """Fallback model for `model` once a budget is exceeded (itself if none)"""
+    key = _match_model(model, CHEAPER_MODELS)
+    return CHEAPER_MODELS[key] if key else model
+
+
+def usage_from_response(response: Any) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (prompt_tokens, completion_tokens) from an OpenAI or Anthropic response
+
+    Returns (None, None) when the response carries no usage block.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None, None
+    prompt = getattr(usage, "prompt_tokens", None)
+    if prompt is None:
+        prompt = getattr(usage, "input_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    if completion is None:
+        completion = getattr(usage, "output_tokens", None)
+    return prompt, completion or 0
+
+
+@dataclass
+class UsageRecord:
+    """One provider call"""
+    operation: str
+    provider: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+    cost_usd: float
+    endpoint: Optional[str] = None
+    agent: Optional[str] = None
+    tenant_filter: Optional[str] = None
+    session_id: Optional[str] = None
+    estimated: bool = False
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class UsageTracker:
+    """
+    Metrics sink for provider usage with budget checks
+
+    Thread-safe. Records are buffered and written to SQLite when
+    `flush_every` records are pending or, on a background timer, once the
+    oldest pending record is `flush_interval` seconds old, so a quiet
+    process doesn't hold records back; call close() on shutdown.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        flush_every: int = USAGE_FLUSH_EVERY,
+        flush_interval: float = USAGE_FLUSH_INTERVAL_SECONDS,
+        session_token_budget: int = SESSION_TOKEN_BUDGET,
+        daily_cost_budget: float = DAILY_COST_BUDGET_USD
+    ):
+        """
+        Initialize the tracker
+
+        Args:
+            db_path: SQLite file for usage records (defaults to USAGE_DB_PATH)
+            flush_every: Pending records that trigger a flush
+            flush_interval: Seconds after which pending records are flushed
+            session_token_budget: Tokens per session before downgrading (0 = unlimited)
+            daily_cost_budget: USD per day before downgrading (0 = unlimited)
+        """
+        self.db_path = Path(db_path or USAGE_DB_PATH)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.session_token_budget = session_token_budget
+        self.daily_cost_budget = daily_cost_budget
+
+        self._lock = threading.RLock()
+        self._pending: List[UsageRecord] = []
+        self._totals: Dict[Tuple[str, Any], Dict[str, float]] = {}
+        self._session_tokens: Dict[str, int] = {}
+        self._day: Optional[date] = None
+        self._day_cost = 0.0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._timer: Optional[threading.Timer] = None
+
+    # ==================== Storage ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_usage (
+                    usage_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp REAL NOT NULL,
+                    operation TEXT NOT NULL,
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_tokens INTEGER NOT NULL,
+                    completion_tokens INTEGER NOT NULL,
+                    latency_ms REAL,
+                    cost_usd REAL NOT NULL,
+                    endpoint TEXT,
+                    agent TEXT,
+                    tenant_filter TEXT,
+                    session_id TEXT,
+                    estimated INTEGER DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_time ON llm_usage(timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_session ON llm_usage(session_id)")
+            self._conn.commit()
+        return self._conn
+
+    def flush(self) -> int:
+        """
+        Write pending records to SQLite
+
+        Returns:
+            Number of records written
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return 0
+            records, self._pending = self._pending, []
+            conn = self._connect()
+            conn.executemany("""
+                INSERT INTO llm_usage (timestamp, operation, provider, model, prompt_tokens,
+                                       completion_tokens, latency_ms, cost_usd, endpoint, agent,
+                                       tenant_filter, session_id, estimated)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (r.timestamp, r.operation, r.provider, r.model, r.prompt_tokens, r.completion_tokens,
+                 r.latency_ms, r.cost_usd, r.endpoint, r.agent, r.tenant_filter, r.session_id, int(r.estimated))
+                for r in records
+            ])
+            conn.commit()
+            return len(records)
+
+    def close(self) -> None:
+        """Flush and close the database connection"""
+        with self._lock:
+            self.flush()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== Recording ====================
+
+    def record(
+        self,
+        operation: str,
+        provider: str,
+        model: str,
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        latency_ms: float,
+        prompt_chars: int = 0,
+        completion_chars: int = 0
+    ) -> UsageRecord:
+        """
+        Record one provider call
+
+        Args:
+            operation: What the call was for (answer, chat, reformulate, ...)
+            provider: "openai" or "anthropic"
+            model: Model actually called
+            prompt_tokens: Input tokens from the response (None if not reported)
+            completion_tokens: Output tokens from the response
+            latency_ms: Wall time of the call
+            prompt_chars: Prompt length, used to estimate tokens when not reported
+            completion_chars: Completion length, used likewise
+
+        Returns:
+            The stored UsageRecord
+        """
+        estimated = prompt_tokens is None
+        if estimated:
+            # ~4 characters per token for English text
+            prompt_tokens, completion_tokens = prompt_chars // 4, completion_chars // 4
+
+        record = UsageRecord(
+            operation=operation,
+            provider=provider,
+            model=model,
+            prompt_tokens=int(prompt_tokens),
+            completion_tokens=int(completion_tokens or 0),
+            latency_ms=round(latency_ms, 2),
+            cost_usd=estimate_cost(model, prompt_tokens, completion_tokens or 0),
+            estimated=estimated,
+            **current_usage_context()
+        )
+
+        labels = {"model": model, "operation": operation}
+        REGISTRY.counter("medley_llm_tokens_total", "Tokens sent to and received from providers").inc(
+            record.total_tokens, labels=labels
+        )
+        REGISTRY.counter("medley_llm_cost_usd_total", "Estimated provider spend in USD").inc(
+            record.cost_usd, labels=labels
+        )
+
+        with self._lock:
+            for key in AGGREGATE_KEYS:
+                totals = self._totals.setdefault((key, getattr(record, key)), {
+                    "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0, "latency_ms": 0.0
+                })
+                totals["calls"] += 1
+                totals["prompt_tokens"] += record.prompt_tokens
+                totals["completion_tokens"] += record.completion_tokens
+                totals["cost_usd"] += record.cost_usd
+                totals["latency_ms"] += record.latency_ms
+
+            if record.session_id:
+                self._session_tokens[record.session_id] = (
+                    self.session_tokens(record.session_id) + record.total_tokens
+                )
+            self._day_cost = self.daily_cost() + record.cost_usd
+
+            self._pending.append(record)
+            if (len(self._pending) >= self.flush_every
+                    or time.time() - self._pending[0].timestamp >= self.flush_interval):
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        return record
+
+    # ==================== Aggregates ====================
+
+    def aggregate(self, by: str = "endpoint") -> Dict[Any, Dict[str, float]]:
+        """
+        In-memory totals since startup, grouped by one dimension
+
+        Args:
+            by: One of endpoint, agent, tenant_filter, model, operation
+
+        Returns:
+            {value: {"calls", "prompt_tokens", "completion_tokens", "cost_usd", "avg_latency_ms"}}
+        """
+        if by not in AGGREGATE_KEYS:
+            raise ValueError(f"Cannot aggregate by {by!r}; use one of {AGGREGATE_KEYS}")
+        with self._lock:
+            return {
+                value: {
+                    "calls": int(totals["calls"]),
+                    "prompt_tokens": int(totals["prompt_tokens"]),
+                    "completion_tokens": int(totals["completion_tokens"]),
+                    "cost_usd": round(totals["cost_usd"], 6),
+                    "avg_latency_ms": round(totals["latency_ms"] / totals["calls"], 2),
+                }
+                for (key, value), totals in self._totals.items()
+                if key == by
+            }
+
+    def summary(self, by: str = "endpoint", since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        Totals from the SQLite log (including previous runs), grouped by one dimension
+
+        Args:
+            by: One of endpoint, agent, tenant_filter, model, operation
+            since: Only include calls at or after this time
+
+        Returns:
+            List of rows sorted by cost, most expensive first
+        """
+        if by not in AGGREGATE_KEYS:
+            raise ValueError(f"Cannot summarize by {by!r}; use one of {AGGREGATE_KEYS}")
+        with self._lock:
+            self.flush()
+            cursor = self._connect().execute(f"""
+                SELECT {by} AS "{by}", COUNT(*) AS calls,
+                       SUM(prompt_tokens) AS prompt_tokens,
+                       SUM(completion_tokens) AS completion_tokens,
+                       ROUND(SUM(cost_usd), 6) AS cost_usd,
+                       ROUND(AVG(latency_ms), 2) AS avg_latency_ms
+                FROM llm_usage
+                WHERE timestamp >= ?
+                GROUP BY {by}
+                ORDER BY cost_usd DESC
+            """, (since.timestamp() if since else 0,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    # ==================== Budgets ====================
+
+    def session_tokens(self, session_id: str) -> int:
+        """Tokens used by a session (loaded from SQLite on first use)"""
+        with self._lock:
+            if session_id not in self._session_tokens:
+                row = self._connect().execute(
+                    "SELECT COALESCE(SUM(prompt_tokens + completion_tokens), 0) FROM llm_usage WHERE session_id = ?",
+                    (session_id,)
+                ).fetchone()
+                self._session_tokens[session_id] = int(row[0])
+            return self._session_tokens[session_id]
+
+    def daily_cost(self) -> float:
+        """Estimated spend today (loaded from SQLite at the start of each day)"""
+        with self._lock:
+            today = date.today()
+            if self._day != today:
+                midnight = datetime.combine(today, datetime.min.time()).timestamp()
+                row = self._connect().execute(
+                    "SELECT COALESCE(SUM(cost_usd), 0) FROM llm_usage WHERE timestamp >= ?", (midnight,)
+                ).fetchone()
+                self._day, self._day_cost = today, float(row[0]) + sum(
+                    r.cost_usd for r in self._pending if r.timestamp >= midnight
+                )
+            return self._day_cost
+
+    def over_budget(self, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        Which budget, if any, is exhausted
+
+        Args:
+            session_id: Session to check (defaults to the current usage context)
+
+        Returns:
+            "session", "daily", or None when within budget
+        """
+        session_id = session_id or current_usage_context().get("session_id")
+        if session_id and self.session_token_budget and self.session_tokens(session_id) >= self.session_token_budget:
+            return "session"
+        if self.daily_cost_budget and self.daily_cost() >= self.daily_cost_budget:
+            return "daily"
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_usage_tracker() -> UsageTracker:
+    """Process-wide tracker writing to USAGE_DB_PATH (flushed at exit)"""
+    tracker = UsageTracker()
+    atexit.register(tracker.close)
+    return tracker
@@ -1,3 +1,18 @@
-from .docx_parser import DocxParser, ParsedDocument
+from typing import TYPE_CHECKING
 
-__all__ = ["DocxParser", "ParsedDocument"]
+from ..lazy import lazy_exports
+
+__all__ = ["DocxParser", "LazyParsedDocument", "ParsedDocument", "ParseCache", "get_parse_cache", "iter_leases"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "DocxParser": ".docx_parser",
+    "LazyParsedDocument": ".docx_parser",
+    "ParsedDocument": ".docx_parser",
+    "iter_leases": ".docx_parser",
+    "ParseCache": ".parse_cache",
+    "get_parse_cache": ".parse_cache",
+})
+
+if TYPE_CHECKING:
+    from .docx_parser import DocxParser, LazyParsedDocument, ParsedDocument, iter_leases
+    from .parse_cache import ParseCache, get_parse_cache
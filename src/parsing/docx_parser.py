@@ -4,11 +4,34 @@ Extracts text, tables, and structure from Word documents
 """
 
 import re
+import zipfile
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from docx import Document
+from docx.oxml.ns import qn
+from docx.oxml.parser import element_class_lookup
 from docx.table import Table as DocxTable
+from docx.text.paragraph import Paragraph as DocxParagraph
+from lxml import etree
+
+from .parse_cache import ParseCache
+
+
+# Body-level elements streamed out of word/document.xml
+W_BODY = qn("w:body")
+W_P = qn("w:p")
+W_TBL = qn("w:tbl")
+
+# Bytes of document.xml fed to the pull parser at a time
+STREAM_READ_SIZE = 64 * 1024
+
+# Non-empty paragraphs read by DocxParser.preview when no data sheet closes earlier
+PREVIEW_MAX_PARAGRAPHS = 300
+
+# Paragraphs after a numbered data sheet entry searched for its value
+DATA_SHEET_LOOKAHEAD = 4
 
 
 @dataclass
@@ -32,6 +55,21 @@ class ParsedDocument:
     data_sheet: Dict[str, Any]
     tenant_name: str = ""
 
+    def iter_sections(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Iterate sections as (name, lines) in document order
+
+        A repeated heading (e.g. one listed in a table of contents) is yielded
+        at every occurrence, so dict(iter_sections()) equals `sections`, which
+        keeps the last one. "\\n".join(lines) is always the section's content.
+        """
+        if not self.paragraphs:
+            # Built from sections alone
+            for name, content in self.sections.items():
+                yield name, content.split("\n")
+            return
+        yield from DocxParser().iter_section_groups(self.paragraphs)
+
 
 class DocxParser:
     """Parser for DOCX lease documents"""
@@ -42,20 +80,36 @@ class DocxParser:
     EXHIBIT_PATTERN = re.compile(r'^EXHIBIT\s+([A-Z](?:-\d+)?)[:\s]*(.*)$', re.IGNORECASE)
     DATA_SHEET_PATTERN = re.compile(r'DATA\s+SHEET', re.IGNORECASE)
 
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional[ParseCache] = None):
+        """
+        Initialize the parser
 
-    def parse(self, file_path: str) -> ParsedDocument:
+        Args:
+            cache: Parse cache consulted before reading any XML (None = always parse)
+        """
+        self.cache = cache
+
+    def parse(self, file_path: str, lazy: bool = False) -> ParsedDocument:
         """
         Parse a DOCX file and extract all relevant content
 
         Args:
             file_path: Path to the DOCX file
+            lazy: Return a LazyParsedDocument that reads the file on first use
 
         Returns:
             ParsedDocument with extracted content
         """
-        path = Path(file_path)
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(file_path)
+            payload = self.cache.load(cache_key)
+            if payload is not None:
+                return self._from_payload(Path(file_path), payload, lazy)
+
+        if lazy:
+            return LazyParsedDocument(file_path, parser=self, cache_key=cache_key)
+
         doc = Document(file_path)
 
         # Extract all paragraphs
@@ -64,6 +118,152 @@ class DocxParser:
         # Extract tables
         tables = self._extract_tables(doc)
 
+        document = self._build_document(Path(file_path), paragraphs, tables)
+        if cache_key:
+            self.cache.save(cache_key, self._to_payload(
+                document.paragraphs, document.tables, document.sections, document.data_sheet
+            ))
+        return document
+
+    def preview(self, file_path: str, max_paragraphs: int = PREVIEW_MAX_PARAGRAPHS) -> ParsedDocument:
+        """
+        Parse only the data sheet of a DOCX file
+
+        Streams document.xml and keeps paragraphs until the data sheet has
+        closed (the first article or exhibit heading after it, plus the few
+        paragraphs its last entry may take a value from) or until
+        max_paragraphs non-empty paragraphs, whichever comes first. Past the
+        close only data sheet tables are kept, so data_sheet matches a full
+        parse while the rest of the text is never held.
+
+        A full parse already in the cache is returned instead, since loading
+        it costs less than reading even the first pages.
+
+        Args:
+            file_path: Path to the DOCX file
+            max_paragraphs: Upper bound on paragraphs read
+
+        Returns:
+            ParsedDocument built from the paragraphs and tables kept
+        """
+        if self.cache is not None:
+            payload = self.cache.load(self.cache.key(file_path))
+            if payload is not None:
+                return self._from_payload(Path(file_path), payload, lazy=False)
+
+        paragraphs = []
+        tables = []
+        in_data_sheet = False
+        closed_at = None
+        for block in self.iter_blocks(file_path):
+            if isinstance(block, TableData):
+                if closed_at is None or block.table_type == "data_sheet":
+                    tables.append(block)
+                continue
+            if closed_at is not None:
+                # An entry just above the heading may take its value from below it
+                if len(paragraphs) - closed_at < DATA_SHEET_LOOKAHEAD - 1:
+                    paragraphs.append(block)
+                continue
+            paragraphs.append(block)
+            if self.DATA_SHEET_PATTERN.search(block):
+                in_data_sheet = True
+            elif in_data_sheet and (self.ARTICLE_PATTERN.match(block) or self.EXHIBIT_PATTERN.match(block)):
+                closed_at = len(paragraphs)
+            if len(paragraphs) >= max_paragraphs:
+                break
+
+        return self._build_document(Path(file_path), paragraphs, tables)
+
+    def iter_blocks(self, file_path: str) -> Iterator[Union[str, TableData]]:
+        """
+        Stream body paragraphs and tables in document order
+
+        word/document.xml is fed to an incremental parser and each body-level
+        element is released once read, so only the current paragraph or table
+        is held in memory. Text matches what Document(file_path) reports.
+
+        Args:
+            file_path: Path to the DOCX file
+
+        Yields:
+            Stripped non-empty paragraph text, or TableData for each table
+        """
+        parser = etree.XMLPullParser(
+            events=("end",), tag=(W_P, W_TBL), remove_blank_text=True, resolve_entities=False
+        )
+        # Same element classes as python-docx, so .text behaves identically
+        parser.set_element_class_lookup(element_class_lookup)
+
+        with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+            while True:
+                data = xml.read(STREAM_READ_SIZE)
+                if not data:
+                    break
+                parser.feed(data)
+                for _, element in parser.read_events():
+                    body = element.getparent()
+                    if body is None or body.tag != W_BODY:
+                        continue  # paragraphs inside tables are read with their table
+
+                    if element.tag == W_P:
+                        text = DocxParagraph(element, None).text.strip()
+                        if text:
+                            yield text
+                    else:
+                        table_data = self._parse_table(DocxTable(element, None))
+                        if table_data:
+                            yield table_data
+
+                    # Drop everything read so far
+                    element.clear()
+                    while element.getprevious() is not None:
+                        del body[0]
+            parser.close()
+
+    # ==================== Cache Payloads ====================
+
+    def _to_payload(
+        self,
+        paragraphs: List[str],
+        tables: List[TableData],
+        sections: Dict[str, str],
+        data_sheet: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Plain-container form of a parse result for the parse cache"""
+        return {
+            "paragraphs": paragraphs,
+            "tables": [(t.headers, t.rows, t.raw_text, t.table_type) for t in tables],
+            "sections": sections,
+            "data_sheet": data_sheet,
+        }
+
+    def _from_payload(self, path: Path, payload: Dict[str, Any], lazy: bool) -> ParsedDocument:
+        """Rebuild a document from a cached payload without touching the DOCX"""
+        paragraphs = payload["paragraphs"]
+        tables = [TableData(*table) for table in payload["tables"]]
+        if lazy:
+            # Seed the cached properties; full_text stays unbuilt until asked for
+            document = LazyParsedDocument(str(path), parser=self)
+            document.__dict__.update(
+                _content=(paragraphs, tables), paragraphs=paragraphs, tables=tables,
+                sections=payload["sections"], data_sheet=payload["data_sheet"]
+            )
+            return document
+
+        return ParsedDocument(
+            file_path=str(path),
+            file_name=path.name,
+            full_text=self._build_full_text(paragraphs, tables),
+            paragraphs=paragraphs,
+            tables=tables,
+            sections=payload["sections"],
+            data_sheet=payload["data_sheet"],
+            tenant_name=self._extract_tenant_name(path.name, payload["data_sheet"])
+        )
+
+    def _build_document(self, path: Path, paragraphs: List[str], tables: List[TableData]) -> ParsedDocument:
+        """Assemble a ParsedDocument from extracted paragraphs and tables"""
         # Build full text
         full_text = self._build_full_text(paragraphs, tables)
 
@@ -173,6 +373,20 @@ class DocxParser:
     def _parse_sections(self, paragraphs: List[str]) -> Dict[str, str]:
         """Parse document into sections based on article/section headers"""
         sections = {}
+        for section_name, content in self.iter_section_groups(paragraphs):
+            sections[section_name] = "\n".join(content)
+        return sections
+
+    def iter_section_groups(self, paragraphs: Iterable[str]) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Group paragraphs under article/exhibit headers as they stream past
+
+        A name can repeat (e.g. headings listed in a table of contents); each
+        occurrence is yielded. _parse_sections keeps the last one per name.
+
+        Yields:
+            (section name, paragraphs) for every non-empty section
+        """
         current_section = "preamble"
         current_content = []
 
@@ -182,7 +396,7 @@ class DocxParser:
             if article_match:
                 # Save previous section
                 if current_content:
-                    sections[current_section] = "\n".join(current_content)
+                    yield current_section, current_content
                 current_section = f"Article {article_match.group(1)}: {article_match.group(2)}"
                 current_content = [para]
                 continue
@@ -191,7 +405,7 @@ class DocxParser:
             exhibit_match = self.EXHIBIT_PATTERN.match(para)
             if exhibit_match:
                 if current_content:
-                    sections[current_section] = "\n".join(current_content)
+                    yield current_section, current_content
                 current_section = f"Exhibit {exhibit_match.group(1)}"
                 if exhibit_match.group(2):
                     current_section += f": {exhibit_match.group(2)}"
@@ -202,9 +416,7 @@ class DocxParser:
 
         # Save final section
         if current_content:
-            sections[current_section] = "\n".join(current_content)
-
-        return sections
+            yield current_section, current_content
 
     def _extract_data_sheet(self, paragraphs: List[str], tables: List[TableData]) -> Dict[str, Any]:
         """Extract key-value pairs from the data sheet section"""
@@ -234,7 +446,7 @@ class DocxParser:
                     ref_value = numbered_match.group(3).strip()
 
                     # Look ahead for the actual value (usually dollar amount or specific value)
-                    for j in range(1, 5):
+                    for j in range(1, DATA_SHEET_LOOKAHEAD + 1):
                         if i + j < len(paragraphs):
                             next_para = paragraphs[i + j].strip()
                             # Check if it looks like a value (starts with $, contains numbers, etc.)
@@ -286,17 +498,118 @@ class DocxParser:
         return name_part.strip()
 
 
-def parse_all_leases(lease_dir: str) -> List[ParsedDocument]:
+class LazyParsedDocument(ParsedDocument):
+    """
+    ParsedDocument that reads its DOCX file on first use
+
+    Each field is computed on first access and cached. Paragraphs and tables
+    are read together in one streaming pass; full_text and sections are
+    derived from them only if asked for, so a document that is only chunked
+    holds its text once instead of three times.
+    """
+
+    def __init__(self, file_path: str, parser: Optional[DocxParser] = None, cache_key: Optional[str] = None):
+        path = Path(file_path)
+        self.file_path = str(path)
+        self.file_name = path.name
+        self._parser = parser or DocxParser()
+        self._cache_key = cache_key  # set when the parser's cache missed; filled on first read
+
+    def __repr__(self) -> str:
+        return f"LazyParsedDocument(file_path={self.file_path!r})"
+
+    @cached_property
+    def _content(self) -> Tuple[List[str], List[TableData]]:
+        paragraphs, tables = [], []
+        for block in self._parser.iter_blocks(self.file_path):
+            if isinstance(block, TableData):
+                tables.append(block)
+            else:
+                paragraphs.append(block)
+
+        if self._cache_key:
+            parser = self._parser
+            parser.cache.save(self._cache_key, parser._to_payload(
+                paragraphs, tables, parser._parse_sections(paragraphs),
+                parser._extract_data_sheet(paragraphs, tables)
+            ))
+        return paragraphs, tables
+
+    @cached_property
+    def paragraphs(self) -> List[str]:
+        return self._content[0]
+
+    @cached_property
+    def tables(self) -> List[TableData]:
+        return self._content[1]
+
+    @cached_property
+    def full_text(self) -> str:
+        return self._parser._build_full_text(self.paragraphs, self.tables)
+
+    @cached_property
+    def sections(self) -> Dict[str, str]:
+        return self._parser._parse_sections(self.paragraphs)
+
+    @cached_property
+    def data_sheet(self) -> Dict[str, Any]:
+        return self._parser._extract_data_sheet(self.paragraphs, self.tables)
+
+    @cached_property
+    def tenant_name(self) -> str:
+        return self._parser._extract_tenant_name(self.file_name, self.data_sheet)
+
+    def iter_sections(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Iterate sections as (name, paragraphs) without building `sections`
+
+        Same sections and order as ParsedDocument.iter_sections. Unless the
+        paragraphs are already loaded, the DOCX is streamed once and only the
+        section being read is held in memory.
+        """
+        if "_content" in self.__dict__:
+            yield from super().iter_sections()
+            return
+        paragraphs = (block for block in self._parser.iter_blocks(self.file_path) if isinstance(block, str))
+        yield from self._parser.iter_section_groups(paragraphs)
+
+
+def iter_leases(
+    lease_dir: str, lazy: bool = True, cache: Optional[ParseCache] = None
+) -> Iterator[ParsedDocument]:
+    """
+    Yield the lease documents in a directory one at a time
+
+    Args:
+        lease_dir: Path to directory containing lease documents
+        lazy: Yield LazyParsedDocuments (read on first use)
+        cache: Parse cache to read from and fill
+
+    Yields:
+        ParsedDocument for each readable .docx file
+    """
+    parser = DocxParser(cache=cache)
+    for file_path in Path(lease_dir).glob("*.docx"):
+        if file_path.name.startswith("~$"):
+            continue  # Word lock files
+        try:
+            yield parser.parse(str(file_path), lazy=lazy)
+        except Exception as e:
+            print(f"Error parsing {file_path}: {e}")
+
+
+def parse_all_leases(lease_dir: str, cache: Optional[ParseCache] = None) -> List[ParsedDocument]:
     """
     Parse all lease documents in a directory
 
     Args:
         lease_dir: Path to directory containing lease documents
+        cache: Parse cache to read from and fill
 
     Returns:
         List of ParsedDocument objects
     """
-    parser = DocxParser()
+    parser = DocxParser(cache=cache)
     documents = []
 
     lease_path = Path(lease_dir)
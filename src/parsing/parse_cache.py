@@ -0,0 +1,101 @@
+"""
+Persistent cache of parsed DOCX content
+Entries are keyed by the sha256 of the file bytes plus the parser version, so
+an unchanged lease is never run through python-docx twice
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import PARSE_CACHE_DIR, PARSE_CACHE_ENABLED
+
+
+# Bump whenever DocxParser output changes for the same file
+PARSER_VERSION = 1
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path: str) -> str:
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Directory of pickled parse payloads, one file per (content hash, parser version)
+
+    A payload is a plain dict of paragraphs, tables, sections and data sheet
+    values. File names and paths are not stored: the same bytes under another
+    name share one entry.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, parser_version: int = PARSER_VERSION):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for cache entries (defaults to PARSE_CACHE_DIR)
+            parser_version: Version stamped into every key
+        """
+        self.cache_dir = Path(cache_dir or PARSE_CACHE_DIR)
+        self.parser_version = parser_version
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, file_path: str) -> str:
+        """Cache key for the current contents of file_path"""
+        return f"{file_digest(file_path)}.v{self.parser_version}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the payload stored under key, or None on a miss"""
+        try:
+            with open(self._entry_path(key), "rb") as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or unreadable entry: treat as a miss and let it be rewritten
+            self.misses += 1
+            return None
+        self.hits += 1
+        return payload
+
+    def save(self, key: str, payload: Dict[str, Any]):
+        """Store payload under key, replacing any existing entry atomically"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(payload, f, protocol=5)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> int:
+        """Delete every entry; returns how many were removed"""
+        removed = 0
+        for entry in self.cache_dir.glob("*.pkl"):
+            entry.unlink()
+            removed += 1
+        return removed
+
+
+@lru_cache(maxsize=1)
+def get_parse_cache() -> Optional[ParseCache]:
+    """Process-wide cache in PARSE_CACHE_DIR, or None when PARSE_CACHE_ENABLED is off"""
+    return ParseCache() if PARSE_CACHE_ENABLED else None
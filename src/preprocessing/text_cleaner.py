@@ -2,8 +2,71 @@
 Text preprocessing and cleaning for lease documents
 """
 
+import os
 import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional
+
+
+# ==================== Compiled Patterns ====================
+# Compiled once at import. Patterns that start with a literal character let the
+# regex engine jump straight to candidate positions instead of trying a match
+# at every offset, which is where most of the original cleaning time went.
+
+PAGE_NUMBERS = re.compile(r'\n\s*-?\s*\d+\s*-?\s*\n')
+HEADER_FOOTER = re.compile(r'(CONFIDENTIAL|DRAFT|Page \d+)', re.IGNORECASE)
+MULTIPLE_SPACES = re.compile(r'  +')  # single spaces need no rewrite
+MULTIPLE_NEWLINES = re.compile(r'\n\n\n+')
+UNDERSCORE_RUNS = re.compile(r'___+')
+ELLIPSIS_RUNS = re.compile(r'\.\.\.\.+')  # exactly "..." is already normalized
+
+MONTH_NAMES = r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+DATE_PATTERN = re.compile(rf'({MONTH_NAMES})\s+(\d{{1,2}}),?\s+(\d{{4}})', re.IGNORECASE)
+CURRENCY_PATTERN = re.compile(r'\$\s*([\d,]+(?:\.\d{2})?)')
+SQUARE_FEET_PATTERN = re.compile(r'([\d,]+)\s*(?:sq\.?\s*ft\.?|square\s*feet|SF)', re.IGNORECASE)
+
+# Case-sensitive twins run against text.lower(); match offsets map straight
+# back onto the original text when lowering keeps every character in place
+HEADER_FOOTER_LOWER = re.compile(r'confidential|draft|page \d+')
+DATE_PATTERN_LOWER = re.compile(f'({MONTH_NAMES.lower()})' + r'\s+(\d{1,2}),?\s+(\d{4})')
+SQUARE_FEET_SUFFIX_LOWER = re.compile(r's(?:q\.?\s*ft\.?|quare\s*feet|f)')
+
+# Non-ASCII characters that IGNORECASE treats as equal to an ASCII letter but
+# that str.lower() leaves alone (or expands), so the lowered scan would differ
+_CASEFOLD_UNSAFE = ('\u0130', '\u0131', '\u017f')
+
+# Below this many characters a process pool costs more than it saves
+PARALLEL_MIN_CHARS = 1_000_000
+
+
+def _lowered(text: str) -> Optional[str]:
+    """Return text.lower() if its offsets line up with text, else None"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        return None
+    if not text.isascii() and any(char in text for char in _CASEFOLD_UNSAFE):
+        return None
+    return lowered
+
+
+def _format_amount(match) -> str:
+    """Re-format a matched dollar amount with thousands separators"""
+    amount = match.group(1).replace(',', '')
+    # Format with commas
+    try:
+        if '.' in amount:
+            whole, decimal = amount.split('.')
+            formatted = f"${int(whole):,}.{decimal}"
+        else:
+            formatted = f"${int(amount):,}"
+        return formatted
+    except ValueError:
+        return match.group(0)
+
+
+def _is_run_char(char: str) -> bool:
+    """Whether char belongs to the [\\d,] run in front of a square-footage unit"""
+    return char == ',' or char.isdecimal()
 
 
 class TextCleaner:
@@ -11,10 +74,10 @@ class TextCleaner:
 
     def __init__(self):
         # Patterns for cleaning
-        self.multiple_spaces = re.compile(r' +')
-        self.multiple_newlines = re.compile(r'\n{3,}')
-        self.page_numbers = re.compile(r'\n\s*-?\s*\d+\s*-?\s*\n')
-        self.header_footer = re.compile(r'(CONFIDENTIAL|DRAFT|Page \d+)', re.IGNORECASE)
+        self.multiple_spaces = MULTIPLE_SPACES
+        self.multiple_newlines = MULTIPLE_NEWLINES
+        self.page_numbers = PAGE_NUMBERS
+        self.header_footer = HEADER_FOOTER
 
     def clean(self, text: str) -> str:
         """
@@ -27,27 +90,41 @@ class TextCleaner:
             Cleaned text
         """
         # Remove page numbers
-        text = self.page_numbers.sub('\n', text)
+        text = PAGE_NUMBERS.sub('\n', text)
 
         # Remove common header/footer text
-        text = self.header_footer.sub('', text)
+        text = self._remove_headers(text)
 
         # Normalize whitespace
-        text = self.multiple_spaces.sub(' ', text)
-        text = self.multiple_newlines.sub('\n\n', text)
+        text = MULTIPLE_SPACES.sub(' ', text)
+        text = MULTIPLE_NEWLINES.sub('\n\n', text)
 
         # Normalize line endings
-        text = text.replace('\r\n', '\n')
-        text = text.replace('\r', '\n')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+            text = text.replace('\r', '\n')
 
         # Strip leading/trailing whitespace from lines
-        lines = [line.strip() for line in text.split('\n')]
-        text = '\n'.join(lines)
+        text = '\n'.join([line.strip() for line in text.split('\n')])
 
         # Remove empty lines at start and end
-        text = text.strip()
-
-        return text
+        return text.strip()
+
+    def _remove_headers(self, text: str) -> str:
+        """Drop CONFIDENTIAL/DRAFT/Page N markers in any letter case"""
+        lowered = _lowered(text)
+        if lowered is None:
+            return HEADER_FOOTER.sub('', text)
+
+        pieces = []
+        last = 0
+        for match in HEADER_FOOTER_LOWER.finditer(lowered):
+            pieces.append(text[last:match.start()])
+            last = match.end()
+        if not pieces:
+            return text
+        pieces.append(text[last:])
+        return ''.join(pieces)
 
     def normalize_dates(self, text: str) -> str:
         """
@@ -59,16 +136,35 @@ class TextCleaner:
         Returns:
             Text with normalized dates
         """
-        # Pattern for various date formats
-        # Month DD, YYYY
-        month_names = r'(?:January|February|March|April|May|June|July|August|September|October|November|December)'
-        date_pattern2 = re.compile(rf'({month_names})\s+(\d{{1,2}}),?\s+(\d{{4}})', re.IGNORECASE)
+        return self._normalize_dates(text, _lowered(text))[0]
+
+    def _normalize_dates(self, text: str, lowered: Optional[str]):
+        """
+        Rewrite "Month DD, YYYY" spacing, keeping the lowered copy in step
 
+        Returns:
+            Tuple of (text, lowered) where lowered is None on the fallback path
+        """
         # Normalize to consistent format (keep as-is for legal documents)
         # Just ensure consistent spacing
-        text = date_pattern2.sub(r'\1 \2, \3', text)
-
-        return text
+        if lowered is None:
+            return DATE_PATTERN.sub(r'\1 \2, \3', text), None
+
+        pieces, lowered_pieces = [], []
+        last = 0
+        for match in DATE_PATTERN_LOWER.finditer(lowered):
+            start, month_end = match.span(1)
+            tail = f" {match.group(2)}, {match.group(3)}"
+            pieces.append(text[last:start])
+            pieces.append(text[start:month_end] + tail)
+            lowered_pieces.append(lowered[last:start])
+            lowered_pieces.append(lowered[start:month_end] + tail)
+            last = match.end()
+        if not pieces:
+            return text, lowered
+        pieces.append(text[last:])
+        lowered_pieces.append(lowered[last:])
+        return ''.join(pieces), ''.join(lowered_pieces)
 
     def normalize_currency(self, text: str) -> str:
         """
@@ -81,23 +177,9 @@ class TextCleaner:
             Text with normalized currency
         """
         # Pattern for currency: $1,234.56 or $1234.56
-        currency_pattern = re.compile(r'\$\s*([\d,]+(?:\.\d{2})?)')
-
-        def normalize_amount(match):
-            amount = match.group(1).replace(',', '')
-            # Format with commas
-            try:
-                if '.' in amount:
-                    whole, decimal = amount.split('.')
-                    formatted = f"${int(whole):,}.{decimal}"
-                else:
-                    formatted = f"${int(amount):,}"
-                return formatted
-            except ValueError:
-                return match.group(0)
-
-        text = currency_pattern.sub(normalize_amount, text)
-        return text
+        if '$' not in text:
+            return text
+        return CURRENCY_PATTERN.sub(_format_amount, text)
 
     def normalize_square_footage(self, text: str) -> str:
         """
@@ -109,16 +191,43 @@ class TextCleaner:
         Returns:
             Text with normalized square footage
         """
-        # Patterns: "1,234 sq ft", "1234 square feet", "1,234 SF"
-        patterns = [
-            (re.compile(r'([\d,]+)\s*(?:sq\.?\s*ft\.?|square\s*feet|SF)', re.IGNORECASE),
-             lambda m: f"{m.group(1)} square feet")
-        ]
+        return self._normalize_square_footage(text, _lowered(text))
 
-        for pattern, replacement in patterns:
-            text = pattern.sub(replacement, text)
+    def _normalize_square_footage(self, text: str, lowered: Optional[str]) -> str:
+        """
+        Rewrite "1,234 sq ft" / "1234 square feet" / "1,234 SF" as "<n> square feet"
 
-        return text
+        The unit is searched for first (it starts with a literal "s") and the
+        number is found by walking backwards, which visits the same matches as
+        SQUARE_FEET_PATTERN scanning forward from every digit.
+        """
+        if lowered is None:
+            return SQUARE_FEET_PATTERN.sub(lambda m: f"{m.group(1)} square feet", text)
+
+        pieces = []
+        last = 0
+        pos = 0
+        while True:
+            match = SQUARE_FEET_SUFFIX_LOWER.search(lowered, pos)
+            if match is None:
+                break
+            unit_start = match.start()
+            number_end = unit_start
+            while number_end > last and lowered[number_end - 1].isspace():
+                number_end -= 1
+            number_start = number_end
+            while number_start > last and _is_run_char(lowered[number_start - 1]):
+                number_start -= 1
+            if number_start == number_end:
+                pos = unit_start + 1
+                continue
+            pieces.append(text[last:number_start])
+            pieces.append(f"{text[number_start:number_end]} square feet")
+            last = pos = match.end()
+        if not pieces:
+            return text
+        pieces.append(text[last:])
+        return ''.join(pieces)
 
     def clean_for_embedding(self, text: str) -> str:
         """
@@ -130,15 +239,22 @@ class TextCleaner:
         Returns:
             Text optimized for embedding
         """
-        # Apply all cleanings
+        # Apply all cleanings. The normalizations stay ordered passes because
+        # their matches can overlap ("$1,000 SF"); the lowered copy is carried
+        # through so the text is lowered once rather than once per pass.
         text = self.clean(text)
-        text = self.normalize_dates(text)
-        text = self.normalize_currency(text)
-        text = self.normalize_square_footage(text)
+        text, lowered = self._normalize_dates(text, _lowered(text))
+        if '$' in text:
+            text = CURRENCY_PATTERN.sub(_format_amount, text)
+            if lowered is not None:
+                lowered = CURRENCY_PATTERN.sub(_format_amount, lowered)
+        text = self._normalize_square_footage(text, lowered)
 
         # Remove excessive punctuation
-        text = re.sub(r'[_]{3,}', '', text)
-        text = re.sub(r'[.]{3,}', '...', text)
+        if '___' in text:
+            text = UNDERSCORE_RUNS.sub('', text)
+        if '....' in text:
+            text = ELLIPSIS_RUNS.sub('...', text)
 
         # Normalize quotes
         text = text.replace('"', '"').replace('"', '"')
@@ -146,6 +262,35 @@ class TextCleaner:
 
         return text
 
+    def clean_many(
+        self,
+        texts: Iterable[str],
+        for_embedding: bool = True,
+        workers: Optional[int] = None,
+        chunksize: int = 8
+    ) -> List[str]:
+        """
+        Clean a batch of texts, spreading large batches over worker processes
+
+        Args:
+            texts: Texts to clean
+            for_embedding: Use clean_for_embedding (True) or clean (False)
+            workers: Worker processes (None = CPU count, 1 = run in-process)
+            chunksize: Texts handed to a worker at a time
+
+        Returns:
+            Cleaned texts in input order
+        """
+        texts = list(texts)
+        clean = self.clean_for_embedding if for_embedding else self.clean
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(texts) < 2 or sum(map(len, texts)) < PARALLEL_MIN_CHARS:
+            return [clean(text) for text in texts]
+
+        worker = _clean_for_embedding_worker if for_embedding else _clean_worker
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(worker, texts, chunksize=chunksize))
+
     def split_into_sentences(self, text: str) -> List[str]:
         """
         Split text into sentences
@@ -169,3 +314,17 @@ class TextCleaner:
         sentences = [s.replace('<PERIOD>', '.') for s in sentences]
 
         return [s.strip() for s in sentences if s.strip()]
+
+
+# ==================== Process Pool Workers ====================
+# Module-level so they pickle by reference for ProcessPoolExecutor
+
+_WORKER_CLEANER = TextCleaner()
+
+
+def _clean_worker(text: str) -> str:
+    return _WORKER_CLEANER.clean(text)
+
+
+def _clean_for_embedding_worker(text: str) -> str:
+    return _WORKER_CLEANER.clean_for_embedding(text)
@@ -1,4 +1,17 @@
-from .hybrid_ranker import HybridRanker
-from .query_engine import QueryEngine
+from typing import TYPE_CHECKING
 
-__all__ = ["HybridRanker", "QueryEngine"]
+from ..lazy import lazy_exports
+
+__all__ = ["HybridRanker", "QueryEngine", "LinearReranker", "Reranker"]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "HybridRanker": ".hybrid_ranker",
+    "QueryEngine": ".query_engine",
+    "LinearReranker": ".reranker",
+    "Reranker": ".reranker",
+})
+
+if TYPE_CHECKING:
+    from .hybrid_ranker import HybridRanker
+    from .query_engine import QueryEngine
+    from .reranker import LinearReranker, Reranker
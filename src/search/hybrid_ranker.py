@@ -4,15 +4,20 @@ Uses Reciprocal Rank Fusion (RRF) for combining results
 """
 
 import re
-from typing import List, Dict, Any, Tuple, Optional
+import threading
+from collections import Counter
+from typing import Callable, List, Dict, Any, Iterable, Tuple, Optional
 from dataclasses import dataclass
 from rank_bm25 import BM25Okapi
 
 from config.settings import (
     VECTOR_SEARCH_K, BM25_SEARCH_K, FINAL_RESULTS_K,
-    RRF_K, VECTOR_WEIGHT, BM25_WEIGHT
+    RRF_K, VECTOR_WEIGHT, BM25_WEIGHT, RERANK_ENABLED
 )
 from ..database.chroma_store import ChromaStore
+from ..database.invalidation import get_invalidation_bus
+from ..observability.tracing import traced
+from .reranker import LinearReranker, Reranker
 
 
 @dataclass
@@ -24,6 +29,56 @@ class SearchResult:
     score: float
     vector_rank: Optional[int] = None
     bm25_rank: Optional[int] = None
+    fusion_score: Optional[float] = None  # RRF score when a reranker replaced `score`
+
+
+class IncrementalBM25(BM25Okapi):
+    """
+    BM25Okapi that can add and remove documents in place
+
+    Per-document term counts and document frequencies are kept, so an update
+    only tokenizes the changed documents and recomputes idf over the vocabulary.
+    """
+
+    def _initialize(self, corpus):
+        self._doc_counts: Dict[str, int] = {}
+        if not corpus:
+            return self._doc_counts
+        self._doc_counts = super()._initialize(corpus)
+        return self._doc_counts
+
+    def _calc_idf(self, nd):
+        # The base class only ever adds to idf; start over so removed terms go
+        self.idf = {}
+        if nd:
+            super()._calc_idf(nd)
+
+    def _refresh_statistics(self) -> None:
+        self.corpus_size = len(self.doc_len)
+        self.avgdl = sum(self.doc_len) / self.corpus_size if self.corpus_size else 0
+        self._calc_idf(self._doc_counts)
+
+    def add_documents(self, tokenized_docs: Iterable[List[str]]) -> None:
+        """Append tokenized documents to the corpus"""
+        for document in tokenized_docs:
+            frequencies = dict(Counter(document))
+            self.doc_freqs.append(frequencies)
+            self.doc_len.append(len(document))
+            for word in frequencies:
+                self._doc_counts[word] = self._doc_counts.get(word, 0) + 1
+        self._refresh_statistics()
+
+    def remove_documents(self, positions: Iterable[int]) -> None:
+        """Drop the documents at the given corpus positions"""
+        drop = set(positions)
+        for position in drop:
+            for word in self.doc_freqs[position]:
+                self._doc_counts[word] -= 1
+                if not self._doc_counts[word]:
+                    del self._doc_counts[word]
+        self.doc_freqs = [freqs for i, freqs in enumerate(self.doc_freqs) if i not in drop]
+        self.doc_len = [length for i, length in enumerate(self.doc_len) if i not in drop]
+        self._refresh_statistics()
 
 
 class HybridRanker:
@@ -40,7 +95,8 @@ class HybridRanker:
         final_k: int = FINAL_RESULTS_K,
         rrf_k: int = RRF_K,
         vector_weight: float = VECTOR_WEIGHT,
-        bm25_weight: float = BM25_WEIGHT
+        bm25_weight: float = BM25_WEIGHT,
+        reranker: Optional[Reranker] = None
     ):
         """
         Initialize the hybrid ranker
@@ -53,6 +109,8 @@ class HybridRanker:
             rrf_k: Constant for RRF calculation
             vector_weight: Weight for vector search results
             bm25_weight: Weight for BM25 results
+            reranker: Rerank stage applied after fusion (defaults to a
+                LinearReranker when RERANK_ENABLED, else none)
         """
         self.store = chroma_store
         self.vector_k = vector_k
@@ -61,24 +119,70 @@ class HybridRanker:
         self.rrf_k = rrf_k
         self.vector_weight = vector_weight
         self.bm25_weight = bm25_weight
+        if reranker is None and RERANK_ENABLED:
+            reranker = LinearReranker()
+        self.reranker = reranker
 
         # BM25 index (built on first search)
         self._bm25_index = None
         self._bm25_docs = None
         self._bm25_ids = None
         self._bm25_metadatas = None
+        self._bm25_version = None  # store data version the index reflects
+        self._bm25_lock = threading.Lock()
+
+        # Switch BM25 over together with blue/green collection swaps
+        if hasattr(chroma_store, "on_swap"):
+            chroma_store.on_swap(self._prepare_swap)
 
+        # Drop a stale BM25 index when another writer changes the store
+        if hasattr(chroma_store, "version_source"):
+            bus = get_invalidation_bus()
+            bus.watch(chroma_store)
+            bus.subscribe(chroma_store.version_source, self._on_store_change)
+
+    @traced("bm25_build")
     def _build_bm25_index(self) -> None:
         """Build BM25 index from all documents in the store"""
-        all_data = self.store.get_all_chunks()
+        self._install_bm25(*self._index_store(self.store))
+
+    @staticmethod
+    def _version_of(store) -> Optional[int]:
+        return store.data_version() if hasattr(store, "data_version") else None
 
-        self._bm25_ids = all_data["ids"]
-        self._bm25_docs = all_data["documents"]
-        self._bm25_metadatas = all_data["metadatas"]
+    def _index_store(self, store) -> Tuple[Dict[str, Any], IncrementalBM25, Optional[int]]:
+        """Read every document from a store and build its BM25 index"""
+        # Read the version first: a write landing during the read leaves the index marked stale
+        version = self._version_of(store)
+        all_data = store.get_all_chunks()
 
         # Tokenize documents for BM25
-        tokenized_docs = [self._tokenize(doc) for doc in self._bm25_docs]
-        self._bm25_index = BM25Okapi(tokenized_docs)
+        tokenized_docs = [self._tokenize(doc) for doc in all_data["documents"]]
+        return all_data, IncrementalBM25(tokenized_docs), version
+
+    def _install_bm25(self, all_data: Dict[str, Any], index: IncrementalBM25, version: Optional[int] = None) -> None:
+        with self._bm25_lock:
+            self._bm25_ids = list(all_data["ids"])
+            self._bm25_docs = list(all_data["documents"])
+            self._bm25_metadatas = list(all_data["metadatas"])
+            self._bm25_index = index
+            self._bm25_version = version
+
+    def _on_store_change(self, source: str, version: int) -> None:
+        """Invalidation bus callback: reopen the store and drop BM25 if it missed the change"""
+        if hasattr(self.store, "refresh"):
+            self.store.refresh()
+        with self._bm25_lock:
+            if self._bm25_index is not None and version != self._bm25_version:
+                self._bm25_index = None  # rebuilt from the store on the next search
+
+    @traced("bm25_build")
+    def _prepare_swap(self, incoming) -> Optional[Callable[[], None]]:
+        """Build the incoming collection's BM25 index before the store swaps to it"""
+        if self._bm25_index is None:
+            return None  # built lazily from whatever is live at first search
+        all_data, index, version = self._index_store(incoming)
+        return lambda: self._install_bm25(all_data, index, version)
 
     def _tokenize(self, text: str) -> List[str]:
         """Tokenize text for BM25"""
@@ -99,7 +203,7 @@ class HybridRanker:
         Args:
             query: Search query
             n_results: Number of results (defaults to final_k)
-            where: Metadata filter for vector search
+            where: Metadata filter applied to both searches
 
         Returns:
             List of SearchResult objects ranked by hybrid score
@@ -109,8 +213,8 @@ class HybridRanker:
         # Get vector search results
         vector_results = self._vector_search(query, where)
 
-        # Get BM25 results
-        bm25_results = self._bm25_search(query)
+        # Get BM25 results (ranked among the chunks matching the filter)
+        bm25_results = self._bm25_search(query, where)
 
         # Combine with RRF
         combined = self._reciprocal_rank_fusion(vector_results, bm25_results)
@@ -119,6 +223,10 @@ class HybridRanker:
         if where:
             combined = self._apply_metadata_filter(combined, where)
 
+        # Rescore the fused candidates before cutting to n_results
+        if self.reranker is not None:
+            combined = self.reranker.rerank(query, combined)
+
         return combined[:n_results]
 
     def _vector_search(
@@ -145,40 +253,56 @@ class HybridRanker:
             results["distances"]
         ))
 
-    def _bm25_search(self, query: str) -> List[Tuple[str, str, Dict[str, Any], float]]:
+    @traced("bm25")
+    def _bm25_search(
+        self,
+        query: str,
+        where: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[str, str, Dict[str, Any], float]]:
         """
         Perform BM25 keyword search
 
+        The top bm25_k are taken among chunks matching `where`, so a tenant
+        filter doesn't leave other tenants' chunks holding every slot.
+
         Returns:
             List of (id, content, metadata, score) tuples
         """
-        # Build index if needed
+        # Notice writes from other processes (rate-limited), then build index if needed
+        get_invalidation_bus().check()
         if self._bm25_index is None:
             self._build_bm25_index()
 
         # Tokenize query
         query_tokens = self._tokenize(query)
 
-        # Get BM25 scores
-        scores = self._bm25_index.get_scores(query_tokens)
-
-        # Get top-k results
-        indexed_scores = list(enumerate(scores))
-        indexed_scores.sort(key=lambda x: x[1], reverse=True)
-        top_k = indexed_scores[:self.bm25_k]
-
-        results = []
-        for idx, score in top_k:
-            if score > 0:  # Only include results with positive scores
-                results.append((
-                    self._bm25_ids[idx],
-                    self._bm25_docs[idx],
-                    self._bm25_metadatas[idx],
-                    score
-                ))
+        with self._bm25_lock:
+            # Get BM25 scores
+            scores = self._bm25_index.get_scores(query_tokens)
+
+            # Get top-k results
+            indexed_scores = list(enumerate(scores))
+            if where:
+                indexed_scores = [
+                    (idx, score) for idx, score in indexed_scores
+                    if self._matches(self._bm25_metadatas[idx], where)
+                ]
+            indexed_scores.sort(key=lambda x: x[1], reverse=True)
+            top_k = indexed_scores[:self.bm25_k]
+
+            results = []
+            for idx, score in top_k:
+                if score > 0:  # Only include results with positive scores
+                    results.append((
+                        self._bm25_ids[idx],
+                        self._bm25_docs[idx],
+                        self._bm25_metadatas[idx],
+                        score
+                    ))
 
         return results
 
+    @traced("fusion")
     def _reciprocal_rank_fusion(
         self,
         vector_results: List[Tuple[str, str, Dict[str, Any], float]],
@@ -236,25 +360,56 @@ class HybridRanker:
         where: Dict[str, Any]
     ) -> List[SearchResult]:
         """Apply metadata filter to results"""
-        filtered = []
-        for result in results:
-            match = True
-            for key, value in where.items():
-                if key not in result.metadata:
-                    match = False
-                    break
-                if result.metadata[key] != value:
-                    match = False
-                    break
-            if match:
-                filtered.append(result)
-        return filtered
+        return [result for result in results if self._matches(result.metadata, where)]
+
+    @staticmethod
+    def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+        """Whether metadata has every key in `where` with the same value"""
+        return all(key in metadata and metadata[key] == value for key, value in where.items())
 
     def refresh_bm25_index(self) -> None:
         """Refresh the BM25 index after adding new documents"""
         self._bm25_index = None
         self._build_bm25_index()
 
+    @traced("bm25_update")
+    def update_bm25_index(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        removed_ids: Iterable[str] = ()
+    ) -> None:
+        """
+        Apply added and removed chunks to the BM25 index without a rebuild
+
+        Does nothing before the index is first built; the first search then
+        reads the store, which already holds the change.
+
+        Args:
+            ids: IDs of added chunks
+            documents: Contents of added chunks
+            metadatas: Metadata of added chunks
+            removed_ids: IDs of chunks no longer in the store
+        """
+        tokenized_docs = [self._tokenize(doc) for doc in documents]
+        drop = set(removed_ids)
+        with self._bm25_lock:
+            if self._bm25_index is None:
+                return
+            if drop:
+                positions = [i for i, chunk_id in enumerate(self._bm25_ids) if chunk_id in drop]
+                self._bm25_index.remove_documents(positions)
+                keep = [i for i, chunk_id in enumerate(self._bm25_ids) if chunk_id not in drop]
+                self._bm25_ids = [self._bm25_ids[i] for i in keep]
+                self._bm25_docs = [self._bm25_docs[i] for i in keep]
+                self._bm25_metadatas = [self._bm25_metadatas[i] for i in keep]
+            self._bm25_index.add_documents(tokenized_docs)
+            self._bm25_ids.extend(ids)
+            self._bm25_docs.extend(documents)
+            self._bm25_metadatas.extend(metadatas)
+            self._bm25_version = self._version_of(self.store)
+
     def vector_only_search(
         self,
         query: str,
@@ -7,7 +7,11 @@ from dataclasses import dataclass
 
 from .hybrid_ranker import HybridRanker, SearchResult
 from ..database.chroma_store import ChromaStore
+from ..database.invalidation import get_invalidation_bus
+from ..database.vector_index import create_vector_store
 from ..llm.answer_generator import AnswerGenerator
+from ..observability.tracing import traced
+from ..observability.usage import usage_context
 
 
 @dataclass
@@ -33,13 +37,27 @@ class QueryEngine:
         Initialize the query engine
 
         Args:
-            chroma_store: ChromaDB store instance (creates new if None)
+            chroma_store: Vector store instance, ChromaStore or VectorIndex
+                (opens the configured VECTOR_BACKEND if None)
             answer_generator: LLM answer generator (creates new if None)
         """
-        self.store = chroma_store or ChromaStore()
+        self.store = chroma_store or create_vector_store()
         self.ranker = HybridRanker(self.store)
         self.answer_generator = answer_generator or AnswerGenerator()
 
+        # Cached answers belong to the old collection once a rebuild is swapped in
+        if hasattr(self.store, "on_swap"):
+            self.store.on_swap(lambda incoming: self.answer_generator.clear_cache)
+
+        # ...and once any other write changes the store
+        if hasattr(self.store, "version_source"):
+            get_invalidation_bus().subscribe(self.store.version_source, self._on_store_change)
+
+    def _on_store_change(self, source: str, version: int) -> None:
+        """Invalidation bus callback: cached answers may cite replaced chunks"""
+        self.answer_generator.clear_cache()
+
+    @traced("query")
     def query(
         self,
         question: str,
@@ -64,19 +82,22 @@ class QueryEngine:
         if tenant_filter:
             where = {"tenant_name": tenant_filter}
 
-        # Search for relevant chunks
-        search_results = self.ranker.search(
-            query=question,
-            n_results=n_results,
-            where=where
-        )
+        # Attribute provider usage to the tenant filter
+        with usage_context(tenant_filter=tenant_filter):
+            # Search for relevant chunks
+            search_results = self.ranker.search(
+                query=question,
+                n_results=n_results,
+                where=where
+            )
 
-        # Generate answer using LLM
-        answer = self.answer_generator.generate_answer(
-            question=question,
-            contexts=[r.content for r in search_results],
-            metadatas=[r.metadata for r in search_results]
-        )
+            # Generate answer using LLM
+            answer = self.answer_generator.generate_answer(
+                question=question,
+                contexts=[r.content for r in search_results],
+                metadatas=[r.metadata for r in search_results],
+                scores=[r.score for r in search_results]
+            )
 
         # Prepare sources
         sources = []
@@ -130,11 +151,15 @@ class QueryEngine:
         return self.store.get_unique_tenants()
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get statistics about the database"""
+        """Get statistics about the database (from the store's facet counts, no chunk scan)"""
+        facets = self.store.get_facets()
+        tenants = sorted(facets["tenant_name"])
         return {
             "total_chunks": self.store.count(),
-            "tenants": self.get_tenant_list(),
-            "num_tenants": len(self.get_tenant_list())
+            "tenants": tenants,
+            "num_tenants": len(tenants),
+            "section_types": facets["section_type"],
+            "num_source_files": len(facets["source_file"])
         }
 
     def compare_tenants(
@@ -160,6 +185,7 @@ class QueryEngine:
             )
         return responses
 
+    @traced("chat")
     def chat(
         self,
         message: str,
@@ -186,29 +212,36 @@ class QueryEngine:
         if tenant_filter:
             where = {"tenant_name": tenant_filter}
 
-        # Reformulate vague follow-up questions into complete, searchable questions
-        # This ensures search works even for messages like "what about per month?"
-        search_query = message
-        if conversation_history:
-            search_query = self.answer_generator.reformulate_query(
-                message=message,
-                conversation_history=conversation_history
+        # Attribute provider usage to the tenant filter
+        with usage_context(tenant_filter=tenant_filter):
+            # Reformulate vague follow-up questions into complete, searchable questions
+            # This ensures search works even for messages like "what about per month?"
+            # Both LLM calls share one history split, so older turns are summarized once
+            window = self.answer_generator.fit_history(conversation_history)
+            search_query = message
+            if conversation_history:
+                search_query = self.answer_generator.reformulate_query(
+                    message=message,
+                    conversation_history=conversation_history,
+                    window=window
+                )
+
+            # Search for relevant chunks using the reformulated query
+            search_results = self.ranker.search(
+                query=search_query,
+                n_results=n_results,
+                where=where
             )
 
-        # Search for relevant chunks using the reformulated query
-        search_results = self.ranker.search(
-            query=search_query,
-            n_results=n_results,
-            where=where
-        )
-
-        # Generate answer using LLM with conversation history
-        answer = self.answer_generator.generate_chat_response(
-            message=message,
-            contexts=[r.content for r in search_results],
-            conversation_history=conversation_history,
-            metadatas=[r.metadata for r in search_results]
-        )
+            # Generate answer using LLM with conversation history
+            answer = self.answer_generator.generate_chat_response(
+                message=message,
+                contexts=[r.content for r in search_results],
+                conversation_history=conversation_history,
+                metadatas=[r.metadata for r in search_results],
+                scores=[r.score for r in search_results],
+                window=window
+            )
 
         # Prepare sources
         sources = []
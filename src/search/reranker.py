@@ -0,0 +1,197 @@
+"""
+Rerank fused hybrid search candidates with a linear model over cheap features
+Chunk features are read from metadata stored at ingest; query features are
+computed once per query, and every candidate is scored in one NumPy product
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Mapping, Optional
+
+import numpy as np
+
+from config.settings import RERANK_WEIGHTS
+from ..chunking.features import FEATURE_PREFIX, chunk_features
+from ..observability.tracing import traced
+
+
+# Column order of the feature matrix; weights are looked up by these names
+FEATURE_NAMES = (
+    "fusion",           # RRF score scaled so the best candidate is 1.0
+    "structured",       # chunk comes from the structured lease data
+    "numeric",          # chunk numeric density, when the query asks for a figure
+    "tenant_match",     # share of the chunk tenant's name found in the query
+    "tenant_mismatch",  # query names a different candidate tenant better
+    "section_match",    # chunk section type fits the query's topic
+)
+
+# Tenant names that are portfolio-wide rather than one tenant
+PORTFOLIO_TENANTS = frozenset({"ALL", ""})
+
+# A tenant counts as named in the query at this share of its name tokens
+TENANT_MENTION_THRESHOLD = 0.5
+
+# Questions asking for an amount, size, rate or date
+NUMERIC_QUERY_PATTERN = re.compile(
+    r'\$|%|\bhow (?:much|many|long)\b|\brent\b|\bcost|\bamount|\bsquare\b|\bsf\b|\bsq\b|\brate\b|\bpsf\b|'
+    r'\ballowance\b|\bwhen\b|\bdate\b|\bexpir|\bescalat|\bincrease|\btotal\b',
+    re.IGNORECASE
+)
+
+# Query topics and the section types (chunker and structured data) that answer them
+SECTION_INTENTS = (
+    (re.compile(r'\brent\b|\bescalat|\bincrease|\bpsf\b|\bper square', re.IGNORECASE),
+     frozenset({"rent_schedule", "lease_summary", "rent_projection", "rent_comparison", "data_sheet"})),
+    (re.compile(r'\bti\b|tenant improvement|\ballowance\b', re.IGNORECASE),
+     frozenset({"ti_allowance"})),
+    (re.compile(r'\bcam\b|recover|operating expense|\btax(?:es)?\b|\binsurance\b|pro rata', re.IGNORECASE),
+     frozenset({"recoveries"})),
+    (re.compile(r'co-?tenancy', re.IGNORECASE),
+     frozenset({"cotenancy", "cotenancy_risk_summary"})),
+    (re.compile(r'\bexpir|\bterm\b|commenc|\brenew|\boption', re.IGNORECASE),
+     frozenset({"lease_summary", "data_sheet", "article"})),
+    (re.compile(r'\bsquare f|\bsf\b|\bsq\.? ?ft|\bsize\b|\bpremises\b', re.IGNORECASE),
+     frozenset({"lease_summary", "data_sheet"})),
+    (re.compile(r'\bportfolio\b|\ball (?:the )?tenants\b|\bwhich tenants\b|\bcompare|\bacross\b|\bhighest\b|\blowest\b',
+                re.IGNORECASE),
+     frozenset({"portfolio_summary", "rent_comparison", "cotenancy_risk_summary", "rent_projection"})),
+)
+
+# Name tokens that say nothing about which tenant is meant
+GENERIC_NAME_TOKENS = frozenset({"the", "and", "inc", "llc", "co", "corp", "ltd", "of"})
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> FrozenSet[str]:
+    """Lowercase word tokens with possessives and apostrophes folded away"""
+    text = text.lower().replace("\u2019", "'").replace("'s", "").replace("'", "")
+    return frozenset(TOKEN_PATTERN.findall(text)) - GENERIC_NAME_TOKENS
+
+
+@lru_cache(maxsize=1024)
+def _name_tokens(tenant_name: str) -> FrozenSet[str]:
+    return _tokens(tenant_name)
+
+
+class Reranker:
+    """Rerank stage interface; the base class keeps the fused order"""
+
+    def rerank(self, query: str, results: List) -> List:
+        """
+        Reorder fused search results for a query
+
+        Args:
+            query: Search query
+            results: SearchResult objects in fused order
+
+        Returns:
+            The same results, reordered
+        """
+        return results
+
+
+class LinearReranker(Reranker):
+    """
+    Score candidates as features @ weights and sort by the result
+
+    Each result's score becomes the rerank score and its RRF score is kept
+    in fusion_score, so downstream consumers keep sorting by `score`.
+    """
+
+    def __init__(self, weights: Optional[Mapping[str, float]] = None):
+        """
+        Initialize the reranker
+
+        Args:
+            weights: Feature name -> weight (defaults to RERANK_WEIGHTS);
+                features left out weigh 0
+        """
+        weights = dict(RERANK_WEIGHTS if weights is None else weights)
+        unknown = set(weights) - set(FEATURE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown rerank features: {sorted(unknown)}")
+        self.weights = np.array([weights.get(name, 0.0) for name in FEATURE_NAMES], dtype=np.float64)
+
+    def query_features(self, query: str) -> Dict[str, object]:
+        """
+        Features of the query shared by every candidate
+
+        Returns:
+            Dict with the query tokens, whether it asks for a figure and the
+            section types its topics point to
+        """
+        sections = set()
+        for pattern, section_types in SECTION_INTENTS:
+            if pattern.search(query):
+                sections |= section_types
+        return {
+            "tokens": _tokens(query),
+            "numeric": bool(NUMERIC_QUERY_PATTERN.search(query)),
+            "sections": frozenset(sections),
+        }
+
+    def feature_matrix(self, query: str, results: List) -> np.ndarray:
+        """
+        Build the (candidates x FEATURE_NAMES) matrix for fused results
+
+        Args:
+            query: Search query
+            results: SearchResult objects
+
+        Returns:
+            float64 array with one row per result
+        """
+        query_info = self.query_features(query)
+        query_tokens = query_info["tokens"]
+
+        # Name overlap per distinct candidate tenant
+        overlap: Dict[str, float] = {}
+        for result in results:
+            tenant = str(result.metadata.get("tenant_name") or "")
+            if tenant not in overlap:
+                name = _name_tokens(tenant) if tenant not in PORTFOLIO_TENANTS else frozenset()
+                overlap[tenant] = len(name & query_tokens) / len(name) if name else 0.0
+        best = max(overlap.values(), default=0.0)
+        named = best >= TENANT_MENTION_THRESHOLD
+
+        fusion = np.array([result.score for result in results], dtype=np.float64)
+        top = fusion.max() if len(fusion) else 0.0
+
+        matrix = np.zeros((len(results), len(FEATURE_NAMES)), dtype=np.float64)
+        if top > 0:
+            matrix[:, 0] = fusion / top
+        for row, result in enumerate(results):
+            metadata = result.metadata
+            stored = metadata
+            if f"{FEATURE_PREFIX}structured" not in metadata:
+                # Chunks indexed before features were stored
+                stored = chunk_features(result.content, metadata)
+            tenant = str(metadata.get("tenant_name") or "")
+            tenant_overlap = overlap[tenant]
+
+            matrix[row, 1] = stored[f"{FEATURE_PREFIX}structured"]
+            if query_info["numeric"]:
+                matrix[row, 2] = stored[f"{FEATURE_PREFIX}numeric_density"]
+            matrix[row, 3] = tenant_overlap
+            if named and tenant not in PORTFOLIO_TENANTS and tenant_overlap < best:
+                matrix[row, 4] = 1.0
+            if metadata.get("section_type") in query_info["sections"]:
+                matrix[row, 5] = 1.0
+        return matrix
+
+    @traced("rerank")
+    def rerank(self, query: str, results: List) -> List:
+        """Score results as feature_matrix @ weights and sort by score"""
+        if not results:
+            return results
+        scores = self.feature_matrix(query, results) @ self.weights
+        # Stable sort keeps the fused order between equal scores
+        order = np.argsort(-scores, kind="stable")
+        reranked = []
+        for index in order:
+            result = results[index]
+            result.fusion_score = result.score
+            result.score = float(scores[index])
+            reranked.append(result)
+        return reranked
@@ -3,12 +3,14 @@ Embedder for creating vector representations of text
 Uses OpenAI embeddings
 """
 
-from typing import List, Optional
-from openai import OpenAI
+import time
+from typing import List, Optional, Tuple
 from tqdm import tqdm
-import tiktoken
 
 from config.settings import OPENAI_API_KEY, EMBEDDING_MODEL, EMBEDDING_BATCH_SIZE
+from ..memory.history_budget import get_tokenizer
+from ..observability.usage import UsageTracker, get_usage_tracker, usage_from_response
+from .embedding_cache import EmbeddingCache
 
 
 class Embedder:
@@ -17,11 +19,16 @@ class Embedder:
     # Maximum tokens for embedding model
     MAX_TOKENS = 8000  # Leave some buffer below 8192 limit
 
+    # Tokens per embeddings request (the API allows 300k)
+    MAX_BATCH_TOKENS = 250_000
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = EMBEDDING_MODEL,
-        batch_size: int = EMBEDDING_BATCH_SIZE
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        usage_tracker: Optional[UsageTracker] = None,
+        cache: Optional[EmbeddingCache] = None
     ):
         """
         Initialize the embedder
@@ -30,23 +37,61 @@ class Embedder:
             api_key: OpenAI API key (defaults to env var)
             model: Embedding model to use
             batch_size: Number of texts to embed per batch
+            usage_tracker: Sink for token/cost records (defaults to the shared tracker)
+            cache: Embedding cache consulted by embed_texts (None = always call the API)
         """
         self.api_key = api_key or OPENAI_API_KEY
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
 
-        self.client = OpenAI(api_key=self.api_key)
+        self._client = None
         self.model = model
         self.batch_size = batch_size
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.usage = usage_tracker or get_usage_tracker()
+        self.cache = cache
+
+    @property
+    def client(self):
+        """OpenAI client (the openai package is imported on first request)"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    @property
+    def tokenizer(self):
+        """Shared cl100k_base encoding (loaded on first use)"""
+        return get_tokenizer()
 
     def _truncate_text(self, text: str) -> str:
         """Truncate text to fit within token limit"""
+        return self._truncate_counted(text)[0]
+
+    def _truncate_counted(self, text: str) -> Tuple[str, int]:
+        """Truncate text to fit within token limit and return its token count"""
         tokens = self.tokenizer.encode(text)
         if len(tokens) > self.MAX_TOKENS:
             tokens = tokens[:self.MAX_TOKENS]
             text = self.tokenizer.decode(tokens)
-        return text
+        return text, len(tokens)
+
+    def _create(self, text: str, operation: str) -> List[float]:
+        """Call the embeddings API and record its token usage"""
+        start = time.perf_counter()
+        response = self.client.embeddings.create(
+            input=text,
+            model=self.model
+        )
+        prompt_tokens, _ = usage_from_response(response)
+        self.usage.record(
+            operation, "openai", self.model, prompt_tokens, 0,
+            (time.perf_counter() - start) * 1000, prompt_chars=len(text)
+        )
+        return response.data[0].embedding
 
     def embed_text(self, text: str) -> List[float]:
         """
@@ -59,16 +104,42 @@ class Embedder:
             Embedding vector
         """
         text = self._truncate_text(text)
+        return self._create(text, "embedding")
+
+    def _create_batch(self, texts: List[str], operation: str) -> List[List[float]]:
+        """Embed several texts in one API call and record its token usage"""
+        start = time.perf_counter()
         response = self.client.embeddings.create(
-            input=text,
+            input=texts,
             model=self.model
         )
-        return response.data[0].embedding
+        prompt_tokens, _ = usage_from_response(response)
+        self.usage.record(
+            operation, "openai", self.model, prompt_tokens, 0,
+            (time.perf_counter() - start) * 1000, prompt_chars=sum(map(len, texts))
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def _batches(self, texts: List[str], token_counts: List[int]) -> List[List[int]]:
+        """Group text positions into requests under batch_size and MAX_BATCH_TOKENS"""
+        batches, current, current_tokens = [], [], 0
+        for i, count in enumerate(token_counts):
+            if current and (len(current) >= self.batch_size or current_tokens + count > self.MAX_BATCH_TOKENS):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += count
+        if current:
+            batches.append(current)
+        return batches
 
     def embed_texts(self, texts: List[str], show_progress: bool = True) -> List[List[float]]:
         """
         Create embeddings for multiple texts
 
+        Cached vectors are reused; the rest are embedded in batched requests
+        and added to the cache.
+
         Args:
             texts: List of texts to embed
             show_progress: Whether to show progress bar
@@ -76,25 +147,40 @@ class Embedder:
         Returns:
             List of embedding vectors
         """
-        all_embeddings = []
-
         # Truncate all texts first
-        texts = [self._truncate_text(t) for t in texts]
+        counted = [self._truncate_counted(t) for t in texts]
+        texts = [text for text, _ in counted]
+
+        all_embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        if self.cache is not None:
+            for i, vector in self.cache.get_many(self.model, texts).items():
+                all_embeddings[i] = vector
+        missing = [i for i, vector in enumerate(all_embeddings) if vector is None]
 
-        # Process one at a time to avoid batch token limits
-        iterator = tqdm(texts, desc="Embedding texts") if show_progress else texts
+        batches = self._batches([texts[i] for i in missing], [counted[i][1] for i in missing])
+        iterator = tqdm(batches, desc="Embedding batches") if show_progress else batches
 
-        for text in iterator:
+        for batch in iterator:
+            positions = [missing[j] for j in batch]
+            batch_texts = [texts[i] for i in positions]
             try:
-                response = self.client.embeddings.create(
-                    input=text,
-                    model=self.model
-                )
-                all_embeddings.append(response.data[0].embedding)
+                vectors = self._create_batch(batch_texts, "embedding_ingest")
             except Exception as e:
-                print(f"Error embedding text: {e}")
-                # Return zero vector as fallback
-                all_embeddings.append([0.0] * 1536)
+                print(f"Error embedding batch, retrying one at a time: {e}")
+                vectors = []
+                for text in batch_texts:
+                    try:
+                        vectors.append(self._create(text, "embedding_ingest"))
+                    except Exception as e:
+                        print(f"Error embedding text: {e}")
+                        # Return zero vector as fallback
+                        vectors.append(None)
+
+            embedded = [(text, vector) for text, vector in zip(batch_texts, vectors) if vector is not None]
+            if self.cache is not None and embedded:
+                self.cache.put_many(self.model, [text for text, _ in embedded], [vector for _, vector in embedded])
+            for i, vector in zip(positions, vectors):
+                all_embeddings[i] = vector if vector is not None else [0.0] * 1536
 
         return all_embeddings
 
@@ -0,0 +1,117 @@
+"""
+Persistent cache of text embeddings
+Vectors are keyed by the sha256 of (model, text), so re-ingesting an edited
+lease only pays for the chunks whose text actually changed
+"""
+
+import hashlib
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config.settings import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_ENABLED
+
+
+def embedding_key(model: str, text: str) -> str:
+    """Cache key for one text under one embedding model"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite table of float32 embedding blobs
+
+    Thread-safe; one connection is shared behind a lock.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: SQLite file for cached vectors (defaults to EMBEDDING_CACHE_PATH)
+        """
+        self.db_path = Path(db_path or EMBEDDING_CACHE_PATH)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get_many(self, model: str, texts: Sequence[str]) -> Dict[int, List[float]]:
+        """
+        Look up cached vectors
+
+        Args:
+            model: Embedding model name
+            texts: Texts to look up
+
+        Returns:
+            Dict of position in texts -> vector, for the texts that were cached
+        """
+        keys = [embedding_key(model, text) for text in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                for key, blob in conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ):
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+            self.hits += len(hits)
+            self.misses += len(keys) - len(hits)
+        return hits
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors for texts under model"""
+        rows = [
+            (embedding_key(model, text), model, np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)", rows)
+            conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached vector"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache at EMBEDDING_CACHE_PATH, or None when disabled"""
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+    return EmbeddingCache()
@@ -2,6 +2,7 @@
 Pytest configuration and shared fixtures.
 """
 
+import importlib
 import pytest
 import sys
 from pathlib import Path
@@ -12,6 +13,51 @@ import os
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.database.sql_store import SQLStore
+from src.memory.history_budget import get_tokenizer
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "needs_tokenizer: skip when the cl100k_base encoding can't be loaded")
+
+
+def _tokenizer_available() -> bool:
+    """Whether tiktoken can load cl100k_base (it is fetched on first use, so offline runs can't)."""
+    try:
+        get_tokenizer()
+        return True
+    except Exception:
+        return False
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip needs_tokenizer tests when the encoding is unavailable."""
+    marked = [item for item in items if item.get_closest_marker("needs_tokenizer")]
+    if marked and not _tokenizer_available():
+        skip = pytest.mark.skip(reason="cl100k_base encoding unavailable")
+        for item in marked:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def api_main(tmp_path_factory):
+    """api.main imported with its vector store, lease and session databases kept out of data/."""
+    from src.database import chroma_store
+    from src.llm import answer_generator
+    from src.memory import conversation_memory
+
+    root = tmp_path_factory.mktemp("api")
+    patch = pytest.MonkeyPatch()
+    # The module builds its QueryEngine and SQLStore on import; neither calls OpenAI here
+    patch.setattr(answer_generator, "OPENAI_API_KEY", answer_generator.OPENAI_API_KEY or "sk-test")
+    patch.setattr(chroma_store, "CHROMA_PERSIST_DIR", root / "chroma_db")
+    patch.setattr(conversation_memory, "CHAT_SESSIONS_DB_PATH", root / "sessions.db")
+    patch.chdir(root)
+    conversation_memory.get_conversation_manager.cache_clear()
+    try:
+        yield importlib.import_module("api.main")
+    finally:
+        patch.undo()
+        conversation_memory.get_conversation_manager.cache_clear()
 
 
 @pytest.fixture(scope="function")
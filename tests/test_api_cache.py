@@ -0,0 +1,144 @@
+"""
+Tests for conditional GETs and keyset pagination on the read endpoints.
+"""
+
+import base64
+import json
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from api.http_cache import etag_for
+from config.settings import API_CACHE_MAX_AGE
+from src.database.sql_store import SQLStore
+
+CACHE_CONTROL = f"private, max-age={API_CACHE_MAX_AGE}, must-revalidate"
+
+
+@pytest.fixture
+def store(api_main, tmp_path, monkeypatch):
+    """A fresh lease database behind the endpoints, with five leases ending a month apart."""
+    sql_store = SQLStore(db_path=str(tmp_path / "leases.db"))
+    for month in range(1, 6):
+        sql_store.add_lease(f"Tenant {month}", f"tenant_{month}.docx", end_date=f"2030-0{month}-01",
+                            base_rent=1000.0 * month)
+    # TestClient runs the app on a thread of its own; under uvicorn the async
+    # handlers share the thread that imported api.main
+    sql_store.conn.close()
+    sql_store.conn = sqlite3.connect(str(sql_store.db_path), check_same_thread=False)
+    sql_store.conn.row_factory = sqlite3.Row
+    monkeypatch.setattr(api_main, "sql_store", sql_store)
+    yield sql_store
+    sql_store.close()
+
+
+@pytest.fixture
+def client(api_main, store):
+    """Client without the lifespan, so the job queue and scheduler stay stopped."""
+    return TestClient(api_main.app)
+
+
+class TestConditionalGet:
+    """Test ETag revalidation on the cached read endpoints."""
+
+    @pytest.mark.parametrize("path", ["/api/leases", "/api/tenants", "/api/leases/1", "/api/analytics/summary"])
+    def test_etag_tracks_data_version(self, client, store, path):
+        """Responses carry a weak ETag built from data_version and today's date."""
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert re.fullmatch(r'W/"\d+-\d{4}-\d{2}-\d{2}"', response.headers["etag"])
+        assert response.headers["etag"] == etag_for(store.data_version())
+
+    @pytest.mark.parametrize("header", ["{etag}", "{strong}", '"stale", {etag}', "*"])
+    def test_matching_if_none_match_is_304(self, client, header):
+        """A matching tag (weak or strong form, in a list, or *) gets an empty 304."""
+        etag = client.get("/api/leases").headers["etag"]
+
+        response = client.get("/api/leases", headers={
+            "If-None-Match": header.format(etag=etag, strong=etag.removeprefix("W/"))
+        })
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_write_invalidates_etag(self, client, store):
+        """After a write bumps data_version, the old tag gets a fresh 200."""
+        first = client.get("/api/leases")
+        store.add_lease("Tenant 6", "tenant_6.docx", end_date="2030-06-01")
+
+        response = client.get("/api/leases", headers={"If-None-Match": first.headers["etag"]})
+        assert response.status_code == 200
+        assert response.headers["etag"] != first.headers["etag"]
+        assert response.json()["count"] == first.json()["count"] + 1
+
+    def test_cache_control(self, client):
+        """200 and 304 both tell clients to revalidate once max-age has passed."""
+        response = client.get("/api/leases")
+        assert response.headers["cache-control"] == CACHE_CONTROL
+
+        revalidated = client.get("/api/leases", headers={"If-None-Match": response.headers["etag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["cache-control"] == CACHE_CONTROL
+
+    def test_missing_rows_are_not_cached(self, client):
+        """404s carry no ETag."""
+        response = client.get("/api/leases/999")
+
+        assert response.status_code == 404
+        assert "etag" not in response.headers
+
+
+class TestPagination:
+    """Test keyset pagination on the list endpoints."""
+
+    def test_pages_cover_every_row_once(self, client):
+        """Following next_cursor walks all leases in end-date order and ends with None."""
+        pages = []
+        params = {"limit": 2}
+        while True:
+            page = client.get("/api/leases", params=params).json()
+            pages.append(page)
+            if page["next_cursor"] is None:
+                break
+            params["cursor"] = page["next_cursor"]
+
+        assert [page["count"] for page in pages] == [2, 2, 1]
+        end_dates = [lease["end_date"] for page in pages for lease in page["leases"]]
+        assert end_dates == [f"2030-0{month}-01" for month in range(1, 6)]
+
+    def test_stale_tag_gets_the_requested_page(self, client):
+        """A cursor request with an outdated tag is served that page in full."""
+        first = client.get("/api/leases", params={"limit": 2})
+        second = client.get("/api/leases", params={"limit": 2, "cursor": first.json()["next_cursor"]},
+                            headers={"If-None-Match": "W/\"0-2000-01-01\""})
+
+        assert second.status_code == 200
+        assert [lease["tenant_name"] for lease in second.json()["leases"]] == ["Tenant 3", "Tenant 4"]
+
+    def test_fields_projection(self, client):
+        """?fields= limits each row to the named columns."""
+        page = client.get("/api/tenants", params={"fields": "tenant_name", "limit": 3}).json()
+
+        assert page["tenants"] == [{"tenant_name": f"Tenant {n}"} for n in range(1, 4)]
+        assert client.get("/api/tenants", params={"fields": "bogus"}).status_code == 400
+
+    @pytest.mark.parametrize("cursor", [
+        "zzz",
+        base64.urlsafe_b64encode(b"not json").decode("ascii"),
+        base64.urlsafe_b64encode(json.dumps({"after": 1}).encode("utf-8")).decode("ascii"),
+        base64.urlsafe_b64encode(json.dumps([1, 2, 3]).encode("utf-8")).decode("ascii"),
+    ])
+    def test_bad_cursor_is_400(self, client, cursor):
+        """A cursor that doesn't decode to a keyset position is rejected."""
+        response = client.get("/api/leases", params={"cursor": cursor})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
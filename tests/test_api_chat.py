@@ -0,0 +1,117 @@
+"""
+Tests for multi-turn chat over the API.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.database.sql_store import SQLStore
+from src.memory import ConversationManager, SQLiteSessionBackend
+from src.search.query_engine import QueryResponse
+
+
+class FakeEngine:
+    """Stands in for QueryEngine.chat, recording the history each turn was given."""
+
+    def __init__(self):
+        self.histories = []
+
+    def chat(self, message, conversation_history, n_results=5, tenant_filter=None):
+        self.histories.append(list(conversation_history))
+        return QueryResponse(answer=f"Answer to {message}", sources=[], query=message, num_results=0)
+
+
+@pytest.fixture
+def engine(api_main, monkeypatch):
+    """The fake engine behind /api/chat."""
+    engine = FakeEngine()
+    monkeypatch.setattr(api_main, "query_engine", engine)
+    return engine
+
+
+@pytest.fixture
+def manager(api_main, tmp_path, monkeypatch):
+    """A fresh session store behind /api/chat."""
+    manager = ConversationManager(backend=SQLiteSessionBackend(str(tmp_path / "sessions.db")))
+    monkeypatch.setattr(api_main, "get_conversation_manager", lambda: manager)
+    yield manager
+    manager.backend.close()
+
+
+@pytest.fixture
+def client(api_main, engine, manager, tmp_path, monkeypatch):
+    """Client without the lifespan, logging queries to a throwaway database."""
+    sql_store = SQLStore(db_path=str(tmp_path / "leases.db"))
+    # TestClient runs the app on a thread of its own
+    sql_store.conn.close()
+    sql_store.conn = sqlite3.connect(str(sql_store.db_path), check_same_thread=False)
+    sql_store.conn.row_factory = sqlite3.Row
+    monkeypatch.setattr(api_main, "sql_store", sql_store)
+    yield TestClient(api_main.app)
+    sql_store.close()
+
+
+class TestChat:
+    """Test /api/chat sessions."""
+
+    def test_first_turn_starts_a_session(self, client, engine, manager):
+        """Without a session_id the chat starts fresh and returns the new ID."""
+        response = client.post("/api/chat", json={"message": "What is Sephora's rent?"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["answer"] == "Answer to What is Sephora's rent?"
+        assert body["turn_count"] == 1
+        assert body["session_id"] in manager
+        assert engine.histories == [[]]
+
+    def test_follow_up_sees_earlier_turns(self, client, engine):
+        """Sending the session_id back passes the stored history to the engine."""
+        session_id = client.post("/api/chat", json={"message": "What is Sephora's rent?"}).json()["session_id"]
+
+        body = client.post("/api/chat", json={"message": "And per month?", "session_id": session_id}).json()
+
+        assert body["session_id"] == session_id
+        assert body["turn_count"] == 2
+        assert engine.histories[-1] == [
+            {"role": "user", "content": "What is Sephora's rent?"},
+            {"role": "assistant", "content": "Answer to What is Sephora's rent?"},
+        ]
+
+    def test_unknown_session_starts_over(self, client, engine):
+        """An expired or made-up session_id gets a new session with no history."""
+        body = client.post("/api/chat", json={"message": "Hi", "session_id": "gone"}).json()
+
+        assert body["session_id"] != "gone"
+        assert body["turn_count"] == 1
+        assert engine.histories == [[]]
+
+    def test_history_survives_restart(self, client, engine, manager, tmp_path, api_main, monkeypatch):
+        """A new manager on the same session file (another worker, or a restart) continues the chat."""
+        session_id = client.post("/api/chat", json={"message": "What is Sephora's rent?"}).json()["session_id"]
+        restarted = ConversationManager(backend=SQLiteSessionBackend(str(tmp_path / "sessions.db")))
+        monkeypatch.setattr(api_main, "get_conversation_manager", lambda: restarted)
+
+        body = client.post("/api/chat", json={"message": "And per month?", "session_id": session_id}).json()
+
+        assert body["turn_count"] == 2
+        assert len(engine.histories[-1]) == 2
+        restarted.backend.close()
+
+    def test_delete_ends_the_session(self, client, manager):
+        """DELETE forgets the session, so the next turn starts over."""
+        session_id = client.post("/api/chat", json={"message": "Hi"}).json()["session_id"]
+
+        response = client.delete(f"/api/chat/{session_id}")
+
+        assert response.json() == {"session_id": session_id, "deleted": True}
+        assert session_id not in manager
+        body = client.post("/api/chat", json={"message": "Hi", "session_id": session_id}).json()
+        assert body["session_id"] != session_id
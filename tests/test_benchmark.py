@@ -0,0 +1,140 @@
+"""
+Tests for the offline benchmark harness.
+"""
+
+from pathlib import Path
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.benchmark.fakes import FakeEmbedder, FakeLLMClient
+from src.benchmark.harness import BenchmarkConfig, compare_reports, percentiles, run_benchmark
+from src.benchmark.importtime import LIGHT_ENTRY_POINTS, measure_imports, parse_importtime
+from src.benchmark.queries import TEST_QUERIES, iter_questions, labeled_queries
+
+
+def _report(p95: float = 10.0, qps: float = 100.0, recall: float = 0.7):
+    return {
+        "latency_ms": {"total": {"p50": p95 / 2, "p95": p95, "p99": p95 * 1.2}},
+        "throughput": {"qps": qps, "latency_ms": {"p50": 5.0, "p95": 10.0, "p99": 12.0}},
+        "retrieval": {"recall_at_k": recall, "hit_rate": 1.0, "mrr": 0.9},
+    }
+
+
+class TestFakes:
+    """Test the deterministic backend stand-ins."""
+
+    def test_embedder_is_deterministic(self):
+        """Same seed gives the same vectors; shared words make texts closer."""
+        a, b = FakeEmbedder(seed=3), FakeEmbedder(seed=3)
+        assert a.embed_query("Sephora monthly rent") == b.embed_query("Sephora monthly rent")
+
+        rent = np.array(a.embed_query("Sephora monthly rent"))
+        close = np.array(a.embed_text("Sephora rent is due monthly"))
+        far = np.array(a.embed_text("Trader Joe's parking ratio"))
+        assert rent @ close > rent @ far
+        assert np.isclose(np.linalg.norm(rent), 1.0)
+
+    def test_llm_client_shapes(self):
+        """Client answers with OpenAI and Anthropic response shapes."""
+        client = FakeLLMClient(completion="canned")
+        messages = [{"role": "user", "content": "What is the rent?"}]
+
+        openai_response = client.chat.completions.create(model="m", messages=messages, max_tokens=10)
+        anthropic_response = client.messages.create(model="m", messages=messages, max_tokens=10)
+
+        assert openai_response.choices[0].message.content == "canned"
+        assert anthropic_response.content[0].text == "canned"
+        assert client.calls == 2
+        assert client.prompt_chars == 2 * len("What is the rent?")
+
+
+class TestQueries:
+    """Test the benchmark query sets."""
+
+    def test_follow_ups_carry_history(self):
+        """Follow-up pairs yield the second question with the first as history."""
+        follow_ups = list(iter_questions(["Follow-Up Questions"]))
+        assert len(follow_ups) == len(TEST_QUERIES["Follow-Up Questions"])
+        _, question, history = follow_ups[0]
+        assert question == "What about per month?"
+        assert history[0]["role"] == "user"
+
+    def test_labeled_queries_name_one_tenant(self):
+        """Labeled queries exist and each names its tenant."""
+        labeled = labeled_queries()
+        assert len(labeled) > 20
+        assert any(item["tenant_name"] == "Sephora" for item in labeled)
+        assert all("Compare" not in item["question"] for item in labeled)
+
+
+class TestReports:
+    """Test percentiles and baseline comparison."""
+
+    def test_percentiles(self):
+        """Percentiles summarize a latency list."""
+        summary = percentiles(list(range(1, 101)))
+        assert summary["count"] == 100
+        assert summary["p50"] == pytest.approx(50.5)
+        assert summary["p99"] == pytest.approx(99.01)
+        assert percentiles([])["count"] == 0
+
+    def test_compare_flags_regressions(self):
+        """Slower latency, lower throughput and lower recall regress."""
+        comparison = compare_reports(_report(p95=20.0, qps=50.0, recall=0.6), _report())
+        assert "latency_ms.total.p95" in comparison["regressions"]
+        assert "throughput.qps" in comparison["regressions"]
+        assert "retrieval.recall_at_k" in comparison["regressions"]
+
+    def test_compare_ignores_small_changes(self):
+        """Improvements and sub-threshold changes do not regress."""
+        assert compare_reports(_report(p95=10.5, qps=120.0, recall=0.695), _report())["regressions"] == []
+        # 50% slower but under the 1 ms floor
+        assert compare_reports(_report(p95=1.2), _report(p95=0.8))["regressions"] == []
+
+
+@pytest.mark.needs_tokenizer
+class TestRunBenchmark:
+    """Test a full offline run."""
+
+    def test_run_benchmark(self):
+        """A run reports every stage, throughput and retrieval quality."""
+        report = run_benchmark(BenchmarkConfig(clients=2, categories=["Basic Information"]))
+
+        assert report["corpus"]["chunks"] > 0
+        assert report["latency_ms"]["total"]["count"] == len(TEST_QUERIES["Basic Information"])
+        assert report["latency_ms"]["vector"]["count"] > 0
+        assert report["throughput"]["qps"] > 0
+        assert report["retrieval"]["hit_rate"] > 0.5
+        assert compare_reports(report, report)["regressions"] == []
+
+
+class TestImportTime:
+    """Test cold-start imports of the startup-sensitive entry points."""
+
+    def test_parse_importtime(self):
+        """The target's cumulative time is the entry point's total."""
+        stderr = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   json.decoder",
+            "import time:       300 |        420 | json",
+            "import time:        80 |        500 | app",
+        ])
+        profile = parse_importtime(stderr, "app")
+        assert profile.total_ms == 0.5
+        assert profile.loaded("json") and not profile.loaded("js")
+        assert profile.slowest(1) == [("app", 0.5)]
+
+    @pytest.mark.parametrize("module", LIGHT_ENTRY_POINTS)
+    def test_entry_points_skip_heavy_packages(self, module, monkeypatch):
+        """chromadb, openai, anthropic, streamlit, pandas and docx load only when used."""
+        # api.main builds its QueryEngine on import, which needs a key (but no client yet)
+        monkeypatch.setenv("OPENAI_API_KEY", os.environ.get("OPENAI_API_KEY") or "sk-test")
+        profile = measure_imports(module)
+        assert profile.heavy() == [], f"{module} imports {profile.heavy()} at startup"
+
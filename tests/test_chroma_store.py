@@ -0,0 +1,178 @@
+"""
+Tests for blue/green versioned collections in ChromaStore.
+"""
+
+from multiprocessing import Process
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.benchmark.fakes import FakeEmbedder
+from src.chunking.chunker import Chunk
+from src.database.chroma_store import ChromaStore
+from src.database.facet_index import FacetIndex
+from src.search.hybrid_ranker import HybridRanker
+from src.search.reranker import Reranker
+
+
+def _chunk(chunk_id: str, content: str) -> Chunk:
+    return Chunk(
+        id=chunk_id,
+        content=content,
+        metadata={"tenant_name": "Summit Coffee"},
+        token_count=len(content.split()),
+        source_file="summit.docx",
+        section_type="article"
+    )
+
+
+def _count_chunks(path: str, n: int) -> None:
+    index = FacetIndex(path)
+    for _ in range(n):
+        index.add([{"tenant_name": "Summit Coffee"}])
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ChromaStore(persist_dir=str(tmp_path / "chroma"), collection_name="swap_test", embedder=FakeEmbedder())
+    store.add_chunks([_chunk("old-1", "Tenant pays minimum rent monthly"),
+                      _chunk("old-2", "Landlord maintains the roof")], show_progress=False)
+    return store
+
+
+class TestVersionedCollections:
+    """Test rebuilds that swap in a new collection version."""
+
+    def test_rebuild_serves_old_data_until_swap(self, store):
+        """Readers see the old collection while the new version is filled."""
+        seen_during_build = []
+
+        def populate(version):
+            version.add_chunks([_chunk("new-1", "Tenant pays percentage rent annually")], show_progress=False)
+            seen_during_build.append(sorted(store.get_all_chunks()["ids"]))
+
+        version = store.rebuild(populate)
+        assert seen_during_build == [["old-1", "old-2"]]
+        assert version.collection_name == "swap_test__v1"
+        assert store.collection_name == "swap_test__v1"
+        assert store.get_all_chunks()["ids"] == ["new-1"]
+
+        # Another process opening the alias lands on the new version
+        reopened = ChromaStore(persist_dir=store.persist_dir, collection_name="swap_test", embedder=FakeEmbedder())
+        assert reopened.get_all_chunks()["ids"] == ["new-1"]
+
+    def test_other_instances_follow_the_swap(self, store):
+        """A second store on the same alias picks up a swap on its next access."""
+        other = ChromaStore(persist_dir=store.persist_dir, collection_name="swap_test", embedder=FakeEmbedder())
+        assert other.count() == 2
+
+        version = store.create_version()
+        version.add_chunks([_chunk("new-1", "Tenant pays percentage rent annually")], show_progress=False)
+        store.swap(version)
+
+        assert other.count() == 1
+        assert other.collection_name == "swap_test__v1"
+
+    def test_failed_rebuild_keeps_live_collection(self, store):
+        """A populate error drops the half-built version and leaves the alias alone."""
+        def populate(version):
+            version.add_chunks([_chunk("new-1", "partial")], show_progress=False)
+            raise RuntimeError("embedding API down")
+
+        with pytest.raises(RuntimeError):
+            store.rebuild(populate)
+        assert store.collection_name == "swap_test"
+        assert store.count() == 2
+        assert store.versions() == []
+
+    def test_garbage_collection_respects_grace_period(self, store):
+        """Retired versions survive until the grace period has passed."""
+        store.rebuild(lambda version: version.add_chunks([_chunk("v1", "first rebuild")], show_progress=False))
+        store.rebuild(lambda version: version.add_chunks([_chunk("v2", "second rebuild")], show_progress=False))
+        assert store.versions() == ["swap_test__v1", "swap_test__v2"]
+
+        assert store.collect_garbage(grace_seconds=3600) == []
+        assert sorted(store.collect_garbage(grace_seconds=0)) == ["swap_test", "swap_test__v1"]
+        assert store.versions() == ["swap_test__v2"]
+        assert store.get_all_chunks()["ids"] == ["v2"]
+
+    def test_bm25_switches_with_the_swap(self, store):
+        """The ranker's keyword index moves to the new version together with the store."""
+        filler = ["Landlord maintains the roof", "Insurance is carried by tenant", "Signage requires approval",
+                  "Hours of operation are posted", "Parking is shared in common"]
+        store.add_chunks([_chunk(f"old-filler-{i}", text) for i, text in enumerate(filler)], show_progress=False)
+        ranker = HybridRanker(store, reranker=Reranker())
+        assert [r.chunk_id for r in ranker.keyword_only_search("minimum rent")][:1] == ["old-1"]
+
+        store.rebuild(lambda version: version.add_chunks(
+            [_chunk("new-1", "Tenant pays percentage rent annually")]
+            + [_chunk(f"new-filler-{i}", text) for i, text in enumerate(filler)],
+            show_progress=False
+        ))
+        hits = ranker.keyword_only_search("percentage rent")
+        assert hits[0].chunk_id == "new-1"
+        assert not any(r.chunk_id.startswith("old") for r in ranker.keyword_only_search("minimum rent roof"))
+
+
+class TestFacetIndex:
+    """Test the write-time tenant/section/source counts."""
+
+    @staticmethod
+    def _scan(store):
+        metadatas = store.collection.get(include=["metadatas"])["metadatas"]
+        return sorted({m["tenant_name"] for m in metadatas}), len(metadatas)
+
+    def test_counts_follow_writes(self, store):
+        """Adds, per-file replacements and delete_all keep the counts exact."""
+        other = _chunk("other-1", "Sephora pays rent")
+        other.metadata = {"tenant_name": "Sephora"}
+        other.source_file = "sephora.docx"
+        store.add_chunks([other], show_progress=False)
+
+        facets = store.get_facets()
+        assert facets["total_chunks"] == 3
+        assert facets["tenant_name"] == {"Summit Coffee": 2, "Sephora": 1}
+        assert facets["source_file"] == {"summit.docx": 2, "sephora.docx": 1}
+        assert store.get_unique_tenants() == self._scan(store)[0]
+
+        store.replace_source_chunks("summit.docx", [_chunk("new-1", "Tenant pays percentage rent")])
+        assert store.get_facets()["tenant_name"] == {"Summit Coffee": 1, "Sephora": 1}
+        assert store.get_facets()["section_type"] == {"article": 2}
+
+        store.delete_all()
+        assert store.get_facets() == {"total_chunks": 0, "tenant_name": {}, "section_type": {}, "source_file": {}}
+
+    def test_existing_collection_is_indexed_on_first_use(self, store):
+        """A collection without saved counts is counted once, then read from the file."""
+        store._facets_path(store.collection_name).unlink()
+        reopened = ChromaStore(persist_dir=store.persist_dir, collection_name="swap_test", embedder=FakeEmbedder())
+        assert reopened.get_facets()["tenant_name"] == {"Summit Coffee": 2}
+        assert store._facets_path(store.collection_name).exists()
+
+        # A write through one instance is visible to the other
+        store.add_chunks([_chunk("old-3", "Tenant pays utilities")], show_progress=False)
+        assert reopened.get_facets()["total_chunks"] == 3
+
+    def test_writers_in_other_processes_are_not_lost(self, tmp_path):
+        """Concurrent updates from several processes all land in the counts."""
+        path = str(tmp_path / "facets" / "counts.json")
+        workers = [Process(target=_count_chunks, args=(path, 50)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        facets = FacetIndex(path).to_dict()
+        assert facets["total_chunks"] == 200
+        assert facets["tenant_name"] == {"Summit Coffee": 200}
+
+    def test_counts_switch_with_the_swap(self, store):
+        """After a rebuild the counts describe the new version."""
+        store.rebuild(lambda version: version.add_chunks([_chunk("new-1", "Rebuilt chunk")], show_progress=False))
+        assert store.get_facets()["total_chunks"] == 1
+        assert store.get_unique_tenants() == ["Summit Coffee"]
@@ -0,0 +1,93 @@
+"""
+Tests for document chunking.
+"""
+
+from pathlib import Path
+import random
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chunking.chunker import Chunker
+from src.parsing.docx_parser import DocxParser
+from src.preprocessing import text_cleaner
+
+LEASE_DIR = Path(__file__).parent.parent / "Lease Contracts"
+
+
+def _chunker(**kwargs):
+    """Chunker with the cl100k_base encoding, skipping if it cannot be loaded."""
+    try:
+        return Chunker(**kwargs)
+    except Exception:
+        pytest.skip("cl100k_base encoding unavailable")
+
+
+def _paragraphs(seed: int, count: int = 40):
+    rng = random.Random(seed)
+    words = ["Tenant", "shall", "pay", "Landlord", "$1,250.00", "per", "month;", "Section", "4.2(a)", "CAM."]
+    return [
+        " ".join(rng.choice(words) for _ in range(rng.randint(1, 60))) + rng.choice(["", ".", ":", ";"])
+        for _ in range(count)
+    ]
+
+
+class TestChunkerSeams:
+    """Test the paragraph seam shortcut used when splitting large sections."""
+
+    def test_is_token_seam(self):
+        """Only paragraphs starting with non-whitespace are safe seams."""
+        assert Chunker._is_token_seam("Tenant shall pay")
+        assert Chunker._is_token_seam("(a) Rent")
+        assert not Chunker._is_token_seam("")
+        assert not Chunker._is_token_seam(" indented")
+        assert not Chunker._is_token_seam("\nTenant")
+
+    def test_tail_overlap_matches_full_encode(self):
+        """Overlap from the chunk tail equals the overlap of the full chunk text."""
+        chunker = _chunker(chunk_size=300, chunk_overlap=50)
+
+        for seed in range(20):
+            segments = _paragraphs(seed)
+            segment_tokens = [chunker.count_tokens(s) for s in segments]
+            expected = chunker._get_overlap_text("\n\n".join(segments))
+            assert chunker._get_tail_overlap_text(segments, segment_tokens) == expected
+
+    def test_split_section_token_counts(self):
+        """Every chunk of a split section respects the chunk size plus one paragraph."""
+        chunker = _chunker(chunk_size=200, chunk_overlap=30, min_chunk_size=1)
+
+        class Doc:
+            tenant_name = "Sephora"
+            file_name = "sephora.docx"
+
+        content = "\n\n".join(_paragraphs(1, count=120))
+        chunks = chunker._split_large_section(content, "ARTICLE 4", "article", Doc)
+
+        assert len(chunks) > 1
+        assert [c.metadata["chunk_part"] for c in chunks] == list(range(1, len(chunks) + 1))
+        assert chunks[-1].token_count == chunker.count_tokens(chunks[-1].content)
+
+
+class TestChunkDocument:
+    """Test chunking whole documents."""
+
+    def test_pooled_cleaning_matches_serial(self, monkeypatch):
+        """Sections cleaned as a process-pool batch give the same chunks as cleaning one at a time."""
+        chunker = _chunker()
+        doc = DocxParser().parse(str(next(LEASE_DIR.glob("*.docx"))))
+        serial = [(c.content, c.section_name, c.token_count) for c in chunker.chunk_document(doc)]
+
+        pools = []
+        pool_class = text_cleaner.ProcessPoolExecutor
+        monkeypatch.setattr(text_cleaner, "PARALLEL_MIN_CHARS", 0)
+        monkeypatch.setattr(text_cleaner.os, "cpu_count", lambda: 2)
+        monkeypatch.setattr(text_cleaner, "ProcessPoolExecutor",
+                            lambda **kwargs: pools.append(kwargs) or pool_class(**kwargs))
+        pooled = [(c.content, c.section_name, c.token_count) for c in chunker.chunk_document(doc)]
+
+        assert pools == [{"max_workers": 2}]
+        assert pooled == serial
@@ -0,0 +1,88 @@
+"""
+Tests for packing retrieved excerpts into the LLM prompt.
+"""
+
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.llm.context_packer import ContextPacker, find_overlap
+
+
+def _words(text: str) -> int:
+    """Whitespace token counter so tests do not need the tiktoken encoding."""
+    return len(text.split())
+
+
+def _paragraph(label: str, words: int = 60) -> str:
+    return " ".join(f"{label}{i}" for i in range(words))
+
+
+def _section_parts():
+    """Two consecutive chunk parts sharing an overlap span, as Chunker emits them."""
+    first = _paragraph("alpha") + "\n\n" + _paragraph("beta")
+    overlap = _paragraph("beta")[-150:]
+    second = overlap + "\n\n" + _paragraph("gamma")
+    meta = {"tenant_name": "Sephora", "source_file": "sephora.docx", "section_name": "ARTICLE 4 RENT"}
+    return [first, second], [{**meta, "chunk_part": 1}, {**meta, "chunk_part": 2}]
+
+
+class TestContextPacker:
+    """Test merging, deduplication and budgeting."""
+
+    def test_find_overlap(self):
+        """The shared span between consecutive parts is detected exactly."""
+        shared = _paragraph("shared", 10)
+        assert find_overlap("lead in " + shared, shared + " tail") == len(shared)
+        assert find_overlap("lead in " + shared, "unrelated " + shared) == 0
+        assert find_overlap("ends with.", ". starts with") == 0
+
+    def test_merges_adjacent_parts_without_overlap(self):
+        """Consecutive parts of a section become one excerpt with no repeated span."""
+        contexts, metadatas = _section_parts()
+        packed = ContextPacker(token_counter=_words).pack(contexts, metadatas)
+
+        assert packed.merged == 1
+        assert len(packed.excerpts) == 1
+        content = packed.excerpts[0].content
+        assert content.count("beta59") == 1
+        assert "alpha0" in content and "gamma59" in content
+        assert packed.output_tokens < packed.input_tokens
+
+    def test_non_adjacent_parts_stay_separate(self):
+        """Parts with a gap between them are not merged."""
+        contexts, metadatas = _section_parts()
+        metadatas[1]["chunk_part"] = 3
+        packed = ContextPacker(token_counter=_words).pack(contexts, metadatas)
+
+        assert packed.merged == 0
+        assert len(packed.excerpts) == 2
+
+    def test_removes_near_duplicates(self):
+        """A lower-scored excerpt repeating the same facts is dropped."""
+        fact = _paragraph("fact", 60)
+        contexts = [fact, fact + " Source: structured lease data.", "Trader Joe's pays percentage rent."]
+        packed = ContextPacker(token_counter=_words).pack(contexts, [{}, {}, {}])
+
+        assert packed.duplicates_removed == 1
+        assert [e.content for e in packed.excerpts] == [contexts[0], contexts[2]]
+
+    def test_fills_budget_by_score(self):
+        """Higher scores win when the budget cannot fit everything."""
+        contexts = [_paragraph("low", 50), _paragraph("high", 50), _paragraph("mid", 50)]
+        packed = ContextPacker(max_tokens=100, token_counter=_words).pack(
+            contexts, scores=[0.1, 0.9, 0.5]
+        )
+
+        assert [e.content for e in packed.excerpts] == [contexts[1], contexts[2]]
+        assert packed.dropped_for_budget == 1
+        assert packed.output_tokens <= 100
+
+    def test_empty_contexts(self):
+        """No retrieved chunks gives an empty pack."""
+        packed = ContextPacker(token_counter=_words).pack([], [])
+
+        assert packed.excerpts == []
+        assert packed.output_tokens == 0
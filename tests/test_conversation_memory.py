@@ -0,0 +1,157 @@
+"""
+Tests for conversation session management.
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import re
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.memory import ConversationManager, ConversationMemory, SQLiteSessionBackend
+
+
+def _age(memory: ConversationMemory, minutes: float):
+    """Backdate a session's last activity."""
+    memory.last_activity = datetime.now() - timedelta(minutes=minutes)
+
+
+class TestConversationMemory:
+    """Test a single session's history."""
+
+    def test_get_messages_alternates_roles(self):
+        """Each turn becomes a user message followed by the assistant's answer."""
+        memory = ConversationMemory()
+        memory.add_turn("What is Sephora's rent?", "Sephora pays $10,000.")
+        memory.add_turn("And per square foot?", "$50 per square foot.")
+
+        assert memory.get_messages() == [
+            {"role": "user", "content": "What is Sephora's rent?"},
+            {"role": "assistant", "content": "Sephora pays $10,000."},
+            {"role": "user", "content": "And per square foot?"},
+            {"role": "assistant", "content": "$50 per square foot."},
+        ]
+
+    def test_session_ids_are_unique(self):
+        """Session IDs are random, not derived from the creation time."""
+        ids = {ConversationMemory().session_id for _ in range(100)}
+
+        assert len(ids) == 100
+        assert all(re.fullmatch(r"[0-9a-f]{32}", session_id) for session_id in ids)
+
+
+class TestConversationManager:
+    """Test bounded in-memory session storage."""
+
+    def test_max_sessions_evicts_lru(self):
+        """The least recently used session is dropped over the cap."""
+        manager = ConversationManager(max_sessions=2)
+        first = manager.create_session()
+        second = manager.create_session()
+
+        manager.get_session(first)  # first is now most recent
+        third = manager.create_session()
+
+        assert len(manager) == 2
+        assert manager.get_session(second) is None
+        assert manager.get_session(first) is not None
+        assert manager.get_session(third) is not None
+
+    def test_idle_sessions_expire_on_access(self):
+        """Sessions idle past the TTL disappear without an explicit cleanup."""
+        manager = ConversationManager(idle_ttl_minutes=30)
+        stale = manager.get_or_create_session()
+        fresh = manager.get_or_create_session()
+        _age(stale, 45)
+        manager.sessions.move_to_end(fresh.session_id)
+
+        assert manager.get_session(stale.session_id) is None
+        assert manager.get_active_sessions() == [fresh.session_id]
+
+    def test_cleanup_uses_total_idle_time(self):
+        """Sessions idle more than a day are removed, not wrapped to look fresh."""
+        manager = ConversationManager(idle_ttl_minutes=60 * 48)
+        memory = manager.get_or_create_session()
+        _age(memory, 60 * 24 + 5)
+
+        assert manager.cleanup_old_sessions(max_age_minutes=60) == 1
+        assert len(manager) == 0
+
+    def test_add_turn_marks_activity(self):
+        """Adding a turn refreshes last activity and LRU position."""
+        manager = ConversationManager()
+        first = manager.create_session()
+        second = manager.create_session()
+        _age(manager.sessions[first], 10)
+
+        manager.add_turn(first, "What is Sephora's rent?", "Sephora pays ...")
+
+        assert manager.sessions[first].idle_seconds() < 5
+        assert list(manager.sessions) == [second, first]
+
+    def test_empty_session_is_found(self):
+        """A session with no turns yet is reused, not mistaken for a missing one."""
+        manager = ConversationManager()
+        memory = manager.get_or_create_session()
+
+        assert manager.get_or_create_session(memory.session_id) is memory
+
+    def test_add_turn_unknown_session(self):
+        """Adding a turn to a missing session raises KeyError."""
+        with pytest.raises(KeyError):
+            ConversationManager().add_turn("missing", "q", "a")
+
+
+class TestSQLiteSessionBackend:
+    """Test persistent, shared session storage."""
+
+    def test_sessions_survive_restart(self, tmp_path):
+        """A new manager on the same file sees earlier sessions and turns."""
+        db_path = str(tmp_path / "sessions.db")
+        manager = ConversationManager(backend=SQLiteSessionBackend(db_path))
+        session_id = manager.create_session()
+        manager.add_turn(session_id, "Rent for Sephora?", "Answer", {'tenant_filter': 'Sephora'})
+
+        restarted = ConversationManager(backend=SQLiteSessionBackend(db_path))
+        memory = restarted.get_session(session_id)
+
+        assert memory is not None
+        assert len(memory) == 1
+        assert memory.get_active_tenant() == 'Sephora'
+        assert memory.get_mentioned_tenants() == ['Sephora']
+
+    def test_workers_share_updates(self, tmp_path):
+        """Turns added by one worker are visible to another."""
+        db_path = str(tmp_path / "sessions.db")
+        worker_a = ConversationManager(backend=SQLiteSessionBackend(db_path))
+        worker_b = ConversationManager(backend=SQLiteSessionBackend(db_path))
+
+        session_id = worker_a.create_session()
+        assert len(worker_b.get_session(session_id)) == 0
+
+        worker_a.add_turn(session_id, "q1", "a1")
+        assert len(worker_b.get_session(session_id)) == 1
+
+    def test_evicted_session_reloads_from_backend(self, tmp_path):
+        """The memory cap only bounds the cache, not the stored sessions."""
+        manager = ConversationManager(max_sessions=1, backend=SQLiteSessionBackend(str(tmp_path / "s.db")))
+        first = manager.create_session()
+        manager.create_session()
+
+        assert first not in manager.sessions
+        assert manager.get_session(first) is not None
+
+    def test_cleanup_removes_stored_sessions(self, tmp_path):
+        """Idle sessions are deleted from the backend too."""
+        backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+        manager = ConversationManager(backend=backend)
+        memory = manager.get_or_create_session()
+        _age(memory, 90)
+        backend.save(memory)
+
+        assert manager.cleanup_old_sessions() == 1
+        assert backend.session_ids() == []
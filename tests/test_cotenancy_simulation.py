@@ -0,0 +1,97 @@
+"""
+Tests for the co-tenancy Monte Carlo simulation engine.
+"""
+
+import time
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.lease_data import LEASE_DATA
+from src.analytics.cotenancy_simulation import (
+    CoTenancyGraph,
+    CoTenancySimulator,
+    SimulationAssumptions,
+    simulate_cotenancy_risk,
+)
+
+
+class TestCoTenancyGraph:
+    """Test clause parsing into the dependency graph."""
+
+    def test_named_tenant_edges(self):
+        """Leases naming Trader Joe's depend on it."""
+        graph = CoTenancyGraph.from_leases(LEASE_DATA)
+        tj = graph.tenants.index("Trader Joe's")
+        dependents = {graph.tenants[i] for i, j in zip(graph.edge_dependent, graph.edge_named) if j == tj}
+
+        assert "Sephora" in dependents
+        assert "High Country Outfitters" in dependents
+
+    def test_thresholds_and_remedies(self):
+        """Percentage thresholds and remedy caps are parsed from clause text."""
+        graph = CoTenancyGraph.from_leases(LEASE_DATA)
+        bakery = graph.tenants.index("Five Daughters Bakery")
+
+        assert graph.gla_threshold[bakery] == pytest.approx(0.50)
+        assert graph.remedy_months[bakery] == 12
+        assert graph.can_terminate[bakery]
+
+
+class TestCoTenancySimulator:
+    """Test the scenario engine."""
+
+    def test_seeded_runs_are_reproducible(self):
+        """Same seed gives the same distribution."""
+        first = simulate_cotenancy_risk(n_scenarios=2000, seed=7)
+        second = simulate_cotenancy_risk(n_scenarios=2000, seed=7)
+        assert first == second
+
+    def test_no_disruption_means_no_loss(self):
+        """With every probability at zero nothing is triggered."""
+        result = simulate_cotenancy_risk(
+            n_scenarios=500, seed=1,
+            anchor_delay_prob=0, anchor_closure_prob=0,
+            tenant_failure_prob=0, anchor_contagion=0
+        )
+        assert result['max_loss'] == 0
+        assert result['probability_of_loss'] == 0
+
+    def test_anchor_closure_triggers_named_dependents(self):
+        """Closing every anchor triggers clauses that name Trader Joe's."""
+        simulator = CoTenancySimulator(assumptions=SimulationAssumptions(
+            anchor_delay_prob=0, anchor_closure_prob=1.0,
+            tenant_failure_prob=0, anchor_contagion=0, termination_prob=0
+        ))
+        result = simulator.run(n_scenarios=100, seed=1)
+
+        assert result.trigger_prob["High Country Outfitters"] == 1.0
+
+    def test_zero_cascade_rounds_still_reports_triggers(self):
+        """Without cascade rounds, triggers come from the initial closures and nobody terminates."""
+        simulator = CoTenancySimulator(assumptions=SimulationAssumptions(
+            anchor_delay_prob=0, anchor_closure_prob=1.0,
+            tenant_failure_prob=0, anchor_contagion=0, termination_prob=1.0,
+            max_cascade_rounds=0
+        ))
+        result = simulator.run(n_scenarios=50, seed=1)
+
+        assert result.trigger_prob["High Country Outfitters"] == 1.0
+        assert not any(result.termination_prob.values())
+
+    def test_percentiles_are_ordered(self):
+        """Percentiles increase and stay below the all-triggered ceiling."""
+        result = simulate_cotenancy_risk(n_scenarios=5000, seed=3)
+        pct = result['percentiles']
+
+        assert pct['p5'] <= pct['p50'] <= pct['p95'] <= pct['p99']
+        assert result['mean_loss'] >= 0
+
+    def test_ten_thousand_scenarios_under_a_second(self):
+        """Batched evaluation keeps a 10k-scenario run interactive."""
+        start = time.perf_counter()
+        simulate_cotenancy_risk(n_scenarios=10000, seed=0)
+        assert time.perf_counter() - start < 1.0
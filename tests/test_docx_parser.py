@@ -0,0 +1,153 @@
+"""
+Tests for DOCX parsing, streaming and lazy documents.
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+from docx import Document
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.parsing import docx_parser
+from src.parsing.docx_parser import DocxParser, LazyParsedDocument
+from src.parsing.parse_cache import ParseCache
+
+LEASE_DIR = Path(__file__).parent.parent / "Lease Contracts"
+
+
+@pytest.fixture
+def lease_docx(tmp_path):
+    """A small lease with a table of contents, data sheet, articles and a table."""
+    doc = Document()
+    for text in ["LEASE AGREEMENT", "ARTICLE I: DEFINITIONS", "ARTICLE II: RENT", "", "DATA SHEET"]:
+        doc.add_paragraph(text)
+    doc.add_paragraph("Tenant: Sephora USA, Inc.")
+    doc.add_paragraph("Square Feet: 1,167 square feet")
+    doc.add_paragraph("ARTICLE I: DEFINITIONS")
+    doc.add_paragraph("Landlord\tmeans Medley Owner, LLC.")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text, table.cell(0, 1).text = "Lease Year", "Annual Rent"
+    table.cell(1, 0).text, table.cell(1, 1).text = "1", "$42,000.00"
+    doc.add_paragraph("ARTICLE II: RENT")
+    doc.add_paragraph("Tenant shall pay Minimum Rent monthly.")
+    doc.add_paragraph("EXHIBIT A: SITE PLAN")
+
+    path = tmp_path / "Sephora - Medley Lease.docx"
+    doc.save(str(path))
+    return str(path)
+
+
+class TestStreaming:
+    """Test the streaming reader against python-docx."""
+
+    def test_blocks_match_document(self, lease_docx):
+        """Streamed paragraphs and tables equal the eager parse."""
+        parser = DocxParser()
+        eager = parser.parse(lease_docx)
+        blocks = list(parser.iter_blocks(lease_docx))
+
+        assert [b for b in blocks if isinstance(b, str)] == eager.paragraphs
+        assert [b.raw_text for b in blocks if not isinstance(b, str)] == [t.raw_text for t in eager.tables]
+
+    def test_preview_stops_after_data_sheet(self, lease_docx):
+        """Preview keeps the data sheet and its value lookahead, and no later text or tables."""
+        preview = DocxParser().preview(lease_docx)
+
+        assert preview.paragraphs[-4:] == [
+            "ARTICLE I: DEFINITIONS", "Landlord\tmeans Medley Owner, LLC.",
+            "ARTICLE II: RENT", "Tenant shall pay Minimum Rent monthly."
+        ]
+        assert preview.tables == []
+        assert preview.tenant_name == "Sephora USA, Inc."
+        assert DocxParser().preview(lease_docx, max_paragraphs=2).paragraphs == [
+            "LEASE AGREEMENT", "ARTICLE I: DEFINITIONS"
+        ]
+
+    @pytest.mark.parametrize("path", sorted(LEASE_DIR.glob("*.docx")), ids=lambda path: path.name[:30])
+    def test_preview_data_sheet_matches_parse(self, path):
+        """Preview reports the same data sheet as a full parse of each sample lease."""
+        parser = DocxParser()
+        preview = parser.preview(str(path))
+        full = parser.parse(str(path))
+
+        assert preview.data_sheet == full.data_sheet
+        assert len(preview.paragraphs) < len(full.paragraphs)
+
+
+class TestLazyParsedDocument:
+    """Test lazily computed document fields."""
+
+    def test_fields_match_eager_parse(self, lease_docx):
+        """Every field equals the eager parse and is read only when used."""
+        eager = DocxParser().parse(lease_docx)
+        lazy = DocxParser().parse(lease_docx, lazy=True)
+
+        assert isinstance(lazy, LazyParsedDocument)
+        assert lazy.file_name == eager.file_name
+        assert "_content" not in lazy.__dict__
+
+        assert lazy.tenant_name == eager.tenant_name
+        assert "full_text" not in lazy.__dict__
+        for name in ("paragraphs", "full_text", "sections", "data_sheet"):
+            assert getattr(lazy, name) == getattr(eager, name)
+
+    def test_iter_sections_matches_sections(self, lease_docx, monkeypatch):
+        """Sections stream in document order from one read of the XML; the dict keeps the last of each."""
+        eager = DocxParser().parse(lease_docx)
+        lazy = DocxParser().parse(lease_docx, lazy=True)
+        reads = []
+        iter_blocks = lazy._parser.iter_blocks
+        monkeypatch.setattr(lazy._parser, "iter_blocks", lambda path: reads.append(path) or iter_blocks(path))
+
+        streamed = [(name, "\n".join(lines)) for name, lines in lazy.iter_sections()]
+        assert len(reads) == 1
+        assert "sections" not in lazy.__dict__
+        assert [(name, "\n".join(lines)) for name, lines in eager.iter_sections()] == streamed
+        assert dict(streamed) == eager.sections
+        assert list(dict(streamed)) == list(eager.sections)
+        assert [content for name, content in streamed if name == "Article I: DEFINITIONS"] == [
+            "ARTICLE I: DEFINITIONS",  # table of contents
+            "ARTICLE I: DEFINITIONS\nLandlord\tmeans Medley Owner, LLC.",
+        ]
+
+class TestParseCache:
+    """Test the persistent parse cache."""
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_second_parse_skips_xml(self, lease_docx, tmp_path, monkeypatch, lazy):
+        """A cached file is rebuilt from the payload without opening the DOCX."""
+        cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+        first = DocxParser(cache=cache).parse(lease_docx, lazy=lazy)
+        expected = (first.paragraphs, first.full_text, first.sections, first.data_sheet, first.tenant_name)
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        def no_xml(*args, **kwargs):
+            raise AssertionError("DOCX was re-read")
+
+        monkeypatch.setattr(docx_parser, "Document", no_xml)
+        monkeypatch.setattr(DocxParser, "iter_blocks", no_xml)
+
+        parser = DocxParser(cache=cache)
+        for cached in (parser.parse(lease_docx, lazy=lazy), parser.preview(lease_docx)):
+            assert (cached.paragraphs, cached.full_text, cached.sections, cached.data_sheet,
+                    cached.tenant_name) == expected
+            assert [t.raw_text for t in cached.tables] == [t.raw_text for t in first.tables]
+        assert cache.hits == 2
+
+    def test_key_tracks_content_and_parser_version(self, lease_docx, tmp_path):
+        """Edited files and new parser versions miss; corrupt entries are misses."""
+        cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+        key = cache.key(lease_docx)
+        assert ParseCache(cache_dir=str(tmp_path / "cache"), parser_version=99).key(lease_docx) != key
+
+        DocxParser(cache=cache).parse(lease_docx)
+        with open(lease_docx, "ab") as f:
+            f.write(b"\0")
+        assert cache.key(lease_docx) != key
+
+        (tmp_path / "cache" / f"{key}.pkl").write_bytes(b"not a pickle")
+        assert cache.load(key) is None
+        assert cache.clear() == 1
@@ -0,0 +1,146 @@
+"""
+Tests for streaming CSV/Excel exports.
+"""
+
+import csv
+import io
+import threading
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.analytics.lease_analytics import LeaseAnalytics
+from src.database.sql_store import SQLStore
+from src.export import report_fragments
+from src.export.report_fragments import FragmentCache, build_tenant_fragments
+from src.export.report_generator import ReportGenerator, LEASE_EXPORT_COLUMNS
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Database with a handful of leases and financial records."""
+    store = SQLStore(db_path=str(tmp_path / "leases.db"))
+    for i in range(7):
+        lease_id = store.add_lease(
+            f"Tenant {i}", f"lease_{i}.docx",
+            start_date="2024-01-01", end_date=f"2030-01-{i + 1:02d}",
+            base_rent=1000.0 + i, square_footage=500.0, status="active"
+        )
+        store.add_financial_record(lease_id, "2024-02-01", "rent", 1000.0 + i)
+    yield store
+    store.close()
+
+
+class TestStreamingReads:
+    """Test SQLStore.stream_* cursors."""
+
+    def test_rows_arrive_in_batches(self, store):
+        """fetchmany() batches cover every row exactly once."""
+        columns, batches = store.stream_leases(fields=["lease_id", "tenant_name"], batch_size=3)
+        batches = list(batches)
+
+        assert columns == ["lease_id", "tenant_name"]
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert [row[1] for batch in batches for row in batch] == [f"Tenant {i}" for i in range(7)]
+
+    def test_stream_can_be_read_from_another_thread(self, store):
+        """A stream opened on one thread can be drained on another, as StreamingResponse does."""
+        _, batches = store.stream_financial_records(batch_size=2)
+        rows = []
+        worker = threading.Thread(target=lambda: rows.extend(row for batch in batches for row in batch))
+        worker.start()
+        worker.join()
+
+        assert len(rows) == 7
+
+    def test_unknown_field_rejected(self, store):
+        """Projection uses the same field check as the paged reads."""
+        with pytest.raises(ValueError):
+            store.stream_leases(fields=["lease_id", "password"])
+
+
+class TestReportExports:
+    """Test the CSV and Excel exports built on the streams."""
+
+    def test_csv_chunks_per_batch(self, store, monkeypatch):
+        """The header is sent first, then one chunk per batch."""
+        report = ReportGenerator(store)
+        open_dataset = report.open_dataset
+        monkeypatch.setattr(report, "open_dataset",
+                            lambda dataset, **filters: open_dataset(dataset, batch_size=4, **filters))
+
+        chunks = list(report.stream_csv("revenue"))
+        assert chunks[0].startswith("tenant_name,monthly_rent")
+        assert len(chunks) == 3
+
+        rows = list(csv.DictReader(io.StringIO("".join(chunks))))
+        assert [row["tenant_name"] for row in rows] == [f"Tenant {i}" for i in reversed(range(7))]
+
+    def test_legacy_csv_strings(self, store):
+        """The string exports keep their columns and stay empty when nothing matches."""
+        report = ReportGenerator(store)
+        rows = list(csv.DictReader(io.StringIO(report.export_leases_csv(status="active"))))
+
+        assert list(rows[0]) == LEASE_EXPORT_COLUMNS
+        assert len(rows) == 7
+        assert report.export_leases_csv(status="expired") == ""
+
+    def test_write_csv_to_file(self, store, tmp_path):
+        """write_csv streams a dataset into a file."""
+        path = ReportGenerator(store).write_csv("financials", tmp_path / "out" / "financials.csv")
+
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 7
+        assert rows[0]["tenant_name"] == "Tenant 0"
+
+    def test_excel_workbook_sheets(self, store, tmp_path):
+        """The write-only workbook has a header and every row on each sheet."""
+        openpyxl = pytest.importorskip("openpyxl")
+        path = tmp_path / "portfolio.xlsx"
+        ReportGenerator(store).export_portfolio_excel(str(path))
+
+        workbook = openpyxl.load_workbook(path)
+        assert workbook.sheetnames == ["Leases", "Revenue by Tenant", "Expiring Soon",
+                                       "Active Alerts", "Portfolio Summary"]
+        assert len(list(workbook["Leases"].values)) == 8
+        assert len(list(workbook["Revenue by Tenant"].values)) == 8
+        assert next(workbook["Portfolio Summary"].values)[0] == "active_leases"
+
+
+class TestPdfFragments:
+    """Test the cached, incrementally rebuilt PDF report."""
+
+    def test_only_changed_sections_rebuild(self, store, tmp_path):
+        """After one lease changes, the tenant pages of everyone else come from the cache."""
+        pytest.importorskip("reportlab")
+        cache = FragmentCache(str(tmp_path / "fragments"))
+        report = ReportGenerator(store, LeaseAnalytics(store), fragment_cache=cache, workers=1)
+        pdf = tmp_path / "portfolio.pdf"
+
+        report.export_portfolio_pdf(str(pdf))
+        assert pdf.read_bytes().startswith(b"%PDF")
+        assert (cache.hits, cache.misses) == (0, 9)  # summary, health, 7 tenant pages
+
+        report.export_portfolio_pdf(str(pdf))
+        assert (cache.hits, cache.misses) == (9, 9)
+
+        lease_id = store.get_leases_by_tenant("Tenant 3")[0]["lease_id"]
+        store.update_lease(lease_id, base_rent=2500.0)
+        report.export_portfolio_pdf(str(pdf))
+        assert (cache.hits, cache.misses) == (15, 12)  # summary, health and Tenant 3 rebuilt
+        assert len(list(cache.cache_dir.glob("*.pkl"))) == 9
+
+    def test_parallel_pages_match_serial(self, store, monkeypatch):
+        """Tenant pages built in worker processes are the same as pages built in-process."""
+        monkeypatch.setattr(report_fragments, "PARALLEL_MIN_PAGES", 2)
+        tenants = [f"Tenant {i}" for i in range(7)]
+        analytics = LeaseAnalytics(store)
+
+        serial = build_tenant_fragments(store, analytics, tenants, workers=1)
+        parallel = build_tenant_fragments(store, analytics, tenants, workers=2)
+        assert parallel == serial
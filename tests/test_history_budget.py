@@ -0,0 +1,176 @@
+"""
+Tests for token-budgeted conversation history.
+"""
+
+from pathlib import Path
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.memory.history_budget import TokenBudgetedHistory, count_tokens
+
+
+# tiktoken downloads the encoding on first use
+pytestmark = pytest.mark.needs_tokenizer
+
+
+def _conversation(turns: int, words: int = 50):
+    """Build a user/assistant history of the given length."""
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"Question {i} about Sephora rent " + "detail " * words})
+        history.append({"role": "assistant", "content": f"Answer {i}: the rent is $100,000 " + "value " * words})
+    return history
+
+
+class RecordingSummarizer:
+    """Summarizer stub that records how many messages it is asked to fold."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, previous, messages, max_tokens):
+        self.calls.append(len(messages))
+        return (previous + "\n" if previous else "") + f"{len(messages)} messages"
+
+
+class TestTokenBudgetedHistory:
+    """Test the summary + recent window split."""
+
+    def test_short_history_is_verbatim(self):
+        """History within budget is passed through unchanged."""
+        budget = TokenBudgetedHistory(max_tokens=2000, keep_turns=3)
+        history = _conversation(2, words=5)
+
+        window = budget.fit(history)
+
+        assert window.summary == ""
+        assert window.messages == history
+
+    def test_window_stays_within_budget(self):
+        """Long conversations are capped at the token budget."""
+        budget = TokenBudgetedHistory(max_tokens=500, keep_turns=3, summary_tokens=100)
+
+        for turns in (5, 20, 80):
+            window = budget.fit(_conversation(turns, words=20))
+            assert window.tokens <= 500
+            assert window.messages and window.messages[0]["role"] == "user"
+
+    def test_summary_is_incremental(self):
+        """Each new turn only folds the newly aged-out messages."""
+        summarizer = RecordingSummarizer()
+        budget = TokenBudgetedHistory(max_tokens=5000, keep_turns=2, summarizer=summarizer)
+        history = _conversation(10, words=5)
+
+        for turns in range(3, 11):
+            budget.fit(history[:turns * 2])
+
+        assert summarizer.calls[0] == 2
+        assert all(count == 2 for count in summarizer.calls)
+        assert len(summarizer.calls) == 8
+
+    def test_repeat_calls_use_cached_summary(self):
+        """Reformulation and answer generation on one turn share a summary."""
+        summarizer = RecordingSummarizer()
+        budget = TokenBudgetedHistory(max_tokens=5000, keep_turns=1, summarizer=summarizer)
+        history = _conversation(4, words=5)
+
+        first = budget.fit(history)
+        second = budget.fit(history, max_tokens=800)
+
+        assert first.summary == second.summary
+        assert len(summarizer.calls) == 1
+
+    def test_within_narrows_without_summarizing_again(self):
+        """A narrower view of a window keeps its summary and a suffix of its messages."""
+        summarizer = RecordingSummarizer()
+        budget = TokenBudgetedHistory(max_tokens=2000, keep_turns=3, summarizer=summarizer)
+        window = budget.fit(_conversation(12, words=40))
+
+        narrow = window.within(300)
+
+        assert narrow.summary == window.summary
+        assert narrow.messages == window.messages[-len(narrow.messages):]
+        assert len(narrow.messages) < len(window.messages)
+        assert narrow.tokens <= 300
+        assert len(summarizer.calls) == 1
+
+    def test_fallback_summary_without_summarizer(self):
+        """Without an LLM the summary lists earlier questions."""
+        budget = TokenBudgetedHistory(max_tokens=2000, keep_turns=1, summary_tokens=200)
+        window = budget.fit(_conversation(3, words=5))
+
+        assert "Question 0" in window.summary
+        assert count_tokens(window.summary) <= 200
+
+    def test_failed_summarizer_falls_back(self):
+        """A summarizer error does not break the chat."""
+        def failing(previous, messages, max_tokens):
+            raise RuntimeError("LLM unavailable")
+
+        budget = TokenBudgetedHistory(keep_turns=1, summarizer=failing)
+        window = budget.fit(_conversation(3, words=5))
+
+        assert "Question 1" in window.summary
+
+
+class TestAnswerGeneratorHistory:
+    """Test that chat prompts use the budgeted history."""
+
+    def test_chat_prompt_is_bounded(self, tmp_path):
+        """Prompt size plateaus as the conversation grows."""
+        from src.llm.answer_generator import AnswerGenerator
+        from src.observability.usage import UsageTracker
+
+        usage = UsageTracker(db_path=str(tmp_path / "usage.db"))
+        generator = AnswerGenerator(provider="openai", openai_api_key="test-key", usage_tracker=usage)
+        sent = []
+
+        def create(**kwargs):
+            sent.append(kwargs["messages"])
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="summary"))])
+
+        generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        sizes = []
+        for turns in (10, 40):
+            sent.clear()
+            generator.generate_chat_response("And per month?", ["Rent is $10"], _conversation(turns))
+            prompt = sent[-1]
+            sizes.append(sum(count_tokens(m["content"]) for m in prompt))
+            assert "Summary of the earlier conversation" in prompt[0]["content"]
+
+        assert sizes[1] - sizes[0] < 100
+
+    def test_turn_summarizes_once(self, tmp_path):
+        """Reformulation and the chat answer on one turn trigger a single summarize call."""
+        from src.llm.answer_generator import AnswerGenerator, SUMMARY_SYSTEM_PROMPT
+        from src.observability.usage import UsageTracker
+
+        usage = UsageTracker(db_path=str(tmp_path / "usage.db"))
+        generator = AnswerGenerator(provider="openai", openai_api_key="test-key", usage_tracker=usage)
+        system_prompts = []
+
+        def create(**kwargs):
+            system_prompts.append(kwargs["messages"][0]["content"])
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="summary"))])
+
+        generator.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        # Shared window, as QueryEngine.chat passes it
+        history = _conversation(12, words=60)
+        window = generator.fit_history(history)
+        generator.reformulate_query("And per month?", history, window=window)
+        generator.generate_chat_response("And per month?", ["Rent is $10"], history, window=window)
+        assert system_prompts.count(SUMMARY_SYSTEM_PROMPT) == 1
+
+        # Callers that don't pass one still land on the same split point
+        system_prompts.clear()
+        history = _conversation(13, words=60)
+        generator.reformulate_query("And per year?", history)
+        generator.generate_chat_response("And per year?", ["Rent is $120"], history)
+        assert system_prompts.count(SUMMARY_SYSTEM_PROMPT) == 1
@@ -0,0 +1,303 @@
+"""
+Tests for single-document ingestion, background jobs, incremental BM25 and the embedding cache.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+import threading
+import time
+
+import pytest
+from docx import Document
+from rank_bm25 import BM25Okapi
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.benchmark.fakes import FakeEmbedder
+from src.chunking.chunker import Chunker
+from src.data.structured_chunks import generate_all_structured_chunks
+from src.database.chroma_store import ChromaStore
+from src.database.sql_store import SQLStore
+from src.ingestion import service as service_module
+from src.ingestion.jobs import JobQueue
+from src.ingestion.service import IngestionService, iso_date
+from src.parsing.parse_cache import ParseCache
+from src.search.hybrid_ranker import HybridRanker, IncrementalBM25
+from src.search.reranker import Reranker
+from src.vectorization.embedder import Embedder
+from src.vectorization.embedding_cache import EmbeddingCache
+
+
+def _chunker(**kwargs):
+    """Chunker with the cl100k_base encoding, skipping if it cannot be loaded."""
+    try:
+        return Chunker(**kwargs)
+    except Exception:
+        pytest.skip("cl100k_base encoding unavailable")
+
+
+def _write_lease(path: Path, rent_clause: str) -> str:
+    doc = Document()
+    doc.add_paragraph("DATA SHEET")
+    doc.add_paragraph("Tenant: Blue Bottle Coffee")
+    doc.add_paragraph("Square Feet: 1,450 square feet")
+    doc.add_paragraph("ARTICLE I: DEFINITIONS")
+    doc.add_paragraph("Landlord means Medley Owner, LLC.")
+    doc.add_paragraph("ARTICLE II: RENT")
+    doc.add_paragraph(rent_clause)
+    # Sections under MIN_CHUNK_SIZE tokens are not chunked
+    doc.add_paragraph("Rent is payable in advance on the first day of each calendar month without demand. " * 12)
+    doc.save(str(path))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def parse_cache(tmp_path, monkeypatch):
+    """Services built without a parser cache their parses here, not in the repository's data/parse_cache."""
+    cache = ParseCache(cache_dir=str(tmp_path / "parse_cache"))
+    monkeypatch.setattr(service_module, "get_parse_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def service(tmp_path):
+    store = ChromaStore(persist_dir=str(tmp_path / "chroma"), collection_name="ingest_test", embedder=FakeEmbedder())
+    store.add_chunks(generate_all_structured_chunks(), show_progress=False)
+    sql_store = SQLStore(db_path=str(tmp_path / "leases.db"))
+    ranker = HybridRanker(store, reranker=Reranker())
+    service = IngestionService(store=store, sql_store=sql_store, ranker=ranker, chunker=_chunker())
+    yield service
+    sql_store.close()
+
+
+class TestIncrementalBM25:
+    """Test in-place BM25 updates against a fresh build."""
+
+    def test_add_and_remove_match_rebuild(self):
+        """Scores after adds and removes equal a BM25Okapi built from scratch."""
+        corpus = [["base", "rent", "due"], ["cam", "charges"], ["rent", "abatement", "rent"], ["signage"]]
+        index = IncrementalBM25(corpus[:2])
+        index.add_documents(corpus[2:])
+        index.remove_documents([1])
+        expected = BM25Okapi([corpus[0], corpus[2], corpus[3]])
+
+        for query in (["rent"], ["cam"], ["signage", "rent"]):
+            assert list(index.get_scores(query)) == pytest.approx(list(expected.get_scores(query)))
+
+    def test_empty_corpus(self):
+        """An empty store gives an index that scores nothing and can grow."""
+        index = IncrementalBM25([])
+        assert len(index.get_scores(["rent"])) == 0
+        index.add_documents([["rent"], ["cam"], ["signage"]])
+        assert index.get_scores(["rent"])[0] > 0
+
+
+class TestEmbeddingCache:
+    """Test the persistent vector cache."""
+
+    def test_round_trip(self, tmp_path):
+        """Vectors come back per model and position; misses are counted."""
+        cache = EmbeddingCache(db_path=str(tmp_path / "embeddings.db"))
+        cache.put_many("model-a", ["rent", "cam"], [[0.5, 0.25], [1.0, 0.0]])
+
+        assert cache.get_many("model-a", ["cam", "signage", "rent"]) == {0: [1.0, 0.0], 2: [0.5, 0.25]}
+        assert cache.get_many("model-b", ["rent"]) == {}
+        assert (cache.hits, cache.misses) == (2, 2)
+        cache.close()
+
+    @pytest.mark.needs_tokenizer
+    def test_embedder_batches_and_caches(self, tmp_path):
+        """Misses are embedded in batched requests and reused on the next call."""
+        requests = []
+
+        def create(input, model):
+            requests.append(list(input))
+            data = [SimpleNamespace(index=i, embedding=[float(len(text))]) for i, text in enumerate(input)]
+            return SimpleNamespace(data=list(reversed(data)), usage=SimpleNamespace(prompt_tokens=len(input)))
+
+        usage = SimpleNamespace(record=lambda *args, **kwargs: None)
+        embedder = Embedder(api_key="test", batch_size=2, usage_tracker=usage,
+                            cache=EmbeddingCache(db_path=str(tmp_path / "embeddings.db")))
+        embedder.client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+        assert embedder.embed_texts(["a", "bb", "ccc"], show_progress=False) == [[1.0], [2.0], [3.0]]
+        assert requests == [["a", "bb"], ["ccc"]]
+        assert embedder.embed_texts(["ccc", "dddd"], show_progress=False) == [[3.0], [4.0]]
+        assert requests[-1] == ["dddd"]
+
+
+class TestIngestionService:
+    """Test the shared parse -> index path."""
+
+    def test_iso_date(self):
+        """Extracted date strings normalize to ISO dates."""
+        assert iso_date("September 12, 2024") == "2024-09-12"
+        assert iso_date("December 08,2023") == "2023-12-08"
+        assert iso_date("sometime next year") is None
+        assert iso_date(None) is None
+
+    def test_ingest_is_searchable_and_idempotent(self, service, tmp_path):
+        """A new lease is searchable at once; re-ingesting replaces its chunks and row."""
+        path = _write_lease(tmp_path / "Blue Bottle Lease.docx", "Tenant shall pay Minimum Rent of $6,000.")
+        service.ranker.search("rent")  # build BM25 before ingesting
+
+        first = service.ingest_document(path)
+        assert first.chunks_indexed > 0 and first.lease_created
+        assert first.tenant_name == "Blue Bottle Coffee"
+        assert "ingest_embed" in first.timings_ms
+        assert any("Minimum Rent" in r.content for r in service.ranker.keyword_only_search("minimum rent"))
+
+        _write_lease(tmp_path / "Blue Bottle Lease.docx", "Tenant shall pay Percentage Rent of six percent.")
+        second = service.ingest_document(path)
+        assert second.lease_id == first.lease_id and not second.lease_created
+        assert second.chunks_replaced == first.chunks_indexed
+        assert len(service.store.get_ids_by_source("Blue Bottle Lease.docx")) == second.chunks_indexed
+        assert len(service.sql_store.get_leases_by_tenant("Blue Bottle Coffee")) == 1
+
+        keyword_hits = service.ranker.keyword_only_search("percentage minimum")
+        assert [r.chunk_id for r in keyword_hits] == [r.chunk_id for r in HybridRanker(
+            service.store, reranker=Reranker()).keyword_only_search("percentage minimum")]
+        assert not any("Minimum Rent" in r.content for r in keyword_hits)
+
+    def test_failed_vector_write_keeps_no_lease_row(self, service, tmp_path, monkeypatch):
+        """The SQLite upsert rolls back when the vector store write fails."""
+        path = _write_lease(tmp_path / "Blue Bottle Lease.docx", "Tenant shall pay Minimum Rent of $6,000.")
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("vector store unavailable")
+
+        monkeypatch.setattr(service.store, "replace_source_chunks", fail)
+        with pytest.raises(RuntimeError):
+            service.ingest_document(path)
+        assert service.sql_store.get_leases_by_tenant("Blue Bottle Coffee") == []
+
+
+def _eventually(condition, timeout: float = 15.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+@pytest.fixture
+def queue(tmp_path):
+    store = ChromaStore(persist_dir=str(tmp_path / "chroma"), collection_name="jobs_test", embedder=FakeEmbedder())
+    store.add_chunks(generate_all_structured_chunks(), show_progress=False)
+    queue = JobQueue(
+        db_path=str(tmp_path / "jobs.db"),
+        store=store,
+        ranker=HybridRanker(store, reranker=Reranker()),
+        sql_db_path=str(tmp_path / "leases.db")
+    )
+    yield queue
+    queue.close()
+
+
+class TestJobQueue:
+    """Test the background ingestion queue."""
+
+    def test_identical_files_share_a_job(self, queue, tmp_path, monkeypatch):
+        """Submitting the same bytes again returns the pending job unless forced."""
+        monkeypatch.setattr(queue, "_dispatch", lambda job_id: None)
+        first = _write_lease(tmp_path / "a.docx", "Tenant shall pay Minimum Rent of $6,000.")
+        copy = tmp_path / "copy of a.docx"
+        copy.write_bytes(Path(first).read_bytes())
+
+        job = queue.submit("ingest", first)
+        assert job.status == "queued"
+        assert queue.submit("ingest", str(copy)).id == job.id
+        assert queue.submit("ingest", str(copy), force=True).id != job.id
+        assert queue.submit("reindex").id == queue.submit("reindex").id
+        with pytest.raises(FileNotFoundError):
+            queue.submit("ingest", str(tmp_path / "missing.docx"))
+
+    def test_finished_job_only_dedupes_while_its_chunks_remain(self, queue, tmp_path, monkeypatch):
+        """A file whose chunks left the store (rebuild, deleted lease) can be ingested again."""
+        monkeypatch.setattr(queue, "_dispatch", lambda job_id: None)
+        path = _write_lease(tmp_path / "a.docx", "Tenant shall pay Minimum Rent of $6,000.")
+        job = queue.submit("ingest", path)
+        queue._update(job.id, status="done")
+
+        monkeypatch.setattr(queue.store, "get_ids_by_source", lambda source: ["a-1"] if source == "a.docx" else [])
+        assert queue.submit("ingest", path).id == job.id
+
+        monkeypatch.setattr(queue.store, "get_ids_by_source", lambda source: [])
+        assert queue.submit("ingest", path).id != job.id
+
+    def test_start_requeues_interrupted_jobs(self, queue, tmp_path, monkeypatch):
+        """Jobs left running by a dead process are queued and dispatched again."""
+        dispatched = []
+        monkeypatch.setattr(queue, "_dispatch", dispatched.append)
+        job = queue.submit("ingest", _write_lease(tmp_path / "a.docx", "Minimum Rent of $6,000."))
+        queue._update(job.id, status="running", started_at="2024-01-01T00:00:00")
+
+        assert queue.start() == 1
+        assert dispatched == [job.id, job.id]
+        assert queue.get(job.id).status == "queued"
+
+    def test_live_owner_keeps_its_running_job(self, queue, tmp_path, monkeypatch):
+        """A second queue on the same database only adopts a job once its owner stops heartbeating."""
+        release = threading.Event()
+
+        def blocked_ingest(job):
+            release.wait(30)
+            return {"run_by": "first"}
+
+        queue.heartbeat_interval = 0.05
+        monkeypatch.setattr(queue, "_run_ingest", blocked_ingest)
+        job = queue.submit("ingest", _write_lease(tmp_path / "a.docx", "Minimum Rent of $6,000."))
+        assert _eventually(lambda: queue.get(job.id).status == "running")
+
+        other = JobQueue(db_path=str(queue.db_path), heartbeat_interval=0.05, stale_after=0.5)
+        monkeypatch.setattr(other, "_run_ingest", lambda job: {"run_by": "other"})
+        try:
+            assert other.start() == 0
+            time.sleep(1.0)
+            assert queue.get(job.id).status == "running"
+            assert queue.get(job.id).owner == queue.owner
+
+            # The first queue goes quiet (its process hung or died)
+            queue._stop.set()
+            assert _eventually(lambda: queue.get(job.id).status == "done")
+            assert queue.get(job.id).result == {"run_by": "other"}
+
+            # The original run finishing late doesn't overwrite the outcome
+            release.set()
+            queue.shutdown()
+            assert queue.get(job.id).result == {"run_by": "other"}
+        finally:
+            release.set()
+            other.close()
+
+    def test_failed_job_records_error(self, queue, tmp_path):
+        """A document that cannot be ingested marks its job failed with the error."""
+        broken = tmp_path / "broken.docx"
+        broken.write_bytes(b"not a zip file")
+
+        job = queue.submit("ingest", str(broken))
+        assert queue.wait(timeout=30)
+        job = queue.get(job.id)
+        assert job.status == "failed" and job.error
+
+    @pytest.mark.needs_tokenizer
+    def test_ingest_job_reports_progress_and_throughput(self, queue, tmp_path):
+        """An ingest job runs in the background, indexes the lease and feeds the stats."""
+        path = _write_lease(tmp_path / "Blue Bottle Lease.docx", "Tenant shall pay Minimum Rent of $6,000.")
+        queue.ranker.search("rent")  # build BM25 before ingesting
+
+        job = queue.submit("ingest", path)
+        assert queue.wait(timeout=60)
+        job = queue.get(job.id)
+        assert job.status == "done", job.error
+        assert job.progress == 1.0 and job.items_done == 1
+        assert job.chunks_indexed == job.result["chunks_indexed"] > 0
+        assert any("Minimum Rent" in r.content for r in queue.ranker.keyword_only_search("minimum rent"))
+
+        stats = queue.stats()
+        assert stats["counts"] == {"done": 1}
+        assert stats["documents_processed"] == 1 and stats["chunks_indexed"] == job.chunks_indexed
+        assert queue.submit("ingest", path).id == job.id
@@ -0,0 +1,199 @@
+"""
+Tests for store data versions and the cache invalidation bus.
+"""
+
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.benchmark.fakes import FakeEmbedder
+from src.chunking.chunker import Chunk
+from src.database.chroma_store import ChromaStore
+from src.database.invalidation import InvalidationBus, get_invalidation_bus
+from src.database.sql_store import SQLStore
+from src.search.hybrid_ranker import HybridRanker
+from src.search.reranker import Reranker
+
+
+FILLER = ["Landlord maintains the roof", "Insurance is carried by tenant", "Signage requires approval",
+          "Hours of operation are posted", "Parking is shared in common"]
+
+
+def _chunk(chunk_id: str, content: str, source_file: str = "summit.docx") -> Chunk:
+    return Chunk(
+        id=chunk_id,
+        content=content,
+        metadata={"tenant_name": "Summit Coffee"},
+        token_count=len(content.split()),
+        source_file=source_file,
+        section_type="article"
+    )
+
+
+class _Counter:
+    """Versioned source stub"""
+
+    def __init__(self, name: str):
+        self.version_source = name
+        self.version = 0
+
+    def data_version(self) -> int:
+        return self.version
+
+
+class _LazyCounter(_Counter):
+    """Versioned source stub that counts version reads and starts closed"""
+
+    is_open = False
+    reads = 0
+
+    def data_version(self) -> int:
+        self.reads += 1
+        return self.version
+
+
+class TestInvalidationBus:
+    """Test subscription and notification rules."""
+
+    def test_notifies_only_when_version_moves(self):
+        """Publishing an unchanged version is a no-op."""
+        bus = InvalidationBus(poll_interval=0)
+        source = _Counter("test:counter")
+        seen = []
+        bus.watch(source)
+        bus.subscribe("test:counter", lambda name, version: seen.append(version))
+
+        assert not bus.publish(source)
+        source.version = 3
+        assert bus.publish(source)
+        assert not bus.publish(source)
+        assert seen == [3]
+
+        source.version = 4
+        assert bus.check() == ["test:counter"]
+        assert seen == [3, 4]
+
+    def test_unopened_store_is_left_alone(self):
+        """watch() and check() don't read a store's version until something opens it."""
+        bus = InvalidationBus(poll_interval=0)
+        source = _LazyCounter("test:lazy")
+        seen = []
+        bus.watch(source)
+        bus.subscribe("test:lazy", lambda name, version: seen.append(version))
+        assert bus.check() == []
+        assert source.reads == 0 and bus.version("test:lazy") is None
+
+        source.is_open = True
+        source.version = 2
+        assert bus.check() == ["test:lazy"]
+        assert bus.check() == []
+        assert seen == [2]
+
+    def test_subscribers_are_held_weakly(self):
+        """A garbage-collected subscriber's bound method is dropped."""
+        bus = InvalidationBus(poll_interval=0)
+        source = _Counter("test:weak")
+        calls = []
+
+        class Cache:
+            def invalidate(self, name, version):
+                calls.append(version)
+
+        cache = Cache()
+        bus.subscribe("test:weak", cache.invalidate)
+        bus.subscribe("test:weak", cache.invalidate)
+        source.version = 1
+        bus.publish(source)
+        assert calls == [1]
+
+        del cache
+        source.version = 2
+        bus.publish(source)
+        assert calls == [1]
+
+
+class TestDataVersions:
+    """Test the counters each store keeps."""
+
+    def test_sql_version_survives_recreating_the_database(self, tmp_path):
+        """A deleted and recreated database starts above the old counter."""
+        db_path = tmp_path / "leases.db"
+        store = SQLStore(db_path=str(db_path))
+        for i in range(3):
+            store.add_lease(f"Tenant {i}", f"l{i}.docx")
+        old_version = store.data_version()
+        store.close()
+
+        db_path.unlink()
+        recreated = SQLStore(db_path=str(db_path))
+        assert recreated.data_version() > old_version
+        recreated.close()
+
+    def test_collection_version_counts_writes_and_swaps(self, tmp_path):
+        """Every write and every swap moves the collection's version forward."""
+        store = ChromaStore(persist_dir=str(tmp_path / "chroma"), collection_name="ver_test", embedder=FakeEmbedder())
+        versions = [store.data_version()]
+        store.add_chunks([_chunk("a", "Tenant pays minimum rent")], show_progress=False)
+        versions.append(store.data_version())
+        store.replace_source_chunks("summit.docx", [_chunk("b", "Tenant pays percentage rent")])
+        versions.append(store.data_version())
+        store.rebuild(lambda version: version.add_chunks([_chunk("c", "Rebuilt")], show_progress=False))
+        versions.append(store.data_version())
+
+        assert versions == sorted(set(versions))
+
+        # Another instance sees the same counter
+        other = ChromaStore(persist_dir=store.persist_dir, collection_name="ver_test", embedder=FakeEmbedder())
+        assert other.data_version() == versions[-1]
+
+
+class TestStaleCaches:
+    """Test caches reacting to writes made through another store instance."""
+
+    def test_ranker_rebuilds_bm25_after_outside_write(self, tmp_path):
+        """A write by another process's store is picked up on the next keyword search."""
+        persist_dir = str(tmp_path / "chroma")
+        store = ChromaStore(persist_dir=persist_dir, collection_name="stale_test", embedder=FakeEmbedder())
+        store.add_chunks([_chunk(f"filler-{i}", text) for i, text in enumerate(FILLER)], show_progress=False)
+        ranker = HybridRanker(store, reranker=Reranker())
+        assert not ranker.keyword_only_search("percentage")
+
+        # Stand-in for another process writing to the same collection
+        writer = ChromaStore(persist_dir=persist_dir, collection_name="stale_test", embedder=FakeEmbedder())
+        writer.add_chunks([_chunk("new-1", "Tenant pays percentage rent annually", "new.docx")], show_progress=False)
+
+        get_invalidation_bus().check(force=True)
+        assert [r.chunk_id for r in ranker.keyword_only_search("percentage")] == ["new-1"]
+
+    def test_ranker_leaves_the_store_closed_until_first_search(self, tmp_path):
+        """Building a ranker doesn't open the collection, and writes before its first search still show."""
+        persist_dir = str(tmp_path / "chroma")
+        writer = ChromaStore(persist_dir=persist_dir, collection_name="lazy_test", embedder=FakeEmbedder())
+        writer.add_chunks([_chunk(f"filler-{i}", text) for i, text in enumerate(FILLER)], show_progress=False)
+
+        store = ChromaStore(persist_dir=persist_dir, collection_name="lazy_test", embedder=FakeEmbedder())
+        ranker = HybridRanker(store, reranker=Reranker())
+        get_invalidation_bus().check(force=True)
+        assert not store.is_open
+
+        writer.add_chunks([_chunk("new-1", "Tenant pays percentage rent annually", "new.docx")], show_progress=False)
+        assert [r.chunk_id for r in ranker.keyword_only_search("percentage")] == ["new-1"]
+        assert store.is_open
+
+    def test_incremental_update_keeps_bm25(self, tmp_path):
+        """An in-process write that patched BM25 doesn't trigger a rebuild."""
+        store = ChromaStore(persist_dir=str(tmp_path / "chroma"), collection_name="patch_test", embedder=FakeEmbedder())
+        store.add_chunks([_chunk(f"filler-{i}", text) for i, text in enumerate(FILLER)], show_progress=False)
+        ranker = HybridRanker(store, reranker=Reranker())
+        ranker.keyword_only_search("roof")
+        index = ranker._bm25_index
+
+        chunk = _chunk("new-1", "Tenant pays percentage rent annually", "new.docx")
+        store.add_chunks([chunk], show_progress=False)
+        ranker.update_bm25_index([chunk.id], [chunk.content], [chunk.metadata])
+        get_invalidation_bus().publish(store)
+
+        assert ranker._bm25_index is index
+        assert [r.chunk_id for r in ranker.keyword_only_search("percentage")] == ["new-1"]
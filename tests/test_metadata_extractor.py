@@ -0,0 +1,85 @@
+"""
+Tests for lease metadata extraction.
+"""
+
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.metadata import extractor
+from src.metadata.extractor import DEFAULT_RULES, ExtractionRule, MetadataExtractor, RuleScanner
+from src.parsing.docx_parser import ParsedDocument
+
+
+def _document(full_text: str, data_sheet=None, file_name: str = "Sephora Lease 8.3.23.docx"):
+    return ParsedDocument(
+        file_path=file_name, file_name=file_name, full_text=full_text, paragraphs=[], tables=[],
+        sections={}, data_sheet=data_sheet or {}, tenant_name="Sephora"
+    )
+
+
+class TestRuleScanner:
+    """Test the combined rule engine."""
+
+    def test_scan_reports_rule_value_and_offsets(self):
+        """Each match carries its rule, captured value and position."""
+        text = "Premises of 1,167 SF at $42.50 from March 1, 2024 with 6% over breakpoint."
+        matches = list(RuleScanner(DEFAULT_RULES).scan(text))
+
+        assert [(m.rule, m.value) for m in matches] == [
+            ("sqft", "1,167"), ("currency", "42.50"), ("date", "March 1, 2024"), ("percentage", "6")
+        ]
+        for match in matches:
+            assert text[match.start:match.end] == match.text
+
+    def test_unguarded_rules_still_match(self):
+        """Rules without a lead class disable the lookahead but scan the same."""
+        rules = DEFAULT_RULES + [ExtractionRule("suite", r'Suite\s+(\w+)')]
+        matches = list(RuleScanner(rules).scan("Suite 120, 2,000 sq. ft."))
+        assert [(m.rule, m.value) for m in matches] == [("suite", "120"), ("sqft", "2,000")]
+
+
+class TestMetadataExtractor:
+    """Test field extraction and provenance."""
+
+    def test_fields_carry_spans(self):
+        """Data sheet and text-derived fields point back into full_text."""
+        text = (
+            "DATA SHEET\nSecurity Deposit: $9,000.00\n"
+            "The Premises contain approximately 80 SF of storage and 1,167 square feet of floor area."
+        )
+        metadata = MetadataExtractor().extract(_document(text, {"security_deposit": "$9,000.00"}))
+
+        assert metadata.premises_sqft == 1167
+        assert metadata.security_deposit == 9000.0
+        assert metadata.execution_date == "August 03, 2023"
+        for name, span in metadata.spans.items():
+            assert text[span.start:span.end] == span.text
+        assert metadata.spans["premises_sqft"].source == "sqft"
+        assert metadata.spans["security_deposit"].source == "data_sheet"
+        assert metadata.to_dict()["spans"]["premises_sqft"]["text"] == "1,167 square feet"
+
+    def test_text_is_only_scanned_for_a_fallback(self, monkeypatch):
+        """A data sheet area means the document text is never scanned."""
+        extractor_ = MetadataExtractor()
+
+        def fail(text):
+            raise AssertionError("document text was scanned")
+
+        monkeypatch.setattr(extractor_.sqft_scanner, "scan", fail)
+        monkeypatch.setattr(extractor_.scanner, "scan", fail)
+        metadata = extractor_.extract(_document("Premises of 1,167 square feet.", {"gla": "1,200 SF"}))
+
+        assert metadata.premises_sqft == 1200
+
+    def test_extract_many_matches_extract(self, monkeypatch):
+        """Pooled extraction returns the same metadata in input order."""
+        monkeypatch.setattr(extractor, "PARALLEL_MIN_CHARS", 0)
+        documents = [_document(f"Premises of {1000 + i * 10} square feet.") for i in range(6)]
+        extractor_ = MetadataExtractor()
+
+        expected = [extractor_.extract(doc).to_dict() for doc in documents]
+        assert [m.to_dict() for m in extractor_.extract_many(documents, workers=2)] == expected
+        assert [m.to_dict() for m in extractor_.extract_many(documents, workers=1)] == expected
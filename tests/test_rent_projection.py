@@ -0,0 +1,65 @@
+"""
+Tests for the vectorized rent projection engine.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.data.lease_data import LEASE_DATA, calc_rent_for_year
+from src.data.rent_projection import build_rent_projection, get_portfolio_projection
+
+
+class TestRentProjection:
+    """Test the annual and monthly projection matrices."""
+
+    def test_matches_calc_rent_for_year(self):
+        """Annual matrix reproduces the per-lease escalation formula."""
+        projection = build_rent_projection(LEASE_DATA, horizon_years=30)
+
+        for i, lease in enumerate(LEASE_DATA):
+            for year in range(1, 31):
+                expected = calc_rent_for_year(lease, year) if year <= lease.term_months / 12 else 0.0
+                assert projection.base_rent[i, year - 1] == pytest.approx(expected)
+
+    def test_active_counts(self):
+        """Active lease counts follow full lease years within the term."""
+        projection = get_portfolio_projection()
+        active = projection.active_by_year(10)
+
+        assert active[0] == len(LEASE_DATA)
+        assert active[9] == sum(1 for lease in LEASE_DATA if lease.term_months >= 120)
+
+    def test_monthly_matrix_sums_to_annual(self):
+        """First twelve calendar months equal lease year 1 when all leases commence together."""
+        projection = get_portfolio_projection()
+
+        assert projection.monthly_base_rent[:, :12].sum() == pytest.approx(projection.base_rent[:, 0].sum())
+
+    def test_monthly_matrix_ends_with_term(self):
+        """Monthly rent stops after the lease term."""
+        projection = get_portfolio_projection()
+
+        for i, lease in enumerate(LEASE_DATA):
+            assert projection.monthly_active[i].sum() == min(lease.term_months, projection.monthly_active.shape[1])
+
+    def test_recovery_layers(self):
+        """CAM, tax and insurance layers are priced per square foot."""
+        projection = get_portfolio_projection()
+        lease = next(l for l in LEASE_DATA if l.tax)
+        i = LEASE_DATA.index(lease)
+
+        assert projection.cam[i, 0] == pytest.approx(lease.cam.year1 * lease.sqft)
+        assert projection.tax[i, 0] == pytest.approx(lease.tax * lease.sqft)
+        assert projection.insurance[i, 0] == pytest.approx(lease.insurance * lease.sqft)
+
+    def test_yearly_summary_shape(self):
+        """Summary rows carry lease and calendar years."""
+        summary = get_portfolio_projection().yearly_summary(10)
+
+        assert len(summary) == 10
+        assert summary[0]['year'] == 1
+        assert summary[0]['calendar_year'] == 2027
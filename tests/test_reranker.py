@@ -0,0 +1,130 @@
+"""
+Tests for the linear rerank stage over stored chunk features.
+"""
+
+from pathlib import Path
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.chunking.features import chunk_features, numeric_density
+from src.search.hybrid_ranker import HybridRanker, SearchResult
+from src.search.reranker import FEATURE_NAMES, LinearReranker, Reranker
+
+
+def _result(chunk_id, score, tenant, section_type, content="Lease text.", structured=True):
+    metadata = {"tenant_name": tenant, "section_type": section_type,
+                "source_file": "structured_data" if structured else f"{tenant}.docx"}
+    metadata.update(chunk_features(content, metadata))
+    return SearchResult(chunk_id=chunk_id, content=content, metadata=metadata, score=score)
+
+
+class StubStore:
+    """Store stand-in returning fixed vector hits and BM25 corpus."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def search(self, query, n_results=10, where=None):
+        hits = self.chunks[:n_results]
+        return {
+            "ids": [c.chunk_id for c in hits],
+            "documents": [c.content for c in hits],
+            "metadatas": [c.metadata for c in hits],
+            "distances": [0.1 * i for i in range(len(hits))],
+        }
+
+    def get_all_chunks(self):
+        return {
+            "ids": [c.chunk_id for c in self.chunks],
+            "documents": [c.content for c in self.chunks],
+            "metadatas": [c.metadata for c in self.chunks],
+        }
+
+
+class TestChunkFeatures:
+    """Test ingest-time chunk features."""
+
+    def test_numeric_density(self):
+        """Dollar amounts, percentages and sizes count; plain prose does not."""
+        assert numeric_density("") == 0.0
+        assert numeric_density("The tenant shall keep the premises clean.") == 0.0
+        assert numeric_density("Rent $5,000; 3% bumps; 1,200 SF") == 1.0
+
+    def test_features_are_prefixed_floats(self):
+        """Features merge into flat Chroma metadata without collisions."""
+        features = chunk_features("Rent is $5,000.", {"source_file": "structured_data"})
+        assert features["feat_structured"] == 1.0
+        assert all(key.startswith("feat_") and isinstance(value, float) for key, value in features.items())
+
+
+class TestLinearReranker:
+    """Test feature scoring and ordering."""
+
+    def test_named_tenant_outranks_fusion_order(self):
+        """Chunks for the tenant named in the query move above other tenants."""
+        results = [
+            _result("drybar", 0.020, "Drybar", "lease_summary"),
+            _result("sephora", 0.015, "Sephora", "lease_summary"),
+            _result("portfolio", 0.012, "ALL", "portfolio_summary"),
+        ]
+        reranked = LinearReranker().rerank("What is Sephora's base rent?", results)
+
+        assert reranked[0].chunk_id == "sephora"
+        assert reranked[0].fusion_score == 0.015
+        assert [r.score for r in reranked] == sorted((r.score for r in reranked), reverse=True)
+
+    def test_feature_matrix_columns(self):
+        """Each column holds the feature its name describes."""
+        results = [
+            _result("a", 0.02, "Trader Joe's", "ti_allowance", content="TI allowance of $40 per SF"),
+            _result("b", 0.01, "Sephora", "recoveries", structured=False),
+        ]
+        matrix = LinearReranker().feature_matrix("Trader Joe’s TI allowance", results)
+        columns = dict(zip(FEATURE_NAMES, matrix.T))
+
+        np.testing.assert_allclose(columns["fusion"], [1.0, 0.5])
+        np.testing.assert_allclose(columns["structured"], [1.0, 0.0])
+        np.testing.assert_allclose(columns["tenant_match"], [1.0, 0.0])
+        np.testing.assert_allclose(columns["tenant_mismatch"], [0.0, 1.0])
+        np.testing.assert_allclose(columns["section_match"], [1.0, 0.0])
+        assert columns["numeric"][0] > 0
+
+    def test_legacy_chunks_without_stored_features(self):
+        """Chunks indexed before features were stored are scored on the fly."""
+        legacy = SearchResult(chunk_id="x", content="Rent $5,000", metadata={"tenant_name": "Drybar"}, score=0.01)
+        assert LinearReranker().feature_matrix("Drybar rent", [legacy]).shape == (1, len(FEATURE_NAMES))
+
+    def test_unknown_weight_rejected(self):
+        """Misspelled feature names fail loudly."""
+        with pytest.raises(ValueError):
+            LinearReranker({"fusoin": 1.0})
+
+    def test_hybrid_ranker_applies_reranker(self):
+        """HybridRanker reranks before truncating; the base Reranker keeps RRF order."""
+        chunks = [_result(f"drybar-{i}", 0.0, "Drybar", "lease_summary", content=f"drybar lease {i}")
+                  for i in range(4)]
+        chunks.append(_result("sephora", 0.0, "Sephora", "lease_summary", content="sephora lease"))
+        store = StubStore(chunks)
+
+        plain = HybridRanker(store, vector_k=5, bm25_k=5, reranker=Reranker())
+        assert plain.search("Sephora lease", n_results=2)[0].fusion_score is None
+
+        ranked = HybridRanker(store, vector_k=5, bm25_k=5, reranker=LinearReranker()).search(
+            "Sephora lease", n_results=2
+        )
+        assert ranked[0].chunk_id == "sephora"
+
+    def test_bm25_ranks_within_the_filter(self):
+        """A tenant filter keeps BM25 hits even when other tenants outscore it on the query."""
+        chunks = [_result(f"drybar-{i}", 0.0, "Drybar", "rent", content=f"monthly rent monthly rent {i}")
+                  for i in range(4)]
+        chunks.append(_result("sephora", 0.0, "Sephora", "rent", content="sephora monthly rent"))
+        ranker = HybridRanker(StubStore(chunks), vector_k=2, bm25_k=2, reranker=Reranker())
+
+        results = ranker.search("monthly rent", where={"tenant_name": "Sephora"})
+        assert [(r.chunk_id, r.bm25_rank) for r in results] == [("sephora", 1)]
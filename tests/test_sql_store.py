@@ -125,6 +125,47 @@ class TestLeaseOperations:
         assert updated_lease['base_rent'] == 1500
         assert updated_lease['status'] == 'renewed'
 
+    def test_upsert_lease(self, temp_db):
+        """Upserting the same lease file updates the row and its expiration alerts."""
+        lease_id, created = temp_db.upsert_lease("Upsert Tenant", "upsert.docx", base_rent=1000,
+                                                 end_date="2030-06-30")
+        assert created is True
+
+        same_id, created = temp_db.upsert_lease("Upsert Tenant", "upsert.docx", base_rent=1200,
+                                                end_date="2031-06-30")
+        assert (same_id, created) == (lease_id, False)
+        assert temp_db.get_lease(lease_id)['base_rent'] == 1200
+
+        cursor = temp_db.conn.cursor()
+        cursor.execute("SELECT alert_date FROM lease_alerts WHERE lease_id = ? ORDER BY alert_date", (lease_id,))
+        assert [row[0] for row in cursor.fetchall()] == ["2031-04-01", "2031-05-01", "2031-05-31"]
+
+    def test_transaction_rolls_back(self, temp_db):
+        """Writes inside a failed transaction block are not kept."""
+        with pytest.raises(RuntimeError):
+            with temp_db.transaction():
+                temp_db.add_lease("Rolled Back Tenant", "rollback.docx")
+                raise RuntimeError("vector store write failed")
+        assert temp_db.get_leases_by_tenant("Rolled Back Tenant") == []
+
+        with temp_db.transaction():
+            temp_db.add_lease("Committed Tenant", "commit.docx")
+        assert len(temp_db.get_leases_by_tenant("Committed Tenant")) == 1
+
+    def test_failed_nested_block_rolls_back_only_itself(self, temp_db):
+        """The enclosing transaction keeps its writes when a nested block raises."""
+        with temp_db.transaction():
+            temp_db.add_lease("Outer Tenant", "outer.docx")
+            with pytest.raises(RuntimeError):
+                with temp_db.transaction():
+                    temp_db.add_lease("Nested Tenant", "nested.docx")
+                    raise RuntimeError("vector store write failed")
+            temp_db.add_lease("Later Tenant", "later.docx")
+
+        assert temp_db.get_leases_by_tenant("Nested Tenant") == []
+        assert len(temp_db.get_leases_by_tenant("Outer Tenant")) == 1
+        assert len(temp_db.get_leases_by_tenant("Later Tenant")) == 1
+
     def test_get_all_leases(self, temp_db):
         """Test retrieving all leases."""
         temp_db.add_lease("Tenant 1", "l1.docx", status='active')
@@ -275,6 +316,180 @@ class TestQueryLog:
         assert popular[0]['query_count'] == 3
 
 
+class TestPagedReads:
+    """Test the data version counter and keyset-paged reads."""
+
+    def test_data_version_counts_writes(self, temp_db):
+        """Every write to a versioned table bumps the data version."""
+        start = temp_db.data_version()
+        lease_id = temp_db.add_lease("Version Tenant", "version.docx")
+        after_add = temp_db.data_version()
+        assert after_add > start
+
+        temp_db.log_query("not versioned")
+        assert temp_db.data_version() == after_add
+
+        temp_db.update_lease(lease_id, base_rent=5000.0)
+        assert temp_db.data_version() > after_add
+
+    def test_pages_cover_every_row_once(self, temp_db):
+        """Following next_after visits each lease once, in end-date order."""
+        for i in range(5):
+            temp_db.add_lease(f"Tenant {i}", f"l{i}.docx", end_date=f"2030-0{5 - i}-01")
+
+        seen, after = [], None
+        while True:
+            rows, after = temp_db.get_leases_page(after=after, limit=2, fields=["lease_file", "end_date"])
+            assert all(set(row) == {"lease_file", "end_date"} for row in rows)
+            seen.extend(rows)
+            if after is None:
+                break
+
+        assert [row["lease_file"] for row in seen] == ["l4.docx", "l3.docx", "l2.docx", "l1.docx", "l0.docx"]
+
+    def test_unknown_field_rejected(self, temp_db):
+        """Projection only accepts real columns."""
+        with pytest.raises(ValueError):
+            temp_db.get_tenants_page(fields=["tenant_name", "password"])
+
+    def test_analytics_memo_follows_data_version(self, temp_db, monkeypatch):
+        """Analytics are served from the memo until the data changes."""
+        from src.analytics.lease_analytics import LeaseAnalytics
+
+        reads = []
+        get_expiration_months = temp_db.get_expiration_months
+        monkeypatch.setattr(temp_db, "get_expiration_months", lambda: reads.append(1) or get_expiration_months())
+
+        temp_db.add_lease("Memo Tenant", "memo.docx", end_date="2030-01-01", base_rent=1000.0)
+        analytics = LeaseAnalytics(temp_db)
+        first = analytics.analyze_expiration_timeline(months_ahead=600)
+        first["mutated"] = True
+        assert "mutated" not in analytics.analyze_expiration_timeline(months_ahead=600)
+        assert len(reads) == 1
+
+        temp_db.add_lease("Second Tenant", "second.docx", end_date="2031-01-01", base_rent=2000.0)
+        analytics.analyze_expiration_timeline(months_ahead=600)
+        assert len(reads) == 2
+
+
+class TestExpirationCalendar:
+    """Test the materialized expiration calendar and its scheduler."""
+
+    def test_calendar_follows_lease_writes(self, temp_db):
+        """Adding and updating a lease moves its calendar row and month bucket."""
+        from datetime import date, timedelta
+        end_date = date.today() + timedelta(days=45)
+        lease_id = temp_db.add_lease("Calendar Tenant", "calendar.docx",
+                                     end_date=end_date.isoformat(), base_rent=3000.0)
+
+        expiring = temp_db.get_expiring_leases(days_ahead=60)
+        assert [lease['lease_id'] for lease in expiring] == [lease_id]
+        assert expiring[0]['days_until_expiration'] == 45
+        assert expiring[0]['alert_horizon'] == 60
+        assert expiring[0]['alert_state'] == 'due'  # the 90-day alert date has passed
+        assert temp_db.get_expiration_months() == [{
+            'month': end_date.strftime("%Y-%m"), 'lease_count': 1,
+            'revenue_at_risk': 3000.0, 'tenants': ["Calendar Tenant"]
+        }]
+
+        later = date.today() + timedelta(days=400)
+        temp_db.update_lease(lease_id, end_date=later.isoformat())
+        assert temp_db.get_expiring_leases(days_ahead=60) == []
+        assert [bucket['month'] for bucket in temp_db.get_expiration_months()] == [later.strftime("%Y-%m")]
+
+        temp_db.update_lease(lease_id, status='terminated')
+        assert temp_db.get_expiration_months() == []
+
+    def test_alerts_follow_configured_horizons(self, tmp_path):
+        """A full refresh replaces pending alerts for dropped horizons but keeps dismissed ones."""
+        db_path = str(tmp_path / "horizons.db")
+        store = SQLStore(db_path=db_path, alert_horizons=[120, 14])
+        lease_id = store.add_lease("Horizon Tenant", "horizon.docx", end_date="2031-06-30")
+        alerts = store.execute_custom_query("SELECT * FROM lease_alerts WHERE lease_id = ?", (lease_id,))
+        assert sorted(a['days_notice'] for a in alerts) == [14, 120]
+        store.dismiss_alert(next(a['alert_id'] for a in alerts if a['days_notice'] == 120))
+        store.close()
+
+        store = SQLStore(db_path=db_path, alert_horizons=[30])
+        store.refresh_expiration_calendar()
+        alerts = store.execute_custom_query(
+            "SELECT days_notice, status FROM lease_alerts WHERE lease_id = ? ORDER BY days_notice", (lease_id,)
+        )
+        assert [(a['days_notice'], a['status']) for a in alerts] == [(30, 'pending'), (120, 'dismissed')]
+        store.close()
+
+    def test_scheduler_refreshes_nightly_and_after_outside_writes(self, temp_db):
+        """run_pending() rebuilds only after the nightly slot or a write it didn't see."""
+        from datetime import datetime, timedelta
+        from src.database.expiration_scheduler import ExpirationScheduler
+
+        scheduler = ExpirationScheduler(temp_db.db_path, refresh_at="02:00")
+        now = datetime.now()
+        scheduler.run_pending(now)
+        assert not scheduler.run_pending(now)
+
+        # Writes through the store refresh their own lease, so nothing needs rebuilding
+        lease_id = temp_db.add_lease("Scheduled Tenant", "scheduled.docx", end_date="2030-01-15")
+        assert not scheduler.run_pending(now)
+        temp_db.update_lease(lease_id, base_rent=5000)
+        temp_db.upsert_lease("Scheduled Tenant", "scheduled.docx", end_date="2030-02-15")
+        temp_db.dismiss_alert(temp_db.get_active_alerts(days_ahead=10000)[0]['alert_id'])
+        assert not scheduler.run_pending(now)
+        assert [bucket['month'] for bucket in temp_db.get_expiration_months()] == ["2030-02"]
+
+        # Stand-in for another process editing the database directly
+        outside = sqlite3.connect(str(temp_db.db_path))
+        outside.execute("UPDATE leases SET end_date = '2030-03-15' WHERE lease_id = ?", (lease_id,))
+        outside.commit()
+        outside.close()
+        assert scheduler.run_pending(now)
+        assert [bucket['month'] for bucket in temp_db.get_expiration_months()] == ["2030-03"]
+
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time()).replace(hour=2, minute=1)
+        assert scheduler.run_pending(tomorrow)
+        assert not scheduler.run_pending(tomorrow)
+
+    def test_writes_outside_the_calendar_keep_it_current(self, temp_db):
+        """Financial records and new tenants don't touch the calendar, so they don't force a rebuild."""
+        from datetime import datetime
+        from src.database.expiration_scheduler import ExpirationScheduler
+
+        lease_id = temp_db.add_lease("Billing Tenant", "billing.docx", end_date="2030-01-15", base_rent=3500.0)
+        scheduler = ExpirationScheduler(temp_db.db_path, refresh_at="02:00")
+        now = datetime.now()
+        scheduler.run_pending(now)
+        lease_version = temp_db.lease_version()
+
+        temp_db.add_financial_record(lease_id, "2024-01-01", "rent_payment", 3500.0)
+        temp_db.add_tenant("Tenant Without Lease")
+        assert temp_db.lease_version() == lease_version
+        assert not scheduler.run_pending(now)
+
+        # A rename does change the tenant lists in the month buckets
+        outside = sqlite3.connect(str(temp_db.db_path))
+        outside.execute("UPDATE tenants SET tenant_name = 'Renamed Tenant' WHERE tenant_name = 'Billing Tenant'")
+        outside.commit()
+        outside.close()
+        assert scheduler.run_pending(now)
+
+    def test_reads_catch_up_without_a_scheduler(self, temp_db):
+        """Calendar reads rebuild first after an outside lease write or when no refresh has run today."""
+        from datetime import date, datetime, timedelta
+
+        lease_id = temp_db.add_lease("Unscheduled Tenant", "unscheduled.docx", end_date="2030-01-15")
+        outside = sqlite3.connect(str(temp_db.db_path))
+        outside.execute("UPDATE leases SET end_date = '2030-03-15' WHERE lease_id = ?", (lease_id,))
+        outside.commit()
+        outside.close()
+        assert "2030-03" in [bucket['month'] for bucket in temp_db.get_expiration_months()]
+
+        yesterday = datetime.combine(date.today() - timedelta(days=1), datetime.min.time())
+        temp_db._set_meta("calendar_refreshed_at", int(yesterday.timestamp()))
+        temp_db.conn.commit()
+        temp_db.get_expiring_leases(days_ahead=30)
+        assert temp_db.expiration_calendar_status()["refreshed_at"].date() == date.today()
+
+
 def test_database_initialization():
     """Test that database initializes with correct schema."""
     with tempfile.TemporaryDirectory() as tmpdir:
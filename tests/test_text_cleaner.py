@@ -0,0 +1,69 @@
+"""
+Tests for text cleaning and normalization.
+"""
+
+from pathlib import Path
+import random
+import sys
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.preprocessing import text_cleaner
+from src.preprocessing.text_cleaner import (
+    DATE_PATTERN, HEADER_FOOTER, SQUARE_FEET_PATTERN, TextCleaner
+)
+
+
+ATOMS = [
+    "January", "MAY", "may 5", "  ", " ", "\n", "\n\n\n", "\r\n", "CONFIDENTIAL", "draft", "Page 12",
+    "$ 1,000", "1,234", "1234.50", ",", " sq ft", "SF", "sq.ft.", "Square  Feet", "5", "2024", ", ",
+    "___", ".....", "transfer", "é", "ſ", "\t"
+]
+
+
+def _random_texts(seed: int, count: int = 2000):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(ATOMS) for _ in range(rng.randint(0, 16)))
+        for _ in range(count)
+    ]
+
+
+class TestTextCleaner:
+    """Test the cleaning pipeline."""
+
+    def test_clean_for_embedding_output(self):
+        """Headers, page numbers, spacing, dates, currency and units are normalized."""
+        text = (
+            "CONFIDENTIAL\r\nTenant  shall pay $1250.00 monthly\n\n\n\n- 3 -\n"
+            "starting march  1 2025 for 2500 SQ. FT. ______ see Exhibit B....."
+        )
+        assert TextCleaner().clean_for_embedding(text) == (
+            "Tenant shall pay $1,250.00 monthly\n"
+            "starting march 1, 2025 for 2500 square feet  see Exhibit B..."
+        )
+
+    def test_fast_paths_match_regex_passes(self):
+        """Lowered-text scans produce exactly what the IGNORECASE regexes do."""
+        cleaner = TextCleaner()
+        for text in _random_texts(seed=7):
+            assert cleaner._remove_headers(text) == HEADER_FOOTER.sub("", text)
+            assert cleaner.normalize_dates(text) == DATE_PATTERN.sub(r"\1 \2, \3", text)
+            assert cleaner.normalize_square_footage(text) == SQUARE_FEET_PATTERN.sub(
+                lambda m: f"{m.group(1)} square feet", text
+            )
+
+    def test_casefold_unsafe_text_uses_regex(self):
+        """A long s still matches "sf" case-insensitively, as before."""
+        assert TextCleaner().normalize_square_footage("1,200 ſF") == "1,200 square feet"
+
+    def test_clean_many_matches_clean(self, monkeypatch):
+        """Batch cleaning keeps order and output, in-process or pooled."""
+        monkeypatch.setattr(text_cleaner, "PARALLEL_MIN_CHARS", 0)
+        cleaner = TextCleaner()
+        texts = _random_texts(seed=11, count=50)
+        expected = [cleaner.clean_for_embedding(text) for text in texts]
+        assert cleaner.clean_many(texts, workers=1) == expected
+        assert cleaner.clean_many(texts, workers=2) == expected
+        assert cleaner.clean_many(texts, for_embedding=False) == [cleaner.clean(text) for text in texts]
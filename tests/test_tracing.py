@@ -0,0 +1,113 @@
+"""
+Tests for span tracing and the metrics registry.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.observability.metrics import MetricsRegistry, REGISTRY
+from src.observability.tracing import STAGE_HISTOGRAM, current_span, span, traced
+
+
+class TestSpans:
+    """Test span nesting and breakdowns."""
+
+    def test_children_attach_to_current_span(self):
+        """Spans opened inside another become its children."""
+        with span("request") as root:
+            with span("embed"):
+                pass
+            with span("generate") as generate:
+                with span("context_pack"):
+                    pass
+                generate.set(model="gpt-4o")
+
+        assert current_span() is None
+        assert [child.name for child in root.children] == ["embed", "generate"]
+        tree = root.to_dict()
+        assert tree["children"][1]["attributes"] == {"model": "gpt-4o"}
+        assert tree["children"][1]["children"][0]["name"] == "context_pack"
+
+        breakdown = root.breakdown()
+        assert set(breakdown) == {"total", "embed", "generate", "context_pack"}
+        assert breakdown["total"] >= breakdown["generate"] >= breakdown["context_pack"]
+
+    def test_traced_decorator_records_errors(self):
+        """Decorated functions open a span and mark it on failure."""
+        @traced("bm25")
+        def failing():
+            raise ValueError("boom")
+
+        with span("request") as root:
+            with pytest.raises(ValueError):
+                failing()
+
+        assert root.children[0].name == "bm25"
+        assert root.children[0].error == "ValueError"
+
+    def test_threads_keep_separate_traces(self):
+        """Concurrent requests do not see each other's spans."""
+        def request(i):
+            with span("request") as root:
+                for _ in range(i + 1):
+                    with span("stage"):
+                        pass
+            return len(root.children)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            assert list(pool.map(request, range(8))) == list(range(1, 9))
+
+    def test_spans_feed_stage_histogram(self):
+        """Every finished span is observed in the stage histogram."""
+        histogram = REGISTRY.histogram(STAGE_HISTOGRAM, "")
+        before = histogram.snapshot().get((("stage", "fusion_test"),), {"count": 0})["count"]
+        for _ in range(3):
+            with span("fusion_test"):
+                pass
+        assert histogram.snapshot()[(("stage", "fusion_test"),)]["count"] == before + 3
+
+
+class TestMetricsRegistry:
+    """Test Prometheus text rendering."""
+
+    def test_histogram_render(self):
+        """Histograms render cumulative buckets, sum and count."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("stage_seconds", "Stage time", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 2.0):
+            histogram.observe(value, labels={"stage": "embed"})
+
+        text = registry.render()
+        assert "# TYPE stage_seconds histogram" in text
+        assert 'stage_seconds_bucket{stage="embed",le="0.1"} 1' in text
+        assert 'stage_seconds_bucket{stage="embed",le="1"} 2' in text
+        assert 'stage_seconds_bucket{stage="embed",le="+Inf"} 3' in text
+        assert 'stage_seconds_sum{stage="embed"} 2.55' in text
+        assert 'stage_seconds_count{stage="embed"} 3' in text
+
+    def test_counter_render_escapes_labels(self):
+        """Counters render with escaped label values."""
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors").inc(labels={"stage": 'say "hi"'})
+        assert 'errors_total{stage="say \\"hi\\""} 1' in registry.render()
+
+
+class TestSlowQueryLog:
+    """Test slow query persistence."""
+
+    def test_log_and_fetch_slow_queries(self, temp_db):
+        """Slow queries come back slowest first with decoded breakdowns."""
+        temp_db.log_slow_query("fast-ish", 6000.0, {"total": 6000.0, "generate": 5500.0})
+        temp_db.log_slow_query("slowest", 9000.0, {"total": 9000.0}, {"name": "request"}, "Sephora")
+
+        slow = temp_db.get_slow_queries(limit=5)
+        assert [row["query_text"] for row in slow] == ["slowest", "fast-ish"]
+        assert slow[0]["trace"] == {"name": "request"}
+        assert slow[0]["tenant_filter"] == "Sephora"
+        assert slow[1]["breakdown"]["generate"] == 5500.0
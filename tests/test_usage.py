@@ -0,0 +1,161 @@
+"""
+Tests for LLM/embedding token and cost accounting.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+import sqlite3
+import sys
+import time
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.benchmark.fakes import FakeLLMClient
+from src.llm.answer_generator import AnswerGenerator
+from src.observability.usage import (
+    UsageTracker, cheaper_model, estimate_cost, usage_context, usage_from_response
+)
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    store = UsageTracker(db_path=str(tmp_path / "usage.db"), flush_every=1000,
+                         session_token_budget=0, daily_cost_budget=0)
+    yield store
+    store.close()
+
+
+class RecordingClient(FakeLLMClient):
+    """Fake client that remembers which model each call used."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.models = []
+        create = self.chat.completions.create
+
+        def recording_create(model, **kw):
+            self.models.append(model)
+            return create(model=model, **kw)
+
+        self.chat.completions.create = recording_create
+
+
+class TestPricing:
+    """Test cost estimates and usage extraction."""
+
+    def test_estimate_cost_matches_longest_prefix(self):
+        """Dated and mini model names resolve to their own prices."""
+        assert estimate_cost("gpt-4o", 1_000_000, 0) == pytest.approx(2.50)
+        assert estimate_cost("gpt-4o-2024-08-06", 0, 1_000_000) == pytest.approx(10.00)
+        assert estimate_cost("gpt-4o-mini", 1_000_000, 1_000_000) == pytest.approx(0.75)
+        assert estimate_cost("unknown-model", 1000, 1000) == 0.0
+        assert cheaper_model("gpt-4o-2024-08-06") == "gpt-4o-mini"
+        assert cheaper_model("unknown-model") == "unknown-model"
+
+    def test_usage_from_both_providers(self):
+        """OpenAI and Anthropic usage blocks are read; missing usage is None."""
+        openai = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=12, completion_tokens=3))
+        anthropic = SimpleNamespace(usage=SimpleNamespace(input_tokens=20, output_tokens=5))
+        assert usage_from_response(openai) == (12, 3)
+        assert usage_from_response(anthropic) == (20, 5)
+        assert usage_from_response(SimpleNamespace()) == (None, None)
+
+
+class TestUsageTracker:
+    """Test recording, aggregation and persistence."""
+
+    def test_records_are_attributed_to_context(self, tracker):
+        """Nested usage contexts attribute calls to endpoint, agent and tenant."""
+        with usage_context(endpoint="/api/query"):
+            with usage_context(agent="rag", tenant_filter="Sephora"):
+                tracker.record("answer", "openai", "gpt-4o", 1000, 100, 50.0)
+            tracker.record("reformulate", "openai", "gpt-4o", 200, 20, 10.0)
+
+        by_endpoint = tracker.aggregate("endpoint")
+        assert by_endpoint["/api/query"]["calls"] == 2
+        assert by_endpoint["/api/query"]["prompt_tokens"] == 1200
+        assert tracker.aggregate("tenant_filter")["Sephora"]["calls"] == 1
+        assert tracker.aggregate("agent")[None]["calls"] == 1
+        assert tracker.aggregate("operation")["answer"]["cost_usd"] == pytest.approx(0.0035)
+
+        with pytest.raises(ValueError):
+            tracker.aggregate("color")
+        with pytest.raises(ValueError):
+            with usage_context(color="blue"):
+                pass
+
+    def test_missing_usage_is_estimated(self, tracker):
+        """Calls without a usage block fall back to a character estimate."""
+        record = tracker.record("chat", "anthropic", "claude-3-5-sonnet", None, None, 5.0,
+                                prompt_chars=400, completion_chars=40)
+        assert record.estimated
+        assert (record.prompt_tokens, record.completion_tokens) == (100, 10)
+
+    def test_flush_and_reload(self, tmp_path):
+        """Records flush to SQLite in batches and budgets survive a restart."""
+        db_path = str(tmp_path / "usage.db")
+        first = UsageTracker(db_path=db_path, flush_every=2, session_token_budget=0, daily_cost_budget=0)
+        with usage_context(session_id="s1", endpoint="chat_app"):
+            first.record("chat", "openai", "gpt-4o", 100, 10, 1.0)
+            assert first.summary("endpoint")[0]["calls"] == 1
+            first.record("chat", "openai", "gpt-4o", 100, 10, 1.0)
+            first.record("chat", "openai", "gpt-4o", 100, 10, 1.0)
+        first.close()
+
+        second = UsageTracker(db_path=db_path, session_token_budget=300, daily_cost_budget=0)
+        assert second.session_tokens("s1") == 330
+        assert second.over_budget("s1") == "session"
+        assert second.over_budget("s2") is None
+        assert second.daily_cost() == pytest.approx(3 * estimate_cost("gpt-4o", 100, 10))
+        second.close()
+
+    def test_quiet_process_flushes_on_timer(self, tmp_path):
+        """A pending record is written once flush_interval passes, without another record() call."""
+        db_path = tmp_path / "usage.db"
+        tracker = UsageTracker(db_path=str(db_path), flush_every=1000, flush_interval=0.05,
+                               session_token_budget=0, daily_cost_budget=0)
+        tracker.record("chat", "openai", "gpt-4o", 100, 10, 1.0)
+
+        def written():
+            conn = sqlite3.connect(str(db_path))
+            try:
+                return conn.execute("SELECT COUNT(*) FROM llm_usage").fetchone()[0]
+            finally:
+                conn.close()
+
+        deadline = time.time() + 5
+        while not written() and time.time() < deadline:
+            time.sleep(0.01)
+        assert written() == 1
+        tracker.close()
+
+
+@pytest.mark.needs_tokenizer
+class TestBudgetFallbacks:
+    """Test AnswerGenerator behavior once a budget is exhausted."""
+
+    def test_over_budget_uses_cache_then_cheaper_model(self, tmp_path):
+        """Repeat prompts come from cache; new prompts go to the cheaper model."""
+        usage = UsageTracker(db_path=str(tmp_path / "usage.db"), session_token_budget=50, daily_cost_budget=0)
+        client = RecordingClient(completion="The rent is $5,000.")
+        generator = AnswerGenerator(provider="openai", model="gpt-4o", client=client, usage_tracker=usage)
+
+        with usage_context(session_id="s1"):
+            first = generator.generate_answer("What is Sephora's rent?", ["Sephora pays $5,000 per month."])
+            assert usage.over_budget() == "session"
+
+            repeat = generator.generate_answer("What is Sephora's rent?", ["Sephora pays $5,000 per month."])
+            generator.generate_answer("What is Drybar's rent?", ["Drybar pays $4,000 per month."])
+
+        assert first == repeat
+        assert client.models == ["gpt-4o", "gpt-4o-mini"]
+        assert usage.aggregate("model")["gpt-4o-mini"]["calls"] == 1
+
+        # Other sessions keep the primary model
+        with usage_context(session_id="s2"):
+            generator.generate_answer("What is Drybar's rent?", ["Drybar pays $4,000 per month."])
+        assert client.models[-1] == "gpt-4o"
+        usage.close()
@@ -0,0 +1,187 @@
+"""
+Tests for the local memory-mapped VectorIndex backend.
+"""
+
+from multiprocessing import Process
+from pathlib import Path
+import copy
+import sys
+
+import pytest
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.benchmark.fakes import FakeEmbedder
+from src.data.structured_chunks import generate_all_structured_chunks
+from src.database.chroma_store import ChromaStore
+from src.database.vector_index import VectorIndex, create_vector_store
+
+
+def _add_in_batches(index_dir: str, start: int, n: int) -> None:
+    chunks = generate_all_structured_chunks()[start:start + n]
+    index = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+    for chunk in chunks:
+        index.add_chunks([chunk], show_progress=False)
+
+
+@pytest.fixture(scope="module")
+def chunks():
+    return generate_all_structured_chunks()
+
+
+@pytest.fixture(scope="module")
+def chroma(tmp_path_factory, chunks):
+    store = ChromaStore(persist_dir=str(tmp_path_factory.mktemp("chroma")), collection_name="index_test",
+                        embedder=FakeEmbedder())
+    store.add_chunks(chunks, show_progress=False)
+    return store
+
+
+@pytest.fixture
+def index(tmp_path, chunks):
+    index = VectorIndex(index_dir=str(tmp_path / "index"), embedder=FakeEmbedder())
+    index.add_chunks(chunks, show_progress=False)
+    return index
+
+
+class TestVectorIndex:
+    """Test the ChromaStore-compatible interface."""
+
+    def test_search_matches_chroma(self, chroma, index):
+        """Exact search returns Chroma's ranking and distances."""
+        for query in ["Sephora base rent", "co-tenancy risk", "TI allowance per square foot"]:
+            expected = chroma.search(query, n_results=5)
+            actual = index.search(query, n_results=5)
+            assert actual["ids"] == expected["ids"]
+            assert actual["metadatas"] == expected["metadatas"]
+            assert actual["distances"] == pytest.approx(expected["distances"], abs=1e-4)
+
+    def test_filtered_search_uses_tenant_rows(self, chroma, index):
+        """Tenant filters only return that tenant's chunks, ranked as Chroma does."""
+        expected = chroma.search_by_tenant("Drybar", "rent", n_results=3)
+        actual = index.search_by_tenant("Drybar", "rent", n_results=3)
+        assert actual["ids"] == expected["ids"]
+        assert index.search("rent", where={"tenant_name": "Nobody"})["ids"] == []
+        assert index.search("rent", where={"tenant_name": "Drybar", "section_type": {"$eq": "cotenancy"}})[
+            "metadatas"][0]["section_type"] == "cotenancy"
+        with pytest.raises(ValueError):
+            index.search("rent", where={"tenant_name": {"$in": ["Drybar"]}})
+
+    def test_store_interface(self, chroma, index):
+        """Counts, tenants, chunk lookup and full scans agree with Chroma."""
+        assert index.count() == chroma.count()
+        assert index.get_unique_tenants() == chroma.get_unique_tenants()
+        assert index.get_facets() == chroma.get_facets()
+        chunk_id = chroma.get_all_chunks()["ids"][0]
+        assert index.get_chunk_by_id(chunk_id) == chroma.get_chunk_by_id(chunk_id)
+        assert index.get_chunk_by_id("missing") is None
+        assert sorted(index.get_all_chunks()["ids"]) == sorted(chroma.get_all_chunks()["ids"])
+
+    def test_quantized_and_ivf(self, tmp_path, chunks):
+        """int8 vectors with an IVF coarse index still find the exact top hit."""
+        exact = VectorIndex(index_dir=str(tmp_path / "exact"), embedder=FakeEmbedder())
+        exact.add_chunks(chunks, show_progress=False)
+        approx = VectorIndex(index_dir=str(tmp_path / "approx"), embedder=FakeEmbedder(),
+                             quantize=True, ivf_min_vectors=16, nprobe=4)
+        approx.add_chunks(chunks, show_progress=False)
+
+        assert approx._centroids is not None
+        assert (tmp_path / "approx" / "g1.vectors").stat().st_size * 4 == (
+            tmp_path / "exact" / "g1.vectors").stat().st_size
+        query = "Sephora lease summary"
+        assert approx.search(query, n_results=1)["ids"] == exact.search(query, n_results=1)["ids"]
+
+    def test_readers_see_new_generation_after_refresh(self, tmp_path, chunks):
+        """A second process-style reader keeps its snapshot until refresh()."""
+        index_dir = str(tmp_path / "shared")
+        writer = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+        writer.add_chunks(chunks[:10], show_progress=False)
+        reader = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+
+        writer.add_chunks(chunks[10:], show_progress=False)
+        assert reader.count() == 10
+        assert reader.refresh()
+        assert reader.count() == len(chunks)
+        # The previous generation stays for readers that have read the old manifest
+        assert sorted(p.name for p in Path(index_dir).glob("g*.*")) == [
+            "g1.meta.pkl", "g1.vectors", "g2.meta.pkl", "g2.vectors"
+        ]
+
+        writer.delete_all()
+        reader.refresh()
+        assert reader.count() == 0
+        assert reader.search("rent")["ids"] == []
+        assert sorted(p.name for p in Path(index_dir).glob("g*.*")) == ["g2.meta.pkl", "g2.vectors", "g3.meta.pkl"]
+
+    def test_writers_build_on_the_newest_generation(self, tmp_path, chunks):
+        """A writer holding an old snapshot keeps what another writer published since."""
+        index_dir = str(tmp_path / "shared")
+        first = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+        second = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+        others = [copy.copy(chunk) for chunk in chunks[5:10]]
+        for chunk in others:
+            chunk.source_file = "other.docx"
+            chunk.metadata = {**chunk.metadata, "source_file": "other.docx"}
+        first.add_chunks(chunks[:5], show_progress=False)
+        second.add_chunks(others, show_progress=False)
+        assert second.count() == 10
+
+        assert len(first.replace_source_chunks(chunks[0].source_file, [])) == 5
+        assert sorted(first._ids) == sorted(chunk.id for chunk in others)
+
+    def test_concurrent_writer_processes_lose_nothing(self, tmp_path):
+        """Writers in different processes take turns, so every chunk ends up in the index."""
+        index_dir = str(tmp_path / "shared")
+        workers = [Process(target=_add_in_batches, args=(index_dir, start, 10)) for start in (0, 10, 20)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert all(worker.exitcode == 0 for worker in workers)
+        index = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+        assert index.count() == 30
+        assert index.data_version() == 30
+
+    def test_embedder_is_built_on_first_use_with_the_cache(self, tmp_path, monkeypatch):
+        """Opening an index for reads needs no API key; writes use the cached embedder."""
+        import src.vectorization.embedder as embedder_module
+        import src.vectorization.embedding_cache as cache_module
+
+        built = []
+        monkeypatch.setattr(embedder_module, "Embedder", lambda cache=None: built.append(cache) or FakeEmbedder())
+        monkeypatch.setattr(cache_module, "get_embedding_cache", lambda: "cache")
+        index = VectorIndex(index_dir=str(tmp_path / "index"))
+        assert index.count() == 0 and built == []
+
+        index.search("rent")
+        assert built == ["cache"]
+
+    def test_refresh_retries_when_files_are_gone(self, tmp_path, chunks, monkeypatch):
+        """A reader holding a manifest whose files were deleted rereads the manifest."""
+        index_dir = str(tmp_path / "shared")
+        writer = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+        writer.add_chunks(chunks[:5], show_progress=False)
+        stale = writer._read_manifest()
+        writer.add_chunks(chunks[5:10], show_progress=False)
+        writer.add_chunks(chunks[10:15], show_progress=False)
+
+        read_manifest = VectorIndex._read_manifest
+        manifests = iter([stale])
+        monkeypatch.setattr(VectorIndex, "_read_manifest", lambda self: next(manifests, None) or read_manifest(self))
+        reader = VectorIndex(index_dir=index_dir, embedder=FakeEmbedder())
+
+        assert reader.count() == 15
+        assert reader.data_version() == 3
+
+    def test_from_store_and_factory(self, tmp_path, chroma):
+        """An index can be exported from Chroma and opened through the factory."""
+        index_dir = str(tmp_path / "export")
+        exported = VectorIndex.from_store(chroma, index_dir=index_dir)
+        assert exported.count() == chroma.count()
+
+        opened = create_vector_store("index", index_dir=index_dir, embedder=FakeEmbedder())
+        assert opened.search("Drybar rent", n_results=3)["ids"] == chroma.search("Drybar rent", n_results=3)["ids"]
+        with pytest.raises(ValueError):
+            create_vector_store("faiss")